@@ -0,0 +1,87 @@
+import argparse
+import json
+import logging
+import os
+import sys
+from typing import Any, Dict
+
+from wannadb.resources import ResourceManager
+
+from benchmarks.suite import BENCHMARKS, SIZES, compare_to_baselines, run_benchmarks
+
+BASELINES_PATH: str = os.path.join(os.path.dirname(__file__), "baselines.json")
+
+
+def init_argparse() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        usage="python -m benchmarks [OPTIONS]",
+        description="Run the benchmarks on synthetic document bases and compare them to the stored baselines.",
+        prog="WannaDB Benchmarks",
+    )
+    parser.add_argument('-s', '--size', choices=list(SIZES.keys()), default="small", required=False,
+                        help="Size of the synthetic document base. Optional, if not specified 'small' will be used.")
+    parser.add_argument('-b', '--benchmark', action="append", choices=list(BENCHMARKS.keys()), required=False,
+                        help="Benchmark to run, can be given several times. "
+                             "Optional, if not specified all benchmarks are run.")
+    parser.add_argument('-r', '--repeat', type=int, default=3, required=False,
+                        help="Number of timed runs per benchmark. Optional, if not specified 3 will be used.")
+    parser.add_argument('-t', '--tolerance', type=float, default=0.25, required=False,
+                        help="Relative slowdown compared to the baseline that is still acceptable. "
+                             "Optional, if not specified 0.25 will be used.")
+    parser.add_argument('-o', '--output', required=False,
+                        help="Path of a JSON file for the measurements. Optional, if not specified nothing is written.")
+    parser.add_argument('--update-baselines', action="store_true",
+                        help="Store the measurements as the new baselines instead of comparing to them.")
+    return parser
+
+
+def main() -> int:
+    parser = init_argparse()
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+
+    with ResourceManager(use_model_server=False):
+        results: Dict[str, Dict[str, Any]] = run_benchmarks(args.size, args.benchmark, args.repeat)
+
+    baselines: Dict[str, Dict[str, float]] = {}
+    if os.path.isfile(BASELINES_PATH):
+        with open(BASELINES_PATH, "r", encoding="utf-8") as file:
+            baselines = json.load(file)
+
+    if args.update_baselines:
+        size_baselines: Dict[str, float] = baselines.setdefault(args.size, {})
+        for identifier, result in results.items():
+            if not result.get("skipped"):
+                size_baselines[identifier] = round(result["median"], 4)
+        with open(BASELINES_PATH, "w", encoding="utf-8") as file:
+            json.dump(baselines, file, indent=4, sort_keys=True)
+            file.write("\n")
+        print(f"Updated the {args.size} baselines.")
+
+    comparison: Dict[str, Dict[str, Any]] = compare_to_baselines(
+        results, baselines.get(args.size, {}), args.tolerance
+    )
+
+    print(f"{'benchmark':<30} {'median [s]':>12} {'baseline [s]':>12} {'ratio':>8}")
+    for identifier, result in results.items():
+        if result.get("skipped"):
+            print(f"{identifier:<30} {'skipped':>12}")
+        elif identifier in comparison.keys():
+            entry: Dict[str, Any] = comparison[identifier]
+            marker: str = "  REGRESSION" if entry["regression"] else ""
+            print(
+                f"{identifier:<30} {result['median']:>12.4f} {entry['baseline']:>12.4f} {entry['ratio']:>8.2f}{marker}"
+            )
+        else:
+            print(f"{identifier:<30} {result['median']:>12.4f} {'-':>12}")
+
+    if args.output is not None:
+        with open(args.output, "w", encoding="utf-8") as file:
+            json.dump({"size": args.size, "results": results, "comparison": comparison}, file, indent=4)
+
+    return 1 if any(entry["regression"] for entry in comparison.values()) and not args.update_baselines else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
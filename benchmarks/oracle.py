@@ -0,0 +1,119 @@
+import logging
+import random
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from wannadb.data.data import Attribute, Document, InformationNugget
+from wannadb.interaction import BaseInteractionCallback
+
+from benchmarks.synthetic import GroundTruth
+
+logger: logging.Logger = logging.getLogger(__name__)
+
+
+class OracleInteractionCallback(BaseInteractionCallback):
+    """
+    Interaction callback that simulates a user who knows the correct values.
+
+    The oracle answers the requests of the RankingBasedMatcher and the MergeGrouper from a ground-truth table. Like a
+    user of the interactive matching view, it confirms a correct nugget of the ranked list, picks the correct nugget of
+    a listed document if it is not the current guess, or states that a listed document contains no match. With the
+    probability noise, it gives a wrong answer instead. Before answering feedback requests, it waits for think_time
+    seconds.
+
+    The oracle records the latency of each feedback round, i.e. the time from the previous answer (or the start of the
+    session) until the next request, which is the time the user has to wait for the system.
+    """
+
+    def __init__(
+            self,
+            ground_truth: GroundTruth,
+            noise: float = 0.0,
+            think_time: float = 0.0,
+            seed: int = 42
+    ) -> None:
+        """
+        Initialize the OracleInteractionCallback.
+
+        :param ground_truth: correct values of the documents
+        :param noise: probability of a wrong answer
+        :param think_time: seconds to wait before each feedback
+        :param seed: seed of the random number generator for the noise
+        """
+        super(OracleInteractionCallback, self).__init__()
+        self._ground_truth: GroundTruth = ground_truth
+        self._noise: float = noise
+        self._think_time: float = think_time
+        self._random: random.Random = random.Random(seed)
+        self._last_answer: float = time.perf_counter()
+        self.latencies: Dict[str, List[float]] = {}
+        self.num_wrong_answers: int = 0
+
+    def reset(self) -> None:
+        """Start a new session, i.e. forget the latencies and measure the next latency from now on."""
+        self._last_answer = time.perf_counter()
+        self.latencies = {}
+        self.num_wrong_answers = 0
+
+    def _call(self, pipeline_element_identifier: str, data: Dict[str, Any]) -> Dict[str, Any]:
+        request: float = time.perf_counter()
+        if self._is_feedback_round(data):
+            self.latencies.setdefault(pipeline_element_identifier, []).append(request - self._last_answer)
+            if self._think_time > 0:
+                time.sleep(self._think_time)
+
+        if "do-attribute-request" in data.keys():
+            answer: Dict[str, Any] = {"do-attribute": True}
+        elif "nuggets" in data.keys():
+            answer: Dict[str, Any] = self._answer_ranked_list(data["nuggets"], data["attribute"])
+        elif data.get("request-name") == "get-attribute":
+            answer: Dict[str, Any] = {"attribute": data["attributes"][0]}
+        elif data.get("request-name") == "same-cluster-feedback":
+            answer: Dict[str, Any] = {"feedback": self._answer_same_cluster(data["cluster-1"], data["cluster-2"])}
+        else:
+            answer: Dict[str, Any] = {}
+
+        self._last_answer = time.perf_counter()
+        return answer
+
+    @staticmethod
+    def _is_feedback_round(data: Dict[str, Any]) -> bool:
+        return "nuggets" in data.keys() or data.get("request-name") == "same-cluster-feedback"
+
+    def _correct_span(self, document: Document, attribute: Attribute) -> Optional[Tuple[int, int]]:
+        return self._ground_truth[document.name][attribute.name]
+
+    def _is_correct(self, nugget: InformationNugget, attribute: Attribute) -> bool:
+        return self._correct_span(nugget.document, attribute) == (nugget.start_char, nugget.end_char)
+
+    def _answer_ranked_list(self, nuggets: List[InformationNugget], attribute: Attribute) -> Dict[str, Any]:
+        if self._random.random() < self._noise:
+            self.num_wrong_answers += 1
+            nugget: InformationNugget = self._random.choice(nuggets)
+            if self._is_correct(nugget, attribute):
+                return {"message": "no-match-in-document", "nugget": nugget, "not-a-match": nugget}
+            return {"message": "is-match", "nugget": nugget, "not-a-match": None}
+
+        # confirm a correct nugget of the ranked list
+        for nugget in nuggets:
+            if self._is_correct(nugget, attribute):
+                return {"message": "is-match", "nugget": nugget, "not-a-match": None}
+
+        # pick the correct nugget of a listed document instead of the current guess
+        for nugget in nuggets:
+            for other_nugget in nugget.document.nuggets:
+                if self._is_correct(other_nugget, attribute):
+                    return {"message": "is-match", "nugget": other_nugget, "not-a-match": nugget}
+
+        # state that a listed document does not contain a value (or none that has been extracted)
+        for nugget in nuggets:
+            if self._correct_span(nugget.document, attribute) is None:
+                return {"message": "no-match-in-document", "nugget": nugget, "not-a-match": nugget}
+        return {"message": "no-match-in-document", "nugget": nuggets[0], "not-a-match": nuggets[0]}
+
+    def _answer_same_cluster(self, cluster_a: List[InformationNugget], cluster_b: List[InformationNugget]) -> bool:
+        is_same: bool = cluster_a[0].text == cluster_b[0].text
+        if self._random.random() < self._noise:
+            self.num_wrong_answers += 1
+            return not is_same
+        return is_same
@@ -0,0 +1,74 @@
+import hashlib
+import logging
+import threading
+from typing import Dict, List
+
+import numpy as np
+
+from wannadb.resources import BaseResource, register_resource
+
+logger: logging.Logger = logging.getLogger(__name__)
+
+# dimensionality of the fake embeddings
+EMBEDDING_DIM: int = 64
+
+
+class HashingEncoder:
+    """
+    Stand-in for a SentenceTransformer that computes deterministic fake embeddings without a model.
+
+    Each word is embedded as a random vector that is seeded by the word's hash, and a text is embedded as the normalized
+    mean of its words' vectors. Texts that share words therefore have similar embeddings, which makes the distances
+    meaningful enough for the matchers and groupers to behave realistically.
+    """
+
+    def __init__(self, embedding_dim: int = EMBEDDING_DIM) -> None:
+        """
+        Initialize the HashingEncoder.
+
+        :param embedding_dim: dimensionality of the embeddings
+        """
+        super(HashingEncoder, self).__init__()
+        self._embedding_dim: int = embedding_dim
+        self._word_vectors: Dict[str, np.ndarray] = {}
+        self._lock: threading.Lock = threading.Lock()
+
+    def _word_vector(self, word: str) -> np.ndarray:
+        vector: np.ndarray = self._word_vectors.get(word)
+        if vector is None:
+            seed: int = int.from_bytes(hashlib.sha256(word.encode("utf-8")).digest()[:8], "little")
+            vector = np.random.default_rng(seed).standard_normal(self._embedding_dim).astype(np.float32)
+            with self._lock:
+                self._word_vectors[word] = vector
+        return vector
+
+    def encode(self, texts: List[str], batch_size: int = 32, show_progress_bar: bool = False) -> np.ndarray:
+        embeddings: np.ndarray = np.zeros((len(texts), self._embedding_dim), dtype=np.float32)
+        for ix, text in enumerate(texts):
+            words: List[str] = text.lower().split()
+            if words != []:
+                embedding: np.ndarray = np.mean([self._word_vector(word) for word in words], axis=0)
+                embeddings[ix] = embedding / np.linalg.norm(embedding)
+        return embeddings
+
+
+@register_resource
+class BenchmarkSBERTResource(BaseResource):
+    """Fake SBERT resource for the benchmarks that works offline and on the CPU."""
+    identifier: str = "BenchmarkSBERTResource"
+
+    def __init__(self) -> None:
+        """Initialize the BenchmarkSBERTResource."""
+        super(BenchmarkSBERTResource, self).__init__()
+        self._encoder: HashingEncoder = HashingEncoder()
+
+    @classmethod
+    def load(cls) -> "BenchmarkSBERTResource":
+        return cls()
+
+    def unload(self) -> None:
+        pass
+
+    @property
+    def resource(self) -> HashingEncoder:
+        return self._encoder
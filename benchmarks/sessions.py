@@ -0,0 +1,213 @@
+import argparse
+import json
+import logging
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from wannadb.configuration import Pipeline
+from wannadb.data.data import DocumentBase, InformationNugget
+from wannadb.matching.distance import SignalsMeanDistance
+from wannadb.matching.matching import BaseMatcher, RankingBasedMatcher
+from wannadb.resources import ResourceManager
+from wannadb.statistics import Statistics
+from wannadb.status import EmptyStatusCallback
+
+from benchmarks.oracle import OracleInteractionCallback
+from benchmarks.synthetic import GroundTruth
+
+logger: logging.Logger = logging.getLogger(__name__)
+
+
+def default_matcher(max_num_feedback: int = 10, num_workers: int = 1) -> RankingBasedMatcher:
+    """
+    RankingBasedMatcher with the configuration of the user interfaces.
+
+    :param max_num_feedback: maximum number of feedback rounds per attribute
+    :param num_workers: number of worker processes that match the attributes in parallel
+    :return: matcher
+    """
+    return RankingBasedMatcher(
+        distance=SignalsMeanDistance(
+            ["LabelEmbeddingSignal", "TextEmbeddingSignal", "ContextSentenceEmbeddingSignal"]
+        ),
+        max_num_feedback=max_num_feedback,
+        len_ranked_list=10,
+        max_distance=0.2,
+        num_random_docs=1,
+        sampling_mode="AT_MAX_DISTANCE_THRESHOLD",
+        adjust_threshold=True,
+        nugget_pipeline=Pipeline([]),
+        num_workers=num_workers
+    )
+
+
+def latency_percentiles(latencies: List[float]) -> Dict[str, Optional[float]]:
+    """
+    Summarize the latencies of the feedback rounds.
+
+    :param latencies: latencies in seconds
+    :return: mean, maximum, and percentiles of the latencies
+    """
+    if latencies == []:
+        return {"mean": None, "p50": None, "p90": None, "p99": None, "max": None}
+    return {
+        "mean": float(np.mean(latencies)),
+        "p50": float(np.percentile(latencies, 50)),
+        "p90": float(np.percentile(latencies, 90)),
+        "p99": float(np.percentile(latencies, 99)),
+        "max": float(np.max(latencies))
+    }
+
+
+def matching_accuracy(document_base: DocumentBase, ground_truth: GroundTruth) -> float:
+    """
+    Fraction of cells of the resulting table that contain the correct value.
+
+    :param document_base: document base with the attribute mappings
+    :param ground_truth: correct values of the documents
+    :return: accuracy
+    """
+    num_correct: int = 0
+    num_cells: int = 0
+    for document in document_base.documents:
+        for attribute in document_base.attributes:
+            num_cells += 1
+            nuggets: List[InformationNugget] = document.attribute_mappings.get(attribute.name, [])
+            span: Optional[Tuple[int, int]] = (nuggets[0].start_char, nuggets[0].end_char) if nuggets != [] else None
+            if span == ground_truth[document.name][attribute.name]:
+                num_correct += 1
+    return num_correct / num_cells if num_cells > 0 else 1.0
+
+
+def run_matching_session(
+        document_base: DocumentBase,
+        ground_truth: GroundTruth,
+        matcher: Optional[BaseMatcher] = None,
+        noise: float = 0.0,
+        think_time: float = 0.0,
+        seed: int = 42
+) -> Dict[str, Any]:
+    """
+    Match all attributes of the document base with the oracle as the user and measure the session.
+
+    The document base must already contain the signals that the matcher requires.
+
+    :param document_base: document base to match
+    :param ground_truth: correct values of the documents
+    :param matcher: matcher to run, defaults to default_matcher()
+    :param noise: probability of a wrong answer of the oracle
+    :param think_time: seconds the oracle waits before each feedback
+    :param seed: seed of the random number generator for the noise
+    :return: report of the session
+    """
+    if matcher is None:
+        matcher = default_matcher()
+    oracle: OracleInteractionCallback = OracleInteractionCallback(ground_truth, noise, think_time, seed)
+
+    statistics: Statistics = Statistics(True)
+    oracle.reset()
+    cpu_tick: float = time.process_time()
+    tick: float = time.perf_counter()
+    matcher(document_base, oracle, EmptyStatusCallback(), statistics)
+    tack: float = time.perf_counter()
+    cpu_tack: float = time.process_time()
+
+    latencies: List[float] = [
+        latency for element_latencies in oracle.latencies.values() for latency in element_latencies
+    ]
+    return {
+        "num_documents": len(document_base.documents),
+        "num_attributes": len(document_base.attributes),
+        "num_feedback_rounds": len(latencies),
+        "num_wrong_answers": oracle.num_wrong_answers,
+        "latency": latency_percentiles(latencies),
+        "time_to_table": tack - tick,
+        "think_time": think_time * len(latencies),
+        "cpu_time": cpu_tack - cpu_tick,
+        "accuracy": matching_accuracy(document_base, ground_truth)
+    }
+
+
+def load_labeled_document_base(
+        document_base_path: str,
+        ground_truth_path: str
+) -> Tuple[DocumentBase, GroundTruth]:
+    """
+    Load a preprocessed document base and its ground truth.
+
+    The ground truth is a JSON file that maps the document names to the attribute names to the [start_char, end_char]
+    of the correct value or null if the document does not contain a value.
+
+    :param document_base_path: path of the BSON file of the document base
+    :param ground_truth_path: path of the JSON file of the ground truth
+    :return: document base and ground truth
+    """
+    with open(document_base_path, "rb") as file:
+        document_base: DocumentBase = DocumentBase.from_bson(file.read())
+    with open(ground_truth_path, "r", encoding="utf-8") as file:
+        ground_truth: GroundTruth = {
+            document_name: {
+                attribute_name: tuple(span) if span is not None else None for attribute_name, span in values.items()
+            } for document_name, values in json.load(file).items()
+        }
+    return document_base, ground_truth
+
+
+def init_argparse() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        usage="python -m benchmarks.sessions [OPTIONS]",
+        description="Run matching sessions with a simulated user and report the latencies of the feedback rounds.",
+        prog="WannaDB Matching Sessions",
+    )
+    parser.add_argument('-s', '--size', default="small", required=False,
+                        help="Size of the synthetic document base. Optional, if not specified 'small' will be used.")
+    parser.add_argument('--document-base', required=False,
+                        help="Path of a preprocessed document base to use instead of a synthetic one. "
+                             "Requires --ground-truth.")
+    parser.add_argument('--ground-truth', required=False,
+                        help="Path of the JSON file with the correct values of the document base.")
+    parser.add_argument('-f', '--max-num-feedback', type=int, default=10, required=False,
+                        help="Maximum number of feedback rounds per attribute. "
+                             "Optional, if not specified 10 will be used.")
+    parser.add_argument('-n', '--noise', type=float, default=0.0, required=False,
+                        help="Probability of a wrong answer of the simulated user. "
+                             "Optional, if not specified the user is always right.")
+    parser.add_argument('--think-time', type=float, default=0.0, required=False,
+                        help="Seconds the simulated user waits before each answer. Optional, defaults to 0.")
+    parser.add_argument('-r', '--repeat', type=int, default=1, required=False,
+                        help="Number of sessions with different seeds. Optional, if not specified 1 will be used.")
+    parser.add_argument('-o', '--output', required=False,
+                        help="Path of a JSON file for the reports. Optional, if not specified nothing is written.")
+    return parser
+
+
+def main() -> None:
+    from benchmarks.suite import load_corpus
+
+    parser = init_argparse()
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+
+    reports: List[Dict[str, Any]] = []
+    with ResourceManager(use_model_server=False):
+        for seed in range(args.repeat):
+            if args.document_base is not None:
+                document_base, ground_truth = load_labeled_document_base(args.document_base, args.ground_truth)
+            else:
+                document_base, ground_truth = load_corpus(args.size)
+            report: Dict[str, Any] = run_matching_session(
+                document_base, ground_truth, default_matcher(args.max_num_feedback), args.noise, args.think_time, seed
+            )
+            reports.append(report)
+            print(json.dumps(report, indent=4))
+
+    if args.output is not None:
+        with open(args.output, "w", encoding="utf-8") as file:
+            json.dump(reports, file, indent=4)
+
+
+if __name__ == "__main__":
+    main()
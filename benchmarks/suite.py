@@ -0,0 +1,280 @@
+import abc
+import gc
+import importlib.util
+import logging
+import pickle
+import time
+from typing import Any, Dict, List, Optional, Tuple, Type
+
+from wannadb.data.data import Attribute, DocumentBase, InformationNugget
+from wannadb.matching.distance import SignalsMeanDistance
+from wannadb.matching.matching import RankingBasedMatcher
+from wannadb.querying.grouping import MergeGrouper
+from wannadb.statistics import Statistics
+from wannadb.status import EmptyStatusCallback
+
+from benchmarks.oracle import OracleInteractionCallback
+from benchmarks.sessions import default_matcher
+from benchmarks.synthetic import GroundTruth, generate_preprocessed_document_base
+
+logger: logging.Logger = logging.getLogger(__name__)
+
+# parameters of the synthetic document bases for each size
+SIZES: Dict[str, Dict[str, int]] = {
+    "small": {"num_documents": 100, "num_attributes": 5, "num_distractors": 5},
+    "medium": {"num_documents": 1000, "num_attributes": 10, "num_distractors": 10},
+    "large": {"num_documents": 10000, "num_attributes": 20, "num_distractors": 10}
+}
+
+BENCHMARKS: Dict[str, Type["BaseBenchmark"]] = {}
+
+_CORPORA: Dict[str, bytes] = {}
+
+
+def register_benchmark(benchmark: Type["BaseBenchmark"]) -> Type["BaseBenchmark"]:
+    """Register the given benchmark."""
+    BENCHMARKS[benchmark.identifier] = benchmark
+    return benchmark
+
+
+def load_corpus(size: str) -> Tuple[DocumentBase, GroundTruth]:
+    """
+    Obtain a fresh copy of the preprocessed synthetic document base of the given size.
+
+    The document base is generated once per size and copied for each call, so that the benchmarks can modify it. The
+    resource manager must be active.
+
+    :param size: size of the document base (see SIZES)
+    :return: document base and ground truth
+    """
+    if size not in _CORPORA.keys():
+        logger.info(f"Generate the {size} synthetic document base.")
+        _CORPORA[size] = pickle.dumps(generate_preprocessed_document_base(**SIZES[size]), pickle.HIGHEST_PROTOCOL)
+    return pickle.loads(_CORPORA[size])
+
+
+class BaseBenchmark(abc.ABC):
+    """
+    Base class for all benchmarks.
+
+    A benchmark prepares its data in 'setup', which is not timed, and executes the timed operation in 'run'. Benchmarks
+    that require optional packages list their modules in 'required_modules' and are skipped if they are missing.
+    """
+    identifier: str = "BaseBenchmark"
+
+    # modules that must be importable to run the benchmark
+    required_modules: List[str] = []
+
+    @classmethod
+    def is_available(cls) -> bool:
+        """Whether all required modules are available."""
+        return all(importlib.util.find_spec(module) is not None for module in cls.required_modules)
+
+    @abc.abstractmethod
+    def setup(self, size: str) -> None:
+        """
+        Prepare the data for the timed operation.
+
+        :param size: size of the synthetic document base (see SIZES)
+        """
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def run(self) -> None:
+        """Execute the timed operation."""
+        raise NotImplementedError
+
+
+########################################################################################################################
+# actual benchmarks
+########################################################################################################################
+
+
+@register_benchmark
+class DocumentBaseSerializationBenchmark(BaseBenchmark):
+    """Serialize the document base to BSON and deserialize it again."""
+    identifier: str = "document_base_serialization"
+
+    def setup(self, size: str) -> None:
+        self._document_base, _ = load_corpus(size)
+
+    def run(self) -> None:
+        DocumentBase.from_bson(self._document_base.to_bson())
+
+
+@register_benchmark
+class SignalsMeanDistanceBenchmark(BaseBenchmark):
+    """Compute the distances between the attributes and all nuggets and between some nuggets and all nuggets."""
+    identifier: str = "signals_mean_distance"
+
+    def setup(self, size: str) -> None:
+        self._document_base, _ = load_corpus(size)
+        self._distance: SignalsMeanDistance = SignalsMeanDistance(
+            ["LabelEmbeddingSignal", "TextEmbeddingSignal", "ContextSentenceEmbeddingSignal"]
+        )
+
+    def run(self) -> None:
+        nuggets: List[InformationNugget] = self._document_base.nuggets
+        self._distance.compute_distances(self._document_base.attributes, nuggets, Statistics(False))
+        self._distance.compute_distances(nuggets[:100], nuggets, Statistics(False))
+
+
+@register_benchmark
+class RankingBasedMatcherBenchmark(BaseBenchmark):
+    """Match all attributes with ten feedback rounds each, answered from the ground truth."""
+    identifier: str = "ranking_based_matcher"
+
+    def setup(self, size: str) -> None:
+        self._document_base, ground_truth = load_corpus(size)
+        self._oracle: OracleInteractionCallback = OracleInteractionCallback(ground_truth)
+        self._matcher: RankingBasedMatcher = default_matcher(max_num_feedback=10)
+
+    def run(self) -> None:
+        self._matcher(self._document_base, self._oracle, EmptyStatusCallback(), Statistics(False))
+
+
+@register_benchmark
+class MergeGrouperBenchmark(BaseBenchmark):
+    """Group the values of the first attribute, where two groups are the same if their values are the same."""
+    identifier: str = "merge_grouper"
+
+    # the grouper compares all pairs of groups in each round, so only the first documents are grouped
+    max_num_documents: int = 300
+
+    def setup(self, size: str) -> None:
+        document_base, ground_truth = load_corpus(size)
+        self._attribute: Attribute = document_base.attributes[0]
+        for document in document_base.documents:
+            span: Optional[Tuple[int, int]] = ground_truth[document.name][self._attribute.name]
+            document.attribute_mappings[self._attribute.name] = [
+                nugget for nugget in document.nuggets if (nugget.start_char, nugget.end_char) == span
+            ]
+        self._document_base: DocumentBase = DocumentBase(
+            document_base.documents[:self.max_num_documents], document_base.attributes
+        )
+        self._oracle: OracleInteractionCallback = OracleInteractionCallback(ground_truth)
+        self._grouper: MergeGrouper = MergeGrouper(
+            distance=SignalsMeanDistance(["LabelEmbeddingSignal", "TextEmbeddingSignal"]),
+            max_tries_no_merge=10,
+            skip=5,
+            automatically_merge_same_surface_form=False
+        )
+
+    def run(self) -> None:
+        self._grouper(self._document_base, self._oracle, EmptyStatusCallback(), Statistics(False))
+
+
+@register_benchmark
+class CacheDBBenchmark(BaseBenchmark):
+    """Store the attribute values in the SQLite cache DB and query them."""
+    identifier: str = "cache_db"
+    required_modules: List[str] = ["pandas", "sqlparse"]
+
+    def setup(self, size: str) -> None:
+        self._document_base, self._ground_truth = load_corpus(size)
+
+    def run(self) -> None:
+        from wannadb_parsql.cache_db import SQLiteCacheDB
+
+        cache_db: SQLiteCacheDB = SQLiteCacheDB(db_file=":memory:")
+        cache_db.create_input_docs_table("documents", self._document_base.documents)
+        for attribute in self._document_base.attributes:
+            cache_db.create_table_by_name(attribute.name)
+            cache_db.store_many(attribute.name, (
+                (ix, document.text[span[0]:span[1]]) for ix, document in enumerate(self._document_base.documents)
+                for span in [self._ground_truth[document.name][attribute.name]] if span is not None
+            ))
+        attribute_names: List[str] = [attribute.name for attribute in self._document_base.attributes]
+        cache_db.execute_queries(*(
+            f"SELECT {name}.value FROM {name} JOIN documents ON {name}.doc_id = documents.doc_id"
+            for name in attribute_names
+        ))
+        cache_db.conn.close()
+
+
+@register_benchmark
+class ParsqlBenchmark(BaseBenchmark):
+    """Parse and rewrite SQL queries over the attributes."""
+    identifier: str = "parsql"
+    required_modules: List[str] = ["pandas", "sqlparse"]
+
+    def setup(self, size: str) -> None:
+        document_base, _ = load_corpus(size)
+        names: List[str] = [attribute.name for attribute in document_base.attributes]
+        self._queries: List[str] = [
+            f"SELECT {', '.join(names)}",
+            f"SELECT {names[0]}, COUNT(*) FROM documents WHERE {names[-1]} = 'x' GROUP BY {names[0]}",
+            f"SELECT DISTINCT {names[0]} FROM documents ORDER BY {names[0]}"
+        ] * 100
+
+    def run(self) -> None:
+        from wannadb_parsql.parsql import Parser
+        from wannadb_parsql.rewrite import rewrite_query
+
+        for query in self._queries:
+            columns, parsed = Parser().parse(query)
+            rewrite_query(columns, parsed)
+
+
+def run_benchmarks(size: str, identifiers: Optional[List[str]] = None, repeat: int = 3) -> Dict[str, Dict[str, Any]]:
+    """
+    Run the benchmarks and measure their runtimes.
+
+    The resource manager must be active.
+
+    :param size: size of the synthetic document base (see SIZES)
+    :param identifiers: identifiers of the benchmarks to run, defaults to all benchmarks
+    :param repeat: number of timed runs per benchmark
+    :return: measurements per benchmark
+    """
+    results: Dict[str, Dict[str, Any]] = {}
+    for identifier in identifiers if identifiers is not None else BENCHMARKS.keys():
+        if identifier not in BENCHMARKS.keys():
+            logger.error(f"Unknown benchmark '{identifier}'!")
+            assert False, f"Unknown benchmark '{identifier}'!"
+        benchmark_class: Type[BaseBenchmark] = BENCHMARKS[identifier]
+        if not benchmark_class.is_available():
+            logger.warning(f"Skip benchmark '{identifier}' since {benchmark_class.required_modules} are missing.")
+            results[identifier] = {"skipped": True}
+            continue
+
+        runtimes: List[float] = []
+        for _ in range(repeat):
+            benchmark: BaseBenchmark = benchmark_class()
+            benchmark.setup(size)
+            gc.collect()
+            tick: float = time.perf_counter()
+            benchmark.run()
+            tack: float = time.perf_counter()
+            runtimes.append(tack - tick)
+        runtimes.sort()
+        results[identifier] = {"median": runtimes[len(runtimes) // 2], "min": runtimes[0], "runtimes": runtimes}
+        logger.info(f"Benchmark '{identifier}': median {results[identifier]['median']:.4f} seconds.")
+    return results
+
+
+def compare_to_baselines(
+        results: Dict[str, Dict[str, Any]],
+        baselines: Dict[str, float],
+        tolerance: float
+) -> Dict[str, Dict[str, Any]]:
+    """
+    Compare the measured runtimes to the baseline runtimes.
+
+    :param results: measurements per benchmark as returned by run_benchmarks
+    :param baselines: baseline median runtime per benchmark
+    :param tolerance: relative slowdown that is still acceptable, e.g. 0.25 for 25%
+    :return: comparison per benchmark with the ratio to the baseline and whether it is a regression
+    """
+    comparison: Dict[str, Dict[str, Any]] = {}
+    for identifier, result in results.items():
+        if result.get("skipped") or identifier not in baselines.keys():
+            continue
+        ratio: float = result["median"] / baselines[identifier]
+        comparison[identifier] = {
+            "baseline": baselines[identifier],
+            "median": result["median"],
+            "ratio": ratio,
+            "regression": ratio > 1 + tolerance
+        }
+    return comparison
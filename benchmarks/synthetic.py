@@ -0,0 +1,149 @@
+import logging
+import random
+from typing import Dict, List, Optional, Tuple
+
+from wannadb.configuration import Pipeline
+from wannadb.data.data import Attribute, Document, DocumentBase, InformationNugget
+from wannadb.data.signals import LabelSignal, NaturalLanguageLabelSignal, SentenceStartCharsSignal
+from wannadb.interaction import EmptyInteractionCallback
+from wannadb.preprocessing.embedding import RelativePositionEmbedder, SBERTContextSentenceEmbedder, \
+    SBERTLabelEmbedder, SBERTTextEmbedder
+from wannadb.preprocessing.label_paraphrasing import SplitAttributeNameLabelParaphraser
+from wannadb.preprocessing.normalization import CopyNormalizer
+from wannadb.preprocessing.other_processing import ContextSentenceCacher
+from wannadb.statistics import Statistics
+from wannadb.status import EmptyStatusCallback
+
+from benchmarks.resources import BenchmarkSBERTResource
+
+logger: logging.Logger = logging.getLogger(__name__)
+
+# ground truth: document name -> attribute name -> (start_char, end_char) of the correct value or None if there is none
+GroundTruth = Dict[str, Dict[str, Optional[Tuple[int, int]]]]
+
+_CONSONANTS: str = "bdfgklmnprstvz"
+_VOWELS: str = "aeiou"
+
+
+def _pseudo_word(rng: random.Random) -> str:
+    return "".join(rng.choice(_CONSONANTS) + rng.choice(_VOWELS) for _ in range(rng.randint(2, 3)))
+
+
+def _vocabulary(rng: random.Random, size: int, exclude: set) -> List[str]:
+    words: List[str] = []
+    while len(words) < size:
+        word: str = _pseudo_word(rng)
+        if word not in exclude:
+            exclude.add(word)
+            words.append(word)
+    return words
+
+
+def generate_document_base(
+        num_documents: int = 100,
+        num_attributes: int = 5,
+        num_distractors: int = 5,
+        fill_rate: float = 0.8,
+        label_noise: float = 0.2,
+        seed: int = 42
+) -> Tuple[DocumentBase, GroundTruth]:
+    """
+    Generate a random document base with extracted nuggets and the correct attribute values.
+
+    The texts consist of random pseudo-words. Each document contains a value for each attribute with the probability
+    fill_rate and some distractor nuggets. The nuggets carry a label like an extractor would produce: the label of the
+    attribute for the values (or a wrong one with the probability label_noise) and random labels for the distractors.
+    The generation is deterministic for a given seed.
+
+    :param num_documents: number of documents
+    :param num_attributes: number of attributes
+    :param num_distractors: number of nuggets per document that are not the value of any attribute
+    :param fill_rate: probability that a document contains a value for an attribute
+    :param label_noise: probability that a value's nugget has the label of another attribute
+    :param seed: seed of the random number generator
+    :return: document base and ground truth
+    """
+    rng: random.Random = random.Random(seed)
+    used_words: set = set()
+    filler_words: List[str] = _vocabulary(rng, 500, used_words)
+    attribute_words: List[List[str]] = [_vocabulary(rng, 2, used_words) for _ in range(num_attributes)]
+    value_words: List[List[str]] = [_vocabulary(rng, 30, used_words) for _ in range(num_attributes)]
+    labels: List[str] = [" ".join(words) for words in attribute_words]
+    distractor_labels: List[str] = labels + _vocabulary(rng, 5, used_words)
+
+    attributes: List[Attribute] = [Attribute("_".join(words)) for words in attribute_words]
+
+    documents: List[Document] = []
+    ground_truth: GroundTruth = {}
+    for document_ix in range(num_documents):
+        name: str = f"document-{document_ix}"
+        ground_truth[name] = {attribute.name: None for attribute in attributes}
+
+        # each nugget is placed in a sentence of its own
+        items: List[Tuple[Optional[int], str, str]] = []
+        for attribute_ix in range(num_attributes):
+            if rng.random() < fill_rate:
+                value: str = " ".join(rng.sample(value_words[attribute_ix], rng.randint(1, 2)))
+                if rng.random() < label_noise:
+                    label: str = rng.choice(labels)
+                else:
+                    label: str = labels[attribute_ix]
+                items.append((attribute_ix, value, label))
+        for _ in range(num_distractors):
+            items.append((None, rng.choice(filler_words), rng.choice(distractor_labels)))
+        rng.shuffle(items)
+
+        text: str = ""
+        sentence_start_chars: List[int] = []
+        spans: List[Tuple[Optional[int], int, int, str]] = []
+        for attribute_ix, value, label in items:
+            sentence_start_chars.append(len(text))
+            prefix: str = " ".join(rng.choices(filler_words, k=rng.randint(2, 8)))
+            suffix: str = " ".join(rng.choices(filler_words, k=rng.randint(2, 8)))
+            start_char: int = len(text) + len(prefix) + 1
+            spans.append((attribute_ix, start_char, start_char + len(value), label))
+            text += f"{prefix.capitalize()} {value} {suffix}. "
+
+        document: Document = Document(name, text.rstrip())
+        document[SentenceStartCharsSignal] = SentenceStartCharsSignal(sentence_start_chars)
+        for attribute_ix, start_char, end_char, label in spans:
+            nugget: InformationNugget = InformationNugget(document, start_char, end_char)
+            nugget[LabelSignal] = LabelSignal(label)
+            nugget[NaturalLanguageLabelSignal] = NaturalLanguageLabelSignal(label)
+            document.nuggets.append(nugget)
+            if attribute_ix is not None:
+                ground_truth[name][attributes[attribute_ix].name] = (start_char, end_char)
+        documents.append(document)
+
+    return DocumentBase(documents, attributes), ground_truth
+
+
+def preprocessing_pipeline() -> Pipeline:
+    """
+    Pipeline that computes the signals for the matching with the fake embeddings of the benchmarks.
+
+    The pipeline requires a resource manager, which loads the fake SBERT resource without any downloads.
+
+    :return: preprocessing pipeline
+    """
+    return Pipeline([
+        SplitAttributeNameLabelParaphraser(do_lowercase=True, splitters=["_"]),
+        ContextSentenceCacher(),
+        CopyNormalizer(),
+        SBERTLabelEmbedder(BenchmarkSBERTResource.identifier),
+        SBERTTextEmbedder(BenchmarkSBERTResource.identifier),
+        SBERTContextSentenceEmbedder(BenchmarkSBERTResource.identifier),
+        RelativePositionEmbedder()
+    ])
+
+
+def generate_preprocessed_document_base(**kwargs) -> Tuple[DocumentBase, GroundTruth]:
+    """
+    Generate a random document base and compute the signals for the matching.
+
+    :param kwargs: parameters of generate_document_base
+    :return: document base and ground truth
+    """
+    document_base, ground_truth = generate_document_base(**kwargs)
+    preprocessing_pipeline()(document_base, EmptyInteractionCallback(), EmptyStatusCallback(), Statistics(False))
+    return document_base, ground_truth
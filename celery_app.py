@@ -3,7 +3,7 @@ import os
 
 from celery import Celery
 
-from wannadb_web.worker.tasks import BaseTask, DocumentBaseAddAttributes, DocumentBaseConfirmNugget, DocumentBaseForgetMatches, DocumentBaseForgetMatchesForAttribute, DocumentBaseGetOrderedNuggets, DocumentBaseInteractiveTablePopulation, DocumentBaseLoad, DocumentBaseRemoveAttributes, DocumentBaseUpdateAttributes, TestTask, InitManager, CreateDocumentBase
+from wannadb_web.worker.tasks import BaseTask, DocumentBaseAddAttributes, DocumentBaseAddDocuments, DocumentBaseAutomaticTablePopulation, DocumentBaseConfirmNugget, DocumentBaseForgetMatches, DocumentBaseForgetMatchesForAttribute, DocumentBaseGetOrderedNuggets, DocumentBaseInteractiveTablePopulation, DocumentBaseLoad, DocumentBaseRemoveAttributes, DocumentBaseUpdateAttributes, TestTask, InitManager, CreateDocumentBase
 
 logging.basicConfig(level=logging.DEBUG, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s")
 
@@ -17,10 +17,12 @@ app.register_task(InitManager)
 app.register_task(CreateDocumentBase)
 app.register_task(DocumentBaseLoad)
 app.register_task(DocumentBaseAddAttributes)
+app.register_task(DocumentBaseAddDocuments)
 app.register_task(DocumentBaseUpdateAttributes)
 app.register_task(DocumentBaseRemoveAttributes)
 app.register_task(DocumentBaseForgetMatches)
 app.register_task(DocumentBaseForgetMatchesForAttribute)
 app.register_task(DocumentBaseInteractiveTablePopulation)
+app.register_task(DocumentBaseAutomaticTablePopulation)
 app.register_task(DocumentBaseGetOrderedNuggets)
 app.register_task(DocumentBaseConfirmNugget)
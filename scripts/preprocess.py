@@ -1,16 +1,19 @@
 import argparse
+import contextlib
 import logging.config
 import os
 from pathlib import Path
+from typing import Iterator
 
 from wannadb.configuration import Pipeline
-from wannadb.data.data import Document, DocumentBase
+from wannadb.profiling import Profiler
+from wannadb.data.data import Document, DocumentBaseWriter
 from wannadb.interaction import EmptyInteractionCallback
 from wannadb.preprocessing.embedding import BERTContextSentenceEmbedder, RelativePositionEmbedder, SBERTTextEmbedder, SBERTLabelEmbedder
 from wannadb.preprocessing.extraction import StanzaNERExtractor, SpacyNERExtractor
 from wannadb.preprocessing.label_paraphrasing import OntoNotesLabelParaphraser, SplitAttributeNameLabelParaphraser
 from wannadb.preprocessing.normalization import CopyNormalizer
-from wannadb.preprocessing.other_processing import ContextSentenceCacher
+from wannadb.preprocessing.other_processing import ContextSentenceCacher, NuggetDeduplicator
 from wannadb.resources import ResourceManager
 from wannadb.statistics import Statistics
 from wannadb.status import EmptyStatusCallback
@@ -33,9 +36,33 @@ def init_argparse() -> argparse.ArgumentParser:
     parser.add_argument('-n', '--name', required=False,
                         help="Name of the serialized document base. "
                              "Optional, if not specified 'document_base' will be used.")
+    parser.add_argument('-w', '--num-workers', type=int, default=1, required=False,
+                        help="Number of worker processes for the per-document pipeline elements. "
+                             "Optional, if not specified the documents are processed sequentially.")
+    parser.add_argument('-t', '--num-threads', type=int, default=1, required=False,
+                        help="Number of threads for independent pipeline elements, e.g. the embedders. "
+                             "Optional, if not specified the pipeline elements run one after another.")
+    parser.add_argument('-c', '--chunk-size', type=int, default=1000, required=False,
+                        help="Number of documents that pass through the pipeline together before they are written. "
+                             "Optional, if not specified 1000 will be used.")
+    parser.add_argument('--cache', required=False,
+                        help="Path of a cache file for the results of the pipeline elements. When the pipeline is run "
+                             "again, only the changed pipeline elements and the following ones are executed. "
+                             "Optional, if not specified nothing is cached.")
+    parser.add_argument('--profile', required=False,
+                        help="Path prefix for a profiling report of the pipeline elements. The report is written as "
+                             "<path>.json and as <path>.folded for flame graph tools. "
+                             "Optional, if not specified nothing is profiled.")
     return parser
 
 
+def read_documents(input_path: str) -> Iterator[Document]:
+    """Read the documents from the input path one by one."""
+    for filename in sorted(os.listdir(input_path)):
+        with open(os.path.join(input_path, filename), "r", encoding='utf-8') as infile:
+            yield Document(filename.split(".")[0], infile.read())
+
+
 def main() -> None:
     parser = init_argparse()
     args = parser.parse_args()
@@ -49,18 +76,11 @@ def main() -> None:
     input_path = args.input_path
     output_path = args.output_path
 
-    with ResourceManager():
-        documents = []
-        for filename in os.listdir(input_path):
-            with open(os.path.join(input_path, filename), "r", encoding='utf-8') as infile:
-                text = infile.read()
-                documents.append(Document(filename.split(".")[0], text))
-
-        logger.info(f"Loaded {len(documents)} documents")
-
+    with ResourceManager(), (Profiler() if args.profile else contextlib.nullcontext()) as profiler:
         wannadb_pipeline = Pipeline([
             StanzaNERExtractor(),
             SpacyNERExtractor("SpacyEnCoreWebLg"),
+            NuggetDeduplicator(),
             ContextSentenceCacher(),
             CopyNormalizer(),
             OntoNotesLabelParaphraser(),
@@ -69,23 +89,29 @@ def main() -> None:
             SBERTTextEmbedder("SBERTBertLargeNliMeanTokensResource"),
             BERTContextSentenceEmbedder("BertLargeCasedResource"),
             RelativePositionEmbedder()
-        ])
-
-        document_base = DocumentBase(documents, [])
+        ], num_workers=args.num_workers, cache_path=args.cache,
+                   num_threads=args.num_threads)
 
         statistics = Statistics(do_collect=True)
         statistics["preprocessing"]["config"] = wannadb_pipeline.to_config()
 
-        wannadb_pipeline(
-            document_base=document_base,
-            interaction_callback=EmptyInteractionCallback(),
-            status_callback=EmptyStatusCallback(),
-            statistics=statistics["preprocessing"]
-        )
-
+        # stream the documents through the pipeline so that only one chunk is kept in memory
         Path(output_path).mkdir(parents=True, exist_ok=True)
-        with open(os.path.join(output_path, f"{dataset_name}.bson"), "wb") as file:
-            file.write(document_base.to_bson())
+        with DocumentBaseWriter(os.path.join(output_path, f"{dataset_name}.bson")) as writer:
+            for document_base in wannadb_pipeline.stream(
+                    documents=read_documents(input_path),
+                    attributes=[],
+                    interaction_callback=EmptyInteractionCallback(),
+                    status_callback=EmptyStatusCallback(),
+                    statistics=statistics["preprocessing"],
+                    chunk_size=args.chunk_size
+            ):
+                writer.write(document_base)
+                logger.info(f"Preprocessed {writer.num_documents} documents")
+
+    if profiler is not None:
+        profiler.save_report(f"{args.profile}.json")
+        profiler.save_folded_stacks(f"{args.profile}.folded")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,106 @@
+import threading
+import time
+from typing import List
+
+import numpy as np
+import pytest
+
+from wannadb.batching import BatchedBertModel, BatchedSentenceEncoder, DynamicBatcher
+
+
+def test_dynamic_batcher() -> None:
+    batches: List[List[int]] = []
+
+    def process_batch(requests: List[int]) -> List[int]:
+        batches.append(requests)
+        return [request * 2 for request in requests]
+
+    batcher: DynamicBatcher = DynamicBatcher(process_batch, max_batch_size=4, max_wait=0.2)
+    futures = [batcher.submit(ix) for ix in range(6)]
+    assert [future.result(5) for future in futures] == [0, 2, 4, 6, 8, 10]
+    assert batches == [[0, 1, 2, 3], [4, 5]]
+
+    # requests are never split across batches
+    futures = [batcher.submit("a", 3), batcher.submit("b", 3)]
+    [future.result(5) for future in futures]
+    assert batches[2:] == [["a"], ["b"]]
+
+    batcher.close()
+
+
+def test_dynamic_batcher_propagates_errors() -> None:
+    def process_batch(requests: List[int]) -> List[int]:
+        raise ValueError("failed")
+
+    batcher: DynamicBatcher = DynamicBatcher(process_batch, max_batch_size=4, max_wait=0.01)
+    with pytest.raises(ValueError):
+        batcher(1)
+    batcher.close()
+
+
+def test_dynamic_batcher_rejects_requests_after_close() -> None:
+    batcher: DynamicBatcher = DynamicBatcher(lambda requests: requests, max_batch_size=4, max_wait=0.01)
+    assert batcher(1) == 1
+    batcher.close()
+    with pytest.raises(RuntimeError):
+        batcher.submit(2)
+    batcher.close()  # closing twice does not block
+
+
+class _RecordingEncoder:
+    def __init__(self) -> None:
+        self.call_sizes: List[int] = []
+
+    def encode(self, texts: List[str], batch_size: int = 32, show_progress_bar: bool = False) -> np.ndarray:
+        self.call_sizes.append(len(texts))
+        return np.array([[float(len(text))] for text in texts])
+
+
+def test_batched_sentence_encoder() -> None:
+    model: _RecordingEncoder = _RecordingEncoder()
+    encoder: BatchedSentenceEncoder = BatchedSentenceEncoder(model, max_batch_size=64, max_wait=0.1)
+
+    results: List = [None] * 10
+
+    def encode(ix: int) -> None:
+        results[ix] = encoder.encode(["x" * ix])
+
+    threads: List[threading.Thread] = [threading.Thread(target=encode, args=(ix,)) for ix in range(10)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert [result.tolist() for result in results] == [[[float(ix)]] for ix in range(10)]
+    assert sum(model.call_sizes) == 10
+    assert len(model.call_sizes) < 10
+    assert encoder.encode("abc").tolist() == [3.0]
+    encoder.close()
+
+
+def test_batched_bert_model() -> None:
+    torch = pytest.importorskip("torch")
+
+    class _SumModel:
+        """Stand-in for a BertModel whose hidden state of a token is the masked token id times the sequence sum."""
+
+        def __call__(self, input_ids, token_type_ids, attention_mask):
+            masked = input_ids * attention_mask
+            return (masked.unsqueeze(-1) * masked.sum(dim=1).view(-1, 1, 1)).float(),
+
+    model: BatchedBertModel = BatchedBertModel(_SumModel(), None, max_batch_size=8, max_wait=0.1)
+    inputs = [torch.tensor([[1, 2, 3]]), torch.tensor([[4, 5]])]
+    outputs: List = [None] * 2
+
+    def forward(ix: int) -> None:
+        outputs[ix] = model(inputs[ix], torch.zeros_like(inputs[ix]), torch.ones_like(inputs[ix]))[0]
+
+    threads: List[threading.Thread] = [threading.Thread(target=forward, args=(ix,)) for ix in range(2)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert outputs[0].tolist() == [[[6.0], [12.0], [18.0]]]
+    assert outputs[1].tolist() == [[[36.0], [45.0]]]
+    model.close()
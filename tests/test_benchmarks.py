@@ -0,0 +1,238 @@
+import pickle
+from typing import Any, Dict, List, Optional, Tuple
+
+import pytest
+
+from wannadb import resources
+from wannadb.configuration import Pipeline
+from wannadb.data.data import Attribute, DocumentBase, InformationNugget
+from wannadb.data.signals import CachedContextSentenceSignal, CachedDistanceSignal, ConfirmedAttributesSignal, \
+    CurrentMatchIndexSignal, MaxDistanceSignal
+from wannadb.matching.matching import RankingBasedMatcher
+from wannadb.preprocessing.embedding import RelativePositionEmbedder, SBERTContextSentenceEmbedder, SBERTLabelEmbedder, \
+    SBERTTextEmbedder
+from wannadb.preprocessing.label_paraphrasing import OntoNotesLabelParaphraser
+from wannadb.preprocessing.normalization import CopyNormalizer
+from wannadb.preprocessing.other_processing import ContextSentenceCacher
+from wannadb.resources import ResourceManager
+from wannadb.statistics import Statistics
+from wannadb.status import EmptyStatusCallback
+
+from benchmarks import suite
+from benchmarks.oracle import OracleInteractionCallback
+from benchmarks.resources import BenchmarkSBERTResource
+from benchmarks.sessions import default_matcher, run_matching_session
+from benchmarks.synthetic import GroundTruth, generate_document_base, generate_preprocessed_document_base
+
+
+@pytest.fixture
+def resource_manager():
+    with ResourceManager(use_model_server=False) as resource_manager:
+        yield resource_manager
+    resources.MANAGER = None
+
+
+def test_generate_document_base() -> None:
+    document_base, ground_truth = generate_document_base(num_documents=20, num_attributes=3, num_distractors=2)
+    assert document_base.validate_consistency()
+    assert len(document_base.documents) == 20
+    assert len(document_base.attributes) == 3
+
+    for document in document_base.documents:
+        assert len(document.nuggets) == 2 + sum(span is not None for span in ground_truth[document.name].values())
+        for span in ground_truth[document.name].values():
+            if span is not None:
+                assert any((nugget.start_char, nugget.end_char) == span for nugget in document.nuggets)
+
+    # the generation is deterministic
+    other_document_base, other_ground_truth = generate_document_base(
+        num_documents=20, num_attributes=3, num_distractors=2
+    )
+    assert [document.text for document in other_document_base.documents] == \
+           [document.text for document in document_base.documents]
+    assert other_ground_truth == ground_truth
+
+
+def test_run_benchmarks(resource_manager, monkeypatch) -> None:
+    monkeypatch.setitem(suite.SIZES, "tiny", {"num_documents": 10, "num_attributes": 2, "num_distractors": 2})
+    document_base, _ = generate_preprocessed_document_base(**suite.SIZES["tiny"])
+    assert document_base.validate_consistency()
+    assert DocumentBase.from_bson(document_base.to_bson()).validate_consistency()
+
+    results: Dict = suite.run_benchmarks("tiny", ["document_base_serialization", "ranking_based_matcher"], repeat=1)
+    assert len(results["ranking_based_matcher"]["runtimes"]) == 1
+
+    comparison: Dict = suite.compare_to_baselines(
+        results, {"document_base_serialization": results["document_base_serialization"]["median"] / 2}, 0.25
+    )
+    assert list(comparison.keys()) == ["document_base_serialization"]
+    assert comparison["document_base_serialization"]["regression"]
+
+
+def test_matching_session(resource_manager) -> None:
+    document_base, ground_truth = generate_preprocessed_document_base(
+        num_documents=30, num_attributes=2, num_distractors=3
+    )
+    report: Dict = run_matching_session(document_base, ground_truth, think_time=0.001)
+
+    assert 0 < report["num_feedback_rounds"] <= 2 * 10
+    assert report["num_wrong_answers"] == 0
+    assert report["latency"]["p50"] <= report["latency"]["p90"] <= report["latency"]["max"]
+    assert report["time_to_table"] >= report["think_time"] > 0
+    # every confirmed document is correct, the guesses for the others may be wrong
+    assert 0 < report["accuracy"] <= 1
+    for document in document_base.documents:
+        for attribute in document_base.attributes:
+            assert attribute.name in document.attribute_mappings.keys()
+
+    oracle: OracleInteractionCallback = OracleInteractionCallback(ground_truth, noise=1.0)
+    nugget = next(
+        nugget for document in document_base.documents for nugget in document.nuggets
+        if ground_truth[document.name][document_base.attributes[0].name] == (nugget.start_char, nugget.end_char)
+    )
+    answer: Dict = oracle("RankingBasedMatcher", {"nuggets": [nugget], "attribute": document_base.attributes[0]})
+    assert answer["message"] == "no-match-in-document"
+    assert oracle.num_wrong_answers == 1
+    assert len(oracle.latencies["RankingBasedMatcher"]) == 1
+
+
+class _CustomMatchOracle(OracleInteractionCallback):
+    """Oracle that adds the correct nuggets of one attribute by hand instead of confirming them in the ranked list."""
+
+    def __init__(self, ground_truth: GroundTruth, attribute_name: str) -> None:
+        super(_CustomMatchOracle, self).__init__(ground_truth)
+        self._attribute_name: str = attribute_name
+
+    def _answer_ranked_list(self, nuggets: List[InformationNugget], attribute: Attribute) -> Dict[str, Any]:
+        if attribute.name == self._attribute_name:
+            for nugget in nuggets:
+                span: Optional[Tuple[int, int]] = self._correct_span(nugget.document, attribute)
+                if span is not None:
+                    return {"message": "custom-match", "document": nugget.document, "start": span[0], "end": span[1]}
+        return super(_CustomMatchOracle, self)._answer_ranked_list(nuggets, attribute)
+
+
+def _mappings(document_base: DocumentBase) -> List[Dict[str, Tuple[List[Tuple[int, int]], bool]]]:
+    return [
+        {name: (
+            [(nugget.start_char, nugget.end_char) for nugget in nuggets],
+            name in document.signals.get(ConfirmedAttributesSignal.identifier, ConfirmedAttributesSignal([])).value
+        ) for name, nuggets in document.attribute_mappings.items()}
+        for document in document_base.documents
+    ]
+
+
+def _matching_signals(document_base: DocumentBase) -> List[Tuple[Optional[int], List[Tuple[int, int, float]]]]:
+    return [
+        (
+            document[CurrentMatchIndexSignal] if document.nuggets != [] else None,
+            [(nugget.start_char, nugget.end_char, nugget[CachedDistanceSignal]) for nugget in document.nuggets]
+        )
+        for document in document_base.documents
+    ]
+
+
+def test_parallel_matching(resource_manager) -> None:
+    document_base, ground_truth = generate_preprocessed_document_base(
+        num_documents=30, num_attributes=3, num_distractors=3
+    )
+    pickled_document_base: bytes = pickle.dumps(document_base)
+    last_attribute: str = document_base.attributes[-1].name
+
+    def match(num_workers: int) -> Tuple[DocumentBase, Statistics]:
+        matched_document_base: DocumentBase = pickle.loads(pickled_document_base)
+        # the first attribute has been matched before and remains untouched
+        matched_document_base.documents[0].attribute_mappings[matched_document_base.attributes[0].name] = []
+        statistics: Statistics = Statistics(True)
+        matcher: RankingBasedMatcher = default_matcher(max_num_feedback=5, num_workers=num_workers)
+        # the nuggets of the last attribute are added by hand, so that the other attributes have the same candidates
+        matcher._nugget_pipeline = Pipeline([
+            ContextSentenceCacher(),
+            CopyNormalizer(),
+            OntoNotesLabelParaphraser(),
+            SBERTLabelEmbedder(BenchmarkSBERTResource.identifier),
+            SBERTTextEmbedder(BenchmarkSBERTResource.identifier),
+            SBERTContextSentenceEmbedder(BenchmarkSBERTResource.identifier),
+            RelativePositionEmbedder()
+        ])
+        matcher(matched_document_base, _CustomMatchOracle(ground_truth, last_attribute), EmptyStatusCallback(),
+                statistics)
+        assert matched_document_base.validate_consistency()
+        return matched_document_base, statistics
+
+    sequential_document_base, sequential_statistics = match(1)
+    parallel_document_base, parallel_statistics = match(2)
+    parallel_mappings = _mappings(parallel_document_base)
+    assert parallel_mappings == _mappings(sequential_document_base)
+    assert any(confirmed for mappings in parallel_mappings for _, confirmed in mappings.values())
+    assert parallel_mappings[1].keys() == {attribute.name for attribute in document_base.attributes[1:]}
+    for attribute in document_base.attributes:
+        for key in ["num_feedback", "num_confirmed_match", "num_guessed_match", "max_distances"]:
+            assert parallel_statistics[attribute.name][key] == sequential_statistics[attribute.name][key]
+    assert parallel_statistics["num_documents"] == 30
+
+    # the thresholds that the matching has ended with are kept for documents that are added later
+    for parallel_attribute, sequential_attribute in zip(
+            parallel_document_base.attributes, sequential_document_base.attributes
+    ):
+        assert parallel_attribute.signals.get(MaxDistanceSignal.identifier) \
+               == sequential_attribute.signals.get(MaxDistanceSignal.identifier)
+    assert MaxDistanceSignal.identifier not in parallel_document_base.attributes[0].signals.keys()
+    assert parallel_document_base.attributes[-1][MaxDistanceSignal] \
+           == parallel_statistics[last_attribute]["max_distances"][-1]
+
+    # the cached distances and current matches of the last attribute are copied back from the workers
+    assert parallel_statistics[last_attribute]["num_custom_match"] > 0
+    for (parallel_index, parallel_nuggets), (sequential_index, sequential_nuggets) in zip(
+            _matching_signals(parallel_document_base), _matching_signals(sequential_document_base)
+    ):
+        assert parallel_index == sequential_index
+        assert [nugget[:2] for nugget in parallel_nuggets] == [nugget[:2] for nugget in sequential_nuggets]
+        assert [nugget[2] for nugget in parallel_nuggets] == pytest.approx([nugget[2] for nugget in sequential_nuggets])
+
+    # the context sentences of the added nuggets refer to the documents of the document base
+    for document in parallel_document_base.documents:
+        for nugget in document.nuggets:
+            assert nugget[CachedContextSentenceSignal].document is document
+
+
+class _SkippingOracle(OracleInteractionCallback):
+    """Oracle that skips one attribute when asked whether to match it."""
+
+    def __init__(self, ground_truth: GroundTruth, attribute_name: str) -> None:
+        super(_SkippingOracle, self).__init__(ground_truth)
+        self._attribute_name: str = attribute_name
+
+    def _call(self, pipeline_element_identifier: str, data: Dict[str, Any]) -> Dict[str, Any]:
+        if "do-attribute-request" in data.keys() and data["attribute"].name == self._attribute_name:
+            return {"do-attribute": False}
+        return super(_SkippingOracle, self)._call(pipeline_element_identifier, data)
+
+
+def test_parallel_matching_with_skipped_attribute(resource_manager) -> None:
+    document_base, ground_truth = generate_preprocessed_document_base(
+        num_documents=10, num_attributes=2, num_distractors=3
+    )
+    pickled_document_base: bytes = pickle.dumps(document_base)
+    skipped_attribute: str = document_base.attributes[0].name
+
+    def match(num_workers: int) -> Tuple[DocumentBase, Statistics]:
+        matched_document_base: DocumentBase = pickle.loads(pickled_document_base)
+        statistics: Statistics = Statistics(True)
+        matcher: RankingBasedMatcher = default_matcher(max_num_feedback=3, num_workers=num_workers)
+        matcher(matched_document_base, _SkippingOracle(ground_truth, skipped_attribute), EmptyStatusCallback(),
+                statistics)
+        assert matched_document_base.validate_consistency()
+        return matched_document_base, statistics
+
+    sequential_document_base, sequential_statistics = match(1)
+    parallel_document_base, parallel_statistics = match(2)
+    assert _mappings(parallel_document_base) == _mappings(sequential_document_base)
+    assert all(skipped_attribute not in document.attribute_mappings.keys()
+               for document in parallel_document_base.documents)
+    assert parallel_statistics[skipped_attribute]["skipped"]
+    for (parallel_index, parallel_nuggets), (sequential_index, sequential_nuggets) in zip(
+            _matching_signals(parallel_document_base), _matching_signals(sequential_document_base)
+    ):
+        assert parallel_index == sequential_index
+        assert [nugget[2] for nugget in parallel_nuggets] == pytest.approx([nugget[2] for nugget in sequential_nuggets])
@@ -0,0 +1,223 @@
+import pickle
+import threading
+import time
+from typing import Dict, List
+
+from wannadb.configuration import BasePipelineElement, Pipeline
+from wannadb.data.data import Attribute, Document, DocumentBase, InformationNugget
+from wannadb.data.signals import CachedContextSentenceSignal, LabelSignal, NaturalLanguageLabelSignal, \
+    RelativePositionSignal, SentenceStartCharsSignal, ValueSignal
+from wannadb.interaction import EmptyInteractionCallback
+from wannadb.preprocessing.embedding import RelativePositionEmbedder
+from wannadb.preprocessing.label_paraphrasing import OntoNotesLabelParaphraser, SplitAttributeNameLabelParaphraser
+from wannadb.preprocessing.normalization import CopyNormalizer
+from wannadb.preprocessing.other_processing import ContextSentenceCacher, NuggetDeduplicator
+from wannadb.statistics import Counter, Statistics
+from wannadb.status import EmptyStatusCallback, StatusCallback
+
+
+def _create_document_base() -> DocumentBase:
+    documents: List[Document] = []
+    for ix in range(10):
+        document: Document = Document(f"doc-{ix}", f"Alice met Bob {ix} times. They went to Paris.")
+        document[SentenceStartCharsSignal] = SentenceStartCharsSignal([0, document.text.index("They")])
+        for start_char, end_char, label in [(0, 5, "PERSON"), (0, 5, "PER"), (10, 13, "PERSON"), (34, 39, "GPE")]:
+            nugget: InformationNugget = InformationNugget(document, start_char, end_char)
+            nugget[LabelSignal] = LabelSignal(label)
+            document.nuggets.append(nugget)
+        documents.append(document)
+    return DocumentBase(documents, [Attribute("first_name"), Attribute("city")])
+
+
+def _run_pipeline(num_workers: int) -> (DocumentBase, Statistics):
+    pipeline: Pipeline = Pipeline([
+        NuggetDeduplicator(),
+        ContextSentenceCacher(),
+        CopyNormalizer(),
+        OntoNotesLabelParaphraser(),
+        SplitAttributeNameLabelParaphraser(do_lowercase=True, splitters=["_"]),
+        RelativePositionEmbedder()
+    ], num_workers)
+    document_base: DocumentBase = _create_document_base()
+    statistics: Statistics = Statistics(True)
+    pipeline(document_base, EmptyInteractionCallback(), EmptyStatusCallback(), statistics)
+    return document_base, statistics
+
+
+def test_parallel_pipeline() -> None:
+    sequential_document_base, sequential_statistics = _run_pipeline(1)
+    parallel_document_base, parallel_statistics = _run_pipeline(2)
+
+    assert parallel_document_base.validate_consistency()
+    assert [document.name for document in parallel_document_base.documents] == \
+           [document.name for document in sequential_document_base.documents]
+    for sequential_nugget, parallel_nugget in zip(sequential_document_base.nuggets, parallel_document_base.nuggets):
+        assert parallel_nugget.document is parallel_document_base.documents[
+            [document.name for document in parallel_document_base.documents].index(parallel_nugget.document.name)
+        ]
+        assert (parallel_nugget.start_char, parallel_nugget.end_char) == \
+               (sequential_nugget.start_char, sequential_nugget.end_char)
+        for signal in [ValueSignal, RelativePositionSignal, NaturalLanguageLabelSignal]:
+            assert parallel_nugget[signal] == sequential_nugget[signal]
+        assert parallel_nugget[CachedContextSentenceSignal].text == sequential_nugget[CachedContextSentenceSignal].text
+    assert [attribute[NaturalLanguageLabelSignal] for attribute in parallel_document_base.attributes] == \
+           ["first name", "city"]
+
+    for ix in range(6):
+        assert parallel_statistics[f"pipeline-element-{ix}"]["identifier"] == \
+               sequential_statistics[f"pipeline-element-{ix}"]["identifier"]
+    assert parallel_statistics["pipeline-element-0"]["num_nuggets_removed"] == 10
+    assert parallel_statistics["pipeline-element-2"]["num_nuggets"] == 30
+    assert parallel_statistics["num_shards"] == 5
+
+
+def test_statistics_merge() -> None:
+    statistics: Statistics = Statistics(True)
+    statistics["count"] = 2
+    statistics["nested"]["values"] = [1]
+    statistics["identifier"] = "A"
+
+    other: Statistics = Statistics(True)
+    other["count"] = 3
+    other["nested"]["values"] = [2]
+    other["nested"]["new"] = 1.5
+    other["identifier"] = "B"
+
+    statistics.merge(other)
+    assert statistics.to_serializable() == {"count": 5, "nested": {"values": [1, 2], "new": 1.5}, "identifier": "A"}
+
+
+def test_statistics_counters() -> None:
+    statistics: Statistics = Statistics(True)
+    statistics["num_calls"] = 2
+    num_calls: Counter = statistics.counter("num_calls")
+    assert statistics.counter("num_calls") is num_calls
+    for _ in range(3):
+        num_calls.add()
+    statistics["num_calls"] += 1
+    statistics["dist"].counter("PERSON").add(2)
+    assert statistics["num_calls"] == 6
+
+    other: Statistics = Statistics(True)
+    other.counter("num_calls").add()
+    other["dist"].counter("PERSON").add()
+    other["dist"].counter("GPE").add()
+    statistics.merge(other)
+    assert statistics.to_serializable() == {"num_calls": 7, "dist": {"PERSON": 3, "GPE": 1}}
+    assert pickle.loads(pickle.dumps(statistics)) == statistics
+
+    # statistics objects that do not collect statistics do not allocate anything
+    no_statistics: Statistics = Statistics(False)
+    assert no_statistics["nested"]["dist"] is no_statistics
+    assert no_statistics.counter("num_calls") is no_statistics["dist"].counter("PERSON")
+    no_statistics.counter("num_calls").add()
+    no_statistics["nested"]["num_calls"] += 1
+    assert no_statistics.to_serializable() == {"message": "not-collecting-statistics"}
+
+
+def test_stream_pipeline() -> None:
+    pipeline: Pipeline = Pipeline([ContextSentenceCacher(), CopyNormalizer(), RelativePositionEmbedder()])
+    document_base: DocumentBase = _create_document_base()
+    statistics: Statistics = Statistics(True)
+    chunks: List[DocumentBase] = list(pipeline.stream(
+        iter(document_base.documents), document_base.attributes, EmptyInteractionCallback(), EmptyStatusCallback(),
+        statistics, chunk_size=4
+    ))
+
+    assert [len(chunk.documents) for chunk in chunks] == [4, 4, 2]
+    assert [document for chunk in chunks for document in chunk.documents] == document_base.documents
+    for nugget in document_base.nuggets:
+        assert nugget[ValueSignal] == nugget.text
+    assert statistics["num_chunks"] == 3
+    assert statistics["num_documents"] == 10
+    assert statistics["pipeline-element-1"]["num_nuggets"] == 40
+
+
+def test_pipeline_cache(tmp_path) -> None:
+    cache_path: str = str(tmp_path / "cache.db")
+
+    def run(pipeline_elements: List, cache: bool) -> (DocumentBase, Statistics):
+        pipeline: Pipeline = Pipeline(pipeline_elements, cache_path=cache_path if cache else None)
+        document_base: DocumentBase = _create_document_base()
+        statistics: Statistics = Statistics(True)
+        pipeline(document_base, EmptyInteractionCallback(), EmptyStatusCallback(), statistics)
+        return document_base, statistics
+
+    _, statistics = run([ContextSentenceCacher(), CopyNormalizer(), OntoNotesLabelParaphraser()], True)
+    assert statistics["cache"]["num_restored_documents"] == 0
+    assert statistics["cache"]["num_stored_entries"] == 3 * 11
+
+    # only the changed last pipeline element is executed
+    elements: List = [ContextSentenceCacher(), CopyNormalizer(), RelativePositionEmbedder()]
+    cached_document_base, statistics = run(elements, True)
+    assert statistics["cache"]["num_restored_documents"] == 10
+    assert statistics["pipeline-element-0"]["num_cached_documents"] == 10
+    assert statistics["pipeline-element-1"]["num_cached_documents"] == 10
+    assert statistics["pipeline-element-2"]["num_cached_documents"] == 0
+    assert statistics["pipeline-element-2"]["identifier"] == "RelativePositionEmbedder"
+    assert "identifier" not in statistics["pipeline-element-1"].to_serializable()
+
+    uncached_document_base, _ = run(elements, False)
+    assert cached_document_base.validate_consistency()
+    for cached_nugget, uncached_nugget in zip(cached_document_base.nuggets, uncached_document_base.nuggets):
+        assert cached_nugget.document in cached_document_base.documents
+        for signal in [ValueSignal, RelativePositionSignal, LabelSignal]:
+            assert cached_nugget[signal] == uncached_nugget[signal]
+        assert cached_nugget[CachedContextSentenceSignal].text == uncached_nugget[CachedContextSentenceSignal].text
+
+    # nothing is executed if all results are cached
+    _, statistics = run(elements, True)
+    assert statistics["pipeline-element-2"]["num_cached_documents"] == 10
+    assert "identifier" not in statistics["pipeline-element-2"].to_serializable()
+
+
+class _SleepingElement(BasePipelineElement):
+    identifier: str = "SleepingElement"
+
+    def __init__(self, name: str, required: List[str], generated: List[str], log: List, barrier: threading.Barrier):
+        super(_SleepingElement, self).__init__()
+        self.required_signal_identifiers = {"nuggets": required, "attributes": [], "documents": []}
+        self.generated_signal_identifiers = {"nuggets": generated, "attributes": [], "documents": []}
+        self._name: str = name
+        self._log: List = log
+        self._barrier: threading.Barrier = barrier
+
+    def _call(self, document_base, interaction_callback, status_callback, statistics) -> None:
+        self._log.append(("start", self._name))
+        if self._name in ("a", "b"):
+            self._barrier.wait(timeout=5)  # only passes if both run concurrently
+        status_callback(f"Sleeping {self._name}...", -1)
+        time.sleep(0.01)
+        self._log.append(("end", self._name))
+
+    def to_config(self) -> Dict:
+        return {"identifier": self.identifier, "name": self._name}
+
+    @classmethod
+    def from_config(cls, config: Dict) -> "_SleepingElement":
+        raise NotImplementedError
+
+
+def test_concurrent_pipeline() -> None:
+    log: List = []
+    barrier: threading.Barrier = threading.Barrier(2)
+    pipeline: Pipeline = Pipeline([
+        _SleepingElement("a", [], ["X"], log, barrier),
+        _SleepingElement("b", [], ["Y"], log, barrier),
+        _SleepingElement("c", ["X", "Y"], ["Z"], log, barrier),
+        NuggetDeduplicator(),
+        _SleepingElement("d", [], ["Z"], log, barrier)
+    ], num_threads=4)
+
+    assert pipeline._dependencies([[ix] for ix in range(5)]) == [[], [], [0, 1], [0, 1, 2], [2, 3]]
+
+    statistics: Statistics = Statistics(True)
+    messages: List[str] = []
+    status_callback: StatusCallback = StatusCallback(lambda message, progress: messages.append(message), 0)
+    pipeline(_create_document_base(), EmptyInteractionCallback(), status_callback, statistics)
+    assert "[SleepingElement] Sleeping a..." in messages
+    assert "Running SleepingElement..." in messages
+    assert log.index(("start", "c")) > max(log.index(("end", "a")), log.index(("end", "b")))
+    assert log.index(("start", "d")) > log.index(("end", "c"))
+    assert statistics["max_concurrent_steps"] == 2
+    assert statistics["pipeline-element-3"]["num_nuggets_removed"] == 10
@@ -2,7 +2,7 @@ from typing import List
 
 import pytest
 
-from wannadb.data.data import Attribute, Document, DocumentBase, InformationNugget
+from wannadb.data.data import Attribute, Document, DocumentBase, DocumentBaseWriter, InformationNugget
 from wannadb.data.signals import CachedDistanceSignal, LabelSignal, SentenceStartCharsSignal, CurrentMatchIndexSignal
 
 
@@ -276,3 +276,16 @@ def test_document_base(documents, information_nuggets, attributes, document_base
     copied_document_base: DocumentBase = DocumentBase.from_bson(bson_bytes)
     assert document_base == copied_document_base
     assert copied_document_base == document_base
+
+
+def test_document_base_writer(documents, information_nuggets, attributes, document_base, tmp_path) -> None:
+    path: str = str(tmp_path / "document_base.bson")
+    with DocumentBaseWriter(path) as writer:
+        writer.write(DocumentBase(document_base.documents[:2], document_base.attributes))
+        writer.write(DocumentBase(document_base.documents[2:], document_base.attributes))
+    assert writer.num_documents == 3
+
+    with open(path, "rb") as file:
+        bson_bytes: bytes = file.read()
+    assert bson_bytes == document_base.to_bson()
+    assert DocumentBase.from_bson(bson_bytes) == document_base
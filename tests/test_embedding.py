@@ -0,0 +1,100 @@
+from typing import List
+
+import numpy as np
+import pytest
+
+embedding = pytest.importorskip("wannadb.preprocessing.embedding")
+
+from wannadb import resources
+from wannadb.data.data import Attribute, Document, DocumentBase, InformationNugget
+from wannadb.data.signals import LabelEmbeddingSignal, NaturalLanguageLabelSignal, TextEmbeddingSignal, \
+    UserProvidedExamplesSignal
+from wannadb.interaction import EmptyInteractionCallback
+from wannadb.resources import BaseResource, ResourceManager
+from wannadb.statistics import Statistics
+from wannadb.status import EmptyStatusCallback
+
+
+class _CountingEncoder:
+    """Stand-in for a SentenceTransformer that embeds a text as its length and remembers the encoded texts."""
+
+    def __init__(self) -> None:
+        self.encoded_texts: List[str] = []
+
+    def encode(self, texts: List[str], batch_size: int = 32, show_progress_bar: bool = False) -> np.ndarray:
+        self.encoded_texts += texts
+        return np.array([[len(text), 1.0] for text in texts])
+
+
+class _CountingSBERTResource(BaseResource):
+    identifier: str = "CountingSBERTResource"
+
+    def __init__(self) -> None:
+        super(_CountingSBERTResource, self).__init__()
+        self._encoder: _CountingEncoder = _CountingEncoder()
+
+    @classmethod
+    def load(cls) -> "_CountingSBERTResource":
+        return cls()
+
+    def unload(self) -> None:
+        pass
+
+    @property
+    def resource(self) -> _CountingEncoder:
+        return self._encoder
+
+
+@pytest.fixture
+def resource_manager(monkeypatch):
+    monkeypatch.setitem(resources.RESOURCES, _CountingSBERTResource.identifier, _CountingSBERTResource)
+    with ResourceManager() as resource_manager:
+        yield resource_manager
+    resources.MANAGER = None
+
+
+def test_sbert_embedders_encode_unique_texts(resource_manager) -> None:
+    document: Document = Document("doc", "Alice met Bob and Alice met Carol.")
+    for start_char, end_char, label in [(0, 5, "person"), (10, 13, "person"), (18, 23, "person"), (28, 33, "person")]:
+        nugget: InformationNugget = InformationNugget(document, start_char, end_char)
+        nugget[NaturalLanguageLabelSignal] = NaturalLanguageLabelSignal(label)
+        document.nuggets.append(nugget)
+    attribute: Attribute = Attribute("name")
+    attribute[NaturalLanguageLabelSignal] = NaturalLanguageLabelSignal("person name")
+    document_base: DocumentBase = DocumentBase([document], [attribute])
+
+    statistics: Statistics = Statistics(True)
+    embedding.SBERTLabelEmbedder(_CountingSBERTResource.identifier)(
+        document_base, EmptyInteractionCallback(), EmptyStatusCallback(), statistics["label"]
+    )
+    embedding.SBERTTextEmbedder(_CountingSBERTResource.identifier, batch_size=2)(
+        document_base, EmptyInteractionCallback(), EmptyStatusCallback(), statistics["text"]
+    )
+
+    encoder: _CountingEncoder = resources.MANAGER[_CountingSBERTResource.identifier]
+    assert encoder.encoded_texts == ["person", "person name", "Alice", "Carol", "Bob"]
+    assert [nugget[TextEmbeddingSignal][0] for nugget in document.nuggets] == [5, 3, 5, 5]
+    assert all(nugget[LabelEmbeddingSignal][0] == 6 for nugget in document.nuggets)
+    assert attribute[LabelEmbeddingSignal][0] == 11
+    assert statistics["text"]["nuggets"]["num_texts"] == 4
+    assert statistics["text"]["nuggets"]["num_unique_texts"] == 3
+
+
+def test_sbert_examples_embedder(resource_manager) -> None:
+    attributes: List[Attribute] = [Attribute("a"), Attribute("b"), Attribute("c")]
+    attributes[0][UserProvidedExamplesSignal] = UserProvidedExamplesSignal(["x", "xyz"])
+    attributes[1][UserProvidedExamplesSignal] = UserProvidedExamplesSignal([])
+    attributes[2][UserProvidedExamplesSignal] = UserProvidedExamplesSignal(["xyz", "xxxxxxx"])
+    document_base: DocumentBase = DocumentBase([], attributes)
+
+    statistics: Statistics = Statistics(True)
+    embedding.SBERTExamplesEmbedder(_CountingSBERTResource.identifier)(
+        document_base, EmptyInteractionCallback(), EmptyStatusCallback(), statistics
+    )
+
+    encoder: _CountingEncoder = resources.MANAGER[_CountingSBERTResource.identifier]
+    assert sorted(encoder.encoded_texts) == ["x", "xxxxxxx", "xyz"]
+    assert attributes[0][TextEmbeddingSignal][0] == 2
+    assert TextEmbeddingSignal.identifier not in attributes[1].signals.keys()
+    assert attributes[2][TextEmbeddingSignal][0] == 5
+    assert statistics["attributes"]["num_has_examples"] == 2
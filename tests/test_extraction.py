@@ -0,0 +1,281 @@
+import json
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from types import SimpleNamespace
+from typing import Dict, List
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+
+extraction = pytest.importorskip("wannadb.preprocessing.extraction")
+
+from wannadb import resources
+from wannadb.data.data import ContextSentence, Document, DocumentBase
+from wannadb.data.signals import CachedContextSentenceSignal, LabelSignal, RelativePositionSignal, \
+    SentenceStartCharsSignal, TokenOffsetsSignal
+from wannadb.interaction import EmptyInteractionCallback
+from wannadb.preprocessing.embedding import RelativePositionEmbedder
+from wannadb.preprocessing.normalization import CopyNormalizer
+from wannadb.preprocessing.other_processing import ContextSentenceCacher, NuggetDeduplicator
+from wannadb.resources import BaseResource, FigerNERPipeline, ResourceManager
+from wannadb.statistics import Statistics
+from wannadb.status import EmptyStatusCallback
+
+MAX_CHUNK_CHARS: int = 200
+
+
+class _FigerStandIn(BaseHTTPRequestHandler):
+    """Stand-in for the FIGER server that labels every occurrence of 'Alice' as a person."""
+    lock: threading.Lock = threading.Lock()
+    in_flight: int = 0
+    max_in_flight: int = 0
+
+    def do_GET(self) -> None:
+        params = parse_qs(urlparse(self.path).query)
+        if "text" not in params:  # health check
+            self._send({"status": 200})
+            return
+
+        with _FigerStandIn.lock:
+            _FigerStandIn.in_flight += 1
+            _FigerStandIn.max_in_flight = max(_FigerStandIn.max_in_flight, _FigerStandIn.in_flight)
+        time.sleep(0.05)
+        with _FigerStandIn.lock:
+            _FigerStandIn.in_flight -= 1
+
+        text: str = params["text"][0]
+        if len(text) > MAX_CHUNK_CHARS:
+            self._send({"status": 500, "error": "text too long"})
+            return
+
+        self._send({
+            "status": 200,
+            "sentence_offsets": [0] + [match.end() for match in re.finditer(r"\. ", text)],
+            "data": [
+                {"start_char": match.start(), "end_char": match.end(), "label": "/person@1.0,/location@0.1"}
+                for match in re.finditer("Alice", text)
+            ]
+        })
+
+    def _send(self, answer) -> None:
+        body: bytes = json.dumps(answer).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args) -> None:
+        pass
+
+
+@pytest.fixture
+def figer_url(monkeypatch) -> str:
+    server: ThreadingHTTPServer = ThreadingHTTPServer(("127.0.0.1", 0), _FigerStandIn)
+    thread: threading.Thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    url: str = f"http://127.0.0.1:{server.server_address[1]}/api"
+    monkeypatch.setenv("FIGER_URL", url)
+    yield url
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def resource_manager():
+    with ResourceManager() as resource_manager:
+        yield resource_manager
+    resources.MANAGER = None
+
+
+def test_split_into_chunks() -> None:
+    text: str = "This is a sentence. " * 30 + "x" * 250
+    chunks: List = extraction._split_into_chunks(text, MAX_CHUNK_CHARS)
+    assert "".join(chunk_text for _, chunk_text in chunks) == text
+    for chunk_start, chunk_text in chunks:
+        assert len(chunk_text) <= MAX_CHUNK_CHARS
+        assert text[chunk_start:chunk_start + len(chunk_text)] == chunk_text
+
+    assert extraction._split_into_chunks("short", MAX_CHUNK_CHARS) == [(0, "short")]
+
+
+def test_figer_ner_extractor(figer_url, resource_manager) -> None:
+    long_text: str = " ".join(f"Sentence {i} mentions Alice." for i in range(40))
+    documents: List[Document] = [Document("long", long_text)] + [
+        Document(f"short-{i}", f"Alice went home. Then Alice slept {i} hours.") for i in range(10)
+    ]
+    document_base: DocumentBase = DocumentBase(documents, [])
+
+    extractor = extraction.FigerNERExtractor(max_workers=4, max_chunk_chars=MAX_CHUNK_CHARS)
+    statistics: Statistics = Statistics(True)
+    extractor(document_base, EmptyInteractionCallback(), EmptyStatusCallback(), statistics)
+
+    assert "num_failed_chunks" not in statistics.all_keys()
+    assert len(documents[0].nuggets) == 40
+    for document in documents[1:]:
+        assert len(document.nuggets) == 2
+
+    for document in documents:
+        for nugget in document.nuggets:
+            assert nugget.text == "Alice"
+            assert nugget[LabelSignal] == "person"
+        sentence_start_chars: List[int] = document[SentenceStartCharsSignal]
+        assert sentence_start_chars == [0] + [match.end() for match in re.finditer(r"\. ", document.text)]
+
+    assert _FigerStandIn.max_in_flight > 1
+
+    # the session's connection pool is sized to the number of workers
+    session = resources.MANAGER[FigerNERPipeline]["session"](1)
+    assert session.get_adapter(figer_url)._pool_maxsize == 4
+
+
+def test_doc_from_token_offsets() -> None:
+    spacy = pytest.importorskip("spacy")
+    np = pytest.importorskip("numpy")
+
+    text: str = "  Alice  went home.\nShe slept. "
+    token_offsets = np.array([(2, 7), (9, 13), (14, 18), (18, 19), (20, 23), (24, 29), (29, 30)], dtype=np.int32)
+    doc = extraction._doc_from_token_offsets(spacy.blank("en"), text, token_offsets)
+    assert doc.text == text
+    for start_char, end_char in token_offsets.tolist():
+        assert doc.char_span(start_char, end_char) is not None
+
+
+def test_token_offsets_are_persisted() -> None:
+    document: Document = Document("doc", "Alice went home.")
+    assert extraction._store_document_analysis(document, [0], [(0, 5), (6, 10), (11, 15), (15, 16)])
+    assert not extraction._store_document_analysis(document, [0], [(0, 16)])
+    assert document[TokenOffsetsSignal].shape == (4, 2)
+
+    document_base: DocumentBase = DocumentBase.from_bson(DocumentBase([document], []).to_bson())
+    assert document_base.documents[0][SentenceStartCharsSignal] == [0]
+    assert document_base.documents[0][TokenOffsetsSignal].tolist() == [[0, 5], [6, 10], [11, 15], [15, 16]]
+
+
+# number of times the NLP stand-ins analyzed a text
+_NLP_CALLS: Dict[str, int] = {"stanza": 0, "spacy_tokenizer": 0, "spacy_senter": 0}
+
+
+class _StanzaStandIn(BaseResource):
+    """Stand-in for the stanza pipeline that tokenizes at word boundaries and recognizes 'Alice' and 'Bob'."""
+    identifier: str = "StanzaNERPipeline"
+
+    @classmethod
+    def load(cls) -> "_StanzaStandIn":
+        return cls()
+
+    def unload(self) -> None:
+        pass
+
+    @property
+    def resource(self) -> "_StanzaStandIn":
+        return self
+
+    def __call__(self, text: str) -> SimpleNamespace:
+        _NLP_CALLS["stanza"] += 1
+        sentences: List[SimpleNamespace] = []
+        for sentence_match in re.finditer(r"[^.]+\.?", text):
+            tokens: List[SimpleNamespace] = [
+                SimpleNamespace(start_char=match.start(), end_char=match.end())
+                for match in re.finditer(r"\w+|[^\w\s]", sentence_match.group())
+                if not match.group().isspace()
+            ]
+            for token in tokens:
+                token.start_char += sentence_match.start()
+                token.end_char += sentence_match.start()
+            entities: List[SimpleNamespace] = [
+                SimpleNamespace(start_char=sentence_match.start() + match.start(), text=match.group(), type="PERSON",
+                                words=[SimpleNamespace(xpos="NNP")])
+                for match in re.finditer("Alice|Bob", sentence_match.group())
+            ]
+            if tokens != []:
+                sentences.append(SimpleNamespace(tokens=tokens, entities=entities))
+        return SimpleNamespace(sentences=sentences)
+
+
+class _SpacyStandIn(BaseResource):
+    """Stand-in for a spacy model whose tokenizer and sentence segmentation count their calls."""
+    identifier: str = "SpacyEnCoreWebLg"
+
+    def __init__(self) -> None:
+        super(_SpacyStandIn, self).__init__()
+        import spacy
+        from spacy.language import Language
+
+        @Language.component("counting_senter")
+        def counting_senter(doc):
+            _NLP_CALLS["spacy_senter"] += 1
+            for token in doc[1:]:
+                token.is_sent_start = doc[token.i - 1].text == "."
+            return doc
+
+        self._nlp = spacy.blank("en")
+        tokenizer = self._nlp.tokenizer
+
+        def counting_tokenizer(text):
+            _NLP_CALLS["spacy_tokenizer"] += 1
+            return tokenizer(text)
+
+        self._nlp.tokenizer = counting_tokenizer
+        self._nlp.add_pipe("counting_senter", name="senter")
+        self._nlp.add_pipe("entity_ruler").add_patterns([{"label": "PERSON", "pattern": [{"ORTH": "Carol"}]}])
+
+    @classmethod
+    def load(cls) -> "_SpacyStandIn":
+        return cls()
+
+    def unload(self) -> None:
+        pass
+
+    @property
+    def resource(self):
+        return self._nlp
+
+
+def test_default_pipeline_analyzes_documents_once(monkeypatch) -> None:
+    pytest.importorskip("spacy")
+    monkeypatch.setitem(resources.RESOURCES, _StanzaStandIn.identifier, _StanzaStandIn)
+    monkeypatch.setitem(resources.RESOURCES, _SpacyStandIn.identifier, _SpacyStandIn)
+    for key in _NLP_CALLS.keys():
+        _NLP_CALLS[key] = 0
+
+    documents: List[Document] = [
+        Document("first", "Alice met Carol. Then Bob and Carol went home."),
+        Document("second", "Nobody was there. Carol met Bob.")
+    ]
+    document_base: DocumentBase = DocumentBase(documents, [])
+
+    with ResourceManager():
+        try:
+            statistics: Statistics = Statistics(True)
+            # the NLP stages of the default preprocessing pipeline
+            for pipeline_element in [
+                extraction.StanzaNERExtractor(),
+                extraction.SpacyNERExtractor("SpacyEnCoreWebLg"),
+                NuggetDeduplicator(),
+                ContextSentenceCacher(),
+                CopyNormalizer(),
+                RelativePositionEmbedder()
+            ]:
+                pipeline_element(document_base, EmptyInteractionCallback(), EmptyStatusCallback(), statistics)
+        finally:
+            resources.MANAGER = None
+
+    # each document is tokenized and segmented once
+    assert _NLP_CALLS == {"stanza": len(documents), "spacy_tokenizer": 0, "spacy_senter": 0}
+    assert [nugget.text for nugget in documents[0].nuggets] == ["Alice", "Bob", "Carol", "Carol"]
+
+    # the later stages work on the stored tokens
+    document: Document = documents[0]
+    tokens: List[str] = [document.text[start:end] for start, end in document[TokenOffsetsSignal].tolist()]
+    assert tokens == ["Alice", "met", "Carol", ".", "Then", "Bob", "and", "Carol", "went", "home", "."]
+    for nugget in document.nuggets:
+        context_sentence: ContextSentence = nugget[CachedContextSentenceSignal]
+        sentence_tokens: List[str] = [
+            context_sentence.text[start:end] for start, end in context_sentence.token_offsets.tolist()
+        ]
+        assert nugget.text in sentence_tokens
+        assert sentence_tokens[-1] == "."
+    assert [nugget[RelativePositionSignal] for nugget in document.nuggets] == [0 / 11, 5 / 11, 2 / 11, 7 / 11]
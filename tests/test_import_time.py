@@ -0,0 +1,54 @@
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+ROOT: str = os.path.join(os.path.dirname(__file__), "..")
+
+# the web and worker processes must not import these libraries before a resource is actually loaded
+HEAVY_MODULES = ["torch", "transformers", "sentence_transformers", "spacy", "stanza", "sklearn"]
+
+# import time budget in seconds, can be raised for slow machines
+IMPORT_TIME_BUDGET: float = float(os.environ.get("WANNADB_IMPORT_TIME_BUDGET", "5"))
+
+_MEASURE_IMPORT: str = """
+import json, sys, time
+tick = time.perf_counter()
+try:
+    __import__(sys.argv[1])
+except ModuleNotFoundError as e:
+    print(json.dumps({"missing": e.name}))
+    sys.exit(0)
+tack = time.perf_counter()
+print(json.dumps({"seconds": tack - tick, "modules": sorted(sys.modules.keys())}))
+"""
+
+
+def _measure_import(module: str) -> dict:
+    process = subprocess.run(
+        [sys.executable, "-c", _MEASURE_IMPORT, module], cwd=ROOT, capture_output=True, text=True, timeout=120
+    )
+    assert process.returncode == 0, process.stderr
+    return json.loads(process.stdout.strip().splitlines()[-1])
+
+
+@pytest.mark.parametrize("module", [
+    "app",
+    "celery_app",
+    "wannadb.matching.matching",
+    "wannadb.preprocessing.embedding",
+    "wannadb.preprocessing.extraction",
+    "wannadb.model_server"
+])
+def test_import_time(module: str) -> None:
+    result: dict = _measure_import(module)
+    if "missing" in result:
+        missing: str = result["missing"].split(".")[0]
+        assert missing not in HEAVY_MODULES, f"Importing '{module}' requires '{missing}'!"
+        pytest.skip(f"'{missing}' is not installed")
+
+    heavy_modules = [name for name in result["modules"] if name.split(".")[0] in HEAVY_MODULES]
+    assert heavy_modules == [], f"Importing '{module}' imports {heavy_modules}!"
+    assert result["seconds"] < IMPORT_TIME_BUDGET, f"Importing '{module}' took {result['seconds']:.2f} seconds!"
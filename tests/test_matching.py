@@ -0,0 +1,173 @@
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from wannadb.data.data import Attribute, Document, DocumentBase, InformationNugget
+from wannadb.data.signals import CachedDistanceSignal, ConfirmedAttributesSignal, CurrentMatchIndexSignal, \
+    LabelEmbeddingSignal, MaxDistanceSignal
+from wannadb.matching.distance import BaseDistance, SignalsMeanDistance
+from wannadb.interaction import EmptyInteractionCallback, InteractionCallback
+from wannadb.matching.matching import AutomaticMatcher, match_new_documents
+from wannadb.statistics import Statistics
+from wannadb.status import EmptyStatusCallback
+
+
+def _create_document(name: str, embeddings: List[List[float]]) -> Document:
+    document: Document = Document(name, "Alice met Bob in Paris.")
+    for start_char, embedding in zip([0, 10, 17], embeddings):
+        nugget: InformationNugget = InformationNugget(document, start_char, start_char + 3)
+        nugget[LabelEmbeddingSignal] = LabelEmbeddingSignal(np.array(embedding))
+        document.nuggets.append(nugget)
+    return document
+
+
+def test_match_new_documents() -> None:
+    city: Attribute = Attribute("city")
+    city[LabelEmbeddingSignal] = LabelEmbeddingSignal(np.array([0.0, 1.0]))
+    name: Attribute = Attribute("name")
+    name[LabelEmbeddingSignal] = LabelEmbeddingSignal(np.array([1.0, 0.0]))
+    country: Attribute = Attribute("country")
+    country[LabelEmbeddingSignal] = LabelEmbeddingSignal(np.array([1.0, 1.0]))
+
+    old_document: Document = _create_document("old", [[1, 0], [1, 0.1], [0.2, 1]])
+    old_document.attribute_mappings["city"] = [old_document.nuggets[2]]
+    old_document.attribute_mappings["name"] = []
+    old_document[ConfirmedAttributesSignal] = ConfirmedAttributesSignal(["city"])
+
+    # the matcher's guess would pull the second nugget of new-2 to the city, but it has not been confirmed
+    guessed_document: Document = _create_document("guessed", [[1, 0.9]])
+    guessed_document.attribute_mappings["city"] = [guessed_document.nuggets[0]]
+    document_base: DocumentBase = DocumentBase([old_document, guessed_document], [city, name, country])
+
+    new_documents: List[Document] = [
+        _create_document("new-0", [[1, 0], [0.2, 1], [1, 1]]),
+        Document("new-1", "No nuggets here."),
+        _create_document("new-2", [[1, 1], [1, 0.9], [0.21, 1]])
+    ]
+    document_base.add_documents(new_documents)
+    assert document_base.validate_consistency()
+    assert len(document_base.documents) == 5
+
+    statistics: Statistics = Statistics(True)
+    match_new_documents(
+        document_base, new_documents, SignalsMeanDistance(["LabelEmbeddingSignal"]), statistics, 0.1, batch_size=2
+    )
+
+    # the city nuggets are matched based on their distance to the confirmed city nugget of the old document
+    assert new_documents[0].attribute_mappings["city"] == [new_documents[0].nuggets[1]]
+    assert new_documents[1].attribute_mappings["city"] == []
+    assert new_documents[2].attribute_mappings["city"] == [new_documents[2].nuggets[2]]
+
+    # no name nugget has been matched, so the distances are based on the attribute
+    assert new_documents[0].attribute_mappings["name"] == [new_documents[0].nuggets[0]]
+    assert new_documents[2].attribute_mappings["name"] == []
+
+    # attributes that have not been matched yet remain unmatched
+    assert all("country" not in document.attribute_mappings.keys() for document in document_base.documents)
+    assert old_document.attribute_mappings["city"] == [old_document.nuggets[2]]
+
+    assert statistics["city"]["num_reference_nuggets"] == 1
+    assert statistics["city"]["num_guessed_match"] == 2
+    assert statistics["city"]["num_document_with_no_nuggets"] == 1
+    assert statistics["name"]["num_blocked_by_max_distance"] == 1
+    assert statistics["country"]["skipped"]
+
+
+def test_match_new_documents_with_adjusted_max_distance() -> None:
+    name: Attribute = Attribute("name")
+    name[LabelEmbeddingSignal] = LabelEmbeddingSignal(np.array([1.0, 0.0]))
+    old_document: Document = _create_document("old", [[1, 0], [0, 1], [1, 1]])
+    old_document.attribute_mappings["name"] = [old_document.nuggets[0]]
+    old_document[ConfirmedAttributesSignal] = ConfirmedAttributesSignal(["name"])
+    document_base: DocumentBase = DocumentBase([old_document], [name])
+    new_documents: List[Document] = [_create_document("new", [[1, 0.1], [0, 1], [1, 1]])]
+    document_base.add_documents(new_documents)
+
+    # the matcher has lowered the threshold below the distance of the closest new nugget
+    name[MaxDistanceSignal] = MaxDistanceSignal(0.001)
+    statistics: Statistics = Statistics(True)
+    match_new_documents(document_base, new_documents, SignalsMeanDistance(["LabelEmbeddingSignal"]), statistics)
+    assert new_documents[0].attribute_mappings["name"] == []
+    assert statistics["name"]["max_distance"] == 0.001
+
+    # without an adjusted threshold, the default threshold applies
+    del name.signals[MaxDistanceSignal.identifier]
+    new_documents[0].attribute_mappings.clear()
+    match_new_documents(document_base, new_documents, SignalsMeanDistance(["LabelEmbeddingSignal"]), Statistics(True))
+    assert new_documents[0].attribute_mappings["name"] == [new_documents[0].nuggets[0]]
+
+
+def test_automatic_matcher() -> None:
+    city: Attribute = Attribute("city")
+    city[LabelEmbeddingSignal] = LabelEmbeddingSignal(np.array([0.0, 1.0]))
+    name: Attribute = Attribute("name")
+    name[LabelEmbeddingSignal] = LabelEmbeddingSignal(np.array([1.0, 0.0]))
+    country: Attribute = Attribute("country")
+
+    documents: List[Document] = [
+        _create_document("doc-0", [[1, 0], [0.1, 1], [1, 1]]),
+        Document("doc-1", "No nuggets here."),
+        _create_document("doc-2", [[1, 1], [1, 0.05], [0.3, 1]])
+    ]
+    documents[2].attribute_mappings["country"] = []
+    document_base: DocumentBase = DocumentBase(documents, [city, name, country])
+
+    statistics: Statistics = Statistics(True)
+    matcher: AutomaticMatcher = AutomaticMatcher(SignalsMeanDistance(["LabelEmbeddingSignal"]), 0.03)
+    matcher(document_base, EmptyInteractionCallback(), EmptyStatusCallback(), statistics)
+
+    assert documents[0].attribute_mappings["city"] == [documents[0].nuggets[1]]
+    assert documents[0].attribute_mappings["name"] == [documents[0].nuggets[0]]
+    assert documents[1].attribute_mappings == {"city": [], "name": []}
+    assert documents[2].attribute_mappings["city"] == []
+    assert documents[2].attribute_mappings["name"] == [documents[2].nuggets[1]]
+    assert statistics["city"]["num_guessed_match"] == 1
+    assert statistics["city"]["num_blocked_by_max_distance"] == 1
+    assert statistics["country"]["skipped"]
+    assert city[MaxDistanceSignal] == name[MaxDistanceSignal] == 0.03
+    assert MaxDistanceSignal.identifier not in country.signals.keys()
+
+    # the signals of the last matched attribute are left for the user interface as by the RankingBasedMatcher
+    assert documents[0][CurrentMatchIndexSignal] == 0
+    assert documents[2][CurrentMatchIndexSignal] == 1
+    for document in [documents[0], documents[2]]:
+        closest: InformationNugget = min(document.nuggets, key=lambda nugget: nugget[CachedDistanceSignal])
+        assert closest is document.nuggets[document[CurrentMatchIndexSignal]]
+
+    # the confirmed city nugget of the first document becomes the reference for the other documents
+    for document in documents:
+        document.attribute_mappings.clear()
+    documents[2].attribute_mappings["country"] = []
+    answers: List[str] = []
+
+    def interaction_callback_fn(pipeline_element_identifier: str, data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        if data["attribute"].name != "city":
+            return None
+        answers.append(data["nuggets"][0].document.name)
+        nugget: InformationNugget = documents[0].nuggets[1]
+        return {"message": "is-match", "nugget": nugget, "not-a-match": None} if len(answers) == 1 else None
+
+    statistics = Statistics(True)
+    matcher = AutomaticMatcher(SignalsMeanDistance(["LabelEmbeddingSignal"]), 0.03, max_num_feedback=2)
+    matcher(document_base, InteractionCallback(interaction_callback_fn), EmptyStatusCallback(), statistics)
+
+    assert answers == ["doc-2", "doc-2"]
+    assert documents[0].attribute_mappings["city"] == [documents[0].nuggets[1]]
+    assert documents[2].attribute_mappings["city"] == [documents[2].nuggets[2]]
+    assert statistics["city"]["num_confirmed_match"] == 1
+    assert statistics["city"]["num_feedback"] == 2
+    assert statistics["name"]["num_feedback"] == 1
+
+
+def test_distance_counts_calls() -> None:
+    document: Document = _create_document("doc", [[1.0, 0.0], [0.0, 1.0], [1.0, 1.0]])
+    attributes: List[Attribute] = [Attribute("city"), Attribute("name")]
+    for attribute in attributes:
+        attribute[LabelEmbeddingSignal] = LabelEmbeddingSignal(np.array([1.0, 0.0]))
+
+    distance: SignalsMeanDistance = SignalsMeanDistance([LabelEmbeddingSignal.identifier])
+    statistics: Statistics = Statistics(True)
+    distances: np.ndarray = BaseDistance.compute_distances(distance, attributes, document.nuggets, statistics)
+    assert distances.shape == (2, 3)
+    assert distances[0, 0] == distance.compute_distance(attributes[0], document.nuggets[0], statistics)
+    assert statistics["num_calls"] == 7
@@ -0,0 +1,117 @@
+import os
+import threading
+import time
+from typing import List
+
+import numpy as np
+import pytest
+
+model_server = pytest.importorskip("wannadb.model_server")
+
+from wannadb import resources
+from wannadb.resources import BaseSBERTResource, ResourceManager
+
+
+class _SlowEncoder:
+    """Stand-in for a SentenceTransformer that embeds a text as its length and records the size of each call."""
+
+    def __init__(self) -> None:
+        self.call_sizes: List[int] = []
+
+    def encode(self, texts: List[str], batch_size: int = 32, show_progress_bar: bool = False) -> np.ndarray:
+        self.call_sizes.append(len(texts))
+        time.sleep(0.05)
+        return np.array([[float(len(text))] for text in texts])
+
+
+class _SlowSBERTResource(BaseSBERTResource):
+    identifier: str = "SlowSBERTResource"
+
+    def __init__(self) -> None:
+        self._sbert_model = _SlowEncoder()
+        self._batched_sbert_model = None
+
+
+@pytest.fixture
+def server(tmp_path, monkeypatch):
+    monkeypatch.setitem(resources.RESOURCES, _SlowSBERTResource.identifier, _SlowSBERTResource)
+    monkeypatch.setenv(model_server.MODEL_SERVER_AUTHKEY_VARIABLE, "secret")
+    address: str = os.path.join(tmp_path, "models.sock")
+    server = model_server.ModelServer(address, [_SlowSBERTResource.identifier])
+    thread: threading.Thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    assert server.wait_until_ready(10)
+    monkeypatch.setenv(model_server.MODEL_SERVER_ADDRESS_VARIABLE, address)
+    yield server
+    server.shutdown()
+    thread.join(10)
+
+
+def test_model_server_coalesces_encode_requests(server) -> None:
+    # the server runs in this process, so the client's resource manager replaces the server's as the global one
+    server_manager: ResourceManager = resources.MANAGER
+    encoder: _SlowEncoder = server_manager[_SlowSBERTResource.identifier]
+    resources.MANAGER = None
+
+    try:
+        with ResourceManager():
+            resources.MANAGER.load(_SlowSBERTResource.identifier)
+            remote_encoder = resources.MANAGER[_SlowSBERTResource.identifier]
+            assert not isinstance(remote_encoder, _SlowEncoder)
+
+            results: List = [None] * 8
+
+            def encode(ix: int) -> None:
+                results[ix] = remote_encoder.encode(["x" * ix, "y" * (ix + 10)])
+
+            threads: List[threading.Thread] = [threading.Thread(target=encode, args=(ix,)) for ix in range(8)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+            for ix, result in enumerate(results):
+                assert result.tolist() == [[float(ix)], [float(ix + 10)]]
+            assert sum(encoder.call_sizes) == 16
+            assert len(encoder.call_sizes) < 8
+    finally:
+        resources.MANAGER = server_manager
+
+
+def test_model_server_requires_secret_and_local_address(tmp_path, monkeypatch) -> None:
+    monkeypatch.delenv(model_server.MODEL_SERVER_AUTHKEY_VARIABLE, raising=False)
+    with pytest.raises(RuntimeError):
+        model_server.ModelServer(os.path.join(tmp_path, "models.sock"), [])
+
+    monkeypatch.setenv(model_server.MODEL_SERVER_AUTHKEY_VARIABLE, "secret")
+    with pytest.raises(ValueError):
+        model_server.ModelServer("0.0.0.0:6060", [])
+    model_server.ModelServer("model-server:6060", [])
+
+
+def test_model_server_client_waits_for_cold_start(tmp_path, monkeypatch) -> None:
+    monkeypatch.setitem(resources.RESOURCES, _SlowSBERTResource.identifier, _SlowSBERTResource)
+    monkeypatch.setenv(model_server.MODEL_SERVER_AUTHKEY_VARIABLE, "secret")
+    address: str = os.path.join(tmp_path, "models.sock")
+    server_manager: ResourceManager = resources.MANAGER
+
+    monkeypatch.setenv(model_server.MODEL_SERVER_CONNECT_TIMEOUT_VARIABLE, "0.2")
+    with pytest.raises(OSError):
+        model_server.ModelServerClient(address).request(_SlowSBERTResource.identifier, "load")
+
+    monkeypatch.setenv(model_server.MODEL_SERVER_CONNECT_TIMEOUT_VARIABLE, "30")
+    server = model_server.ModelServer(address, [_SlowSBERTResource.identifier])
+    thread: threading.Thread = threading.Thread(target=server.serve_forever, daemon=True)
+    timer: threading.Timer = threading.Timer(0.5, thread.start)
+    timer.start()
+    try:
+        client = model_server.ModelServerClient(address)
+        result = client.request(_SlowSBERTResource.identifier, "encode", ["abc"])
+        assert result.tolist() == [[3.0]]
+        client.close()
+    finally:
+        timer.join()
+        server.wait_until_ready(10)
+        server.shutdown()
+        thread.join(10)
+        resources.MANAGER = server_manager
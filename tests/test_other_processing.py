@@ -0,0 +1,55 @@
+from wannadb.data.data import Document, DocumentBase, InformationNugget
+from wannadb.data.signals import CachedContextSentenceSignal, LabelSignal, LabelsSignal, SentenceStartCharsSignal
+from wannadb.interaction import EmptyInteractionCallback
+from wannadb.preprocessing.other_processing import ContextSentenceCacher, NuggetDeduplicator
+from wannadb.statistics import Statistics
+from wannadb.status import EmptyStatusCallback
+
+
+def _add_nugget(document: Document, start_char: int, end_char: int, label: str) -> None:
+    nugget: InformationNugget = InformationNugget(document, start_char, end_char)
+    nugget[LabelSignal] = LabelSignal(label)
+    document.nuggets.append(nugget)
+
+
+def test_nugget_deduplicator() -> None:
+    document: Document = Document("doc", "Barack Obama visited the United States of America in 2009.")
+    _add_nugget(document, 0, 12, "PERSON")  # Barack Obama
+    _add_nugget(document, 25, 49, "GPE")  # United States of America
+    _add_nugget(document, 53, 57, "DATE")  # 2009
+    _add_nugget(document, 0, 12, "PER")  # identical span
+    _add_nugget(document, 21, 49, "LOC")  # the United States of America
+    _add_nugget(document, 25, 38, "LOC")  # United States
+    _add_nugget(document, 53, 57, "DATE")  # identical span and label
+    document_base: DocumentBase = DocumentBase([document], [])
+
+    statistics: Statistics = Statistics(True)
+    NuggetDeduplicator()(document_base, EmptyInteractionCallback(), EmptyStatusCallback(), statistics)
+
+    assert [(nugget.start_char, nugget.end_char) for nugget in document.nuggets] == [(0, 12), (25, 49), (53, 57), (25, 38)]
+    assert document.nuggets[0][LabelSignal] == "PERSON"
+    assert document.nuggets[0][LabelsSignal] == ["PERSON", "PER"]
+    assert document.nuggets[1][LabelsSignal] == ["GPE", "LOC"]
+    assert document.nuggets[2][LabelsSignal] == ["DATE"]
+    assert LabelsSignal.identifier not in document.nuggets[3].signals.keys()
+    assert statistics["num_nuggets_removed"] == 3
+    assert document_base.validate_consistency()
+
+
+def test_context_sentence_cacher() -> None:
+    document: Document = Document("doc", "Intro  Alice went home. Bob stayed. Carol left.")
+    document[SentenceStartCharsSignal] = SentenceStartCharsSignal([7, 24, 36])
+    for start_char, end_char in [(0, 5), (7, 12), (24, 27), (36, 41)]:
+        document.nuggets.append(InformationNugget(document, start_char, end_char))
+    document_base: DocumentBase = DocumentBase([document], [])
+
+    statistics: Statistics = Statistics(True)
+    ContextSentenceCacher()(document_base, EmptyInteractionCallback(), EmptyStatusCallback(), statistics)
+
+    sentences = [nugget[CachedContextSentenceSignal] for nugget in document.nuggets]
+    assert [sentence["text"] for sentence in sentences] == ["Intro  ", "Alice went home. ", "Bob stayed. ", "Carol left."]
+    for nugget, sentence in zip(document.nuggets, sentences):
+        assert sentence["text"][sentence["start_char"]:sentence["end_char"]] == nugget.text
+    assert statistics["num_context_sentence_before_first_sentence"] == 1
+    assert statistics["num_context_sentence_is_first_or_inner_sentence"] == 2
+    assert statistics["num_context_sentence_is_final_sentence"] == 1
@@ -0,0 +1,212 @@
+import importlib
+import os
+import select
+import socket
+import sys
+import threading
+import time
+import types
+from typing import Dict, List
+
+import pytest
+
+
+class _FakeError(Exception):
+    pass
+
+
+class _FakeIntegrityError(_FakeError):
+    pass
+
+
+class _FakePoolError(_FakeError):
+    pass
+
+
+class _FakeCursor:
+
+    def __init__(self, connection: "_FakeConnection") -> None:
+        self._connection: "_FakeConnection" = connection
+
+    def __enter__(self) -> "_FakeCursor":
+        return self
+
+    def __exit__(self, *args) -> None:
+        pass
+
+    def execute(self, query, params=None) -> None:
+        if self._connection.broken:
+            raise _FakeError("broken connection")
+        self._connection.log.append(query)
+        if not self._connection.autocommit:
+            self._connection.transaction_status = 2
+
+    def fetchall(self) -> List:
+        return [(1,)]
+
+
+class _FakeConnection:
+    """Stand-in for a psycopg2 connection whose socket is one end of a socket pair."""
+
+    def __init__(self) -> None:
+        own_socket, self.peer = socket.socketpair()
+        self._fd: int = os.dup(own_socket.fileno())
+        own_socket.close()
+        self.closed: int = 0
+        self.autocommit: bool = False
+        self.broken: bool = False
+        self.transaction_status: int = 0
+        self.log: List[str] = []
+        self.info = self
+
+    def fileno(self) -> int:
+        return self._fd
+
+    def cursor(self) -> _FakeCursor:
+        return _FakeCursor(self)
+
+    def commit(self) -> None:
+        self.log.append("COMMIT")
+        self.transaction_status = 0
+
+    def rollback(self) -> None:
+        if self.broken:
+            raise _FakeError("broken connection")
+        self.log.append("ROLLBACK")
+        self.transaction_status = 0
+
+    def close(self) -> None:
+        # like PQfinish, send the protocol goodbye before closing the socket
+        if self.closed == 0:
+            os.write(self._fd, b"X")
+            os.close(self._fd)
+            self.closed = 1
+
+
+class _FakeThreadedConnectionPool:
+    """Stand-in for psycopg2's ThreadedConnectionPool with the same internal attributes."""
+
+    def __init__(self, minconn: int, maxconn: int, **kwargs) -> None:
+        self.maxconn: int = maxconn
+        self._pool: List[_FakeConnection] = []
+        self._used: Dict[int, _FakeConnection] = {}
+        self._lock: threading.Lock = threading.Lock()
+
+    def getconn(self) -> _FakeConnection:
+        with self._lock:
+            if self._pool:
+                conn = self._pool.pop()
+            elif len(self._used) < self.maxconn:
+                conn = _FakeConnection()
+            else:
+                raise _FakePoolError("connection pool exhausted")
+            self._used[id(conn)] = conn
+            return conn
+
+    def putconn(self, conn: _FakeConnection, close: bool = False) -> None:
+        with self._lock:
+            del self._used[id(conn)]
+            if close:
+                conn.close()
+            else:
+                self._pool.append(conn)
+
+    def closeall(self) -> None:
+        with self._lock:
+            for conn in self._pool + list(self._used.values()):
+                conn.close()
+
+
+@pytest.fixture
+def util(monkeypatch):
+    """Import the PostgreSQL utilities with a fake psycopg2 driver."""
+    psycopg2 = types.ModuleType("psycopg2")
+    psycopg2.Error = _FakeError
+    psycopg2.IntegrityError = _FakeIntegrityError
+    psycopg2.extensions = types.ModuleType("psycopg2.extensions")
+    psycopg2.extensions.TRANSACTION_STATUS_IDLE = 0
+    psycopg2.extensions.connection = _FakeConnection
+    psycopg2.extensions.cursor = _FakeCursor
+    psycopg2.pool = types.ModuleType("psycopg2.pool")
+    psycopg2.pool.ThreadedConnectionPool = _FakeThreadedConnectionPool
+    psycopg2.pool.PoolError = _FakePoolError
+    psycopg2.sql = types.ModuleType("psycopg2.sql")
+    psycopg2.sql.SQL = str
+    for module in [psycopg2, psycopg2.extensions, psycopg2.pool, psycopg2.sql]:
+        monkeypatch.setitem(sys.modules, module.__name__, module)
+
+    monkeypatch.delitem(sys.modules, "wannadb_web.postgres.util", raising=False)
+    module = importlib.import_module("wannadb_web.postgres.util")
+    monkeypatch.setitem(sys.modules, "wannadb_web.postgres.util", module)  # removed again after the test
+    monkeypatch.setattr(module, "DB_POOL_MAX_SIZE", 2)
+    monkeypatch.setattr(module, "DB_POOL_TIMEOUT", 0.1)
+    return module
+
+
+def test_connection_pool_timeout(util) -> None:
+    with util.connection(), util.connection():
+        start = time.monotonic()
+        with pytest.raises(_FakePoolError):
+            util.get_pool().getconn()
+        assert time.monotonic() - start >= 0.1
+        assert util.execute_query("SELECT 1") is False
+
+    # the slots are released again
+    assert util.execute_query("SELECT 1") == [(1,)]
+
+
+def test_connection_pool_rolls_back_on_return(util) -> None:
+    with util.connection() as conn:
+        pass
+
+    assert util.execute_transaction("INSERT", commit=False, fetch=False) is True
+    assert conn.log[-2:] == ["INSERT", "ROLLBACK"]
+
+    with util.transaction() as cur:
+        cur.execute("INSERT")
+    assert conn.log[-2:] == ["INSERT", "COMMIT"]
+
+    with pytest.raises(ValueError):
+        with util.transaction() as cur:
+            cur.execute("INSERT")
+            raise ValueError()
+    assert conn.log[-2:] == ["INSERT", "ROLLBACK"]
+    assert conn.transaction_status == 0
+
+
+def test_connection_pool_replaces_broken_connections(util, monkeypatch) -> None:
+    monkeypatch.setattr(util, "DB_POOL_HEALTH_CHECK_INTERVAL", 0)
+    with util.connection() as broken_conn:
+        pass
+    broken_conn.broken = True
+
+    with util.connection() as conn:
+        assert conn is not broken_conn
+    assert broken_conn.closed != 0
+    assert util.execute_query("SELECT 1") == [(1,)]
+
+
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="requires os.fork")
+def test_connection_pool_is_reset_after_fork(util) -> None:
+    parent_pool = util.get_pool()
+    with util.connection() as conn:
+        pass
+
+    pid = os.fork()
+    if pid == 0:
+        try:
+            assert util._POOL is None
+            assert util.get_pool() is not parent_pool
+            # closing the inherited connection (e.g. when it is garbage collected) must not reach the parent's socket
+            conn.close()
+            os._exit(0)
+        except BaseException:
+            os._exit(1)
+    _, status = os.waitpid(pid, 0)
+    assert os.waitstatus_to_exitcode(status) == 0
+
+    # the parent's session is untouched and its connection still works
+    assert select.select([conn.peer], [], [], 0.1)[0] == []
+    assert conn.closed == 0
+    assert util.execute_query("SELECT 1") == [(1,)]
+    parent_pool.closeall()
@@ -0,0 +1,56 @@
+import json
+from typing import Any, Dict, List
+
+from wannadb import profiling
+from wannadb.configuration import Pipeline
+from wannadb.data.data import Attribute, Document, DocumentBase, InformationNugget
+from wannadb.interaction import EmptyInteractionCallback
+from wannadb.preprocessing.embedding import RelativePositionEmbedder
+from wannadb.preprocessing.normalization import CopyNormalizer
+from wannadb.profiling import Profiler
+from wannadb.statistics import Statistics
+from wannadb.status import EmptyStatusCallback
+
+
+def _create_document_base() -> DocumentBase:
+    documents: List[Document] = []
+    for ix in range(4):
+        document: Document = Document(f"doc-{ix}", "Alice met Bob in Paris.")
+        document.nuggets.append(InformationNugget(document, 0, 5))
+        document.nuggets.append(InformationNugget(document, 17, 22))
+        documents.append(document)
+    return DocumentBase(documents, [Attribute("city")])
+
+
+def test_profile_pipeline(tmp_path) -> None:
+    pipeline: Pipeline = Pipeline([CopyNormalizer(), RelativePositionEmbedder()], num_threads=2)
+    with Profiler() as profiler:
+        assert profiling.PROFILER is profiler
+        pipeline(_create_document_base(), EmptyInteractionCallback(), EmptyStatusCallback(), Statistics(False))
+        profiling.record_resource_load("FastTextEmbedding", 2.5, 1024)
+    assert profiling.PROFILER is None
+
+    report: Dict[str, Any] = profiler.to_report()
+    frames: Dict[str, Dict[str, Any]] = {";".join(frame["stack"]): frame for frame in report["frames"]}
+    # the pipeline elements run in other threads but continue the stack of the pipeline
+    assert set(frames.keys()) == {"Pipeline", "Pipeline;CopyNormalizer", "Pipeline;RelativePositionEmbedder"}
+    assert frames["Pipeline"]["items"] == {"documents": 4}
+    assert frames["Pipeline;CopyNormalizer"]["items"] == {"documents": 4, "nuggets": 8}
+    assert frames["Pipeline;CopyNormalizer"]["num_calls"] == 1
+    assert frames["Pipeline"]["wall_time"] >= frames["Pipeline;CopyNormalizer"]["wall_time"]
+    assert report["resource_loads"] == {"FastTextEmbedding": {"num_loads": 1, "load_time": 2.5, "size": 1024}}
+
+    profiler.save_report(str(tmp_path / "profile.json"))
+    with open(tmp_path / "profile.json", "r", encoding="utf-8") as file:
+        assert json.load(file)["frames"] == report["frames"]
+
+    for line in profiler.to_folded_stacks().splitlines():
+        stack, self_time = line.rsplit(" ", 1)
+        assert stack in {"Pipeline", "Pipeline;CopyNormalizer", "Pipeline;RelativePositionEmbedder"}
+        assert int(self_time) > 0
+
+    # without an active profiler, nothing is recorded
+    profiling.count("documents", 1)
+    with profiling.frame("Pipeline"):
+        pass
+    assert profiler.to_report()["frames"] == report["frames"]
@@ -0,0 +1,146 @@
+import os
+
+import numpy as np
+import pytest
+
+resources = pytest.importorskip("wannadb.resources")
+
+
+def test_memmap_vocabulary(tmp_path) -> None:
+    words = ["the", "über", "a", "", "The", "the", "zebra"]
+    prefix: str = os.path.join(tmp_path, "vocab")
+    resources.MemmapVocabulary.build(words, prefix)
+    assert resources.MemmapVocabulary.exists(prefix)
+
+    vocabulary = resources.MemmapVocabulary(prefix)
+    assert len(vocabulary) == len(words)
+    assert vocabulary["the"] == 5  # duplicates map to their last row
+    assert vocabulary["über"] == 1
+    assert vocabulary["The"] == 4
+    assert vocabulary[""] == 3
+    assert "zebra" in vocabulary
+    assert "zebras" not in vocabulary
+    assert vocabulary.get("missing", -1) == -1
+    with pytest.raises(KeyError):
+        _ = vocabulary["missing"]
+    assert [vocabulary.word(row) for row in range(len(words))] == words
+    vocabulary.close()
+
+
+def test_fast_text_embedding(tmp_path, monkeypatch) -> None:
+    path: str = os.path.join(tmp_path, "vectors.vec")
+    with open(path, "w", encoding="utf-8") as file:
+        file.write("3 2\n")
+        file.write("hello 0.5 1.0\n")
+        file.write("world -1.0 2.25\n")
+        file.write("! 0.0 0.0\n")
+    monkeypatch.setattr(resources.BaseFastTextEmbedding, "_path", path)
+    monkeypatch.setattr(resources.FastTextEmbedding100000, "_num_vectors", 2)
+
+    embedding = resources.FastTextEmbedding.load()
+    assert os.path.isfile(f"{path}.npy")
+    vectors = embedding.resource
+    assert len(vectors) == 3
+    assert vectors["world"].dtype == np.float32
+    assert np.array_equal(vectors["world"], np.array([-1.0, 2.25], dtype=np.float32))
+    assert "!" in vectors
+    embedding.unload()
+
+    limited = resources.FastTextEmbedding100000.load().resource
+    assert "hello" in limited
+    assert "!" not in limited
+
+
+def test_glove_embeddings(tmp_path, monkeypatch) -> None:
+    vocab_path: str = os.path.join(tmp_path, "glove.vocab")
+    vector_path: str = os.path.join(tmp_path, "glove.npy")
+    with open(vocab_path, "w", encoding="utf-8") as file:
+        file.write("cat\ndog\nmouse\n")
+    np.arange(900, dtype=np.float32).tofile(vector_path)
+    monkeypatch.setattr(resources.GloveEmbeddings300, "_vocab_path", vocab_path)
+    monkeypatch.setattr(resources.GloveEmbeddings300, "_vector_path", vector_path)
+
+    glove = resources.GloveEmbeddings300.load().resource
+    assert glove["word2index"]["mouse"] == 2
+    assert "horse" not in glove["word2index"]
+    assert list(glove["index2word"]) == ["cat", "dog", "mouse"]
+    assert glove["vectors_memmap"][glove["word2index"]["dog"]][0] == 300
+
+
+class _FakeResource(resources.BaseResource):
+    """Resource that pretends to occupy 'size' bytes of memory."""
+    identifier: str = "FakeResource"
+    size: int = 0
+    rss: int = 0
+    num_loads: int = 0
+
+    @classmethod
+    def load(cls) -> "_FakeResource":
+        _FakeResource.rss += cls.size
+        _FakeResource.num_loads += 1
+        return cls()
+
+    def unload(self) -> None:
+        _FakeResource.rss -= self.size
+
+    @property
+    def resource(self) -> str:
+        return self.identifier
+
+
+def _fake_resource(identifier: str, size: int):
+    return type(identifier, (_FakeResource,), {"identifier": identifier, "size": size})
+
+
+def test_resource_manager_memory_budget(monkeypatch) -> None:
+    for identifier in ["FakeA", "FakeB", "FakeC"]:
+        monkeypatch.setitem(resources.RESOURCES, identifier, _fake_resource(identifier, 40))
+    monkeypatch.setattr(resources, "_current_rss", lambda: _FakeResource.rss)
+    monkeypatch.setattr(resources, "MANAGER", None)
+    _FakeResource.rss = 0
+    _FakeResource.num_loads = 0
+
+    with resources.ResourceManager(use_model_server=False, memory_budget=100) as manager:
+        manager.load("FakeA")
+        manager.load("FakeB")
+        assert manager["FakeA"] == "FakeA"  # FakeB is now the least recently used resource
+        manager.load("FakeC")
+        assert manager.memory_usage == 80
+        assert _FakeResource.num_loads == 3
+
+        # FakeB has been evicted and is loaded again transparently, which evicts FakeA
+        assert manager["FakeB"] == "FakeB"
+        assert _FakeResource.num_loads == 4
+        assert _FakeResource.rss == 80
+
+        manager.prefetch(["FakeA"])
+        assert manager["FakeA"] == "FakeA"
+        assert _FakeResource.num_loads == 5
+
+        with pytest.raises(AssertionError):
+            _ = manager["FakeUnknown"]
+    assert _FakeResource.rss == 0
+
+
+def test_resource_manager_does_not_evict_pinned_resources(monkeypatch) -> None:
+    for identifier in ["FakeA", "FakeB", "FakeC"]:
+        monkeypatch.setitem(resources.RESOURCES, identifier, _fake_resource(identifier, 40))
+    monkeypatch.setattr(resources, "_current_rss", lambda: _FakeResource.rss)
+    monkeypatch.setattr(resources, "MANAGER", None)
+    _FakeResource.rss = 0
+    _FakeResource.num_loads = 0
+
+    with resources.ResourceManager(use_model_server=False, memory_budget=100) as manager:
+        manager.load("FakeA")
+        with manager.pinned(["FakeA"]):
+            manager.load("FakeB")
+            manager.load("FakeC")  # FakeA is the least recently used resource, but it is in use, so FakeB is evicted
+            assert _FakeResource.rss == 80
+            assert manager["FakeA"] == "FakeA"
+            assert _FakeResource.num_loads == 3
+            assert manager["FakeB"] == "FakeB"  # evicts FakeC
+            assert _FakeResource.num_loads == 4
+        assert manager["FakeC"] == "FakeC"  # FakeA is no longer pinned and evicted
+        assert _FakeResource.num_loads == 5
+        assert manager["FakeB"] == "FakeB"
+        assert _FakeResource.num_loads == 5
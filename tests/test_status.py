@@ -0,0 +1,67 @@
+import time
+from typing import List, Tuple
+
+from wannadb.status import StatusCallback, TaggedStatusCallback
+
+
+def test_throttled_status_callback() -> None:
+    updates: List[Tuple[str, float]] = []
+    status_callback: StatusCallback = StatusCallback(
+        lambda message, progress: updates.append((message, progress)), min_interval=60, min_progress_delta=0.1
+    )
+
+    for ix in range(1000):
+        status_callback("Embedding nuggets...", ix / 1000)
+    assert updates == [("Embedding nuggets...", 0)]
+
+    # new messages and completion updates are always delivered, held-back updates are coalesced per message
+    status_callback("Paraphrasing nugget labels...", 0)
+    status_callback("Paraphrasing nugget labels...", 0.5)
+    status_callback("Paraphrasing nugget labels...", 0.6)
+    assert updates[-1] == ("Paraphrasing nugget labels...", 0)
+    status_callback.flush()
+    assert updates[-2:] == [("Embedding nuggets...", 0.999), ("Paraphrasing nugget labels...", 0.6)]
+    status_callback.flush()
+    status_callback("Paraphrasing nugget labels...", 1)
+    assert updates[1:] == [
+        ("Paraphrasing nugget labels...", 0), ("Embedding nuggets...", 0.999), ("Paraphrasing nugget labels...", 0.6),
+        ("Paraphrasing nugget labels...", 1)
+    ]
+
+
+def test_throttled_status_callback_with_interleaved_messages() -> None:
+    updates: List[Tuple[str, float]] = []
+    status_callback: StatusCallback = StatusCallback(
+        lambda message, progress: updates.append((message, progress)), min_interval=0.2
+    )
+
+    # the messages of concurrently running pipeline elements are throttled separately
+    for ix in range(100):
+        status_callback("Embedding nuggets...", ix / 100)
+        status_callback("Caching context sentences...", ix / 100)
+    assert updates == [("Embedding nuggets...", 0), ("Caching context sentences...", 0)]
+
+    # the held-back updates are delivered once the interval has passed, without flushing
+    deadline: float = time.monotonic() + 5
+    while len(updates) < 4 and time.monotonic() < deadline:
+        time.sleep(0.05)
+    assert sorted(updates[2:]) == [("Caching context sentences...", 0.99), ("Embedding nuggets...", 0.99)]
+    status_callback.flush()
+    assert len(updates) == 4
+
+
+def test_unthrottled_status_callback() -> None:
+    updates: List[Tuple[str, float]] = []
+    status_callback: StatusCallback = StatusCallback(lambda message, progress: updates.append((message, progress)))
+    for ix in range(100):
+        status_callback("Running...", ix / 100)
+    assert len(updates) == 100
+
+
+def test_tagged_status_callback() -> None:
+    updates: List[Tuple[str, float]] = []
+    status_callback: StatusCallback = StatusCallback(lambda message, progress: updates.append((message, progress)))
+    tagged_status_callback: TaggedStatusCallback = TaggedStatusCallback(status_callback, "Embedder")
+    tagged_status_callback("Embedding nuggets...", 0.5)
+    tagged_status_callback("Running Embedder...", 1)
+    assert updates == [("[Embedder] Embedding nuggets...", 0.5), ("Running Embedder...", 1)]
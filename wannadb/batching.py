@@ -0,0 +1,236 @@
+import logging
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Callable, List, Optional, Tuple
+
+import numpy as np
+
+logger: logging.Logger = logging.getLogger(__name__)
+
+
+def dynamic_batching_enabled() -> bool:
+    """Check whether the resources should coalesce concurrent requests (environment variable WANNADB_DYNAMIC_BATCHING)."""
+    return os.environ.get("WANNADB_DYNAMIC_BATCHING", "0").lower() in ("1", "true", "yes")
+
+
+def max_batch_size() -> int:
+    """Maximum number of items in a batch (environment variable WANNADB_BATCH_MAX_SIZE)."""
+    return int(os.environ.get("WANNADB_BATCH_MAX_SIZE", "64"))
+
+
+def max_wait() -> float:
+    """Maximum time in seconds that a request waits for others to join its batch (WANNADB_BATCH_MAX_WAIT_MS)."""
+    return float(os.environ.get("WANNADB_BATCH_MAX_WAIT_MS", "5")) / 1000
+
+
+class DynamicBatcher:
+    """
+    Queue that coalesces concurrent requests into batches.
+
+    The first request of a batch waits at most max_wait seconds for other requests to join the batch. The batch is
+    processed as soon as it contains max_batch_size items or the time is up. Each request may consist of several items
+    (e.g. texts), but a request is never split across batches. All batches are processed by a single thread, which
+    therefore has exclusive access to the underlying model.
+    """
+
+    def __init__(
+            self,
+            process_batch: Callable[[List[Any]], List[Any]],
+            max_batch_size: int,
+            max_wait: float,
+            name: str = "batcher"
+    ) -> None:
+        """
+        Initialize the DynamicBatcher.
+
+        :param process_batch: function that computes the list of results for a list of requests
+        :param max_batch_size: maximum number of items in a batch
+        :param max_wait: maximum time in seconds that the first request of a batch waits for others
+        :param name: name of the batching thread
+        """
+        super(DynamicBatcher, self).__init__()
+        self._process_batch: Callable[[List[Any]], List[Any]] = process_batch
+        self._max_batch_size: int = max_batch_size
+        self._max_wait: float = max_wait
+        self._queue: "queue.Queue[Optional[Tuple[Any, int, Future]]]" = queue.Queue()
+        self._closed: bool = False
+        self._closed_lock: threading.Lock = threading.Lock()
+        self._thread: threading.Thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self._thread.start()
+
+    def submit(self, request: Any, size: int = 1) -> Future:
+        """
+        Add a request to the queue.
+
+        :param request: request to process
+        :param size: number of items in the request
+        :return: future of the request's result
+        """
+        future: Future = Future()
+        with self._closed_lock:
+            if self._closed:
+                raise RuntimeError(f"Cannot submit requests to the closed batcher '{self._thread.name}'!")
+            self._queue.put((request, size, future))
+        return future
+
+    def __call__(self, request: Any, size: int = 1) -> Any:
+        """Process the request as part of a batch and wait for the result."""
+        return self.submit(request, size).result()
+
+    def close(self) -> None:
+        """Process the remaining requests and stop the batching thread. Later requests are rejected."""
+        with self._closed_lock:
+            if not self._closed:
+                self._closed = True
+                self._queue.put(None)
+        self._thread.join()
+
+    def _run(self) -> None:
+        pending: Optional[Tuple[Any, int, Future]] = None
+        while True:
+            first: Optional[Tuple[Any, int, Future]] = pending if pending is not None else self._queue.get()
+            pending = None
+            if first is None:
+                return
+
+            batch: List[Tuple[Any, int, Future]] = [first]
+            batch_size: int = first[1]
+            deadline: float = time.monotonic() + self._max_wait
+            stop: bool = False
+            while batch_size < self._max_batch_size:
+                try:
+                    item: Optional[Tuple[Any, int, Future]] = self._queue.get(
+                        timeout=max(deadline - time.monotonic(), 0)
+                    )
+                except queue.Empty:
+                    break
+                if item is None:
+                    stop = True
+                    break
+                if batch_size + item[1] > self._max_batch_size:
+                    pending = item  # starts the next batch
+                    break
+                batch.append(item)
+                batch_size += item[1]
+
+            try:
+                results: List[Any] = self._process_batch([request for request, _, _ in batch])
+                for (_, _, future), result in zip(batch, results):
+                    future.set_result(result)
+            except Exception as e:
+                for _, _, future in batch:
+                    future.set_exception(e)
+
+            if stop:
+                return
+
+
+class BatchedSentenceEncoder:
+    """Stand-in for a SentenceTransformer that encodes concurrent requests in shared batches."""
+
+    def __init__(self, model: Any, max_batch_size: int, max_wait: float) -> None:
+        """
+        Initialize the BatchedSentenceEncoder.
+
+        :param model: SentenceTransformer to encode the texts with
+        :param max_batch_size: maximum number of texts in a batch
+        :param max_wait: maximum time in seconds that a request waits for others
+        """
+        super(BatchedSentenceEncoder, self).__init__()
+        self._model: Any = model
+        self._batcher: DynamicBatcher = DynamicBatcher(self._encode_batch, max_batch_size, max_wait, "sbert-batcher")
+
+    def encode(self, sentences: Any, batch_size: int = 32, show_progress_bar: bool = False, **kwargs: Any) -> np.ndarray:
+        if isinstance(sentences, str):
+            return self.encode([sentences], batch_size, show_progress_bar)[0]
+        sentences: List[str] = list(sentences)
+        if sentences == []:
+            return self._model.encode([], batch_size=batch_size, show_progress_bar=False)
+        return self._batcher((sentences, batch_size), len(sentences))
+
+    def _encode_batch(self, requests: List[Tuple[List[str], int]]) -> List[np.ndarray]:
+        texts: List[str] = []
+        for sentences, _ in requests:
+            texts += sentences
+        batch_size: int = max(batch_size for _, batch_size in requests)
+        embeddings: np.ndarray = np.asarray(self._model.encode(texts, batch_size=batch_size, show_progress_bar=False))
+        if len(requests) > 1:
+            logger.debug(f"Encoded {len(texts)} texts of {len(requests)} requests in one batch.")
+
+        results: List[np.ndarray] = []
+        offset: int = 0
+        for sentences, _ in requests:
+            results.append(embeddings[offset:offset + len(sentences)])
+            offset += len(sentences)
+        return results
+
+    def close(self) -> None:
+        self._batcher.close()
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._model, name)
+
+
+class BatchedBertModel:
+    """
+    Stand-in for a BertModel that runs concurrent forward passes in shared batches.
+
+    The inputs of the requests are padded to the same length and masked, so that the hidden states of each request's
+    tokens are the same as without batching.
+    """
+
+    def __init__(self, model: Any, device: Any, max_batch_size: int, max_wait: float) -> None:
+        """
+        Initialize the BatchedBertModel.
+
+        :param model: BertModel to run
+        :param device: device of the model or None for the CPU
+        :param max_batch_size: maximum number of sequences in a batch
+        :param max_wait: maximum time in seconds that a request waits for others
+        """
+        super(BatchedBertModel, self).__init__()
+        self._model: Any = model
+        self._device: Any = device
+        self._batcher: DynamicBatcher = DynamicBatcher(self._forward_batch, max_batch_size, max_wait, "bert-batcher")
+
+    def to(self, device: Any) -> "BatchedBertModel":
+        self._model.to(device)
+        self._device = device
+        return self
+
+    def __call__(self, input_ids: Any, token_type_ids: Any, attention_mask: Any) -> Tuple[Any]:
+        return self._batcher((input_ids, token_type_ids, attention_mask), len(input_ids)),
+
+    def _forward_batch(self, requests: List[Tuple[Any, Any, Any]]) -> List[Any]:
+        import torch
+
+        max_length: int = max(input_ids.shape[1] for input_ids, _, _ in requests)
+
+        def pad(tensor: Any) -> Any:
+            tensor = tensor.to(self._device) if self._device is not None else tensor
+            return torch.nn.functional.pad(tensor, (0, max_length - tensor.shape[1]), value=0)
+
+        with torch.inference_mode():
+            outputs = self._model(
+                input_ids=torch.cat([pad(input_ids) for input_ids, _, _ in requests]),
+                token_type_ids=torch.cat([pad(token_type_ids) for _, token_type_ids, _ in requests]),
+                attention_mask=torch.cat([pad(attention_mask) for _, _, attention_mask in requests])
+            )
+        if len(requests) > 1:
+            logger.debug(f"Ran the forward pass of {len(requests)} requests in one batch.")
+
+        results: List[Any] = []
+        offset: int = 0
+        for input_ids, _, _ in requests:
+            results.append(outputs[0][offset:offset + len(input_ids), :input_ids.shape[1]])
+            offset += len(input_ids)
+        return results
+
+    def close(self) -> None:
+        self._batcher.close()
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._model, name)
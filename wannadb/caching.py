@@ -0,0 +1,124 @@
+import hashlib
+import json
+import logging
+import pickle
+import sqlite3
+import threading
+from typing import Any, Dict, Iterable, List, Optional
+
+logger: logging.Logger = logging.getLogger(__name__)
+
+# must be increased whenever the pickled representation of the data model changes
+CACHE_FORMAT_VERSION: int = 1
+
+# maximum number of keys per lookup query (SQLite limits the number of query parameters)
+_MAX_KEYS_PER_QUERY: int = 500
+
+
+def fingerprint(*parts: Any) -> str:
+    """
+    Compute a stable fingerprint of the given JSON-serializable parts.
+
+    :param parts: values to fingerprint, e.g. previous fingerprints and configurations
+    :return: hexadecimal SHA-256 digest
+    """
+    return hashlib.sha256(json.dumps(parts, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+
+def content_fingerprint(obj: Any) -> str:
+    """
+    Compute the fingerprint of an object's content, e.g. a document with its nuggets and signals.
+
+    :param obj: picklable object
+    :return: hexadecimal SHA-256 digest
+    """
+    return hashlib.sha256(pickle.dumps(obj, protocol=pickle.HIGHEST_PROTOCOL)).hexdigest()
+
+
+class PipelineCache:
+    """
+    Local store for the intermediate results of a pipeline.
+
+    The cache maps keys (fingerprints of the pipeline elements' configurations and the input data) to pickled objects,
+    e.g. the state of a document after a pipeline element. The entries are stored in an SQLite database file, which can
+    be deleted at any time to clear the cache.
+    """
+
+    def __init__(self, path: str) -> None:
+        """
+        Initialize the PipelineCache.
+
+        :param path: path of the SQLite database file, which is created if it does not exist yet
+        """
+        super(PipelineCache, self).__init__()
+        self._path: str = path
+        self._lock: threading.Lock = threading.Lock()
+        self._connection: sqlite3.Connection = sqlite3.connect(path, check_same_thread=False)
+        with self._connection:
+            self._connection.execute("CREATE TABLE IF NOT EXISTS entries (key TEXT PRIMARY KEY, value BLOB NOT NULL)")
+        logger.debug(f"Opened pipeline cache '{path}'.")
+
+    @property
+    def path(self) -> str:
+        """Path of the SQLite database file."""
+        return self._path
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._connection.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+
+    def contains(self, keys: Iterable[str]) -> List[bool]:
+        """
+        Check which of the given keys have an entry.
+
+        :param keys: keys to check
+        :return: for each key whether it has an entry
+        """
+        keys: List[str] = list(keys)
+        existing: set = set()
+        with self._lock:
+            for start in range(0, len(keys), _MAX_KEYS_PER_QUERY):
+                batch: List[str] = keys[start:start + _MAX_KEYS_PER_QUERY]
+                rows = self._connection.execute(
+                    f"SELECT key FROM entries WHERE key IN ({', '.join('?' * len(batch))})", batch
+                ).fetchall()
+                existing.update(row[0] for row in rows)
+        return [key in existing for key in keys]
+
+    def get(self, key: str) -> Optional[Any]:
+        """
+        Load the object stored under the given key.
+
+        :param key: key of the entry
+        :return: unpickled object or None if there is no entry
+        """
+        with self._lock:
+            row = self._connection.execute("SELECT value FROM entries WHERE key = ?", (key,)).fetchone()
+        return None if row is None else pickle.loads(row[0])
+
+    def put_many(self, items: Dict[str, Any]) -> None:
+        """
+        Store the given objects.
+
+        :param items: objects by their keys
+        """
+        rows: List[tuple] = [
+            (key, pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)) for key, value in items.items()
+        ]
+        with self._lock, self._connection:
+            self._connection.executemany("INSERT OR REPLACE INTO entries (key, value) VALUES (?, ?)", rows)
+
+    def clear(self) -> None:
+        """Remove all entries."""
+        with self._lock, self._connection:
+            self._connection.execute("DELETE FROM entries")
+
+    def close(self) -> None:
+        """Close the database connection."""
+        self._connection.close()
+
+    def __enter__(self) -> "PipelineCache":
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.close()
@@ -1,12 +1,20 @@
 import abc
+import contextlib
+import importlib
+import itertools
 import logging
+import math
+import multiprocessing
 import time
-from typing import Any, Dict, List, Type
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, ThreadPoolExecutor, as_completed, wait
+from typing import Any, ContextManager, Dict, Iterable, Iterator, List, Optional, Tuple, Type
 
-from wannadb.data.data import DocumentBase
-from wannadb.interaction import BaseInteractionCallback
+from wannadb import profiling
+from wannadb.caching import CACHE_FORMAT_VERSION, PipelineCache, content_fingerprint, fingerprint
+from wannadb.data.data import Attribute, Document, DocumentBase
+from wannadb.interaction import BaseInteractionCallback, EmptyInteractionCallback
 from wannadb.statistics import Statistics
-from wannadb.status import BaseStatusCallback
+from wannadb.status import BaseStatusCallback, EmptyStatusCallback, TaggedStatusCallback
 
 logger = logging.getLogger(__name__)
 
@@ -91,6 +99,20 @@ class BasePipelineElement(BaseConfigurableElement, abc.ABC):
         "documents": []
     }
 
+    # whether the pipeline element processes each document (and its nuggets) independently of the other documents and
+    # never interacts with the user, so that the pipeline can process the documents in parallel (attributes are still
+    # processed in the main process)
+    is_document_local: bool = False
+
+    # whether the pipeline element adds or removes nuggets, changes the attribute mappings, or interacts with the user,
+    # so that it must not run concurrently with other pipeline elements even if their signals are independent
+    runs_exclusively: bool = False
+
+    @property
+    def resource_identifiers(self) -> List[str]:
+        """Identifiers of the resources that the pipeline element accesses when it is applied."""
+        return []
+
     def _add_required_signal_identifiers(self, required_signal_identifiers: Dict[str, List[str]]) -> None:
         """
         Helper method that adds the dictionary of required signal identifiers to this pipeline element's dictionary of
@@ -127,7 +149,19 @@ class BasePipelineElement(BaseConfigurableElement, abc.ABC):
 
         statistics["identifier"] = self.identifier
 
-        self._call(document_base, interaction_callback, status_callback, statistics)
+        from wannadb import resources
+
+        # the resources must not be evicted while they are in use
+        if resources.MANAGER is not None:
+            pinned: ContextManager = resources.MANAGER.pinned(self.resource_identifiers)
+        else:
+            pinned: ContextManager = contextlib.nullcontext()
+
+        with pinned, profiling.frame(self.identifier):
+            self._call(document_base, interaction_callback, status_callback, statistics)
+            if profiling.PROFILER is not None:
+                profiling.count("documents", len(document_base.documents))
+                profiling.count("nuggets", len(document_base.nuggets))
 
         status_callback(f"Running {self.identifier}...", 1)
         tack: float = time.time()
@@ -172,24 +206,93 @@ class BasePipelineElement(BaseConfigurableElement, abc.ABC):
                 status_callback(f"Running {self.identifier}...", ix / total)
 
 
+# pipeline elements of the worker process, indexed by their position in the pipeline
+_WORKER_PIPELINE_ELEMENTS: Dict[int, BasePipelineElement] = {}
+
+
+def _init_worker(modules: List[str], element_configs: Dict[int, Dict[str, Any]]) -> None:
+    """
+    Set up a worker process of the pipeline's process pool.
+
+    The worker creates its own resource manager and pipeline elements, which load their resources once.
+
+    :param modules: modules that register the pipeline elements
+    :param element_configs: configurations of the document-local pipeline elements by their position in the pipeline
+    """
+    from wannadb.resources import ResourceManager
+
+    for module in modules:
+        importlib.import_module(module)
+    ResourceManager()
+    for ix, element_config in element_configs.items():
+        _WORKER_PIPELINE_ELEMENTS[ix] = BasePipelineElement.from_config(element_config)
+
+
+def _process_shard(element_indices: List[int], documents: List[Document]) -> Tuple[List[Document], Statistics]:
+    """
+    Apply the given pipeline elements to a shard of the documents in a worker process.
+
+    :param element_indices: positions of the pipeline elements in the pipeline
+    :param documents: documents of the shard
+    :return: processed documents and statistics of the pipeline elements
+    """
+    document_base: DocumentBase = DocumentBase(documents, [])
+    statistics: Statistics = Statistics(True)
+    for ix in element_indices:
+        _WORKER_PIPELINE_ELEMENTS[ix](
+            document_base, EmptyInteractionCallback(), EmptyStatusCallback(), statistics[f"pipeline-element-{str(ix)}"]
+        )
+    return document_base.documents, statistics
+
+
 class Pipeline(BaseConfigurableElement):
     """
     Pipeline that applies pipeline elements to a document base.
 
     The pipeline can be applied ('__call__') to a document base.
 
+    If the pipeline uses more than one worker, it shards the documents across a process pool for consecutive
+    document-local pipeline elements (see 'is_document_local'). Each worker process loads the resources once and applies
+    the pipeline elements to its shards. The processed documents replace the original documents in the document base and
+    the workers' statistics are merged. The attributes are processed in the main process.
+
+    If the pipeline has a cache, it stores the state of each document and of the attributes after each pipeline element
+    (or group of parallel pipeline elements) under a fingerprint of the pipeline elements' configurations up to that
+    point and the input content. When the pipeline is applied again, each document continues from its latest cached
+    state, so that only the changed pipeline elements and the following ones are executed. This requires that the
+    pipeline elements are deterministic and process each document independently of the others, as it is the case for
+    the preprocessing pipeline elements. The cache does not notice changes of the resources (e.g. new model versions).
+
+    If the pipeline uses more than one thread, it derives the dependencies between the pipeline elements from their
+    required and generated signals and runs independent pipeline elements concurrently in a thread pool (e.g. the SBERT
+    and BERT embedders, whose models release the GIL). A pipeline element depends on an earlier one if it requires a
+    signal that the earlier one generates, generates a signal that the earlier one requires or generates as well, or if
+    one of them runs exclusively (see 'runs_exclusively'). Pipelines with a cache run their pipeline elements in order.
+
     A pipeline is a configurable element.
     """
     identifier: str = "Pipeline"
 
-    def __init__(self, pipeline_elements: List[BasePipelineElement]) -> None:
+    def __init__(
+            self,
+            pipeline_elements: List[BasePipelineElement],
+            num_workers: int = 1,
+            cache_path: Optional[str] = None,
+            num_threads: int = 1
+    ) -> None:
         """
         Initialize the Pipeline.
 
         :param pipeline_elements: list of pipeline elements that make up the pipeline
+        :param num_workers: number of worker processes for document-local pipeline elements, 1 means no parallelism
+        :param cache_path: path of the cache file for the intermediate results or None to disable caching
+        :param num_threads: number of threads for independent pipeline elements, 1 means no concurrency
         """
         super(Pipeline, self).__init__()
         self._pipeline_elements: List[BasePipelineElement] = pipeline_elements
+        self._num_workers: int = num_workers
+        self._cache_path: Optional[str] = cache_path
+        self._num_threads: int = num_threads
 
         logger.debug("Initialized the pipeline.")
 
@@ -223,6 +326,16 @@ class Pipeline(BaseConfigurableElement):
     def pipeline_elements(self) -> List[BasePipelineElement]:
         return self._pipeline_elements
 
+    @property
+    def resource_identifiers(self) -> List[str]:
+        """Identifiers of the resources that the pipeline elements access."""
+        resource_identifiers: List[str] = []
+        for pipeline_element in self._pipeline_elements:
+            for resource_identifier in pipeline_element.resource_identifiers:
+                if resource_identifier not in resource_identifiers:
+                    resource_identifiers.append(resource_identifier)
+        return resource_identifiers
+
     def __str__(self) -> str:
         return f"({', '.join(str(pipeline_element) for pipeline_element in self._pipeline_elements)})"
 
@@ -247,17 +360,474 @@ class Pipeline(BaseConfigurableElement):
         logger.info("Execute the pipeline.")
         tick: float = time.time()
         status_callback("Running the pipeline...", -1)
-        
 
-        for i, pipeline_element in enumerate(self._pipeline_elements):
-            print(f"Running pipeline element {pipeline_element}...")
-            pipeline_element(document_base, interaction_callback, status_callback, statistics[f"pipeline-element-{str(i)}"])
+        executor: Optional[ProcessPoolExecutor] = None
+        cache: Optional[PipelineCache] = self._open_cache()
+        try:
+            with profiling.frame(self.identifier):
+                executor = self._apply(
+                    document_base, interaction_callback, status_callback, statistics, executor, cache
+                )
+                profiling.count("documents", len(document_base.documents))
+        finally:
+            if executor is not None:
+                executor.shutdown(wait=True)
+            if cache is not None:
+                cache.close()
 
         status_callback("Running the pipeline...", 1)
+        status_callback.flush()
         tack: float = time.time()
         logger.info(f"Executed the pipeline in {tack - tick} seconds.")
         statistics["runtime"] = tack - tick
 
+    def stream(
+            self,
+            documents: Iterable[Document],
+            attributes: List[Attribute],
+            interaction_callback: BaseInteractionCallback,
+            status_callback: BaseStatusCallback,
+            statistics: Statistics,
+            chunk_size: int = 1000
+    ) -> Iterator[DocumentBase]:
+        """
+        Apply the pipeline to consecutive chunks of the documents and yield each processed chunk.
+
+        Each chunk passes through the whole pipeline before the next chunk is taken from the documents, so that only one
+        chunk must be kept in memory if the documents are read lazily and the processed chunks are written out (e.g. with
+        a DocumentBaseWriter). The attributes are part of every chunk's document base. The worker processes of a
+        parallel pipeline are reused for all chunks.
+
+        :param documents: documents to work on, e.g. a generator that reads them one by one
+        :param attributes: attributes of the document base
+        :param interaction_callback: callback to allow for user interaction
+        :param status_callback: callback to communicate current status (message and progress)
+        :param statistics: statistics object to collect statistics
+        :param chunk_size: number of documents per chunk
+        :return: document bases with the processed chunks of documents
+        """
+        logger.info(f"Execute the pipeline on chunks of {chunk_size} documents.")
+        tick: float = time.time()
+        status_callback("Running the pipeline...", -1)
+
+        executor: Optional[ProcessPoolExecutor] = None
+        cache: Optional[PipelineCache] = self._open_cache()
+        try:
+            document_iterator: Iterator[Document] = iter(documents)
+            while True:
+                chunk: List[Document] = list(itertools.islice(document_iterator, chunk_size))
+                if chunk == []:
+                    break
+
+                document_base: DocumentBase = DocumentBase(chunk, attributes)
+                chunk_statistics: Statistics = Statistics(True)
+                # the frame must not span the yield, since the caller continues on the same thread
+                with profiling.frame(self.identifier):
+                    executor = self._apply(
+                        document_base, interaction_callback, status_callback, chunk_statistics, executor, cache
+                    )
+                    profiling.count("documents", len(chunk))
+                statistics.merge(chunk_statistics)
+                statistics["num_chunks"] += 1
+                statistics["num_documents"] += len(chunk)
+                logger.info(f"Processed chunk with {len(chunk)} documents.")
+                yield document_base
+        finally:
+            if executor is not None:
+                executor.shutdown(wait=True)
+            if cache is not None:
+                cache.close()
+
+        status_callback("Running the pipeline...", 1)
+        status_callback.flush()
+        tack: float = time.time()
+        logger.info(f"Executed the pipeline on all chunks in {tack - tick} seconds.")
+        statistics["runtime"] = tack - tick
+
+    def _apply(
+            self,
+            document_base: DocumentBase,
+            interaction_callback: BaseInteractionCallback,
+            status_callback: BaseStatusCallback,
+            statistics: Statistics,
+            executor: Optional[ProcessPoolExecutor],
+            cache: Optional[PipelineCache] = None
+    ) -> Optional[ProcessPoolExecutor]:
+        """
+        Apply the pipeline elements to the document base.
+
+        :param document_base: document base to work on
+        :param interaction_callback: callback to allow for user interaction
+        :param status_callback: callback to communicate current status (message and progress)
+        :param statistics: statistics object to collect statistics
+        :param executor: process pool for document-local pipeline elements or None if it has not been created yet
+        :param cache: cache for the intermediate results or None to disable caching
+        :return: process pool, which is created when it is needed for the first time
+        """
+        steps: List[List[int]] = self._steps()
+        if cache is not None:
+            return self._apply_cached(
+                steps, document_base, interaction_callback, status_callback, statistics, executor, cache
+            )
+
+        if self._num_threads > 1:
+            return self._apply_concurrently(
+                steps, document_base, interaction_callback, status_callback, statistics, executor
+            )
+
+        for step in steps:
+            executor = self._apply_step(step, document_base, interaction_callback, status_callback, statistics, executor)
+        return executor
+
+    def _steps(self) -> List[List[int]]:
+        """
+        Group the pipeline elements into the steps in which they are executed.
+
+        Consecutive document-local pipeline elements of a parallel pipeline form one step, all other pipeline elements
+        are executed on their own.
+
+        :return: positions of the pipeline elements of each step
+        """
+        steps: List[List[int]] = []
+        for ix, pipeline_element in enumerate(self._pipeline_elements):
+            if (
+                    self._num_workers > 1 and pipeline_element.is_document_local
+                    and steps != [] and self._pipeline_elements[steps[-1][-1]].is_document_local
+            ):
+                steps[-1].append(ix)
+            else:
+                steps.append([ix])
+        return steps
+
+    def _runs_exclusively(self, step: List[int]) -> bool:
+        """
+        Check whether the step must not run concurrently with other steps.
+
+        Steps that are processed by the process pool replace the documents of the document base and therefore run
+        exclusively as well.
+
+        :param step: positions of the pipeline elements of the step
+        :return: whether the step runs exclusively
+        """
+        return (
+                any(self._pipeline_elements[ix].runs_exclusively for ix in step)
+                or self._num_workers > 1 and self._pipeline_elements[step[0]].is_document_local
+        )
+
+    def _dependencies(self, steps: List[List[int]]) -> List[List[int]]:
+        """
+        Determine the dependencies between the steps based on the required and generated signals.
+
+        :param steps: positions of the pipeline elements of each step
+        :return: for each step the positions of the earlier steps that must be finished before it can start
+        """
+        signals: List[Dict[str, Tuple[set, set]]] = []
+        for step in steps:
+            step_signals: Dict[str, Tuple[set, set]] = {}
+            for data_element in ["nuggets", "documents", "attributes"]:
+                required: set = set()
+                generated: set = set()
+                for ix in step:
+                    required.update(self._pipeline_elements[ix].required_signal_identifiers[data_element])
+                    generated.update(self._pipeline_elements[ix].generated_signal_identifiers[data_element])
+                step_signals[data_element] = (required, generated)
+            signals.append(step_signals)
+
+        dependencies: List[List[int]] = []
+        for later_ix, later_step in enumerate(steps):
+            later_dependencies: List[int] = []
+            for earlier_ix in range(later_ix):
+                if self._runs_exclusively(later_step) or self._runs_exclusively(steps[earlier_ix]):
+                    later_dependencies.append(earlier_ix)
+                    continue
+                for data_element in ["nuggets", "documents", "attributes"]:
+                    earlier_required, earlier_generated = signals[earlier_ix][data_element]
+                    later_required, later_generated = signals[later_ix][data_element]
+                    if (
+                            earlier_generated & later_required
+                            or earlier_required & later_generated
+                            or earlier_generated & later_generated
+                    ):
+                        later_dependencies.append(earlier_ix)
+                        break
+            dependencies.append(later_dependencies)
+        return dependencies
+
+    def _apply_concurrently(
+            self,
+            steps: List[List[int]],
+            document_base: DocumentBase,
+            interaction_callback: BaseInteractionCallback,
+            status_callback: BaseStatusCallback,
+            statistics: Statistics,
+            executor: Optional[ProcessPoolExecutor]
+    ) -> Optional[ProcessPoolExecutor]:
+        """
+        Apply the steps to the document base and run independent steps concurrently in a thread pool.
+
+        :param steps: positions of the pipeline elements of each step
+        :param document_base: document base to work on
+        :param interaction_callback: callback to allow for user interaction
+        :param status_callback: callback to communicate current status (message and progress)
+        :param statistics: statistics object to collect statistics
+        :param executor: process pool for document-local pipeline elements or None if it has not been created yet
+        :return: process pool, which is created when it is needed for the first time
+        """
+        dependencies: List[List[int]] = self._dependencies(steps)
+        # the process pool is created upfront, since the threads must not create it concurrently
+        if executor is None and any(
+                self._num_workers > 1 and self._pipeline_elements[step[0]].is_document_local for step in steps
+        ):
+            executor = self._create_executor()
+        # create the statistics objects before the threads access them
+        for step in steps:
+            for ix in step:
+                statistics[f"pipeline-element-{str(ix)}"]["identifier"] = self._pipeline_elements[ix].identifier
+
+        finished: set = set()
+        running: Dict[Future, int] = {}
+        max_concurrent_steps: int = 0
+        with ThreadPoolExecutor(max_workers=self._num_threads, thread_name_prefix="pipeline") as thread_pool:
+            while len(finished) < len(steps):
+                for step_ix, step in enumerate(steps):
+                    if (
+                            step_ix not in finished and step_ix not in running.values()
+                            and all(dependency in finished for dependency in dependencies[step_ix])
+                    ):
+                        # the updates of concurrent steps are tagged, so that they can be told apart
+                        step_status_callback: BaseStatusCallback = TaggedStatusCallback(
+                            status_callback, ", ".join(self._pipeline_elements[ix].identifier for ix in step)
+                        )
+                        running[thread_pool.submit(
+                            profiling.with_current_stack(self._apply_step), step, document_base, interaction_callback,
+                            step_status_callback, statistics, executor
+                        )] = step_ix
+                max_concurrent_steps = max(max_concurrent_steps, len(running))
+                done, _ = wait(running.keys(), return_when=FIRST_COMPLETED)
+                for future in done:
+                    future.result()  # raises the exception of the pipeline element
+                    finished.add(running.pop(future))
+
+        statistics["max_concurrent_steps"] = max_concurrent_steps
+        return executor
+
+    def _apply_step(
+            self,
+            step: List[int],
+            document_base: DocumentBase,
+            interaction_callback: BaseInteractionCallback,
+            status_callback: BaseStatusCallback,
+            statistics: Statistics,
+            executor: Optional[ProcessPoolExecutor]
+    ) -> Optional[ProcessPoolExecutor]:
+        """
+        Apply the pipeline elements of one step to the document base.
+
+        :param step: positions of the pipeline elements of the step
+        :param document_base: document base to work on
+        :param interaction_callback: callback to allow for user interaction
+        :param status_callback: callback to communicate current status (message and progress)
+        :param statistics: statistics object to collect statistics
+        :param executor: process pool for document-local pipeline elements or None if it has not been created yet
+        :return: process pool, which is created when it is needed for the first time
+        """
+        from wannadb import resources
+
+        if self._num_workers > 1 and self._pipeline_elements[step[0]].is_document_local:
+            # process all consecutive document-local pipeline elements in parallel
+            if executor is None:
+                executor = self._create_executor()
+            identifiers: str = ", ".join(self._pipeline_elements[ix].identifier for ix in step)
+            with profiling.frame(f"parallel({identifiers})"):
+                self._call_in_parallel(
+                    executor, step, document_base, interaction_callback, status_callback, statistics
+                )
+                profiling.count("documents", len(document_base.documents))
+            return executor
+
+        # load the resources of the next pipeline element while the current one is running
+        ix: int = step[0]
+        if resources.MANAGER is not None and ix + 1 < len(self._pipeline_elements):
+            resources.MANAGER.prefetch(self._pipeline_elements[ix + 1].resource_identifiers)
+        pipeline_element: BasePipelineElement = self._pipeline_elements[ix]
+        print(f"Running pipeline element {pipeline_element}...")
+        pipeline_element(document_base, interaction_callback, status_callback, statistics[f"pipeline-element-{str(ix)}"])
+        return executor
+
+    def _open_cache(self) -> Optional[PipelineCache]:
+        """
+        Open the cache for the intermediate results.
+
+        :return: cache or None if caching is disabled
+        """
+        if self._cache_path is None:
+            return None
+        return PipelineCache(self._cache_path)
+
+    def _apply_cached(
+            self,
+            steps: List[List[int]],
+            document_base: DocumentBase,
+            interaction_callback: BaseInteractionCallback,
+            status_callback: BaseStatusCallback,
+            statistics: Statistics,
+            executor: Optional[ProcessPoolExecutor],
+            cache: PipelineCache
+    ) -> Optional[ProcessPoolExecutor]:
+        """
+        Apply the pipeline elements to the document base and skip the steps whose results are cached.
+
+        :param steps: positions of the pipeline elements of each step
+        :param document_base: document base to work on
+        :param interaction_callback: callback to allow for user interaction
+        :param status_callback: callback to communicate current status (message and progress)
+        :param statistics: statistics object to collect statistics
+        :param executor: process pool for document-local pipeline elements or None if it has not been created yet
+        :param cache: cache for the intermediate results
+        :return: process pool, which is created when it is needed for the first time
+        """
+        # the fingerprint of a step covers the configurations of all pipeline elements up to the end of the step
+        element_fingerprints: List[str] = []
+        previous_fingerprint: str = fingerprint(CACHE_FORMAT_VERSION)
+        for pipeline_element in self._pipeline_elements:
+            previous_fingerprint = fingerprint(previous_fingerprint, pipeline_element.to_config())
+            element_fingerprints.append(previous_fingerprint)
+        step_fingerprints: List[str] = [element_fingerprints[step[-1]] for step in steps]
+
+        # the last entry stands for the attributes
+        documents: List[Document] = document_base.documents
+        content_fingerprints: List[str] = [content_fingerprint(document) for document in documents]
+        content_fingerprints.append(content_fingerprint(document_base.attributes))
+
+        # determine the number of steps for which the results of each document and the attributes are cached
+        num_cached_steps: List[int] = [0] * len(content_fingerprints)
+        unresolved: List[int] = list(range(len(content_fingerprints)))
+        for step_ix in reversed(range(len(steps))):
+            if unresolved == []:
+                break
+            is_cached: List[bool] = cache.contains(
+                fingerprint(step_fingerprints[step_ix], content_fingerprints[ix]) for ix in unresolved
+            )
+            for ix, cached in zip(unresolved, is_cached):
+                if cached:
+                    num_cached_steps[ix] = step_ix + 1
+            unresolved = [ix for ix, cached in zip(unresolved, is_cached) if not cached]
+
+        # restore the latest cached results
+        for ix, num_steps in enumerate(num_cached_steps):
+            if num_steps > 0:
+                restored: Any = cache.get(fingerprint(step_fingerprints[num_steps - 1], content_fingerprints[ix]))
+                if ix < len(documents):
+                    documents[ix] = restored
+                else:
+                    document_base.attributes[:] = restored
+        num_restored_documents: int = sum(1 for num_steps in num_cached_steps[:-1] if num_steps > 0)
+        statistics["cache"]["num_restored_documents"] += num_restored_documents
+        logger.info(f"Restored the cached results of {num_restored_documents} of {len(documents)} documents.")
+
+        # apply the remaining steps to the documents (and attributes) for which they are not cached
+        for step_ix, step in enumerate(steps):
+            positions: List[int] = [ix for ix in range(len(documents)) if num_cached_steps[ix] <= step_ix]
+            process_attributes: bool = num_cached_steps[-1] <= step_ix
+            for ix in step:
+                statistics[f"pipeline-element-{str(ix)}"]["num_cached_documents"] += len(documents) - len(positions)
+            if positions == [] and not process_attributes:
+                continue
+
+            step_document_base: DocumentBase = DocumentBase(
+                [documents[ix] for ix in positions], document_base.attributes if process_attributes else []
+            )
+            executor = self._apply_step(
+                step, step_document_base, interaction_callback, status_callback, statistics, executor
+            )
+
+            items: Dict[str, Any] = {}
+            for ix, document in zip(positions, step_document_base.documents):
+                documents[ix] = document
+                items[fingerprint(step_fingerprints[step_ix], content_fingerprints[ix])] = document
+            if process_attributes:
+                items[fingerprint(step_fingerprints[step_ix], content_fingerprints[-1])] = document_base.attributes
+            cache.put_many(items)
+            statistics["cache"]["num_stored_entries"] += len(items)
+
+        return executor
+
+    def _create_executor(self) -> ProcessPoolExecutor:
+        """
+        Create the process pool whose workers hold the document-local pipeline elements.
+
+        :return: process pool executor
+        """
+        element_configs: Dict[int, Dict[str, Any]] = {}
+        modules: List[str] = []
+        for ix, pipeline_element in enumerate(self._pipeline_elements):
+            if pipeline_element.is_document_local:
+                element_configs[ix] = pipeline_element.to_config()
+                if pipeline_element.__class__.__module__ not in modules:
+                    modules.append(pipeline_element.__class__.__module__)
+
+        logger.info(f"Start {self._num_workers} worker processes.")
+        return ProcessPoolExecutor(
+            max_workers=self._num_workers,
+            mp_context=multiprocessing.get_context("spawn"),  # forking would copy the loaded models and threads
+            initializer=_init_worker,
+            initargs=(modules, element_configs)
+        )
+
+    def _call_in_parallel(
+            self,
+            executor: ProcessPoolExecutor,
+            element_indices: List[int],
+            document_base: DocumentBase,
+            interaction_callback: BaseInteractionCallback,
+            status_callback: BaseStatusCallback,
+            statistics: Statistics
+    ) -> None:
+        """
+        Apply the given document-local pipeline elements to the document base using the process pool.
+
+        :param executor: process pool executor
+        :param element_indices: positions of the pipeline elements in the pipeline
+        :param document_base: document base to work on
+        :param interaction_callback: callback to allow for user interaction
+        :param status_callback: callback to communicate current status (message and progress)
+        :param statistics: statistics object to collect statistics
+        """
+        identifiers: str = ", ".join(self._pipeline_elements[ix].identifier for ix in element_indices)
+        logger.info(f"Execute {identifiers} with {self._num_workers} worker processes.")
+        tick: float = time.time()
+        status_callback(f"Running {identifiers}...", -1)
+
+        # several shards per worker balance the load if the documents differ in length
+        documents: List[Document] = document_base.documents
+        shard_size: int = max(math.ceil(len(documents) / (self._num_workers * 4)), 1)
+        futures: Dict[Future, int] = {}
+        for shard_start in range(0, len(documents), shard_size):
+            shard: List[Document] = documents[shard_start:shard_start + shard_size]
+            futures[executor.submit(_process_shard, element_indices, shard)] = shard_start
+
+        for num_done, future in enumerate(as_completed(futures.keys())):
+            shard_start: int = futures[future]
+            processed_documents, shard_statistics = future.result()
+            documents[shard_start:shard_start + len(processed_documents)] = processed_documents
+            statistics.merge(shard_statistics)
+            status_callback(f"Running {identifiers}...", (num_done + 1) / len(futures))
+        statistics["num_shards"] += len(futures)
+
+        # the attributes do not belong to any document and are processed in the main process
+        if document_base.attributes != []:
+            attributes_document_base: DocumentBase = DocumentBase([], document_base.attributes)
+            for ix in element_indices:
+                attribute_statistics: Statistics = Statistics(True)
+                self._pipeline_elements[ix](
+                    attributes_document_base, interaction_callback, status_callback, attribute_statistics
+                )
+                statistics[f"pipeline-element-{str(ix)}"].merge(attribute_statistics)
+
+        status_callback(f"Running {identifiers}...", 1)
+        tack: float = time.time()
+        logger.info(f"Executed {identifiers} in parallel in {tack - tick} seconds.")
+
     def to_config(self) -> Dict[str, Any]:
         """
         Obtain a JSON-serializable representation of the pipeline.
@@ -266,7 +836,10 @@ class Pipeline(BaseConfigurableElement):
         """
         return {
             "identifier": self.identifier,
-            "pipeline_elements": [pipeline_element.to_config() for pipeline_element in self._pipeline_elements]
+            "pipeline_elements": [pipeline_element.to_config() for pipeline_element in self._pipeline_elements],
+            "num_workers": self._num_workers,
+            "cache_path": self._cache_path,
+            "num_threads": self._num_threads
         }
 
     @classmethod
@@ -278,5 +851,8 @@ class Pipeline(BaseConfigurableElement):
         :return: pipeline created from the JSON-serializable representation
         """
         return cls(
-            [BasePipelineElement.from_config(element_config) for element_config in config["pipeline_elements"]]
+            [BasePipelineElement.from_config(element_config) for element_config in config["pipeline_elements"]],
+            config.get("num_workers", 1),
+            config.get("cache_path"),
+            config.get("num_threads", 1)
         )
@@ -1,9 +1,12 @@
 import functools
 import logging
+import os
+import struct
 import time
-from typing import Any, Dict, List, Optional, Type, Union
+from typing import Any, Dict, List, Optional, Set, Type, Union
 
 import bson
+import numpy as np
 
 from wannadb.data import signals
 from wannadb.data.signals import BaseSignal, ValueSignal
@@ -120,6 +123,126 @@ class InformationNugget:
             self._signals[signal_identifier] = signals.SIGNALS[signal_identifier](value)
 
 
+class ContextSentence:
+    """
+    Context sentence of an InformationNugget.
+
+    The ContextSentence only stores the span of the sentence in the document and the nugget's position in the sentence.
+    The text of the sentence is sliced from the document when it is accessed, so that nuggets from the same sentence do
+    not each hold a copy of it. If the document has been tokenized, the ContextSentence also knows the range of the
+    sentence's tokens in the document's token offsets.
+
+    For compatibility, the ContextSentence can be accessed like the dictionary with the keys 'text', 'start_char', and
+    'end_char' that has been cached in earlier versions.
+    """
+
+    __slots__ = (
+        "_document", "_sentence_start_char", "_sentence_end_char", "_start_char", "_end_char", "_start_token",
+        "_end_token"
+    )
+
+    def __init__(
+            self,
+            document: "Document",
+            sentence_start_char: int,
+            sentence_end_char: int,
+            start_char: int,
+            end_char: int,
+            start_token: Optional[int] = None,
+            end_token: Optional[int] = None
+    ) -> None:
+        """
+        Initialize the ContextSentence.
+
+        :param document: document that contains the sentence
+        :param sentence_start_char: index of the sentence's first character in the document (inclusive)
+        :param sentence_end_char: index of the first character after the sentence in the document (exclusive)
+        :param start_char: index of the nugget's first character in the sentence (inclusive)
+        :param end_char: index of the first character after the nugget in the sentence (exclusive)
+        :param start_token: index of the sentence's first token in the document (inclusive) or None if not tokenized
+        :param end_token: index of the first token after the sentence in the document (exclusive) or None if not
+            tokenized
+        """
+        self._document: "Document" = document
+        self._sentence_start_char: int = sentence_start_char
+        self._sentence_end_char: int = sentence_end_char
+        self._start_char: int = start_char
+        self._end_char: int = end_char
+        self._start_token: Optional[int] = start_token
+        self._end_token: Optional[int] = end_token
+
+    def __repr__(self) -> str:
+        return f"ContextSentence({repr(self._document)}, {self._sentence_start_char}, {self._sentence_end_char}, " \
+               f"{self._start_char}, {self._end_char}, {self._start_token}, {self._end_token})"
+
+    def __eq__(self, other) -> bool:
+        return (
+                isinstance(other, ContextSentence)
+                and self._document.name == other._document.name
+                and self._sentence_start_char == other._sentence_start_char
+                and self._sentence_end_char == other._sentence_end_char
+                and self._start_char == other._start_char
+                and self._end_char == other._end_char
+        )
+
+    def __getitem__(self, item: str) -> Union[str, int]:
+        if item == "text":
+            return self.text
+        elif item == "start_char":
+            return self._start_char
+        elif item == "end_char":
+            return self._end_char
+        raise KeyError(item)
+
+    @property
+    def document(self) -> "Document":
+        """Document that contains the sentence."""
+        return self._document
+
+    @property
+    def sentence_start_char(self) -> int:
+        """Index of the sentence's first character in the document (inclusive)."""
+        return self._sentence_start_char
+
+    @property
+    def sentence_end_char(self) -> int:
+        """Index of the first character after the sentence in the document (exclusive)."""
+        return self._sentence_end_char
+
+    @property
+    def start_char(self) -> int:
+        """Index of the nugget's first character in the sentence (inclusive)."""
+        return self._start_char
+
+    @property
+    def end_char(self) -> int:
+        """Index of the first character after the nugget in the sentence (exclusive)."""
+        return self._end_char
+
+    @property
+    def start_token(self) -> Optional[int]:
+        """Index of the sentence's first token in the document (inclusive) or None if not tokenized."""
+        return self._start_token
+
+    @property
+    def end_token(self) -> Optional[int]:
+        """Index of the first token after the sentence in the document (exclusive) or None if not tokenized."""
+        return self._end_token
+
+    @property
+    def text(self) -> str:
+        """Actual text of the sentence."""
+        return self._document.text[self._sentence_start_char:self._sentence_end_char]
+
+    @property
+    def token_offsets(self) -> Optional[np.ndarray]:
+        """(start char, end char) pairs of the sentence's tokens relative to the sentence or None if not tokenized."""
+        if self._start_token is None:
+            return None
+        token_offsets: np.ndarray = self._document[signals.TokenOffsetsSignal][self._start_token:self._end_token]
+        return token_offsets - self._sentence_start_char
+
+
 class Attribute:
     """
     Attribute that is populated with information from the documents.
@@ -307,6 +430,77 @@ class Document:
             self._signals[signal_identifier] = signals.SIGNALS[signal_identifier](value)
 
 
+def _serialize_attribute(attribute: Attribute) -> Dict[str, Any]:
+    """
+    Convert the attribute into its BSON-serializable representation.
+
+    :param attribute: attribute to serialize
+    :return: BSON-serializable representation of the attribute
+    """
+    serializable_attribute: Dict[str, Any] = {
+        "name": attribute.name,
+        "signals": {}
+    }
+
+    # serialize the signals
+    for signal_identifier, signal in attribute.signals.items():
+        if signal.do_serialize:
+            serializable_attribute["signals"][signal_identifier] = signal.to_serializable()
+
+    return serializable_attribute
+
+
+def _serialize_document(document: Document) -> Dict[str, Any]:
+    """
+    Convert the document and its nuggets into their BSON-serializable representation.
+
+    :param document: document to serialize
+    :return: BSON-serializable representation of the document
+    """
+    serializable_document: Dict[str, Any] = {
+        "name": document.name,
+        "text": document.text,
+        "nuggets": [],
+        "attribute_mappings": {},
+        "signals": {}
+    }
+
+    # serialize the attribute mappings
+    for name, nuggets in document.attribute_mappings.items():
+        nugget_ids: List[int] = []
+        for nugget in nuggets:
+            for idx, doc_nugget in enumerate(document.nuggets):
+                if nugget is doc_nugget:
+                    nugget_ids.append(idx)
+                    break
+            else:
+                assert False, "The document does not contain the nugget that is assigned to the attribute."
+
+        serializable_document["attribute_mappings"][name] = nugget_ids
+
+    # serialize the signals
+    for signal_identifier, signal in document.signals.items():
+        if signal.do_serialize:
+            serializable_document["signals"][signal_identifier] = signal.to_serializable()
+
+    for nugget in document.nuggets:
+        # serialize the nugget
+        serializable_nugget: Dict[str, Any] = {
+            "start_char": nugget.start_char,
+            "end_char": nugget.end_char,
+            "signals": {}
+        }
+
+        # serialize the signals
+        for signal_identifier, signal in nugget.signals.items():
+            if signal.do_serialize:
+                serializable_nugget["signals"][signal_identifier] = signal.to_serializable()
+
+        serializable_document["nuggets"].append(serializable_nugget)
+
+    return serializable_document
+
+
 class DocumentBase:
     """
     Collection of documents that provides information.
@@ -379,6 +573,23 @@ class DocumentBase:
                 nugget_list += document.attribute_mappings[attribute_name]
         return nugget_list
 
+    def add_documents(self, documents: List[Document]) -> None:
+        """
+        Append new documents to the document base.
+
+        The new documents must not know of any attributes yet, their matches can be computed with
+        'wannadb.matching.matching.match_new_documents'.
+
+        :param documents: documents to append
+        """
+        document_names: Set[str] = set(document.name for document in self._documents)
+        for document in documents:
+            if document.name in document_names:
+                logger.error(f"A document with the name '{document.name}' is already part of the document base!")
+                assert False, f"A document with the name '{document.name}' is already part of the document base!"
+            document_names.add(document.name)
+        self._documents += documents
+
     def get_column_for_attribute(self, attribute: Union[str, Attribute]) -> List[Optional[List[InformationNugget]]]:
         """
         Column of nuggets that match the given attribute.
@@ -546,63 +757,11 @@ class DocumentBase:
 
         logger.info("Serialize attributes.")
         for attribute in self._attributes:
-            # serialize the attribute
-            serializable_attribute: Dict[str, Any] = {
-                "name": attribute.name,
-                "signals": {}
-            }
-
-            # serialize the signals
-            for signal_identifier, signal in attribute.signals.items():
-                if signal.do_serialize:
-                    serializable_attribute["signals"][signal_identifier] = signal.to_serializable()
-
-            serializable_base["attributes"].append(serializable_attribute)
+            serializable_base["attributes"].append(_serialize_attribute(attribute))
 
         logger.info("Serialize documents.")
         for document in self._documents:
-            # serialize the document
-            serializable_document: Dict[str, Any] = {
-                "name": document.name,
-                "text": document.text,
-                "nuggets": [],
-                "attribute_mappings": {},
-                "signals": {}
-            }
-
-            # serialize the attribute mappings
-            for name, nuggets in document.attribute_mappings.items():
-                nugget_ids: List[int] = []
-                for nugget in nuggets:
-                    for idx, doc_nugget in enumerate(document.nuggets):
-                        if nugget is doc_nugget:
-                            nugget_ids.append(idx)
-                            break
-                    else:
-                        assert False, "The document does not contain the nugget that is assigned to the attribute."
-
-                serializable_document["attribute_mappings"][name] = nugget_ids
-
-            # serialize the signals
-            for signal_identifier, signal in document.signals.items():
-                if signal.do_serialize:
-                    serializable_document["signals"][signal_identifier] = signal.to_serializable()
-
-            for nugget in document.nuggets:
-                # serialize the nugget
-                serializable_nugget: Dict[str, Any] = {
-                    "start_char": nugget.start_char,
-                    "end_char": nugget.end_char,
-                    "signals": {}
-                }
-
-                # serialize the signals
-                for signal_identifier, signal in nugget.signals.items():
-                    if signal.do_serialize:
-                        serializable_nugget["signals"][signal_identifier] = signal.to_serializable()
-
-                serializable_document["nuggets"].append(serializable_nugget)
-            serializable_base["documents"].append(serializable_document)
+            serializable_base["documents"].append(_serialize_document(document))
 
         logger.info("Convert to BSON bytes.")
         bson_bytes: bytes = bson.encode(serializable_base)
@@ -684,3 +843,93 @@ class DocumentBase:
         logger.info(f"Deserialized document base in {tack - tick} seconds.")
 
         return document_base
+
+
+class DocumentBaseWriter:
+    """
+    Writer that serializes a document base to a BSON file chunk by chunk.
+
+    The documents are written as soon as they are passed to the writer ('write'), so that only the current chunk of
+    documents must be kept in memory. The attributes are written when the writer is closed ('close'). The resulting file
+    has the same format as the output of DocumentBase.to_bson and can be read with DocumentBase.from_bson. The file is
+    only moved to its final path when the writer is closed successfully.
+    """
+
+    def __init__(self, path: str) -> None:
+        """
+        Initialize the DocumentBaseWriter.
+
+        :param path: path of the BSON file
+        """
+        super(DocumentBaseWriter, self).__init__()
+        self._path: str = path
+        self._tmp_path: str = f"{path}.tmp"
+        self._file = open(self._tmp_path, "wb")
+        self._document_names: Set[str] = set()
+        self._attributes: List[Attribute] = []
+
+        # the BSON document and the documents array start with their total lengths, which are filled in when closing
+        self._file.write(b"\x00\x00\x00\x00")
+        self._file.write(b"\x04documents\x00")
+        self._documents_start: int = self._file.tell()
+        self._file.write(b"\x00\x00\x00\x00")
+
+    def __enter__(self) -> "DocumentBaseWriter":
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        if exc_type is None:
+            self.close()
+        else:
+            self._file.close()
+            os.remove(self._tmp_path)
+
+    @property
+    def num_documents(self) -> int:
+        """Number of documents that have been written."""
+        return len(self._document_names)
+
+    def write(self, document_base: DocumentBase) -> None:
+        """
+        Write the documents of the given (partial) document base.
+
+        :param document_base: document base with the next chunk of documents and all attributes
+        """
+        if not document_base.validate_consistency():
+            logger.error("Cannot serialize an inconsistent document base!")
+            assert False, "Cannot serialize an inconsistent document base!"
+
+        for document in document_base.documents:
+            if document.name in self._document_names:
+                logger.error(f"Document '{document.name}' has already been written!")
+                assert False, f"Document '{document.name}' has already been written!"
+            self._file.write(b"\x03" + str(len(self._document_names)).encode("utf-8") + b"\x00")
+            self._file.write(bson.encode(_serialize_document(document)))
+            self._document_names.add(document.name)
+        self._attributes = document_base.attributes
+
+    def close(self, attributes: Optional[List[Attribute]] = None) -> None:
+        """
+        Write the attributes and finish the BSON file.
+
+        :param attributes: attributes to write, defaults to the attributes of the last written document base
+        """
+        if attributes is not None:
+            self._attributes = attributes
+
+        self._file.write(b"\x00")
+        documents_end: int = self._file.tell()
+        self._file.write(b"\x04attributes\x00")
+        self._file.write(bson.encode({
+            str(ix): _serialize_attribute(attribute) for ix, attribute in enumerate(self._attributes)
+        }))
+        self._file.write(b"\x00")
+        end: int = self._file.tell()
+
+        self._file.seek(self._documents_start)
+        self._file.write(struct.pack("<i", documents_end - self._documents_start))
+        self._file.seek(0)
+        self._file.write(struct.pack("<i", end))
+        self._file.close()
+        os.replace(self._tmp_path, self._path)
+        logger.info(f"Wrote {self.num_documents} documents to '{self._path}'.")
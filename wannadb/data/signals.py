@@ -286,6 +286,13 @@ class LabelSignal(BaseFloatSignal):
     do_serialize: bool = True
 
 
+@register_signal
+class LabelsSignal(BaseStringListSignal):
+    """Labels of all nuggets that have been merged into the nugget as determined by the extractors."""
+    identifier: str = "LabelsSignal"
+    do_serialize: bool = True
+
+
 @register_signal
 class NaturalLanguageLabelSignal(BaseStringSignal):
     """Natural language version of the nugget's label that works well with natural language embeddings."""
@@ -301,8 +308,8 @@ class RelativePositionSignal(BaseFloatSignal):
 
 
 @register_signal
-class CachedContextSentenceSignal(BaseStringSignal):
-    """Context sentence and position in context for caching."""
+class CachedContextSentenceSignal(BaseUntypedSignal):
+    """Context sentence and position in context for caching as a ContextSentence."""
     identifier: str = "CachedContextSentenceSignal"
     do_serialize: bool = False
 
@@ -321,6 +328,20 @@ class CurrentMatchIndexSignal(BaseIntSignal):
     do_serialize: bool = False
 
 
+@register_signal
+class ConfirmedAttributesSignal(BaseStringListSignal):
+    """Names of the attributes whose matches in the document have been confirmed by the user."""
+    identifier: str = "ConfirmedAttributesSignal"
+    do_serialize: bool = True
+
+
+@register_signal
+class MaxDistanceSignal(BaseFloatSignal):
+    """Maximum distance at which nuggets have been accepted as matches of the attribute at the end of the matching."""
+    identifier: str = "MaxDistanceSignal"
+    do_serialize: bool = True
+
+
 @register_signal
 class POSTagsSignal(BaseStringListSignal):
     """POS tags of the nugget's words as determined by extractors."""
@@ -342,6 +363,13 @@ class SentenceStartCharsSignal(BaseIntListSignal):
     do_serialize: bool = True
 
 
+@register_signal
+class TokenOffsetsSignal(BaseNumpyArraySignal):
+    """Token boundaries as an int32 array of (start char, end char) pairs, one row per token."""
+    identifier: str = "TokenOffsetsSignal"
+    do_serialize: bool = True
+
+
 @register_signal
 class LabelEmbeddingSignal(BaseNumpyArraySignal):
     """Embedding of the nugget's label or attribute's name."""
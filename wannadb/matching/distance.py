@@ -4,14 +4,12 @@ from collections.abc import Collection
 from typing import Any, Union
 
 import numpy as np
-from scipy.spatial.distance import cosine
-from sklearn.metrics.pairwise import cosine_distances
 
 from wannadb.configuration import BaseConfigurableElement, register_configurable_element
 from wannadb.data.data import Attribute, InformationNugget
 from wannadb.data.signals import ContextSentenceEmbeddingSignal, LabelEmbeddingSignal, \
     POSTagsSignal, RelativePositionSignal, TextEmbeddingSignal
-from wannadb.statistics import Statistics
+from wannadb.statistics import Counter, Statistics
 
 logger: logging.Logger = logging.getLogger(__name__)
 
@@ -33,7 +31,6 @@ class BaseDistance(BaseConfigurableElement, abc.ABC):
         "documents": []
     }
 
-    @abc.abstractmethod
     def compute_distance(
             self,
             x: Union[InformationNugget, Attribute],
@@ -43,6 +40,24 @@ class BaseDistance(BaseConfigurableElement, abc.ABC):
         """
         Compute distance between the two given InformationNuggets/Attributes.
 
+        :param x: first InformationNugget/Attribute
+        :param y: second InformationNugget/Attribute
+        :param statistics: statistics object to collect statistics
+        :return: computed distance
+        """
+        statistics.counter("num_calls").add()
+        return self._compute_distance(x, y, statistics)
+
+    @abc.abstractmethod
+    def _compute_distance(
+            self,
+            x: Union[InformationNugget, Attribute],
+            y: Union[InformationNugget, Attribute],
+            statistics: Statistics
+    ) -> float:
+        """
+        Compute distance between the two given InformationNuggets/Attributes without counting the call.
+
         :param x: first InformationNugget/Attribute
         :param y: second InformationNugget/Attribute
         :param statistics: statistics object to collect statistics
@@ -60,7 +75,7 @@ class BaseDistance(BaseConfigurableElement, abc.ABC):
         Compute distances between all pairs from two collections of InformationNuggets/Attributes.
 
         This method exists to speed up the calculation using batching. The default implementation works by calling the
-        'compute_distance' method.
+        '_compute_distance' method and counts the calls with a counter that is resolved once.
 
         :param xs: first list of InformationNuggets/Attributes
         :param ys: second list of InformationNuggets/Attributes
@@ -71,10 +86,12 @@ class BaseDistance(BaseConfigurableElement, abc.ABC):
 
         assert len(xs) > 0 and len(ys) > 0, "Cannot compute distances for an empty collection!"
 
+        num_calls: Counter = statistics.counter("num_calls")
         res: np.ndarray = np.zeros((len(xs), len(ys)))
         for x_ix, x in enumerate(xs):
             for y_ix, y in enumerate(ys):
-                res[x_ix, y_ix] = self.compute_distance(x, y, statistics)
+                num_calls.add()
+                res[x_ix, y_ix] = self._compute_distance(x, y, statistics)
         return res
 
 
@@ -111,13 +128,13 @@ class SignalsMeanDistance(BaseDistance):
         self._signal_identifiers: list[str] = list(set(signal_identifiers + [LabelEmbeddingSignal.identifier]))
         logger.debug(f"Initialized '{self.identifier}'.")
 
-    def compute_distance(
+    def _compute_distance(
             self,
             x: Union[InformationNugget, Attribute],
             y: Union[InformationNugget, Attribute],
             statistics: Statistics
     ) -> float:
-        statistics["num_calls"] += 1
+        from scipy.spatial.distance import cosine
 
         distances: np.ndarray = np.zeros(5)
         is_present: np.ndarray = np.zeros(5)
@@ -234,6 +251,8 @@ class SignalsMeanDistance(BaseDistance):
                         assert False, "All ys must have the same signals!"
 
         # compute distances signal by signal
+        from sklearn.metrics.pairwise import cosine_distances
+
         distances: np.ndarray = np.zeros((len(xs), len(ys)))
         for idx in range(3):
             if xs_is_present[idx] == 1 and ys_is_present[idx] == 1:
@@ -1,22 +1,33 @@
 import abc
+import importlib
 import logging
+import multiprocessing
+import os
+import pickle
 import random
+import tempfile
 import time
-from typing import Any, Dict, List, Callable, Tuple
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Any, Dict, List, Callable, Optional, Set, Tuple
 
 import numpy as np
 
+from wannadb import profiling
 from wannadb.configuration import BasePipelineElement, register_configurable_element, Pipeline
-from wannadb.data.data import Document, DocumentBase, InformationNugget
-from wannadb.data.signals import CachedContextSentenceSignal, CachedDistanceSignal, \
-    SentenceStartCharsSignal, CurrentMatchIndexSignal, LabelSignal
+from wannadb.data.data import Attribute, ContextSentence, Document, DocumentBase, InformationNugget
+from wannadb.data.signals import SIGNALS, BaseNumpyArraySignal, BaseSignal, CachedContextSentenceSignal, \
+    CachedDistanceSignal, SentenceStartCharsSignal, CurrentMatchIndexSignal, LabelSignal, ConfirmedAttributesSignal, \
+    MaxDistanceSignal
 from wannadb.interaction import BaseInteractionCallback
 from wannadb.matching.distance import BaseDistance
 from wannadb.statistics import Statistics
-from wannadb.status import BaseStatusCallback
+from wannadb.status import BaseStatusCallback, EmptyStatusCallback
 
 logger: logging.Logger = logging.getLogger(__name__)
 
+# maximum distance at which the matchers of the user interfaces start to accept nuggets
+DEFAULT_MAX_DISTANCE: float = 0.2
+
 
 class BaseMatcher(BasePipelineElement, abc.ABC):
     """
@@ -25,6 +36,25 @@ class BaseMatcher(BasePipelineElement, abc.ABC):
     A matcher attempts to find matching InformationNuggets for the Attributes.
     """
     identifier: str = "BaseMatcher"
+    runs_exclusively: bool = True
+
+
+def _no_additional_nuggets(nugget: InformationNugget, documents: List[Document]) -> List[Tuple[Document, int, int]]:
+    return []
+
+
+def _mark_confirmed(document: Document, attribute_name: str) -> None:
+    """Record that the user has confirmed the match of the attribute in the document."""
+    if ConfirmedAttributesSignal.identifier not in document.signals.keys():
+        document[ConfirmedAttributesSignal] = ConfirmedAttributesSignal([])
+    if attribute_name not in document[ConfirmedAttributesSignal]:
+        document[ConfirmedAttributesSignal].append(attribute_name)
+
+
+def _is_confirmed(document: Document, attribute_name: str) -> bool:
+    """Check whether the user has confirmed the match of the attribute in the document."""
+    return ConfirmedAttributesSignal.identifier in document.signals.keys() \
+        and attribute_name in document[ConfirmedAttributesSignal]
 
 
 ########################################################################################################################
@@ -49,7 +79,7 @@ class RankingBasedMatcher(BaseMatcher):
             CachedDistanceSignal.identifier,
         ],
         "attributes": [],
-        "documents": []
+        "documents": [ConfirmedAttributesSignal.identifier]
     }
 
     def __init__(
@@ -62,7 +92,8 @@ class RankingBasedMatcher(BaseMatcher):
             sampling_mode: str,
             adjust_threshold: bool,
             nugget_pipeline: Pipeline,
-            find_additional_nuggets: Callable[[InformationNugget, List[Document]], List[Tuple[Document, int, int]]] = lambda nugget, documents: (),
+            find_additional_nuggets: Callable[[InformationNugget, List[Document]], List[Tuple[Document, int, int]]] = _no_additional_nuggets,
+            num_workers: int = 1
     ) -> None:
         """
         Initialize the RankingBasedMatcher.
@@ -76,6 +107,7 @@ class RankingBasedMatcher(BaseMatcher):
         :param adjust_threshold: whether to adjust the maximum distance threshold based on the user feedback
         :param nugget_pipeline: pipeline that is used to process newly-generated nuggets
         :param find_additional_nuggets: optional function to add nuggets similar to a manually added and matched nugget
+        :param num_workers: number of worker processes that match the attributes in parallel, 1 means no parallelism
         """
         super(RankingBasedMatcher, self).__init__()
         self._distance: BaseDistance = distance
@@ -88,12 +120,17 @@ class RankingBasedMatcher(BaseMatcher):
         self._adjust_threshold: bool = adjust_threshold
         self._nugget_pipeline: Pipeline = nugget_pipeline
         self._find_additional_nuggets = find_additional_nuggets
+        self._num_workers: int = num_workers
 
         # add signals required by the distance function to the signals required by the matcher
         self._add_required_signal_identifiers(self._distance.required_signal_identifiers)
 
         logger.debug(f"Initialized '{self.identifier}'.")
 
+    @property
+    def resource_identifiers(self) -> List[str]:
+        return self._nugget_pipeline.resource_identifiers
+
     def _call(
             self,
             document_base: DocumentBase,
@@ -104,6 +141,10 @@ class RankingBasedMatcher(BaseMatcher):
         statistics["num_documents"] = len(document_base.documents)
         statistics["num_nuggets"] = len(document_base.nuggets)
 
+        if self._num_workers > 1 and len(document_base.attributes) > 1:
+            self._call_in_parallel(document_base, interaction_callback, status_callback, statistics)
+            return
+
         for attribute in document_base.attributes:
             feedback_result: Dict[str, Any] = interaction_callback(
                 self.identifier,
@@ -133,22 +174,24 @@ class RankingBasedMatcher(BaseMatcher):
             logger.info("Compute initial distances and initialize documents.")
             tik: float = time.time()
 
-            distances: np.ndarray = self._distance.compute_distances(
-                [attribute], document_base.nuggets, statistics["distance"]
-            )[0]
-            for nugget, distance in zip(document_base.nuggets, distances):
-                nugget[CachedDistanceSignal] = CachedDistanceSignal(distance)
-            distances_based_on_label: bool = True
-
-            for document in document_base.documents:
-                try:
-                    index, _ = min(enumerate(document.nuggets), key=lambda nugget: nugget[1][CachedDistanceSignal])
-                except ValueError:  # document has no nuggets
-                    document.attribute_mappings[attribute.name] = []
-                    statistics[attribute.name]["num_document_with_no_nuggets"] += 1
-                else:
-                    document[CurrentMatchIndexSignal] = CurrentMatchIndexSignal(index)
-                    remaining_documents.append(document)
+            with profiling.frame(attribute.name), profiling.frame("initial distances"):
+                distances: np.ndarray = self._distance.compute_distances(
+                    [attribute], document_base.nuggets, statistics["distance"]
+                )[0]
+                for nugget, distance in zip(document_base.nuggets, distances):
+                    nugget[CachedDistanceSignal] = CachedDistanceSignal(distance)
+                distances_based_on_label: bool = True
+
+                for document in document_base.documents:
+                    try:
+                        index, _ = min(enumerate(document.nuggets), key=lambda nugget: nugget[1][CachedDistanceSignal])
+                    except ValueError:  # document has no nuggets
+                        document.attribute_mappings[attribute.name] = []
+                        statistics[attribute.name]["num_document_with_no_nuggets"] += 1
+                    else:
+                        document[CurrentMatchIndexSignal] = CurrentMatchIndexSignal(index)
+                        remaining_documents.append(document)
+                profiling.count("nuggets", len(distances))
 
             tak: float = time.time()
             logger.info(f"Computed initial distances and initialized documents in {tak - tik} seconds.")
@@ -225,17 +268,19 @@ class RankingBasedMatcher(BaseMatcher):
                 num_feedback += 1
                 statistics[attribute.name]["num_feedback"] += 1
                 t0 = time.time()
-                feedback_result: Dict[str, Any] = interaction_callback(
-                    self.identifier,
-                    {
-                        "max-distance": self._max_distance,
-                        "nuggets": feedback_nuggets,
-                        "attribute": attribute,
-                        "num-feedback": num_feedback,
-                        "num-nuggets-above": num_nuggets_above,
-                        "num-nuggets-below": num_nuggets_below
-                    }
-                )
+                with profiling.frame(attribute.name), profiling.frame("feedback"):
+                    feedback_result: Dict[str, Any] = interaction_callback(
+                        self.identifier,
+                        {
+                            "max-distance": self._max_distance,
+                            "nuggets": feedback_nuggets,
+                            "attribute": attribute,
+                            "num-feedback": num_feedback,
+                            "num-nuggets-above": num_nuggets_above,
+                            "num-nuggets-below": num_nuggets_below
+                        }
+                    )
+                    profiling.count("feedback rounds", 1)
                 t1 = time.time()
                 statistics[attribute.name]["feedback_durations"].append(t1 - t0)
 
@@ -245,6 +290,7 @@ class RankingBasedMatcher(BaseMatcher):
                 elif feedback_result["message"] == "no-match-in-document":
                     statistics[attribute.name]["num_no_match_in_document"] += 1
                     feedback_result["nugget"].document.attribute_mappings[attribute.name] = []
+                    _mark_confirmed(feedback_result["nugget"].document, attribute.name)
                     remaining_documents.remove(feedback_result["nugget"].document)
 
                     if self._adjust_threshold:
@@ -309,22 +355,25 @@ class RankingBasedMatcher(BaseMatcher):
                     # add this nugget to the document as a match and remove the document from remaining documents
                     feedback_result["document"].nuggets.append(confirmed_nugget)
                     feedback_result["document"].attribute_mappings[attribute.name] = [confirmed_nugget]
+                    _mark_confirmed(feedback_result["document"], attribute.name)
                     remaining_documents.remove(feedback_result["document"])
 
                     # update the distances for the other documents
-                    for document in remaining_documents:
-                        new_distances: np.ndarray = self._distance.compute_distances(
-                            [confirmed_nugget],
-                            document.nuggets,
-                            statistics["distance"]
-                        )[0]
-                        for nugget, new_distance in zip(document.nuggets, new_distances):
-                            if distances_based_on_label or new_distance < nugget[CachedDistanceSignal]:
-                                nugget[CachedDistanceSignal] = new_distance
-                        for ix, nugget in enumerate(document.nuggets):
-                            current_guess: InformationNugget = document.nuggets[document[CurrentMatchIndexSignal]]
-                            if nugget[CachedDistanceSignal] < current_guess[CachedDistanceSignal]:
-                                document[CurrentMatchIndexSignal] = ix
+                    with profiling.frame(attribute.name), profiling.frame("update distances"):
+                        for document in remaining_documents:
+                            new_distances: np.ndarray = self._distance.compute_distances(
+                                [confirmed_nugget],
+                                document.nuggets,
+                                statistics["distance"]
+                            )[0]
+                            for nugget, new_distance in zip(document.nuggets, new_distances):
+                                if distances_based_on_label or new_distance < nugget[CachedDistanceSignal]:
+                                    nugget[CachedDistanceSignal] = new_distance
+                            for ix, nugget in enumerate(document.nuggets):
+                                current_guess: InformationNugget = document.nuggets[document[CurrentMatchIndexSignal]]
+                                if nugget[CachedDistanceSignal] < current_guess[CachedDistanceSignal]:
+                                    document[CurrentMatchIndexSignal] = ix
+                        profiling.count("documents", len(remaining_documents))
                     distances_based_on_label = False
 
                     # Find more nuggets that are similar to this match
@@ -356,22 +405,25 @@ class RankingBasedMatcher(BaseMatcher):
                 elif feedback_result["message"] == "is-match":
                     statistics[attribute.name]["num_confirmed_match"] += 1
                     feedback_result["nugget"].document.attribute_mappings[attribute.name] = [feedback_result["nugget"]]
+                    _mark_confirmed(feedback_result["nugget"].document, attribute.name)
                     remaining_documents.remove(feedback_result["nugget"].document)
 
                     # update the distances for the other documents
-                    for document in remaining_documents:
-                        new_distances: np.ndarray = self._distance.compute_distances(
-                            [feedback_result["nugget"]],
-                            document.nuggets,
-                            statistics["distance"]
-                        )[0]
-                        for nugget, new_distance in zip(document.nuggets, new_distances):
-                            if distances_based_on_label or new_distance < nugget[CachedDistanceSignal]:
-                                nugget[CachedDistanceSignal] = new_distance
-                        for ix, nugget in enumerate(document.nuggets):
-                            current_guess: InformationNugget = document.nuggets[document[CurrentMatchIndexSignal]]
-                            if nugget[CachedDistanceSignal] < current_guess[CachedDistanceSignal]:
-                                document[CurrentMatchIndexSignal] = ix
+                    with profiling.frame(attribute.name), profiling.frame("update distances"):
+                        for document in remaining_documents:
+                            new_distances: np.ndarray = self._distance.compute_distances(
+                                [feedback_result["nugget"]],
+                                document.nuggets,
+                                statistics["distance"]
+                            )[0]
+                            for nugget, new_distance in zip(document.nuggets, new_distances):
+                                if distances_based_on_label or new_distance < nugget[CachedDistanceSignal]:
+                                    nugget[CachedDistanceSignal] = new_distance
+                            for ix, nugget in enumerate(document.nuggets):
+                                current_guess: InformationNugget = document.nuggets[document[CurrentMatchIndexSignal]]
+                                if nugget[CachedDistanceSignal] < current_guess[CachedDistanceSignal]:
+                                    document[CurrentMatchIndexSignal] = ix
+                        profiling.count("documents", len(remaining_documents))
                     distances_based_on_label = False
 
                     if self._adjust_threshold:
@@ -426,6 +478,9 @@ class RankingBasedMatcher(BaseMatcher):
                     statistics[attribute.name]["num_blocked_by_max_distance"] += 1
                     document.attribute_mappings[attribute.name] = []
 
+            # the threshold is kept, so that documents added later are matched with the same threshold
+            attribute[MaxDistanceSignal] = MaxDistanceSignal(self._max_distance)
+
             tak: float = time.time()
             logger.info(f"Updated remaining documents in {tak - tik} seconds.")
 
@@ -439,7 +494,8 @@ class RankingBasedMatcher(BaseMatcher):
             "num_random_docs": self._num_random_docs,
             "sampling_mode": self._sampling_mode,
             "adjust_threshold": self._adjust_threshold,
-            "nugget_pipeline": self._nugget_pipeline.to_config()
+            "nugget_pipeline": self._nugget_pipeline.to_config(),
+            "num_workers": self._num_workers
         }
 
     @classmethod
@@ -447,4 +503,641 @@ class RankingBasedMatcher(BaseMatcher):
         distance: BaseDistance = BaseDistance.from_config(config["distance"])
         return cls(distance, config["max_num_feedback"], config["len_ranked_list"], config["max_distance"],
                    config["num_random_docs"], config["sampling_mode"], config["adjust_threshold"],
-                   Pipeline.from_config(config["nugget_pipeline"]))
+                   Pipeline.from_config(config["nugget_pipeline"]), num_workers=config.get("num_workers", 1))
+
+    def _call_in_parallel(
+            self,
+            document_base: DocumentBase,
+            interaction_callback: BaseInteractionCallback,
+            status_callback: BaseStatusCallback,
+            statistics: Statistics
+    ) -> None:
+        """
+        Match the attributes in worker processes.
+
+        The embeddings of the nuggets are written to memory-mapped files that all workers share, while the rest of the
+        document base is copied to each worker once. Each worker matches its attributes independently of the others,
+        so that nuggets added for one attribute are no candidates for the other attributes. The interaction callback and
+        the function to find additional nuggets are copied to the workers and must therefore be picklable. The
+        attribute mappings, the added nuggets, and the statistics are merged in the order of the attributes, so that the
+        result does not depend on the scheduling of the workers. As in the sequential matching, the cached distances and
+        current matches are those of the last matched attribute (nuggets added for other attributes keep the distances
+        of their own attribute).
+
+        :param document_base: document base to work on
+        :param interaction_callback: callback to allow for user interaction
+        :param status_callback: callback to communicate current status (message and progress)
+        :param statistics: statistics object to collect statistics
+        """
+        attributes: List[Attribute] = document_base.attributes
+        num_workers: int = min(self._num_workers, len(attributes))
+        logger.info(f"Match {len(attributes)} attributes with {num_workers} worker processes.")
+        tick: float = time.time()
+        status_callback("Matching attributes...", 0)
+
+        config: Dict[str, Any] = self.to_config()
+        config["max_distance"] = self._default_max_distance
+        config["num_workers"] = 1
+        modules: List[str] = [self.__class__.__module__, self._distance.__class__.__module__]
+        for pipeline_element in self._nugget_pipeline.pipeline_elements:
+            if pipeline_element.__class__.__module__ not in modules:
+                modules.append(pipeline_element.__class__.__module__)
+
+        with tempfile.TemporaryDirectory() as directory:
+            document_base_path, store_paths = _write_shared_document_base(
+                document_base, self._distance.required_signal_identifiers["nuggets"], directory
+            )
+            with ProcessPoolExecutor(
+                    max_workers=num_workers,
+                    mp_context=multiprocessing.get_context("spawn"),  # forking would copy the loaded models and threads
+                    initializer=_init_matching_worker,
+                    initargs=(modules, document_base_path, store_paths, config, self._find_additional_nuggets,
+                              interaction_callback)
+            ) as executor:
+                futures: List[Any] = [executor.submit(_match_attribute, ix) for ix in range(len(attributes))]
+                for num_done, _ in enumerate(as_completed(futures)):
+                    status_callback("Matching attributes...", (num_done + 1) / len(futures))
+                results: List[_AttributeResult] = [future.result() for future in futures]
+
+        documents: List[Document] = document_base.documents
+        num_nuggets: List[int] = [len(document.nuggets) for document in documents]
+        for attribute, (attribute_statistics, mappings, new_nuggets, confirmed, document_signals, max_distance) \
+                in zip(attributes, results):
+            added_nuggets: Dict[int, List[InformationNugget]] = {}
+            for document_ix, start_char, end_char, signals, context in new_nuggets:
+                document: Document = documents[document_ix]
+                nugget: InformationNugget = InformationNugget(document, start_char, end_char)
+                for signal in signals.values():
+                    nugget[signal.identifier] = signal
+                if context is not None:
+                    nugget[CachedContextSentenceSignal] = CachedContextSentenceSignal(ContextSentence(document, *context))
+                document.nuggets.append(nugget)
+                added_nuggets.setdefault(document_ix, []).append(nugget)
+
+            def worker_nugget(document_ix: int, nugget_ix: int) -> InformationNugget:
+                # the worker's nuggets are the original nuggets followed by those it has added
+                if nugget_ix < num_nuggets[document_ix]:
+                    return documents[document_ix].nuggets[nugget_ix]
+                return added_nuggets[document_ix][nugget_ix - num_nuggets[document_ix]]
+
+            for document_ix, nugget_indices in enumerate(mappings):
+                if nugget_indices is not None:
+                    documents[document_ix].attribute_mappings[attribute.name] = [
+                        worker_nugget(document_ix, nugget_ix) for nugget_ix in nugget_indices
+                    ]
+            for document_ix in confirmed:
+                _mark_confirmed(documents[document_ix], attribute.name)
+            if max_distance is not None:
+                attribute[MaxDistanceSignal] = MaxDistanceSignal(max_distance)
+
+            if document_signals is not None:
+                for document_ix, (distances, match_index) in enumerate(document_signals):
+                    for nugget_ix, distance in enumerate(distances):
+                        if distance is not None:
+                            worker_nugget(document_ix, nugget_ix)[CachedDistanceSignal] = CachedDistanceSignal(distance)
+                    if match_index is not None:
+                        match: InformationNugget = worker_nugget(document_ix, match_index)
+                        documents[document_ix][CurrentMatchIndexSignal] = CurrentMatchIndexSignal(
+                            next(ix for ix, nugget in enumerate(documents[document_ix].nuggets) if nugget is match)
+                        )
+
+            # the other entries are recorded by the pipeline element of the worker and have been recorded here as well
+            for key in attribute_statistics.all_keys():
+                if isinstance(attribute_statistics[key], Statistics):
+                    statistics[key].merge(attribute_statistics[key])
+
+        status_callback("Matching attributes...", 1)
+        tack: float = time.time()
+        logger.info(f"Matched the attributes in parallel in {tack - tick} seconds.")
+
+
+def _closest_nuggets(distances: np.ndarray, starts: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Find the closest nugget of each document for each row of the distance matrix.
+
+    :param distances: distances between the rows and the nuggets of the documents, ordered by document
+    :param starts: index of the first nugget of each document, all documents must have nuggets
+    :return: minimum distance and index of the closest nugget in the document for each row and document
+    """
+    num_nuggets: int = distances.shape[1]
+    min_distances: np.ndarray = np.minimum.reduceat(distances, starts, axis=1)
+    counts: np.ndarray = np.diff(np.append(starts, num_nuggets))
+    is_closest: np.ndarray = distances == np.repeat(min_distances, counts, axis=1)
+    positions: np.ndarray = np.where(is_closest, np.arange(num_nuggets), num_nuggets)
+    return min_distances, np.minimum.reduceat(positions, starts, axis=1) - starts
+
+
+@register_configurable_element
+class AutomaticMatcher(BaseMatcher):
+    """
+    Matcher that populates the table without user interaction or with a limited budget of feedback rounds.
+
+    The matcher computes the distances between all attributes and all nuggets at once and matches the closest nugget of
+    each document if its distance is below the maximum distance. With a feedback budget, it presents the documents
+    closest to the threshold in the same way as the RankingBasedMatcher. Confirmed matches update the distances and
+    the threshold of the attribute, any answer other than 'is-match' or 'no-match-in-document' ends the feedback.
+    """
+
+    identifier: str = "AutomaticMatcher"
+
+    required_signal_identifiers: Dict[str, List[str]] = {
+        "nuggets": [],
+        "attributes": [],
+        "documents": []
+    }
+
+    generated_signal_identifiers: Dict[str, List[str]] = {
+        "nuggets": [CachedDistanceSignal.identifier],
+        "attributes": [],
+        "documents": [CurrentMatchIndexSignal.identifier, ConfirmedAttributesSignal.identifier]
+    }
+
+    def __init__(
+            self,
+            distance: BaseDistance,
+            max_distance: float,
+            max_num_feedback: int = 0,
+            len_ranked_list: int = 10,
+            adjust_threshold: bool = True
+    ) -> None:
+        """
+        Initialize the AutomaticMatcher.
+
+        :param distance: distance function
+        :param max_distance: maximum distance at which nuggets will be accepted
+        :param max_num_feedback: maximum number of user interactions per attribute, zero for none
+        :param len_ranked_list: length of the ranked list of nuggets presented to the user for feedback
+        :param adjust_threshold: whether to adjust the maximum distance threshold based on the user feedback
+        """
+        super(AutomaticMatcher, self).__init__()
+        self._distance: BaseDistance = distance
+        self._max_distance: float = max_distance
+        self._max_num_feedback: int = max_num_feedback
+        self._len_ranked_list: int = len_ranked_list
+        self._adjust_threshold: bool = adjust_threshold
+
+        # add signals required by the distance function to the signals required by the matcher
+        self._add_required_signal_identifiers(self._distance.required_signal_identifiers)
+
+        logger.debug(f"Initialized '{self.identifier}'.")
+
+    def _call(
+            self,
+            document_base: DocumentBase,
+            interaction_callback: BaseInteractionCallback,
+            status_callback: BaseStatusCallback,
+            statistics: Statistics
+    ) -> None:
+        statistics["num_documents"] = len(document_base.documents)
+        statistics["num_nuggets"] = len(document_base.nuggets)
+
+        attributes: List[Attribute] = []
+        for attribute in document_base.attributes:
+            if any(attribute.name in document.attribute_mappings.keys() for document in document_base.documents):
+                logger.info(f"Attribute '{attribute.name}' has already been matched before.")
+                statistics[attribute.name]["skipped"] = True
+            else:
+                attributes.append(attribute)
+
+        documents: List[Document] = []
+        for document in document_base.documents:
+            if document.nuggets == []:
+                for attribute in attributes:
+                    document.attribute_mappings[attribute.name] = []
+                    statistics[attribute.name]["num_document_with_no_nuggets"] += 1
+            else:
+                documents.append(document)
+        if attributes == [] or documents == []:
+            return
+
+        # compute the distances between all attributes and all nuggets and the closest nugget of each document
+        logger.info(f"Compute initial distances for {len(attributes)} attributes.")
+        tik: float = time.time()
+        nuggets: List[InformationNugget] = [nugget for document in documents for nugget in document.nuggets]
+        starts: np.ndarray = np.cumsum([0] + [len(document.nuggets) for document in documents[:-1]])
+        with profiling.frame("initial distances"):
+            distances: np.ndarray = self._distance.compute_distances(attributes, nuggets, statistics["distance"])
+            min_distances, match_indices = _closest_nuggets(distances, starts)
+            profiling.count("nuggets", distances.size)
+        max_distances: np.ndarray = np.full(len(attributes), self._max_distance)
+        remaining: np.ndarray = np.ones((len(attributes), len(documents)), dtype=bool)
+        tak: float = time.time()
+        logger.info(f"Computed initial distances in {tak - tik} seconds.")
+
+        if self._max_num_feedback > 0:
+            document_indices: Dict[int, int] = {id(document): ix for ix, document in enumerate(documents)}
+            for attribute_ix, attribute in enumerate(attributes):
+                with profiling.frame(attribute.name), profiling.frame("feedback"):
+                    max_distances[attribute_ix] = self._feedback_rounds(
+                        attribute, documents, document_indices, nuggets, starts, distances[attribute_ix],
+                        min_distances[attribute_ix], match_indices[attribute_ix], remaining[attribute_ix],
+                        interaction_callback, statistics
+                    )
+
+        # match the closest nuggets below the thresholds
+        is_match: np.ndarray = remaining & (min_distances < max_distances[:, np.newaxis])
+        for attribute_ix, attribute in enumerate(attributes):
+            statistics[attribute.name]["max_distance"] = float(max_distances[attribute_ix])
+            attribute[MaxDistanceSignal] = MaxDistanceSignal(float(max_distances[attribute_ix]))
+            statistics[attribute.name]["num_guessed_match"] += int(np.sum(is_match[attribute_ix]))
+            statistics[attribute.name]["num_blocked_by_max_distance"] += int(
+                np.sum(remaining[attribute_ix] & ~is_match[attribute_ix])
+            )
+            for document_ix in np.flatnonzero(remaining[attribute_ix]):
+                document: Document = documents[document_ix]
+                if is_match[attribute_ix, document_ix]:
+                    nugget: InformationNugget = document.nuggets[match_indices[attribute_ix, document_ix]]
+                    document.attribute_mappings[attribute.name] = [nugget]
+                else:
+                    document.attribute_mappings[attribute.name] = []
+
+        # like the RankingBasedMatcher, leave the distances and closest nuggets of the last attribute in the signals
+        for nugget, distance in zip(nuggets, distances[-1]):
+            nugget[CachedDistanceSignal] = CachedDistanceSignal(distance)
+        for document, match_index in zip(documents, match_indices[-1]):
+            document[CurrentMatchIndexSignal] = CurrentMatchIndexSignal(int(match_index))
+
+    def _feedback_rounds(
+            self,
+            attribute: Attribute,
+            documents: List[Document],
+            document_indices: Dict[int, int],
+            nuggets: List[InformationNugget],
+            starts: np.ndarray,
+            distances: np.ndarray,
+            min_distances: np.ndarray,
+            match_indices: np.ndarray,
+            remaining: np.ndarray,
+            interaction_callback: BaseInteractionCallback,
+            statistics: Statistics
+    ) -> float:
+        """
+        Execute the feedback rounds for the given attribute.
+
+        The distances, closest nuggets, and remaining documents of the attribute are updated in place.
+
+        :return: maximum distance threshold of the attribute
+        """
+        max_distance: float = self._max_distance
+        statistics[attribute.name]["max_distances"] = [max_distance]
+        distances_based_on_label: bool = True
+        for num_feedback in range(1, self._max_num_feedback + 1):
+            remaining_indices: np.ndarray = np.flatnonzero(remaining)
+            if len(remaining_indices) == 0:
+                break
+
+            # rank the remaining documents by the distance of their closest nugget and select those at the threshold
+            ranking: np.ndarray = remaining_indices[np.argsort(-min_distances[remaining_indices], kind="stable")]
+            ix_lower: int = int(np.sum(min_distances[ranking] > max_distance))
+            left: int = max(0, min(ix_lower - self._len_ranked_list // 2, len(ranking) - self._len_ranked_list))
+            right: int = min(len(ranking), left + self._len_ranked_list)
+            feedback_nuggets: List[InformationNugget] = [
+                documents[document_ix].nuggets[match_indices[document_ix]] for document_ix in ranking[left:right]
+            ]
+
+            statistics[attribute.name]["num_feedback"] += 1
+            feedback_result: Dict[str, Any] = interaction_callback(
+                self.identifier,
+                {
+                    "max-distance": max_distance,
+                    "nuggets": feedback_nuggets,
+                    "attribute": attribute,
+                    "num-feedback": num_feedback,
+                    "num-nuggets-above": left,
+                    "num-nuggets-below": len(ranking) - right
+                }
+            )
+            profiling.count("feedback rounds", 1)
+            message: Any = feedback_result.get("message") if feedback_result is not None else None
+
+            if message == "no-match-in-document":
+                statistics[attribute.name]["num_no_match_in_document"] += 1
+                document_ix: int = document_indices[id(feedback_result["nugget"].document)]
+                feedback_result["nugget"].document.attribute_mappings[attribute.name] = []
+                _mark_confirmed(feedback_result["nugget"].document, attribute.name)
+                remaining[document_ix] = False
+                if self._adjust_threshold and min_distances[document_ix] < max_distance:
+                    max_distance = float(min_distances[document_ix])
+                    statistics[attribute.name]["max_distances"].append(max_distance)
+            elif message == "is-match":
+                statistics[attribute.name]["num_confirmed_match"] += 1
+                confirmed_nugget: InformationNugget = feedback_result["nugget"]
+                document_ix: int = document_indices[id(confirmed_nugget.document)]
+                confirmed_nugget.document.attribute_mappings[attribute.name] = [confirmed_nugget]
+                _mark_confirmed(confirmed_nugget.document, attribute.name)
+                remaining[document_ix] = False
+
+                nugget_ix: int = starts[document_ix] + next(
+                    ix for ix, nugget in enumerate(confirmed_nugget.document.nuggets) if nugget is confirmed_nugget
+                )
+                if self._adjust_threshold and feedback_result.get("not-a-match") is None \
+                        and distances[nugget_ix] > max_distance:
+                    max_distance = float(distances[nugget_ix])
+                    statistics[attribute.name]["max_distances"].append(max_distance)
+
+                # update the distances based on the confirmed nugget
+                new_distances: np.ndarray = self._distance.compute_distances(
+                    [confirmed_nugget], nuggets, statistics["distance"]
+                )[0]
+                if distances_based_on_label:
+                    distances[:] = new_distances
+                else:
+                    np.minimum(distances, new_distances, out=distances)
+                distances_based_on_label = False
+                new_min_distances, new_match_indices = _closest_nuggets(distances[np.newaxis], starts)
+                min_distances[:] = new_min_distances[0]
+                match_indices[:] = new_match_indices[0]
+            else:
+                logger.info(f"Stop the feedback for attribute '{attribute.name}' after the answer '{message}'.")
+                break
+
+        return max_distance
+
+    def to_config(self) -> Dict[str, Any]:
+        return {
+            "identifier": self.identifier,
+            "distance": self._distance.to_config(),
+            "max_distance": self._max_distance,
+            "max_num_feedback": self._max_num_feedback,
+            "len_ranked_list": self._len_ranked_list,
+            "adjust_threshold": self._adjust_threshold
+        }
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any]) -> "AutomaticMatcher":
+        distance: BaseDistance = BaseDistance.from_config(config["distance"])
+        return cls(distance, config["max_distance"], config.get("max_num_feedback", 0),
+                   config.get("len_ranked_list", 10), config.get("adjust_threshold", True))
+
+
+########################################################################################################################
+# incremental matching
+########################################################################################################################
+
+
+def match_new_documents(
+        document_base: DocumentBase,
+        documents: List[Document],
+        distance: BaseDistance,
+        statistics: Statistics,
+        max_distance: float = DEFAULT_MAX_DISTANCE,
+        batch_size: int = 256
+) -> None:
+    """
+    Match the attributes that have already been matched in the document base for newly-added documents.
+
+    The new documents must already be preprocessed and part of the document base. The distance of a new nugget is its
+    minimum distance to the nuggets that the user has confirmed as matches in the other documents, or its distance to
+    the attribute if no nuggets have been confirmed, just as the RankingBasedMatcher would compute it after its feedback
+    rounds. The matcher's guesses are no references, since the distances would otherwise drift towards wrong guesses.
+    Nuggets are accepted up to the maximum distance that the matcher has ended with for the attribute. The existing
+    documents and their matches remain untouched.
+
+    :param document_base: document base that contains the new documents
+    :param documents: newly-added documents
+    :param distance: distance function
+    :param statistics: statistics object to collect statistics
+    :param max_distance: maximum distance at which nuggets will be accepted if the matcher has not recorded one
+    :param batch_size: maximum number of new nuggets for which the distances are computed at once
+    """
+    statistics["num_documents"] = len(documents)
+    new_document_ids: Set[int] = set(id(document) for document in documents)
+    old_documents: List[Document] = [
+        document for document in document_base.documents if id(document) not in new_document_ids
+    ]
+
+    for attribute in document_base.attributes:
+        if not any(attribute.name in document.attribute_mappings.keys() for document in old_documents):
+            logger.info(f"Attribute '{attribute.name}' has not been matched before.")
+            statistics[attribute.name]["skipped"] = True
+            continue
+
+        logger.info(f"Matching attribute '{attribute.name}' for {len(documents)} new documents.")
+        tik: float = time.time()
+
+        confirmed_nuggets: List[InformationNugget] = []
+        for document in old_documents:
+            if _is_confirmed(document, attribute.name):
+                confirmed_nuggets += document.attribute_mappings.get(attribute.name, [])
+        references: List[Any] = confirmed_nuggets if confirmed_nuggets != [] else [attribute]
+        statistics[attribute.name]["num_reference_nuggets"] = len(confirmed_nuggets)
+
+        attribute_max_distance: float = max_distance
+        if MaxDistanceSignal.identifier in attribute.signals.keys():
+            attribute_max_distance = attribute[MaxDistanceSignal]
+        statistics[attribute.name]["max_distance"] = attribute_max_distance
+
+        # compute the distances for batches of documents to bound the size of the distance matrix
+        batch: List[Document] = []
+        batch_nuggets: List[InformationNugget] = []
+        for ix, document in enumerate(documents):
+            if document.nuggets == []:
+                document.attribute_mappings[attribute.name] = []
+                statistics[attribute.name]["num_document_with_no_nuggets"] += 1
+            else:
+                batch.append(document)
+                batch_nuggets += document.nuggets
+            if batch_nuggets != [] and (len(batch_nuggets) >= batch_size or ix == len(documents) - 1):
+                distances: np.ndarray = np.min(distance.compute_distances(
+                    references, batch_nuggets, statistics[attribute.name]["distance"]
+                ), axis=0)
+                for nugget, nugget_distance in zip(batch_nuggets, distances):
+                    nugget[CachedDistanceSignal] = CachedDistanceSignal(nugget_distance)
+
+                for batch_document in batch:
+                    index, _ = min(enumerate(batch_document.nuggets), key=lambda x: x[1][CachedDistanceSignal])
+                    batch_document[CurrentMatchIndexSignal] = CurrentMatchIndexSignal(index)
+                    current_guess: InformationNugget = batch_document.nuggets[index]
+                    if current_guess[CachedDistanceSignal] < attribute_max_distance:
+                        statistics[attribute.name]["num_guessed_match"] += 1
+                        batch_document.attribute_mappings[attribute.name] = [current_guess]
+                    else:
+                        statistics[attribute.name]["num_blocked_by_max_distance"] += 1
+                        batch_document.attribute_mappings[attribute.name] = []
+                batch = []
+                batch_nuggets = []
+
+        tak: float = time.time()
+        logger.info(f"Matched attribute '{attribute.name}' for the new documents in {tak - tik} seconds.")
+
+
+########################################################################################################################
+# attribute-parallel matching
+########################################################################################################################
+
+
+# state of the worker process of the attribute-parallel matching
+_WORKER_MATCHER: Optional[RankingBasedMatcher] = None
+_WORKER_DOCUMENT_BASE: Optional[DocumentBase] = None
+_WORKER_INTERACTION_CALLBACK: Optional[BaseInteractionCallback] = None
+
+# added nugget as document index, start_char, end_char, signals without the context sentence, and span of the context
+# sentence (sentence start char, sentence end char, start char in sentence, end char in sentence, start token, end
+# token) if it has one
+_ContextSpan = Tuple[int, int, int, int, Optional[int], Optional[int]]
+_NewNugget = Tuple[int, int, int, Dict[str, BaseSignal], Optional[_ContextSpan]]
+
+# cached distances of the nuggets and index of the current match (if any) of a document
+_DocumentSignals = Tuple[List[Optional[float]], Optional[int]]
+
+# statistics, indices of the matched nuggets per document, added nuggets, indices of the documents whose matches have
+# been confirmed by the user, the cached distances and current matches per document, and the final maximum distance
+# (the last two are None if not matched)
+_AttributeResult = Tuple[
+    Statistics, List[Optional[List[int]]], List[_NewNugget], List[int], Optional[List[_DocumentSignals]],
+    Optional[float]
+]
+
+
+def _write_shared_document_base(
+        document_base: DocumentBase,
+        signal_identifiers: List[str],
+        directory: str
+) -> Tuple[str, Dict[str, str]]:
+    """
+    Write the document base for the workers of the attribute-parallel matching.
+
+    The given numpy array signals of the nuggets are stored as one matrix per signal that the workers memory-map, the
+    rest of the document base is pickled. Signals that not all nuggets have or whose shapes differ are pickled as well.
+
+    :param document_base: document base to write
+    :param signal_identifiers: identifiers of the nugget signals to store as matrices
+    :param directory: directory for the files
+    :return: path of the pickled document base and paths of the matrices by signal identifier
+    """
+    nuggets: List[InformationNugget] = document_base.nuggets
+    store_paths: Dict[str, str] = {}
+    for signal_identifier in signal_identifiers:
+        if nuggets == [] or not all(
+                isinstance(nugget.signals.get(signal_identifier), BaseNumpyArraySignal) for nugget in nuggets
+        ):
+            continue
+        first_value: np.ndarray = nuggets[0][signal_identifier]
+        if any(nugget[signal_identifier].shape != first_value.shape for nugget in nuggets):
+            continue
+        path: str = os.path.join(directory, f"{signal_identifier}.npy")
+        vectors: np.ndarray = np.lib.format.open_memmap(
+            path, mode="w+", dtype=first_value.dtype, shape=(len(nuggets),) + first_value.shape
+        )
+        for ix, nugget in enumerate(nuggets):
+            vectors[ix] = nugget[signal_identifier]
+        vectors.flush()
+        del vectors
+        store_paths[signal_identifier] = path
+
+    # the stored signals are removed from the nuggets while the document base is pickled
+    stored_signals: List[Dict[str, BaseSignal]] = [
+        {signal_identifier: nugget.signals.pop(signal_identifier) for signal_identifier in store_paths.keys()}
+        for nugget in nuggets
+    ]
+    document_base_path: str = os.path.join(directory, "document_base.pickle")
+    try:
+        with open(document_base_path, "wb") as file:
+            pickle.dump(document_base, file, pickle.HIGHEST_PROTOCOL)
+    finally:
+        for nugget, signals in zip(nuggets, stored_signals):
+            nugget.signals.update(signals)
+    return document_base_path, store_paths
+
+
+def _init_matching_worker(
+        modules: List[str],
+        document_base_path: str,
+        store_paths: Dict[str, str],
+        matcher_config: Dict[str, Any],
+        find_additional_nuggets: Callable[[InformationNugget, List[Document]], List[Tuple[Document, int, int]]],
+        interaction_callback: BaseInteractionCallback
+) -> None:
+    """
+    Set up a worker process of the attribute-parallel matching.
+
+    :param modules: modules that register the distance and the pipeline elements of the nugget pipeline
+    :param document_base_path: path of the pickled document base
+    :param store_paths: paths of the memory-mapped nugget signals by signal identifier
+    :param matcher_config: configuration of the matcher
+    :param find_additional_nuggets: function to add nuggets similar to a manually added and matched nugget
+    :param interaction_callback: callback to allow for user interaction
+    """
+    global _WORKER_MATCHER, _WORKER_DOCUMENT_BASE, _WORKER_INTERACTION_CALLBACK
+    from wannadb.resources import ResourceManager
+
+    for module in modules:
+        importlib.import_module(module)
+    ResourceManager()
+
+    with open(document_base_path, "rb") as file:
+        _WORKER_DOCUMENT_BASE = pickle.load(file)
+    nuggets: List[InformationNugget] = _WORKER_DOCUMENT_BASE.nuggets
+    for signal_identifier, path in store_paths.items():
+        vectors: np.ndarray = np.load(path, mmap_mode="r")
+        for nugget, vector in zip(nuggets, vectors):
+            nugget[signal_identifier] = SIGNALS[signal_identifier](vector)
+
+    _WORKER_MATCHER = RankingBasedMatcher.from_config(matcher_config)
+    _WORKER_MATCHER._find_additional_nuggets = find_additional_nuggets
+    _WORKER_INTERACTION_CALLBACK = interaction_callback
+
+
+def _match_attribute(attribute_ix: int) -> _AttributeResult:
+    """
+    Match the given attribute in a worker process.
+
+    The document base of the worker is restored afterward, so that the next attribute starts from the original state.
+
+    :param attribute_ix: position of the attribute in the document base
+    :return: statistics, indices of the matched nuggets in each document (None if the attribute has not been matched
+        in this run), the added nuggets, the indices of the documents whose matches have been confirmed, the cached
+        distances and current matches of each document, and the final maximum distance (both None if the attribute has
+        not been matched in this run)
+    """
+    documents: List[Document] = _WORKER_DOCUMENT_BASE.documents
+    attribute: Attribute = _WORKER_DOCUMENT_BASE.attributes[attribute_ix]
+    num_nuggets: List[int] = [len(document.nuggets) for document in documents]
+    matched_before: bool = any(attribute.name in document.attribute_mappings.keys() for document in documents)
+
+    statistics: Statistics = Statistics(True)
+    _WORKER_MATCHER(
+        DocumentBase(documents, [attribute]), _WORKER_INTERACTION_CALLBACK, EmptyStatusCallback(), statistics
+    )
+
+    # the attribute may also have been skipped on request of the user
+    matched: bool = not matched_before \
+        and any(attribute.name in document.attribute_mappings.keys() for document in documents)
+
+    mappings: List[Optional[List[int]]] = []
+    new_nuggets: List[_NewNugget] = []
+    confirmed: List[int] = []
+    document_signals: Optional[List[_DocumentSignals]] = [] if matched else None
+    for document_ix, document in enumerate(documents):
+        for nugget in document.nuggets[num_nuggets[document_ix]:]:
+            # the context sentence refers to the worker's document and is bound to the original document instead
+            signals: Dict[str, BaseSignal] = dict(nugget.signals)
+            context: Optional[_ContextSpan] = None
+            if CachedContextSentenceSignal.identifier in signals.keys() \
+                    and isinstance(nugget[CachedContextSentenceSignal], ContextSentence):
+                sentence: ContextSentence = signals.pop(CachedContextSentenceSignal.identifier).value
+                context = (sentence.sentence_start_char, sentence.sentence_end_char, sentence.start_char,
+                           sentence.end_char, sentence.start_token, sentence.end_token)
+            new_nuggets.append((document_ix, nugget.start_char, nugget.end_char, signals, context))
+        if document_signals is not None:
+            document_signals.append((
+                [nugget[CachedDistanceSignal] if CachedDistanceSignal.identifier in nugget.signals.keys() else None
+                 for nugget in document.nuggets],
+                document[CurrentMatchIndexSignal]
+                if CurrentMatchIndexSignal.identifier in document.signals.keys() else None
+            ))
+        if not matched or attribute.name not in document.attribute_mappings.keys():
+            mappings.append(None)
+        else:
+            mappings.append([
+                next(ix for ix, nugget in enumerate(document.nuggets) if nugget is matched_nugget)
+                for matched_nugget in document.attribute_mappings.pop(attribute.name)
+            ])
+            if _is_confirmed(document, attribute.name):
+                confirmed.append(document_ix)
+                document[ConfirmedAttributesSignal].remove(attribute.name)
+        del document.nuggets[num_nuggets[document_ix]:]
+    max_distance: Optional[MaxDistanceSignal] = attribute.signals.pop(MaxDistanceSignal.identifier, None)
+    if not matched or max_distance is None:
+        return statistics, mappings, new_nuggets, confirmed, document_signals, None
+    return statistics, mappings, new_nuggets, confirmed, document_signals, max_distance.value
@@ -0,0 +1,501 @@
+import argparse
+import logging
+import os
+import threading
+import time
+from multiprocessing.connection import Client, Connection, Listener
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple, Type, Union
+
+import numpy as np
+
+from wannadb import batching, resources
+from wannadb.batching import BatchedBertModel, BatchedSentenceEncoder, DynamicBatcher
+from wannadb.resources import BaseBERTResource, BaseResource, BaseSBERTResource, BaseSpacyResource, RESOURCES, \
+    ResourceManager, SpacyEnCoreSciMd, SpacyEnNerCraftMd, StanzaNERPipeline
+
+logger: logging.Logger = logging.getLogger(__name__)
+
+# address of the model server as 'host:port' or as the path of a unix socket
+MODEL_SERVER_ADDRESS_VARIABLE: str = "WANNADB_MODEL_SERVER"
+MODEL_SERVER_AUTHKEY_VARIABLE: str = "WANNADB_MODEL_SERVER_AUTHKEY"
+# time in seconds that the clients wait for the model server to accept connections (e.g. while it loads the models)
+MODEL_SERVER_CONNECT_TIMEOUT_VARIABLE: str = "WANNADB_MODEL_SERVER_CONNECT_TIMEOUT"
+
+# hosts that would expose the model server on all network interfaces
+_WILDCARD_HOSTS: Tuple[str, ...] = ("", "0.0.0.0", "::", "*")
+
+
+def _parse_address(address: str) -> Union[str, Tuple[str, int]]:
+    """
+    Parse the address of the model server.
+
+    :param address: 'host:port' or path of a unix socket
+    :return: address as expected by multiprocessing.connection
+    """
+    if ":" in address and not address.startswith("/"):
+        host, port = address.rsplit(":", 1)
+        return host, int(port)
+    return address
+
+
+def _authkey() -> bytes:
+    """
+    Secret that the model server and its clients use to authenticate connections.
+
+    There is no default, since anyone who can connect to the model server can make it unpickle arbitrary data.
+
+    :return: value of the environment variable WANNADB_MODEL_SERVER_AUTHKEY
+    """
+    authkey: str = os.environ.get(MODEL_SERVER_AUTHKEY_VARIABLE, "")
+    if authkey == "":
+        message: str = f"The model server requires a secret in the variable {MODEL_SERVER_AUTHKEY_VARIABLE}!"
+        logger.error(message)
+        raise RuntimeError(message)
+    return authkey.encode("utf-8")
+
+
+def _connect_timeout() -> float:
+    return float(os.environ.get(MODEL_SERVER_CONNECT_TIMEOUT_VARIABLE, "600"))
+
+
+def _resource_kind(resource_class: Type[BaseResource]) -> Optional[str]:
+    """
+    Determine how the model server serves resources of the given class.
+
+    :param resource_class: class of the resource
+    :return: kind of the resource or None if the resource cannot be served by the model server
+    """
+    if issubclass(resource_class, BaseSBERTResource):
+        return "sbert"
+    elif issubclass(resource_class, BaseBERTResource):
+        return "bert"
+    elif issubclass(resource_class, (BaseSpacyResource, SpacyEnCoreSciMd, SpacyEnNerCraftMd)):
+        return "spacy"
+    elif issubclass(resource_class, StanzaNERPipeline):
+        return "stanza"
+    return None
+
+
+########################################################################################################################
+# server
+########################################################################################################################
+
+
+class _ResourceWorker:
+    """
+    Serves the requests for one resource.
+
+    Concurrent requests are coalesced into batches, regardless of which worker process has sent them: SBERT encode
+    requests and BERT forward passes are batched by the batching stand-ins of the models, spacy and stanza requests by a
+    DynamicBatcher that processes them with nlp.pipe and bulk_process. Each resource has its own batching thread, so
+    that requests for different resources do not wait for each other.
+    """
+
+    def __init__(self, resource_identifier: str, resource: Any) -> None:
+        self._resource_identifier: str = resource_identifier
+        self._kind: str = _resource_kind(RESOURCES[resource_identifier])
+        self._batched: Optional[Union[BatchedSentenceEncoder, BatchedBertModel, DynamicBatcher]] = None
+
+        if self._kind == "sbert":
+            if not isinstance(resource, BatchedSentenceEncoder):
+                resource = self._batched = BatchedSentenceEncoder(resource, batching.max_batch_size(), batching.max_wait())
+        elif self._kind == "bert":
+            if not isinstance(resource["model"], BatchedBertModel):
+                self._batched = BatchedBertModel(
+                    resource["model"], resource["device"], batching.max_batch_size(), batching.max_wait()
+                )
+                resource = {**resource, "model": self._batched}
+        elif self._kind in ("spacy", "stanza"):
+            process_batch: Callable = _spacy_batch if self._kind == "spacy" else _stanza_batch
+            self._batched = DynamicBatcher(
+                lambda requests: process_batch(resource, requests),
+                batching.max_batch_size(),
+                batching.max_wait(),
+                f"{self._kind}-batcher"
+            )
+        self._resource: Any = resource
+
+    def __call__(self, method: str, args: Sequence[Any], kwargs: Dict[str, Any]) -> Any:
+        if self._kind in ("spacy", "stanza") and method == "call":
+            return self._batched((args, kwargs))
+        return _HANDLERS[self._kind][method](self._resource, *args, **kwargs)
+
+    def stop(self) -> None:
+        if self._batched is not None:
+            self._batched.close()
+
+
+def _sbert_encode(encoder: BatchedSentenceEncoder, texts: List[str], batch_size: int = 32) -> np.ndarray:
+    return encoder.encode(texts, batch_size=batch_size, show_progress_bar=False)
+
+
+def _bert_forward(resource: Dict[str, Any], input_ids: np.ndarray, token_type_ids: np.ndarray,
+                  attention_mask: np.ndarray) -> np.ndarray:
+    import torch
+
+    outputs = resource["model"](
+        input_ids=torch.from_numpy(input_ids),
+        token_type_ids=torch.from_numpy(token_type_ids),
+        attention_mask=torch.from_numpy(attention_mask)
+    )
+    return outputs[0].cpu().numpy()
+
+
+def _spacy_batch(nlp: Any, requests: List[Tuple[Sequence[Any], Dict[str, Any]]]) -> List[bytes]:
+    from spacy.tokens import Doc
+
+    # requests that disable different components cannot share a call to nlp.pipe
+    groups: Dict[Tuple[str, ...], List[int]] = {}
+    for ix, (_, kwargs) in enumerate(requests):
+        groups.setdefault(tuple(kwargs.get("disable", ())), []).append(ix)
+
+    results: List[Optional[bytes]] = [None] * len(requests)
+    for disable, ixs in groups.items():
+        texts_or_docs: List[Any] = []
+        for ix in ixs:
+            text_or_doc: Union[str, bytes] = requests[ix][0][0]
+            if isinstance(text_or_doc, bytes):
+                text_or_doc = Doc(nlp.vocab).from_bytes(text_or_doc)
+            texts_or_docs.append(text_or_doc)
+        for ix, doc in zip(ixs, nlp.pipe(texts_or_docs, disable=list(disable))):
+            results[ix] = doc.to_bytes(exclude=["tensor", "user_data"])
+    if len(requests) > 1:
+        logger.debug(f"Processed {len(requests)} spacy requests in one batch.")
+    return results
+
+
+def _stanza_batch(pipeline: Any, requests: List[Tuple[Sequence[Any], Dict[str, Any]]]
+                  ) -> List[Tuple[List[List[Dict[str, Any]]], str]]:
+    import stanza
+
+    documents: List[Any] = pipeline.bulk_process([stanza.Document([], text=args[0]) for args, _ in requests])
+    if len(requests) > 1:
+        logger.debug(f"Processed {len(requests)} stanza requests in one batch.")
+    return [(document.to_dict(), document.text) for document in documents]
+
+
+_HANDLERS: Dict[str, Dict[str, Callable]] = {
+    "sbert": {"encode": _sbert_encode},
+    "bert": {"forward": _bert_forward},
+    "spacy": {"pipe_names": lambda nlp: list(nlp.pipe_names)}
+}
+
+
+class ModelServer:
+    """
+    Local server that holds resources once and serves them to the worker processes on the same host.
+
+    Worker processes use the model server if the environment variable WANNADB_MODEL_SERVER is set to its address. Their
+    resource manager then creates lightweight proxies for the BERT, SBERT, spacy, and stanza resources instead of
+    loading the models themselves. All other resources are still loaded by the worker processes.
+    """
+
+    def __init__(self, address: str, resource_identifiers: List[str]) -> None:
+        """
+        Initialize the model server.
+
+        :param address: 'host:port' or path of a unix socket to listen on, must not be a wildcard address
+        :param resource_identifiers: identifiers of the resources to load before serving
+        """
+        super(ModelServer, self).__init__()
+        self._address: Union[str, Tuple[str, int]] = _parse_address(address)
+        if isinstance(self._address, tuple) and self._address[0] in _WILDCARD_HOSTS:
+            message: str = f"The model server must not listen on all network interfaces ('{address}')!"
+            logger.error(message)
+            raise ValueError(message)
+        self._authkey: bytes = _authkey()  # fail before loading the resources if no secret is configured
+        self._resource_identifiers: List[str] = resource_identifiers
+        self._workers: Dict[str, _ResourceWorker] = {}
+        self._workers_lock: threading.Lock = threading.Lock()
+        self._manager: Optional[ResourceManager] = None
+        self._ready: threading.Event = threading.Event()
+        self._shutdown: threading.Event = threading.Event()
+
+    def serve_forever(self) -> None:
+        """Load the resources and serve requests until the server is shut down."""
+        with ResourceManager(use_model_server=False) as manager:
+            self._manager = manager
+            for resource_identifier in self._resource_identifiers:
+                self._worker(resource_identifier)
+
+            if isinstance(self._address, str) and os.path.exists(self._address):
+                os.remove(self._address)  # stale socket of a previous run
+            with Listener(self._address, authkey=self._authkey) as listener:
+                self._ready.set()
+                logger.info(f"Model server is listening on {self._address}.")
+                while True:
+                    try:
+                        connection: Connection = listener.accept()
+                    except Exception as e:  # failed authentication etc.
+                        logger.warning(f"Rejected connection to the model server: {e}")
+                        continue
+                    if self._shutdown.is_set():
+                        connection.close()
+                        break
+                    threading.Thread(target=self._serve_connection, args=(connection,), daemon=True).start()
+
+            for worker in self._workers.values():
+                worker.stop()
+            if resources.MANAGER is manager:
+                resources.MANAGER = None
+        logger.info("Model server has shut down.")
+
+    def wait_until_ready(self, timeout: Optional[float] = None) -> bool:
+        """Wait until the server has loaded its resources and accepts connections."""
+        return self._ready.wait(timeout)
+
+    def shutdown(self) -> None:
+        """Stop accepting connections and unload the resources."""
+        self._shutdown.set()
+        if self._ready.is_set():
+            # wake up the listener, which is blocked in accept
+            Client(self._address, authkey=self._authkey).close()
+
+    def _worker(self, resource_identifier: str) -> _ResourceWorker:
+        with self._workers_lock:
+            if resource_identifier not in self._workers.keys():
+                if resource_identifier not in RESOURCES.keys() \
+                        or _resource_kind(RESOURCES[resource_identifier]) is None:
+                    raise ValueError(f"Resource '{resource_identifier}' cannot be served by the model server!")
+                self._manager.load(resource_identifier)
+                self._workers[resource_identifier] = _ResourceWorker(resource_identifier, self._manager[resource_identifier])
+            return self._workers[resource_identifier]
+
+    def _serve_connection(self, connection: Connection) -> None:
+        with connection:
+            while True:
+                try:
+                    resource_identifier, method, args, kwargs = connection.recv()
+                except (EOFError, OSError):
+                    break
+
+                try:
+                    if method == "load":
+                        self._worker(resource_identifier)
+                        result: Any = None
+                    else:
+                        result: Any = self._worker(resource_identifier)(method, args, kwargs)
+                    connection.send(("ok", result))
+                except Exception as e:
+                    logger.error(f"Model server request '{method}' for '{resource_identifier}' failed: {e}")
+                    connection.send(("error", f"{type(e).__name__}: {e}"))
+
+
+########################################################################################################################
+# client
+########################################################################################################################
+
+
+class ModelServerClient:
+    """Client that sends requests to the model server, using one connection per thread."""
+
+    def __init__(self, address: str) -> None:
+        """
+        Initialize the client.
+
+        :param address: 'host:port' or path of a unix socket of the model server
+        """
+        super(ModelServerClient, self).__init__()
+        self._address: Union[str, Tuple[str, int]] = _parse_address(address)
+        self._local: threading.local = threading.local()
+
+    def _connection(self) -> Connection:
+        # connections must not be shared with processes forked after their creation
+        if getattr(self._local, "pid", None) != os.getpid():
+            self._local.connection = self._connect()
+            self._local.pid = os.getpid()
+        return self._local.connection
+
+    def _connect(self) -> Connection:
+        # the model server may still be loading its models (e.g. if it has been started together with the workers)
+        authkey: bytes = _authkey()
+        deadline: float = time.monotonic() + _connect_timeout()
+        delay: float = 0.1
+        while True:
+            try:
+                return Client(self._address, authkey=authkey)
+            except (ConnectionRefusedError, FileNotFoundError, OSError) as e:
+                if time.monotonic() + delay > deadline:
+                    logger.error(f"Could not connect to the model server at {self._address}: {e}")
+                    raise
+                logger.info(f"Waiting for the model server at {self._address}: {e}")
+                time.sleep(delay)
+                delay = min(delay * 2, 5.0)
+
+    def request(self, resource_identifier: str, method: str, *args: Any, **kwargs: Any) -> Any:
+        """
+        Send a request to the model server and wait for the result.
+
+        :param resource_identifier: identifier of the resource
+        :param method: method to invoke on the resource
+        :return: result of the request
+        """
+        connection: Connection = self._connection()
+        connection.send((resource_identifier, method, args, kwargs))
+        status, result = connection.recv()
+        if status != "ok":
+            logger.error(f"Model server request '{method}' for '{resource_identifier}' failed: {result}")
+            raise RuntimeError(f"Model server request '{method}' for '{resource_identifier}' failed: {result}")
+        return result
+
+    def close(self) -> None:
+        """Close the connection of the current thread."""
+        if getattr(self._local, "pid", None) == os.getpid():
+            self._local.connection.close()
+            del self._local.pid
+
+
+class _RemoteSentenceTransformer:
+    """Stand-in for a SentenceTransformer that encodes texts on the model server."""
+
+    def __init__(self, client: ModelServerClient, resource_identifier: str) -> None:
+        self._client: ModelServerClient = client
+        self._resource_identifier: str = resource_identifier
+
+    def encode(self, sentences: Union[str, List[str]], batch_size: int = 32, show_progress_bar: bool = False,
+               **kwargs: Any) -> np.ndarray:
+        if isinstance(sentences, str):
+            return self.encode([sentences], batch_size, show_progress_bar)[0]
+        return self._client.request(self._resource_identifier, "encode", list(sentences), batch_size=batch_size)
+
+
+class _RemoteBertModel:
+    """Stand-in for a BertModel that runs the forward pass on the model server."""
+
+    def __init__(self, client: ModelServerClient, resource_identifier: str) -> None:
+        self._client: ModelServerClient = client
+        self._resource_identifier: str = resource_identifier
+
+    def to(self, device: Any) -> "_RemoteBertModel":
+        return self
+
+    def __call__(self, input_ids: Any, token_type_ids: Any, attention_mask: Any) -> Tuple[Any]:
+        import torch
+
+        last_hidden_state: np.ndarray = self._client.request(
+            self._resource_identifier, "forward",
+            input_ids.cpu().numpy(), token_type_ids.cpu().numpy(), attention_mask.cpu().numpy()
+        )
+        return torch.from_numpy(last_hidden_state),
+
+
+class _RemoteLanguage:
+    """Stand-in for a spacy Language that runs the pipeline on the model server."""
+
+    def __init__(self, client: ModelServerClient, resource_identifier: str) -> None:
+        from spacy.vocab import Vocab
+
+        self._client: ModelServerClient = client
+        self._resource_identifier: str = resource_identifier
+        self.vocab: Vocab = Vocab()
+        self.pipe_names: List[str] = client.request(resource_identifier, "pipe_names")
+
+    def __call__(self, text: Any, disable: Sequence[str] = ()) -> Any:
+        from spacy.tokens import Doc
+
+        data: bytes = self._client.request(
+            self._resource_identifier, "call",
+            text if isinstance(text, str) else text.to_bytes(exclude=["tensor", "user_data"]),
+            disable=list(disable)
+        )
+        return Doc(self.vocab).from_bytes(data)
+
+
+class _RemoteStanzaPipeline:
+    """Stand-in for a stanza Pipeline that processes the texts on the model server."""
+
+    def __init__(self, client: ModelServerClient, resource_identifier: str) -> None:
+        self._client: ModelServerClient = client
+        self._resource_identifier: str = resource_identifier
+
+    def __call__(self, text: str) -> Any:
+        import stanza
+
+        sentences, text = self._client.request(self._resource_identifier, "call", text)
+        document = stanza.Document(sentences, text=text)
+        document.build_ents()
+        return document
+
+
+class RemoteResource:
+    """
+    Proxy for a resource that is held by the model server.
+
+    The resource manager accesses ('resource') and unloads ('unload') it like a loaded resource. It is not a resource
+    class itself, since it is created by 'load_remote_resource' and not by the resource manager.
+    """
+
+    def __init__(self, resource_identifier: str, resource: Any) -> None:
+        self._resource_identifier: str = resource_identifier
+        self._resource: Any = resource
+
+    def unload(self) -> None:
+        del self._resource
+
+    @property
+    def resource(self) -> Any:
+        return self._resource
+
+
+_CLIENTS: Dict[str, ModelServerClient] = {}
+_CLIENTS_LOCK: threading.Lock = threading.Lock()
+
+
+def load_remote_resource(resource_identifier: str, address: str) -> Optional[RemoteResource]:
+    """
+    Create a proxy for the resource with the given identifier that is served by the model server.
+
+    :param resource_identifier: identifier of the resource
+    :param address: address of the model server
+    :return: proxy for the resource or None if the resource cannot be served by the model server
+    """
+    resource_class: Type[BaseResource] = RESOURCES[resource_identifier]
+    kind: Optional[str] = _resource_kind(resource_class)
+    if kind is None:
+        return None
+
+    with _CLIENTS_LOCK:
+        if address not in _CLIENTS.keys():
+            _CLIENTS[address] = ModelServerClient(address)
+        client: ModelServerClient = _CLIENTS[address]
+    client.request(resource_identifier, "load")
+
+    if kind == "sbert":
+        return RemoteResource(resource_identifier, _RemoteSentenceTransformer(client, resource_identifier))
+    elif kind == "bert":
+        # the tokenizer is small and runs in the worker process
+        return RemoteResource(resource_identifier, {
+            "tokenizer": resource_class.load_tokenizer(),
+            "model": _RemoteBertModel(client, resource_identifier),
+            "device": None
+        })
+    elif kind == "spacy":
+        return RemoteResource(resource_identifier, _RemoteLanguage(client, resource_identifier))
+    else:
+        return RemoteResource(resource_identifier, _RemoteStanzaPipeline(client, resource_identifier))
+
+
+def init_argparse() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        description="Serve the models of WannaDB to the worker processes on this host."
+    )
+    parser.add_argument(
+        "--address", type=str, default=os.environ.get(MODEL_SERVER_ADDRESS_VARIABLE, "localhost:6060"),
+        help="'host:port' or path of a unix socket to listen on (wildcard addresses like 0.0.0.0 are rejected)"
+    )
+    parser.add_argument(
+        "--resources", type=str, nargs="*",
+        default=["StanzaNERPipeline", "SpacyEnCoreWebLg", "SBERTBertLargeNliMeanTokensResource", "BertLargeCasedResource"],
+        help="identifiers of the resources to load at startup"
+    )
+    return parser
+
+
+def main() -> None:
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+    args = init_argparse().parse_args()
+    ModelServer(args.address, args.resources).serve_forever()
+
+
+if __name__ == "__main__":
+    main()
@@ -7,11 +7,12 @@ from typing import Any, Dict, List, Optional, Set
 
 import numpy as np
 
-from wannadb import resources
+from wannadb import profiling, resources
 from wannadb.configuration import BasePipelineElement, register_configurable_element
-from wannadb.data.data import Attribute, DocumentBase, InformationNugget
+from wannadb.data.data import Attribute, ContextSentence, DocumentBase, InformationNugget
 from wannadb.data.signals import ContextSentenceEmbeddingSignal, LabelEmbeddingSignal, RelativePositionSignal, \
-    TextEmbeddingSignal, UserProvidedExamplesSignal, NaturalLanguageLabelSignal, CachedContextSentenceSignal
+    TextEmbeddingSignal, UserProvidedExamplesSignal, NaturalLanguageLabelSignal, CachedContextSentenceSignal, \
+    TokenOffsetsSignal
 from wannadb.interaction import BaseInteractionCallback
 from wannadb.statistics import Statistics
 from wannadb.status import BaseStatusCallback
@@ -126,28 +127,68 @@ class BaseSBERTEmbedder(BaseEmbedder, abc.ABC):
     """Base class for all embedders based on SBERT."""
     identifier: str = "BaseSBERTEmbedder"
 
-    def __init__(self, sbert_resource_identifier: str) -> None:
+    def __init__(self, sbert_resource_identifier: str, batch_size: int = 64) -> None:
         """
         Initialize the embedder.
 
         :param sbert_resource_identifier: identifier of the SBERT model resource
+        :param batch_size: number of texts that SBERT encodes at once
         """
         super(BaseSBERTEmbedder, self).__init__()
         self._sbert_resource_identifier: str = sbert_resource_identifier
+        self._batch_size: int = batch_size
 
         # preload required resources
         resources.MANAGER.load(self._sbert_resource_identifier)
         logger.debug(f"Initialized '{self.identifier}'.")
 
+    @property
+    def resource_identifiers(self) -> List[str]:
+        return [self._sbert_resource_identifier]
+
+    def _encode(self, texts: List[str], statistics: Statistics) -> List[np.ndarray]:
+        """
+        Compute the SBERT embeddings of the given texts.
+
+        Each distinct text is encoded only once. The distinct texts are sorted by length so that the batches contain texts
+        of similar length and require little padding.
+
+        :param texts: list of texts to embed
+        :param statistics: statistics object to collect statistics
+        :return: list of embeddings in the same order as the texts
+        """
+        text_indices: Dict[str, int] = {}
+        for text in texts:
+            if text not in text_indices.keys():
+                text_indices[text] = len(text_indices)
+        unique_texts: List[str] = list(text_indices.keys())
+        statistics["num_texts"] += len(texts)
+        statistics["num_unique_texts"] += len(unique_texts)
+
+        if unique_texts == []:
+            return []
+
+        order: List[int] = sorted(range(len(unique_texts)), key=lambda ix: len(unique_texts[ix]), reverse=True)
+        sorted_embeddings: np.ndarray = resources.MANAGER[self._sbert_resource_identifier].encode(
+            [unique_texts[ix] for ix in order], batch_size=self._batch_size, show_progress_bar=False
+        )
+        profiling.count("texts", len(unique_texts))
+        unique_embeddings: List[Optional[np.ndarray]] = [None] * len(unique_texts)
+        for ix, embedding in zip(order, sorted_embeddings):
+            unique_embeddings[ix] = embedding
+
+        return [unique_embeddings[text_indices[text]] for text in texts]
+
     def to_config(self) -> Dict[str, Any]:
         return {
             "identifier": self.identifier,
-            "sbert_resource_identifier": self._sbert_resource_identifier
+            "sbert_resource_identifier": self._sbert_resource_identifier,
+            "batch_size": self._batch_size
         }
 
     @classmethod
     def from_config(cls, config: Dict[str, Any]) -> "BaseSBERTEmbedder":
-        return cls(config["sbert_resource_identifier"])
+        return cls(config["sbert_resource_identifier"], config.get("batch_size", 64))
 
 
 @register_configurable_element
@@ -175,9 +216,7 @@ class SBERTLabelEmbedder(BaseSBERTEmbedder):
             statistics: Statistics
     ) -> None:
         texts: List[str] = [nugget[NaturalLanguageLabelSignal] for nugget in nuggets]
-        embeddings: List[np.ndarray] = resources.MANAGER[self._sbert_resource_identifier].encode(
-            texts, show_progress_bar=False
-        )
+        embeddings: List[np.ndarray] = self._encode(texts, statistics)
 
         for nugget, embedding in zip(nuggets, embeddings):
             nugget[LabelEmbeddingSignal] = LabelEmbeddingSignal(embedding)
@@ -190,9 +229,7 @@ class SBERTLabelEmbedder(BaseSBERTEmbedder):
             statistics: Statistics
     ) -> None:
         texts: List[str] = [attribute[NaturalLanguageLabelSignal] for attribute in attributes]
-        embeddings: List[np.ndarray] = resources.MANAGER[self._sbert_resource_identifier].encode(
-            texts, show_progress_bar=False
-        )
+        embeddings: List[np.ndarray] = self._encode(texts, statistics)
 
         for attribute, embedding in zip(attributes, embeddings):
             attribute[LabelEmbeddingSignal] = LabelEmbeddingSignal(embedding)
@@ -223,9 +260,7 @@ class SBERTTextEmbedder(BaseSBERTEmbedder):
             statistics: Statistics
     ) -> None:
         texts: List[str] = [nugget.text for nugget in nuggets]
-        embeddings: List[np.ndarray] = resources.MANAGER[self._sbert_resource_identifier].encode(
-            texts, show_progress_bar=False
-        )
+        embeddings: List[np.ndarray] = self._encode(texts, statistics)
 
         for nugget, embedding in zip(nuggets, embeddings):
             nugget[TextEmbeddingSignal] = TextEmbeddingSignal(embedding)
@@ -255,13 +290,19 @@ class SBERTExamplesEmbedder(BaseSBERTEmbedder):
             status_callback: BaseStatusCallback,
             statistics: Statistics
     ) -> None:
+        # compute the embeddings of all attributes' examples at once
+        texts: List[str] = []
+        for attribute in attributes:
+            texts += attribute[UserProvidedExamplesSignal]
+        all_embeddings: List[np.ndarray] = self._encode(texts, statistics)
+
+        offset: int = 0
         for ix, attribute in enumerate(attributes):
             self._use_status_callback_for_embedder(status_callback, "attributes", ix, len(attributes))
-            texts: List[str] = attribute[UserProvidedExamplesSignal]
-            if texts != []:
-                embeddings: List[np.ndarray] = resources.MANAGER[self._sbert_resource_identifier].encode(
-                    texts, show_progress_bar=False
-                )
+            num_examples: int = len(attribute[UserProvidedExamplesSignal])
+            embeddings: List[np.ndarray] = all_embeddings[offset:offset + num_examples]
+            offset += num_examples
+            if embeddings != []:
                 embedding: np.ndarray = np.mean(embeddings, axis=0)
                 attribute[TextEmbeddingSignal] = TextEmbeddingSignal(embedding)
                 statistics["num_has_examples"] += 1
@@ -296,9 +337,7 @@ class SBERTContextSentenceEmbedder(BaseSBERTEmbedder):
         texts: List[str] = [nugget[CachedContextSentenceSignal]["text"] for nugget in nuggets]
 
         # compute embeddings
-        embeddings: List[np.ndarray] = resources.MANAGER[self._sbert_resource_identifier].encode(
-            texts, show_progress_bar=False
-        )
+        embeddings: List[np.ndarray] = self._encode(texts, statistics)
 
         for nugget, embedding in zip(nuggets, embeddings):
             nugget[ContextSentenceEmbeddingSignal] = ContextSentenceEmbeddingSignal(embedding)
@@ -310,14 +349,17 @@ class BERTContextSentenceEmbedder(BaseEmbedder):
     Context sentence embedder based on BERT.
 
     Computes the context embedding of an InformationNugget as the mean of the final hidden states of the tokens that make up
-    the nugget in its context sentence.
+    the nugget in its context sentence. If the context sentence knows its tokens, BERT's tokenizer only splits these
+    words into word pieces instead of tokenizing the raw sentence again.
     """
     identifier: str = "BERTContextSentenceEmbedder"
 
     required_signal_identifiers: Dict[str, List[str]] = {
         "nuggets": [CachedContextSentenceSignal.identifier],
         "attributes": [],
-        "documents": []
+        "documents": [
+            # can use (but not required): TokenOffsetsSignal.identifier
+        ]
     }
 
     generated_signal_identifiers: Dict[str, List[str]] = {
@@ -339,6 +381,10 @@ class BERTContextSentenceEmbedder(BaseEmbedder):
         resources.MANAGER.load(self._bert_resource_identifier)
         logger.debug(f"Initialized '{self.identifier}'.")
 
+    @property
+    def resource_identifiers(self) -> List[str]:
+        return [self._bert_resource_identifier]
+
     def _embed_nuggets(
             self,
             nuggets: List[InformationNugget],
@@ -346,6 +392,7 @@ class BERTContextSentenceEmbedder(BaseEmbedder):
             status_callback: BaseStatusCallback,
             statistics: Statistics
     ) -> None:
+        import torch
 
         if resources.MANAGER[self._bert_resource_identifier]["device"] is not None:
             resources.MANAGER[self._bert_resource_identifier]["model"].to(
@@ -360,6 +407,7 @@ class BERTContextSentenceEmbedder(BaseEmbedder):
             end_in_context: int = nugget[CachedContextSentenceSignal]["end_char"]
 
             device = resources.MANAGER[self._bert_resource_identifier]["device"]
+            tokenizer = resources.MANAGER[self._bert_resource_identifier]["tokenizer"]
 
             def set_arguments(**kwargs):
                 def wrapper(f):
@@ -367,7 +415,7 @@ class BERTContextSentenceEmbedder(BaseEmbedder):
 
                 return wrapper
 
-            @set_arguments(device=device, tokenizer=resources.MANAGER[self._bert_resource_identifier]["tokenizer"])
+            @set_arguments(device=device, tokenizer=tokenizer)
             def get_encoding_data_with_limited_tokens_for_context(context_sentence, start_in_context, end_in_context,
                                                                   device=None, tokenizer=None,
                                                                   limit=512):
@@ -451,28 +499,58 @@ class BERTContextSentenceEmbedder(BaseEmbedder):
 
                 return input_ids, token_type_ids, attention_mask, char_to_token, context_sentence
 
-            input_ids, token_type_ids, attention_mask, char_to_token, context_sentence = get_encoding_data_with_limited_tokens_for_context(context_sentence,
-                                                                                                                                           start_in_context,
-                                                                                                                                           end_in_context)
+            # reuse the tokenization of the document if the context sentence knows its tokens
+            token_indices: Optional[List[int]] = None
+            token_offsets: Optional[np.ndarray] = None
+            if isinstance(nugget[CachedContextSentenceSignal], ContextSentence):
+                token_offsets = nugget[CachedContextSentenceSignal].token_offsets
+            if token_offsets is not None and len(token_offsets) > 0:
+                words: List[str] = [context_sentence[start:end] for start, end in token_offsets.tolist()]
+                encoding = tokenizer(words, is_split_into_words=True, return_tensors="pt")
+                if len(encoding.input_ids[0]) <= 512:
+                    statistics["num_pretokenized_context_sentences"] += 1
+                    input_ids, token_type_ids, attention_mask = \
+                        encoding.input_ids, encoding.token_type_ids, encoding.attention_mask
+                    if device is not None:
+                        input_ids = input_ids.to(device)
+                        token_type_ids = token_type_ids.to(device)
+                        attention_mask = attention_mask.to(device)
+
+                    # the nugget is made up of the words that overlap with it
+                    token_indices_set: Set[int] = set()
+                    for word_ix, (start, end) in enumerate(token_offsets.tolist()):
+                        if start < end_in_context and end > start_in_context:
+                            span = encoding.word_to_tokens(word_ix)
+                            if span is not None:
+                                token_indices_set.update(range(span.start, span.end))
+                    token_indices = sorted(token_indices_set)
+
+            if token_indices is None:
+                input_ids, token_type_ids, attention_mask, char_to_token, context_sentence = \
+                    get_encoding_data_with_limited_tokens_for_context(
+                        context_sentence, start_in_context, end_in_context
+                    )
 
-            outputs = resources.MANAGER[self._bert_resource_identifier]["model"](
-                input_ids=input_ids,
-                token_type_ids=token_type_ids,
-                attention_mask=attention_mask
-            )
+                # determine which tokens make up the nugget
+                token_indices_set: Set[int] = set()
+                for char_ix in range(start_in_context, end_in_context):
+                    token_ix: Optional[int] = char_to_token(char_ix)
+                    if token_ix is not None:
+                        token_indices_set.add(token_ix)
+                token_indices = list(token_indices_set)
+
+            with torch.inference_mode():
+                outputs = resources.MANAGER[self._bert_resource_identifier]["model"](
+                    input_ids=input_ids,
+                    token_type_ids=token_type_ids,
+                    attention_mask=attention_mask
+                )
             torch_output = outputs[0].detach()
+            profiling.count("texts", 1)
             if device is not None:
                 torch_output = torch_output.cpu()
             output: np.ndarray = torch_output[0].numpy()
 
-            # determine which tokens make up the nugget
-            token_indices_set: Set[int] = set()
-            for char_ix in range(start_in_context, end_in_context):
-                token_ix: Optional[int] = char_to_token(char_ix)
-                if token_ix is not None:
-                    token_indices_set.add(token_ix)
-            token_indices: List[int] = list(token_indices_set)
-
             if token_indices == []:
                 statistics["num_no_token_indices"] += 1
                 logger.error(f"There are no token indices for nugget '{nugget.text}' in '{context_sentence}'!")
@@ -497,18 +575,24 @@ class BERTContextSentenceEmbedder(BaseEmbedder):
 @register_configurable_element
 class RelativePositionEmbedder(BaseEmbedder):
     """
-    Position embedder that embeds the character position of a nugget relative to the start and end of the document.
+    Position embedder that embeds the position of a nugget relative to the start and end of the document.
+
+    The position is the index of the nugget's first token relative to the document's tokens if the document has been
+    tokenized and the nugget's start char relative to the document's text otherwise.
 
     works on InformationNuggets:
     required signals: start_char and document.text
     produced signals: RelativePositionSignal
     """
     identifier: str = "RelativePositionEmbedder"
+    is_document_local: bool = True
 
     required_signal_identifiers: Dict[str, List[str]] = {
         "nuggets": [],
         "attributes": [],
-        "documents": []
+        "documents": [
+            # can use (but not required): TokenOffsetsSignal.identifier
+        ]
     }
 
     generated_signal_identifiers: Dict[str, List[str]] = {
@@ -528,9 +612,22 @@ class RelativePositionEmbedder(BaseEmbedder):
             status_callback: BaseStatusCallback,
             statistics: Statistics
     ) -> None:
+        # start chars of the tokens of the nuggets' documents if they have been tokenized
+        token_start_chars: Dict[str, Optional[np.ndarray]] = {}
         for ix, nugget in enumerate(nuggets):
             self._use_status_callback_for_embedder(status_callback, "nuggets", ix, len(nuggets))
-            if len(nugget.document.text) == 0:
+            if nugget.document.name not in token_start_chars.keys():
+                token_start_chars[nugget.document.name] = None
+                if TokenOffsetsSignal.identifier in nugget.document.signals.keys():
+                    token_start_chars[nugget.document.name] = nugget.document[TokenOffsetsSignal][:, 0]
+
+            start_chars: Optional[np.ndarray] = token_start_chars[nugget.document.name]
+            if start_chars is not None and len(start_chars) > 0:
+                # index of the token that contains the nugget's start char
+                token_ix: int = max(int(np.searchsorted(start_chars, nugget.start_char, side="right")) - 1, 0)
+                nugget[RelativePositionSignal] = RelativePositionSignal(token_ix / len(start_chars))
+                statistics["num_token_position"] += 1
+            elif len(nugget.document.text) == 0:
                 nugget[RelativePositionSignal] = RelativePositionSignal(0)
                 statistics["num_text_is_empty"] += 1
             else:
@@ -585,6 +682,10 @@ class FastTextLabelEmbedder(BaseEmbedder):
         resources.MANAGER.load(self._embedding_resource_identifier)
         logger.debug(f"Initialized '{self.identifier}'.")
 
+    @property
+    def resource_identifiers(self) -> List[str]:
+        return [self._embedding_resource_identifier]
+
     def _compute_embedding(self, label: str, statistics: Statistics) -> LabelEmbeddingSignal:
         """
         Compute the embedding of the given label.
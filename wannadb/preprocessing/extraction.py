@@ -1,20 +1,27 @@
 import abc
 import json
 import logging
-from typing import Any, Dict, List
+import re
+from collections import defaultdict
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, DefaultDict, Dict, List, Optional, TYPE_CHECKING, Tuple
 
+import numpy as np
 import requests
-from spacy.tokens import Doc
 
 from wannadb import resources
 from wannadb.configuration import register_configurable_element, BasePipelineElement
-from wannadb.data.data import DocumentBase, InformationNugget
-from wannadb.data.signals import LabelSignal, POSTagsSignal, SentenceStartCharsSignal
+from wannadb.data.data import Document, DocumentBase, InformationNugget
+from wannadb.data.signals import LabelSignal, POSTagsSignal, SentenceStartCharsSignal, TokenOffsetsSignal
 from wannadb.interaction import BaseInteractionCallback
 from wannadb.resources import StanzaNERPipeline, FigerNERPipeline
-from wannadb.statistics import Statistics
+from wannadb.statistics import Counter, Statistics
 from wannadb.status import BaseStatusCallback
 
+if TYPE_CHECKING:
+    from spacy.language import Language
+    from spacy.tokens import Doc
+
 logger: logging.Logger = logging.getLogger(__name__)
 
 
@@ -25,6 +32,86 @@ class BaseExtractor(BasePipelineElement, abc.ABC):
     Extractors derive the information nuggets from the documents.
     """
     identifier: str = "BaseExtractor"
+    is_document_local: bool = True
+    runs_exclusively: bool = True
+
+
+def _has_document_analysis(document: Document) -> bool:
+    """Check whether the document has already been segmented and tokenized by another extractor."""
+    return SentenceStartCharsSignal.identifier in document.signals.keys() \
+        and TokenOffsetsSignal.identifier in document.signals.keys()
+
+
+def _store_document_analysis(
+        document: Document,
+        sentence_start_chars: List[int],
+        token_offsets: Optional[List[Tuple[int, int]]]
+) -> bool:
+    """
+    Store the sentence and token boundaries of the document unless another extractor has already done so.
+
+    The first extractor that analyzes a document determines its segmentation and tokenization, which all later pipeline
+    elements share. Extractors that run later must not overwrite it.
+
+    :param document: document to store the boundaries for
+    :param sentence_start_chars: indices of the first characters in each sentence
+    :param token_offsets: (start char, end char) pairs of the tokens or None if the extractor does not tokenize
+    :return: True if the boundaries have been stored, else False
+    """
+    if SentenceStartCharsSignal.identifier in document.signals.keys():
+        return False
+
+    document[SentenceStartCharsSignal] = SentenceStartCharsSignal(sentence_start_chars)
+    if token_offsets is not None:
+        document[TokenOffsetsSignal] = TokenOffsetsSignal(np.array(token_offsets, dtype=np.int32).reshape(-1, 2))
+    return True
+
+
+def _add_label_counts(label_dist: Statistics, label_counts: Dict[str, int]) -> None:
+    """
+    Add the numbers of nuggets per label to the label distribution.
+
+    :param label_dist: statistics object of the label distribution
+    :param label_counts: number of nuggets per label
+    """
+    for label, count in label_counts.items():
+        label_dist.counter(label).add(count)
+
+
+def _doc_from_token_offsets(nlp: "Language", text: str, token_offsets: np.ndarray) -> "Doc":
+    """
+    Create a spacy document from the given token boundaries instead of running spacy's tokenizer.
+
+    Whitespace between the tokens is represented in the same way spacy's tokenizer does it, so that the character
+    offsets of the resulting document are identical to those in the text.
+
+    :param nlp: spacy model that provides the vocabulary
+    :param text: text of the document
+    :param token_offsets: (start char, end char) pairs of the tokens
+    :return: spacy document
+    """
+    words: List[str] = []
+    spaces: List[bool] = []
+
+    def add_gap(gap: str) -> None:
+        if gap != "" and gap[0] == " " and words != [] and not spaces[-1]:
+            spaces[-1] = True
+            gap = gap[1:]
+        if gap != "":
+            words.append(gap)
+            spaces.append(False)
+
+    position: int = 0
+    for start_char, end_char in token_offsets.tolist():
+        add_gap(text[position:start_char])
+        words.append(text[start_char:end_char])
+        spaces.append(False)
+        position = end_char
+    add_gap(text[position:])
+
+    from spacy.tokens import Doc
+
+    return Doc(nlp.vocab, words=words, spaces=spaces)
 
 
 ########################################################################################################################
@@ -38,6 +125,9 @@ class SpacyNERExtractor(BaseExtractor):
 
     identifier: str = "SpacyNERExtractor"
 
+    # pipeline components that only serve to segment the document into sentences
+    _segmentation_components: Tuple[str, ...] = ("parser", "senter", "sentencizer")
+
     required_signal_identifiers: Dict[str, List[str]] = {
         "nuggets": [],
         "attributes": [],
@@ -47,22 +137,30 @@ class SpacyNERExtractor(BaseExtractor):
     generated_signal_identifiers: Dict[str, List[str]] = {
         "nuggets": [LabelSignal.identifier, POSTagsSignal.identifier],
         "attributes": [],
-        "documents": [SentenceStartCharsSignal.identifier]
+        "documents": [SentenceStartCharsSignal.identifier, TokenOffsetsSignal.identifier]
     }
 
-    def __init__(self, spacy_resource_identifier: str) -> None:
+    def __init__(self, spacy_resource_identifier: str, reuse_tokenization: bool = True) -> None:
         """
         Initialize the SpacyNERExtractor.
 
         :param spacy_resource_identifier: identifier of the spacy model resource
+        :param reuse_tokenization: whether to run spacy's NER on the tokens of an extractor that ran before (e.g. stanza)
+            instead of tokenizing and segmenting the document again (the entities may differ slightly from those on
+            spacy's own tokenization)
         """
         super(SpacyNERExtractor, self).__init__()
         self._spacy_resource_identifier: str = spacy_resource_identifier
+        self._reuse_tokenization: bool = reuse_tokenization
 
         # preload required resources
         resources.MANAGER.load(self._spacy_resource_identifier)
         logger.debug(f"Initialized '{self.identifier}'.")
 
+    @property
+    def resource_identifiers(self) -> List[str]:
+        return [self._spacy_resource_identifier]
+
     def _call(
             self,
             document_base: DocumentBase,
@@ -72,17 +170,30 @@ class SpacyNERExtractor(BaseExtractor):
     ) -> None:
         statistics["num_documents"] = len(document_base.documents)
 
+        nlp: "Language" = resources.MANAGER[self._spacy_resource_identifier]
+
+        num_nuggets: Counter = statistics.counter("num_nuggets")
+        entity_type_counts: DefaultDict[str, int] = defaultdict(int)
+
         for ix, document in enumerate(document_base.documents):
             self._use_status_callback(status_callback, ix, len(document_base.documents))
 
-            spacy_output: Doc = resources.MANAGER[self._spacy_resource_identifier](document.text)
-            sentence_start_chars: List[int] = []
-
-            # transform the spacy output into the document and nuggets
-            for sentence in spacy_output.sents:
-                sentence_start_chars.append(sentence.start_char)
+            if self._reuse_tokenization and _has_document_analysis(document):
+                # reuse the existing tokenization and skip spacy's sentence segmentation
+                spacy_output: "Doc" = _doc_from_token_offsets(nlp, document.text, document[TokenOffsetsSignal])
+                spacy_output = nlp(spacy_output, disable=[
+                    name for name in nlp.pipe_names if name in self._segmentation_components
+                ])
+                statistics["num_reused_document_analysis"] += 1
+            else:
+                spacy_output: "Doc" = nlp(document.text)
 
-            document[SentenceStartCharsSignal] = SentenceStartCharsSignal(sentence_start_chars)
+                # transform the spacy output into the document and nuggets
+                _store_document_analysis(
+                    document,
+                    [sentence.start_char for sentence in spacy_output.sents],
+                    [(token.idx, token.idx + len(token)) for token in spacy_output if not token.is_space]
+                )
 
             for entity in spacy_output.ents:
                 nugget: InformationNugget = InformationNugget(
@@ -96,18 +207,22 @@ class SpacyNERExtractor(BaseExtractor):
 
                 document.nuggets.append(nugget)
 
-                statistics["num_nuggets"] += 1
-                statistics["spacy_entity_type_dist"][entity.label_] += 1
+                num_nuggets.add()
+                entity_type_counts[entity.label_] += 1
+
+        # the counters are resolved once per entity type
+        _add_label_counts(statistics["spacy_entity_type_dist"], entity_type_counts)
 
     def to_config(self) -> Dict[str, Any]:
         return {
             "identifier": self.identifier,
-            "spacy_resource_identifier": self._spacy_resource_identifier
+            "spacy_resource_identifier": self._spacy_resource_identifier,
+            "reuse_tokenization": self._reuse_tokenization
         }
 
     @classmethod
     def from_config(cls, config: Dict[str, Any]) -> "SpacyNERExtractor":
-        return cls(config["spacy_resource_identifier"])
+        return cls(config["spacy_resource_identifier"], config.get("reuse_tokenization", True))
 
 
 @register_configurable_element
@@ -125,7 +240,7 @@ class StanzaNERExtractor(BaseExtractor):
     generated_signal_identifiers: Dict[str, List[str]] = {
         "nuggets": [LabelSignal.identifier, POSTagsSignal.identifier],
         "attributes": [],
-        "documents": [SentenceStartCharsSignal.identifier]
+        "documents": [SentenceStartCharsSignal.identifier, TokenOffsetsSignal.identifier]
     }
 
     def __init__(self) -> None:
@@ -136,6 +251,10 @@ class StanzaNERExtractor(BaseExtractor):
         resources.MANAGER.load(StanzaNERPipeline)
         logger.debug(f"Initialized '{self.identifier}'.")
 
+    @property
+    def resource_identifiers(self) -> List[str]:
+        return [StanzaNERPipeline.identifier]
+
     def _call(
             self,
             document_base: DocumentBase,
@@ -145,16 +264,21 @@ class StanzaNERExtractor(BaseExtractor):
     ) -> None:
         statistics["num_documents"] = len(document_base.documents)
 
+        num_nuggets: Counter = statistics.counter("num_nuggets")
+        entity_type_counts: DefaultDict[str, int] = defaultdict(int)
+
         for ix, document in enumerate(document_base.documents):
             self._use_status_callback(status_callback, ix, len(document_base.documents))
 
             stanza_output = resources.MANAGER[StanzaNERPipeline](document.text)
 
             sentence_start_chars: List[int] = []
+            token_offsets: List[Tuple[int, int]] = []
 
             # transform the stanza output into the document and nuggets
             for sentence in stanza_output.sentences:
                 sentence_start_chars.append(sentence.tokens[0].start_char)
+                token_offsets += [(token.start_char, token.end_char) for token in sentence.tokens]
 
                 for entity in sentence.entities:
                     nugget: InformationNugget = InformationNugget(
@@ -168,10 +292,14 @@ class StanzaNERExtractor(BaseExtractor):
 
                     document.nuggets.append(nugget)
 
-                    statistics["num_nuggets"] += 1
-                    statistics["stanza_entity_type_dist"][entity.type] += 1
+                    num_nuggets.add()
+                    entity_type_counts[entity.type] += 1
 
-            document[SentenceStartCharsSignal] = SentenceStartCharsSignal(sentence_start_chars)
+            if not _store_document_analysis(document, sentence_start_chars, token_offsets):
+                statistics["num_kept_document_analysis"] += 1
+
+        # the counters are resolved once per entity type
+        _add_label_counts(statistics["stanza_entity_type_dist"], entity_type_counts)
 
     def to_config(self) -> Dict[str, Any]:
         return {
@@ -183,11 +311,54 @@ class StanzaNERExtractor(BaseExtractor):
         return cls()
 
 
+def _split_into_chunks(text: str, max_chunk_chars: int) -> List[Tuple[int, str]]:
+    """
+    Split the given text into sentence-aligned chunks that are not longer than the given limit.
+
+    Sentences are approximated by splitting after sentence-final punctuation. Sentences that are longer than the limit
+    are split at the last whitespace before the limit (or hard at the limit if there is no whitespace).
+
+    :param text: text to split
+    :param max_chunk_chars: maximum number of characters per chunk
+    :return: list of (start char of the chunk in the text, text of the chunk) tuples
+    """
+    if len(text) <= max_chunk_chars:
+        return [(0, text)]
+
+    # determine the (approximate) sentence boundaries
+    boundaries: List[int] = [0] + [match.end() for match in re.finditer(r"[.!?]+\s+", text)] + [len(text)]
+
+    pieces: List[Tuple[int, int]] = []
+    for start, end in zip(boundaries[:-1], boundaries[1:]):
+        while end - start > max_chunk_chars:
+            split: int = text.rfind(" ", start + 1, start + max_chunk_chars)
+            split = split + 1 if split != -1 else start + max_chunk_chars
+            pieces.append((start, split))
+            start = split
+        if end > start:
+            pieces.append((start, end))
+
+    # greedily merge the pieces into chunks
+    chunks: List[Tuple[int, str]] = []
+    chunk_start, chunk_end = pieces[0]
+    for start, end in pieces[1:]:
+        if end - chunk_start <= max_chunk_chars:
+            chunk_end = end
+        else:
+            chunks.append((chunk_start, text[chunk_start:chunk_end]))
+            chunk_start, chunk_end = start, end
+    chunks.append((chunk_start, text[chunk_start:chunk_end]))
+    return chunks
+
+
 @register_configurable_element
 class FigerNERExtractor(BaseExtractor):
     """
     Extractor based on Figer's NER model
     (using CoreNLP for basic extraction and fine-graned labeling on top).
+
+    Documents that are longer than the server's limit are split into sentence-aligned chunks. The chunks of all
+    documents are sent to the server concurrently and the chunk-local offsets are translated back into document offsets.
     """
 
     identifier: str = "FigerNERExtractor"
@@ -204,14 +375,52 @@ class FigerNERExtractor(BaseExtractor):
         "documents": [SentenceStartCharsSignal.identifier]
     }
 
-    def __init__(self) -> None:
-        """Initialize the FigerNERExtractor."""
+    def __init__(self, max_workers: int = 8, max_chunk_chars: int = 8000, timeout: float = 300) -> None:
+        """
+        Initialize the FigerNERExtractor.
+
+        :param max_workers: maximum number of concurrent requests to the FIGER server
+        :param max_chunk_chars: maximum number of characters the FIGER server accepts per request
+        :param timeout: timeout of a single request in seconds
+        """
         super().__init__()
+        self._max_workers: int = max_workers
+        self._max_chunk_chars: int = max_chunk_chars
+        self._timeout: float = timeout
 
         # preload required resources
         resources.MANAGER.load(FigerNERPipeline)
         logger.debug(f"Initialized '{self.identifier}'.")
 
+    def _run_figer(self, session: requests.Session, url: str, text: str) -> Optional[Dict[str, Any]]:
+        """
+        Run FIGER on the given text.
+
+        :param session: pooled HTTP session
+        :param url: URL of the FIGER server
+        :param text: text to process
+        :return: FIGER's answer or None if the request failed
+        """
+        try:
+            r = session.get(url, params={"text": text}, timeout=self._timeout)
+        except requests.exceptions.RequestException as e:
+            logger.warning(f"Request to FIGER failed with error '{e}'")
+            return None
+
+        if r.status_code != 200:
+            logger.warning(f"Request to FIGER failed with status code {r.status_code}")
+            return None
+
+        answer: Dict[str, Any] = json.loads(r.text)
+        if answer["status"] != 200:
+            logger.warning(f"FIGER failed with error '{answer['error']}'")
+            return None
+        return answer
+
+    @property
+    def resource_identifiers(self) -> List[str]:
+        return [FigerNERPipeline.identifier]
+
     def _call(
             self,
             document_base: DocumentBase,
@@ -221,27 +430,49 @@ class FigerNERExtractor(BaseExtractor):
     ) -> None:
         statistics["num_documents"] = len(document_base.documents)
 
-        base_url = resources.MANAGER[FigerNERPipeline]
-
-        for ix, document in enumerate(document_base.documents):
-            self._use_status_callback(status_callback, ix, len(document_base.documents))
-
-            # Run FIGER on document (truncate to first 8000 chars if necessary due to server limitations)
-            r = requests.get(base_url, params={'text': document.text[:8000]})
-            if r.status_code == 200:
-                answer = json.loads(r.text)
-                if answer["status"] == 200:
-                    sentence_start_chars: List[int] = answer["sentence_offsets"]
+        url: str = resources.MANAGER[FigerNERPipeline]["url"]
+        # the session keeps one connection alive for each worker
+        session: requests.Session = resources.MANAGER[FigerNERPipeline]["session"](self._max_workers)
+
+        with ThreadPoolExecutor(max_workers=self._max_workers) as executor:
+            # submit the chunks of all documents so that the server is kept busy
+            futures: List[List[Tuple[int, Future]]] = []
+            for document in document_base.documents:
+                chunks: List[Tuple[int, str]] = _split_into_chunks(document.text, self._max_chunk_chars)
+                statistics["num_chunks"] += len(chunks)
+                if len(chunks) > 1:
+                    statistics["num_chunked_documents"] += 1
+                futures.append([
+                    (chunk_start, executor.submit(self._run_figer, session, url, chunk_text))
+                    for chunk_start, chunk_text in chunks
+                ])
+
+            num_nuggets: Counter = statistics.counter("num_nuggets")
+            label_counts: DefaultDict[str, int] = defaultdict(int)
+
+            # collect the answers in document order
+            for ix, (document, document_futures) in enumerate(zip(document_base.documents, futures)):
+                self._use_status_callback(status_callback, ix, len(document_base.documents))
+
+                sentence_start_chars: List[int] = []
+                num_failed_chunks: int = 0
+                for chunk_start, future in document_futures:
+                    answer: Optional[Dict[str, Any]] = future.result()
+                    if answer is None:
+                        num_failed_chunks += 1
+                        statistics["num_failed_chunks"] += 1
+                        sentence_start_chars.append(chunk_start)  # chunks are sentence-aligned
+                        continue
+
+                    sentence_start_chars += [chunk_start + offset for offset in answer["sentence_offsets"]]
 
                     for raw_nugget in answer["data"]:
                         nugget: InformationNugget = InformationNugget(
                             document=document,
-                            start_char=raw_nugget["start_char"],
-                            end_char=raw_nugget["end_char"]
+                            start_char=chunk_start + raw_nugget["start_char"],
+                            end_char=chunk_start + raw_nugget["end_char"]
                         )
 
-                        # nugget[POSTagsSignal] = POSTagsSignal([word.xpos for word in entity.words])
-
                         # Label format from FIGER is e.g.
                         # "/location@1.4898770776826524,/organization/company@0.17639383484191654,/location/country@0.25034040521054085"
                         # Extract first label (without numeric value)
@@ -249,20 +480,29 @@ class FigerNERExtractor(BaseExtractor):
                         nugget[LabelSignal] = LabelSignal(label_string)
                         document.nuggets.append(nugget)
 
-                        statistics["num_nuggets"] += 1
-                        statistics["figer_label_dist"][label_string] += 1
+                        num_nuggets.add()
+                        label_counts[label_string] += 1
 
-                    document[SentenceStartCharsSignal] = SentenceStartCharsSignal(sentence_start_chars)
+                if num_failed_chunks == len(document_futures):
+                    logger.warning(f"Failed to run FIGER on document '{document.name}'")
+                    statistics["num_failed_documents"] += 1
                 else:
-                    print(logger.warning(f"Failed to run FIGER on document '{document.name}' with error '{answer['error']}'"))
-            else:
-                logger.warning(f"Failed to run FIGER on document '{document.name}'")
+                    if num_failed_chunks > 0:
+                        logger.warning(f"Failed to run FIGER on {num_failed_chunks} chunks of document "
+                                       f"'{document.name}'")
+                    _store_document_analysis(document, sorted(set(sentence_start_chars)), None)
+
+        # the counters are resolved once per label
+        _add_label_counts(statistics["figer_label_dist"], label_counts)
 
     def to_config(self) -> Dict[str, Any]:
         return {
-            "identifier": self.identifier
+            "identifier": self.identifier,
+            "max_workers": self._max_workers,
+            "max_chunk_chars": self._max_chunk_chars,
+            "timeout": self._timeout
         }
 
     @classmethod
     def from_config(cls, config: Dict[str, Any]) -> "FigerNERExtractor":
-        return cls()
+        return cls(config.get("max_workers", 8), config.get("max_chunk_chars", 8000), config.get("timeout", 300))
@@ -21,6 +21,7 @@ class BaseLabelParaphraser(BasePipelineElement, abc.ABC):
     attributes) into a natural language string that works well with natural language embeddings.
     """
     identifier: str = "BaseLabelParaphraser"
+    is_document_local: bool = True
 
     def _use_status_callback_for_label_paraphrasers(
             self,
@@ -19,6 +19,7 @@ class BaseNormalizer(BasePipelineElement, abc.ABC):
     Normalizers derive the value of an information nuggets from its mention text.
     """
     identifier: str = "BaseNormalizer"
+    is_document_local: bool = True
 
 
 ########################################################################################################################
@@ -1,10 +1,13 @@
+import bisect
 import logging
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Optional
+
+import numpy as np
 
 from wannadb.configuration import BasePipelineElement, register_configurable_element
-from wannadb.data.data import DocumentBase, InformationNugget
-from wannadb.data.signals import CachedContextSentenceSignal, \
-    SentenceStartCharsSignal
+from wannadb.data.data import ContextSentence, DocumentBase, InformationNugget
+from wannadb.data.signals import CachedContextSentenceSignal, LabelSignal, LabelsSignal, \
+    SentenceStartCharsSignal, TokenOffsetsSignal
 from wannadb.interaction import BaseInteractionCallback
 from wannadb.statistics import Statistics
 from wannadb.status import BaseStatusCallback
@@ -12,16 +15,136 @@ from wannadb.status import BaseStatusCallback
 logger: logging.Logger = logging.getLogger(__name__)
 
 
+@register_configurable_element
+class NuggetDeduplicator(BasePipelineElement):
+    """
+    Merges nuggets of the same document that refer to identical or heavily overlapping spans.
+
+    Two spans overlap heavily if the number of characters they share divided by the number of characters they cover
+    together is at least the given threshold. The nugget that comes first in the document's list of nuggets is kept,
+    so that the extractor that runs first takes precedence. The labels of all merged nuggets are kept in the
+    LabelsSignal of the remaining nugget.
+    """
+
+    identifier: str = "NuggetDeduplicator"
+    is_document_local: bool = True
+    runs_exclusively: bool = True
+
+    required_signal_identifiers: Dict[str, List[str]] = {
+        "nuggets": [],
+        "attributes": [],
+        "documents": []
+    }
+
+    generated_signal_identifiers: Dict[str, List[str]] = {
+        "nuggets": [LabelsSignal.identifier],
+        "attributes": [],
+        "documents": []
+    }
+
+    def __init__(self, min_overlap: float = 0.8) -> None:
+        """
+        Initialize the NuggetDeduplicator.
+
+        :param min_overlap: minimum ratio of shared characters to covered characters for two nuggets to be merged
+        """
+        super(NuggetDeduplicator, self).__init__()
+        self._min_overlap: float = min_overlap
+        logger.debug(f"Initialized '{self.identifier}'.")
+
+    def _overlap(self, nugget: InformationNugget, other_nugget: InformationNugget) -> float:
+        shared: int = min(nugget.end_char, other_nugget.end_char) - max(nugget.start_char, other_nugget.start_char)
+        covered: int = max(nugget.end_char, other_nugget.end_char) - min(nugget.start_char, other_nugget.start_char)
+        if covered == 0:
+            return 1.0
+        return max(shared, 0) / covered
+
+    def _call(self, document_base: DocumentBase, interaction_callback: BaseInteractionCallback,
+              status_callback: BaseStatusCallback, statistics: Statistics) -> None:
+        statistics["num_documents"] = len(document_base.documents)
+
+        for ix, document in enumerate(document_base.documents):
+            self._use_status_callback(status_callback, ix, len(document_base.documents))
+            statistics["num_nuggets_before"] += len(document.nuggets)
+
+            # sweep over the nuggets ordered by their start chars and only compare with kept nuggets that are still open
+            order: List[int] = sorted(
+                range(len(document.nuggets)),
+                key=lambda i: (document.nuggets[i].start_char, i)
+            )
+            is_kept: List[bool] = [True] * len(document.nuggets)
+            open_nuggets: List[int] = []
+            for nugget_ix in order:
+                nugget: InformationNugget = document.nuggets[nugget_ix]
+                open_nuggets = [i for i in open_nuggets if document.nuggets[i].end_char > nugget.start_char]
+
+                candidates: List[int] = [
+                    i for i in open_nuggets if self._overlap(document.nuggets[i], nugget) >= self._min_overlap
+                ]
+                if candidates == []:
+                    open_nuggets.append(nugget_ix)
+                    continue
+
+                # merge into the nugget that comes first in the document's list of nuggets
+                merged_ix: int = min(candidates)
+                if nugget_ix < merged_ix:
+                    open_nuggets[open_nuggets.index(merged_ix)] = nugget_ix
+                    merged_ix, nugget_ix = nugget_ix, merged_ix
+                    nugget = document.nuggets[nugget_ix]
+                is_kept[nugget_ix] = False
+                self._merge_labels(document.nuggets[merged_ix], nugget)
+
+            num_removed: int = is_kept.count(False)
+            if num_removed > 0:
+                document.nuggets[:] = [nugget for nugget, kept in zip(document.nuggets, is_kept) if kept]
+                statistics["num_nuggets_removed"] += num_removed
+            statistics["num_nuggets_after"] += len(document.nuggets)
+
+    def _merge_labels(self, kept_nugget: InformationNugget, removed_nugget: InformationNugget) -> None:
+        labels: List[str] = self._labels(kept_nugget)
+        for label in self._labels(removed_nugget):
+            if label not in labels:
+                labels.append(label)
+        kept_nugget[LabelsSignal] = LabelsSignal(labels)
+
+    @staticmethod
+    def _labels(nugget: InformationNugget) -> List[str]:
+        if LabelsSignal.identifier in nugget.signals.keys():
+            return list(nugget[LabelsSignal])
+        if LabelSignal.identifier in nugget.signals.keys():
+            return [nugget[LabelSignal]]
+        return []
+
+    def to_config(self) -> Dict[str, Any]:
+        return {
+            "identifier": self.identifier,
+            "min_overlap": self._min_overlap
+        }
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any]) -> "NuggetDeduplicator":
+        return cls(config.get("min_overlap", 0.8))
+
+
 @register_configurable_element
 class ContextSentenceCacher(BasePipelineElement):
-    """Caches a nugget's context sentence."""
+    """
+    Caches a nugget's context sentence.
+
+    If the document has been tokenized by an extractor, the context sentence also refers to the range of its tokens in
+    the document's token offsets, so that later pipeline elements can reuse the tokenization.
+    """
 
     identifier: str = "ContextSentenceCacher"
+    is_document_local: bool = True
 
     required_signal_identifiers: Dict[str, List[str]] = {
         "nuggets": [],
         "attributes": [],
-        "documents": [SentenceStartCharsSignal.identifier]
+        "documents": [
+            SentenceStartCharsSignal.identifier
+            # can use (but not required): TokenOffsetsSignal.identifier
+        ]
     }
 
     generated_signal_identifiers: Dict[str, List[str]] = {
@@ -37,40 +160,51 @@ class ContextSentenceCacher(BasePipelineElement):
 
     def _call(self, document_base: DocumentBase, interaction_callback: BaseInteractionCallback,
               status_callback: BaseStatusCallback, statistics: Statistics) -> None:
-        nuggets: List[InformationNugget] = document_base.nuggets
-        statistics["num_nuggets"] = len(nuggets)
-
-        for nugget in nuggets:
-            sent_start_chars: List[int] = nugget.document[SentenceStartCharsSignal]
-            context_start_char: int = 0
-            context_end_char: int = 0
-            for ix, sent_start_char in enumerate(sent_start_chars):
-                if sent_start_char > nugget.start_char:
-                    if ix == 0:
-                        context_start_char: int = 0
-                        context_end_char: int = sent_start_char
-                        statistics["num_context_sentence_before_first_sentence"] += 1
-                        break
-                    else:
-                        context_start_char: int = sent_start_chars[ix - 1]
-                        context_end_char: int = sent_start_char
-                        statistics["num_context_sentence_is_first_or_inner_sentence"] += 1
-                        break
-            else:
-                if sent_start_chars != []:
-                    context_start_char: int = sent_start_chars[-1]
-                    context_end_char: int = len(nugget.document.text)
-                    statistics["num_context_sentence_is_final_sentence"] += 1
-
-            context_sentence: str = nugget.document.text[context_start_char:context_end_char]
-            start_in_context: int = nugget.start_char - context_start_char
-            end_in_context: int = nugget.end_char - context_start_char
-
-            nugget[CachedContextSentenceSignal] = CachedContextSentenceSignal({
-                "text": context_sentence,
-                "start_char": start_in_context,
-                "end_char": end_in_context
-            })
+        statistics["num_nuggets"] = len(document_base.nuggets)
+
+        for document in document_base.documents:
+            sent_start_chars: List[int] = document[SentenceStartCharsSignal]
+            token_start_chars: Optional[np.ndarray] = None
+            if TokenOffsetsSignal.identifier in document.signals.keys():
+                token_start_chars = document[TokenOffsetsSignal][:, 0]
+
+            for nugget in document.nuggets:
+                context_start_char: int = 0
+                context_end_char: int = 0
+
+                # index of the first sentence that starts after the nugget's start char
+                ix: int = bisect.bisect_right(sent_start_chars, nugget.start_char)
+                if ix == len(sent_start_chars):
+                    if sent_start_chars != []:
+                        context_start_char: int = sent_start_chars[-1]
+                        context_end_char: int = len(document.text)
+                        statistics["num_context_sentence_is_final_sentence"] += 1
+                elif ix == 0:
+                    context_start_char: int = 0
+                    context_end_char: int = sent_start_chars[0]
+                    statistics["num_context_sentence_before_first_sentence"] += 1
+                else:
+                    context_start_char: int = sent_start_chars[ix - 1]
+                    context_end_char: int = sent_start_chars[ix]
+                    statistics["num_context_sentence_is_first_or_inner_sentence"] += 1
+
+                # the tokens of the sentence are those that start in it
+                start_token: Optional[int] = None
+                end_token: Optional[int] = None
+                if token_start_chars is not None:
+                    start_token = int(np.searchsorted(token_start_chars, context_start_char))
+                    end_token = int(np.searchsorted(token_start_chars, context_end_char))
+                    statistics["num_context_sentence_with_tokens"] += 1
+
+                nugget[CachedContextSentenceSignal] = CachedContextSentenceSignal(ContextSentence(
+                    document=document,
+                    sentence_start_char=context_start_char,
+                    sentence_end_char=context_end_char,
+                    start_char=nugget.start_char - context_start_char,
+                    end_char=nugget.end_char - context_start_char,
+                    start_token=start_token,
+                    end_token=end_token
+                ))
 
     def to_config(self) -> Dict[str, Any]:
         return {
@@ -0,0 +1,320 @@
+import contextlib
+import functools
+import json
+import logging
+import sys
+import threading
+import time
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+try:
+    import resource as _rusage
+except ImportError:  # not available on Windows
+    _rusage = None
+
+logger: logging.Logger = logging.getLogger(__name__)
+
+PROFILER: Optional["Profiler"] = None
+
+
+def _peak_rss() -> Optional[int]:
+    """Peak resident set size of the current process in bytes or None if it cannot be determined."""
+    if _rusage is None:
+        return None
+    max_rss: int = _rusage.getrusage(_rusage.RUSAGE_SELF).ru_maxrss
+    # macOS reports bytes, Linux reports kilobytes
+    return max_rss if sys.platform == "darwin" else max_rss * 1024
+
+
+class Profiler:
+    """
+    Profiler that records where the time and memory of a run are spent.
+
+    The profiler records frames, i.e. named sections of the execution like the pipeline and its pipeline elements.
+    Frames are nested, and the measurements are aggregated per stack of frames. For each stack, the profiler records the
+    number of calls, the wall time, the CPU time of the process, the growth of the process's peak resident set size,
+    and the number of processed items (e.g. documents, nuggets, or encoded texts). Furthermore, it records the load
+    times of the resources.
+
+    The profiler implements the singleton pattern like the resource manager and should always be accessed using the
+    profiling.PROFILER module variable. When no profiler is active, the helper functions of this module return
+    immediately. To profile a program, use the profiler as a Python context manager:
+
+    with Profiler() as profiler:
+        pipeline(document_base, interaction_callback, status_callback, statistics)
+    profiler.save_report("profile.json")
+    profiler.save_folded_stacks("profile.folded")
+
+    The CPU time is measured for the whole process, so it includes the other threads that run concurrently, but not the
+    worker processes of the pipeline.
+    """
+
+    def __init__(self) -> None:
+        """Initialize the Profiler."""
+        super(Profiler, self).__init__()
+        self._frames: Dict[Tuple[str, ...], Dict[str, Any]] = {}
+        self._resource_loads: Dict[str, Dict[str, Any]] = {}
+        self._lock: threading.Lock = threading.Lock()
+        self._local: threading.local = threading.local()
+        self._tick: Optional[float] = None
+        self._tack: Optional[float] = None
+
+    def __enter__(self) -> "Profiler":
+        """
+        Activate the profiler.
+
+        :return: the profiler itself
+        """
+        global PROFILER
+
+        if PROFILER is not None:
+            logger.error("There can only be one active profiler!")
+            assert False, "There can only be one active profiler!"
+        PROFILER = self
+        self._tick = time.perf_counter()
+        logger.info("Activated the profiler.")
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        """Deactivate the profiler."""
+        global PROFILER
+
+        self._tack = time.perf_counter()
+        PROFILER = None
+        logger.info("Deactivated the profiler.")
+
+    @property
+    def stack(self) -> Tuple[str, ...]:
+        """Stack of frames of the current thread."""
+        return tuple(self._stack())
+
+    def _stack(self) -> List[str]:
+        stack: Optional[List[str]] = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = []
+            self._local.stack = stack
+        return stack
+
+    @contextlib.contextmanager
+    def frame(self, name: str) -> Iterator[None]:
+        """
+        Record the execution of the enclosed code as a frame on top of the current thread's stack.
+
+        :param name: name of the frame
+        """
+        stack: List[str] = self._stack()
+        stack.append(name)
+        path: Tuple[str, ...] = tuple(stack)
+        peak_rss_before: Optional[int] = _peak_rss()
+        cpu_tick: float = time.process_time()
+        tick: float = time.perf_counter()
+        try:
+            yield
+        finally:
+            tack: float = time.perf_counter()
+            cpu_tack: float = time.process_time()
+            peak_rss_after: Optional[int] = _peak_rss()
+            stack.pop()
+            with self._lock:
+                entry: Dict[str, Any] = self._entry(path)
+                entry["num_calls"] += 1
+                entry["wall_time"] += tack - tick
+                entry["cpu_time"] += cpu_tack - cpu_tick
+                if peak_rss_before is not None and peak_rss_after is not None:
+                    entry["peak_rss_delta"] += peak_rss_after - peak_rss_before
+
+    @contextlib.contextmanager
+    def stack_of(self, stack: Tuple[str, ...]) -> Iterator[None]:
+        """
+        Record the frames of the enclosed code on top of the given stack, e.g. the stack of the submitting thread.
+
+        :param stack: stack of frames to continue
+        """
+        previous_stack: Optional[List[str]] = getattr(self._local, "stack", None)
+        self._local.stack = list(stack)
+        try:
+            yield
+        finally:
+            self._local.stack = previous_stack
+
+    def count(self, kind: str, num: int) -> None:
+        """
+        Add processed items to the frame on top of the current thread's stack.
+
+        :param kind: kind of items, e.g. 'documents', 'nuggets', or 'texts'
+        :param num: number of items
+        """
+        path: Tuple[str, ...] = tuple(self._stack())
+        with self._lock:
+            items: Dict[str, int] = self._entry(path)["items"]
+            items[kind] = items.get(kind, 0) + num
+
+    def record_resource_load(self, resource_identifier: str, load_time: float, size: int) -> None:
+        """
+        Record that a resource has been loaded.
+
+        :param resource_identifier: identifier of the resource
+        :param load_time: time it took to load the resource in seconds
+        :param size: approximate size of the resource in bytes
+        """
+        with self._lock:
+            if resource_identifier not in self._resource_loads.keys():
+                self._resource_loads[resource_identifier] = {"num_loads": 0, "load_time": 0.0, "size": 0}
+            entry: Dict[str, Any] = self._resource_loads[resource_identifier]
+            entry["num_loads"] += 1
+            entry["load_time"] += load_time
+            entry["size"] = max(entry["size"], size)
+
+    def _entry(self, path: Tuple[str, ...]) -> Dict[str, Any]:
+        if path not in self._frames.keys():
+            self._frames[path] = {"num_calls": 0, "wall_time": 0.0, "cpu_time": 0.0, "peak_rss_delta": 0, "items": {}}
+        return self._frames[path]
+
+    def to_report(self) -> Dict[str, Any]:
+        """
+        Obtain a JSON-serializable report of the measurements.
+
+        :return: JSON-serializable report
+        """
+        with self._lock:
+            frames: Dict[Tuple[str, ...], Dict[str, Any]] = {path: dict(entry) for path, entry in self._frames.items()}
+            resource_loads: Dict[str, Dict[str, Any]] = {
+                identifier: dict(entry) for identifier, entry in self._resource_loads.items()
+            }
+
+        if self._tick is None:
+            total_time: Optional[float] = None
+        else:
+            total_time: Optional[float] = (self._tack if self._tack is not None else time.perf_counter()) - self._tick
+
+        report_frames: List[Dict[str, Any]] = []
+        for path, entry in frames.items():
+            wall_time: float = entry["wall_time"]
+            report_frames.append({
+                "stack": list(path),
+                "num_calls": entry["num_calls"],
+                "wall_time": wall_time,
+                "self_time": self._self_time(path, frames),
+                "cpu_time": entry["cpu_time"],
+                "peak_rss_delta": entry["peak_rss_delta"],
+                "items": dict(entry["items"]),
+                "items_per_second": {
+                    kind: num / wall_time if wall_time > 0 else None for kind, num in entry["items"].items()
+                }
+            })
+
+        return {
+            "total_time": total_time,
+            "frames": report_frames,
+            "resource_loads": resource_loads
+        }
+
+    @staticmethod
+    def _self_time(path: Tuple[str, ...], frames: Dict[Tuple[str, ...], Dict[str, Any]]) -> float:
+        # children that run concurrently may take longer than their parent
+        children_time: float = sum(
+            entry["wall_time"] for child_path, entry in frames.items()
+            if len(child_path) == len(path) + 1 and child_path[:-1] == path
+        )
+        return max(frames[path]["wall_time"] - children_time, 0.0)
+
+    def to_folded_stacks(self) -> str:
+        """
+        Obtain the measurements in the folded stack format of flame graph tools like flamegraph.pl and speedscope.
+
+        Each line consists of the semicolon-separated stack of frames and the frame's self time in microseconds.
+
+        :return: folded stacks
+        """
+        report: Dict[str, Any] = self.to_report()
+        lines: List[str] = []
+        for frame in report["frames"]:
+            self_time: int = round(frame["self_time"] * 1_000_000)
+            if self_time > 0:
+                stack: str = ";".join(name.replace(";", ",").replace(" ", "_") for name in frame["stack"])
+                lines.append(f"{stack} {self_time}")
+        return "\n".join(lines) + "\n" if lines != [] else ""
+
+    def save_report(self, path: str) -> None:
+        """
+        Save the report as a JSON file.
+
+        :param path: path of the JSON file
+        """
+        with open(path, "w", encoding="utf-8") as file:
+            json.dump(self.to_report(), file, indent=4)
+        logger.info(f"Saved the profiling report to '{path}'.")
+
+    def save_folded_stacks(self, path: str) -> None:
+        """
+        Save the folded stacks for flame graph tools.
+
+        :param path: path of the file
+        """
+        with open(path, "w", encoding="utf-8") as file:
+            file.write(self.to_folded_stacks())
+        logger.info(f"Saved the folded stacks to '{path}'.")
+
+
+########################################################################################################################
+# helpers that do nothing if no profiler is active
+########################################################################################################################
+
+
+def frame(name: str) -> contextlib.AbstractContextManager:
+    """
+    Record the execution of the enclosed code as a frame if a profiler is active.
+
+    :param name: name of the frame
+    :return: context manager
+    """
+    profiler: Optional[Profiler] = PROFILER
+    if profiler is None:
+        return contextlib.nullcontext()
+    return profiler.frame(name)
+
+
+def count(kind: str, num: int) -> None:
+    """
+    Add processed items to the current frame if a profiler is active.
+
+    :param kind: kind of items, e.g. 'documents', 'nuggets', or 'texts'
+    :param num: number of items
+    """
+    profiler: Optional[Profiler] = PROFILER
+    if profiler is not None:
+        profiler.count(kind, num)
+
+
+def record_resource_load(resource_identifier: str, load_time: float, size: int) -> None:
+    """
+    Record that a resource has been loaded if a profiler is active.
+
+    :param resource_identifier: identifier of the resource
+    :param load_time: time it took to load the resource in seconds
+    :param size: approximate size of the resource in bytes
+    """
+    profiler: Optional[Profiler] = PROFILER
+    if profiler is not None:
+        profiler.record_resource_load(resource_identifier, load_time, size)
+
+
+def with_current_stack(function: Callable) -> Callable:
+    """
+    Wrap the function so that its frames continue the current thread's stack when it is executed in another thread.
+
+    :param function: function to wrap
+    :return: wrapped function or the function itself if no profiler is active
+    """
+    profiler: Optional[Profiler] = PROFILER
+    if profiler is None:
+        return function
+
+    stack: Tuple[str, ...] = profiler.stack
+
+    @functools.wraps(function)
+    def wrapper(*args, **kwargs):
+        with profiler.stack_of(stack):
+            return function(*args, **kwargs)
+
+    return wrapper
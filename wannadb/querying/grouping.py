@@ -22,6 +22,7 @@ class BaseGrouper(BasePipelineElement, abc.ABC):
     A grouper can group rows based on their matches for an attribute.
     """
     identifier: str = "BaseGrouper"
+    runs_exclusively: bool = True
 
 
 @register_configurable_element
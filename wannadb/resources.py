@@ -1,20 +1,30 @@
 import abc
 import logging
+import mmap
 import os
+import threading
 import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from concurrent.futures import Future, ThreadPoolExecutor
 from subprocess import Popen
-from typing import Any, Dict, List, Optional, Type, Union
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Set, TYPE_CHECKING, Type, Union
 
 import numpy as np
 import requests
-import spacy
-import spacy.cli.download
-import stanza
-import torch
-from sentence_transformers import SentenceTransformer
-from spacy.language import Language
-from stanza import Pipeline
-from transformers import BertModel, BertTokenizer, BertTokenizerFast
+import requests.adapters
+
+from wannadb import batching, profiling
+
+# the machine learning libraries take several seconds to import, so they are only imported when a resource is loaded
+if TYPE_CHECKING:
+    import torch
+    from sentence_transformers import SentenceTransformer
+    from spacy.language import Language
+    from stanza import Pipeline
+    from transformers import BertModel, BertTokenizer
+
+    from wannadb.model_server import RemoteResource
 
 logger: logging.Logger = logging.getLogger(__name__)
 
@@ -60,6 +70,15 @@ class BaseResource(abc.ABC):
 MANAGER: Optional["ResourceManager"] = None
 
 
+def _current_rss() -> Optional[int]:
+    """Resident set size of the current process in bytes or None if it cannot be determined."""
+    try:
+        with open("/proc/self/statm", "r") as file:
+            return int(file.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError, AttributeError):
+        return None
+
+
 class ResourceManager:
     """
     The resource manager provides the system with access to shared resources (e.g. embeddings).
@@ -69,10 +88,21 @@ class ResourceManager:
     resource manager should always be accessed using the resources.MANAGER module variable. To set up the resource
     manager in a program, use it as a Python context manager to make sure that all resources are closed when the
     program finishes.
+
+    The resource manager can enforce a memory budget. It tracks the approximate size of each resource as the growth of
+    the process's resident set size while loading it. Resources are loaded one after another so that the growth is not
+    attributed to the wrong resource. If the loaded resources exceed the budget, the least recently used resources that
+    are not in use ('pinned') are unloaded. They are loaded again transparently when they are accessed the next time.
+    Resources can be prefetched in a background thread ('prefetch') so that they are available when they are needed.
     """
 
-    def __init__(self) -> None:
-        """Initialize the resource manager."""
+    def __init__(self, use_model_server: bool = True, memory_budget: Optional[int] = None) -> None:
+        """
+        Initialize the resource manager.
+
+        :param use_model_server: whether to access the models through the model server if WANNADB_MODEL_SERVER is set
+        :param memory_budget: memory budget in bytes, defaults to WANNADB_RESOURCE_MEMORY_BUDGET_MB or no budget
+        """
         global MANAGER
 
         # check that this is the only resource manager
@@ -82,7 +112,23 @@ class ResourceManager:
         else:
             MANAGER = self
 
-        self._resources: Dict[str, BaseResource] = {}
+        # loaded resources ordered from least recently to most recently used
+        self._resources: "OrderedDict[str, Union[BaseResource, RemoteResource]]" = OrderedDict()
+        self._sizes: Dict[str, int] = {}
+        self._evicted: Set[str] = set()
+        self._loading: Dict[str, Future] = {}
+        self._pins: Dict[str, int] = {}
+        self._lock: threading.RLock = threading.RLock()
+        self._load_lock: threading.Lock = threading.Lock()
+        self._prefetch_executor: Optional[ThreadPoolExecutor] = None
+        self._model_server_address: Optional[str] = os.environ.get("WANNADB_MODEL_SERVER") if use_model_server else None
+
+        if memory_budget is None and "WANNADB_RESOURCE_MEMORY_BUDGET_MB" in os.environ:
+            memory_budget = int(os.environ["WANNADB_RESOURCE_MEMORY_BUDGET_MB"]) * 1024 * 1024
+        self._memory_budget: Optional[int] = memory_budget
+        if self._memory_budget is not None and _current_rss() is None:
+            logger.warning("The memory budget cannot be enforced since the resident set size of the process cannot be "
+                           "determined on this platform!")
 
         logger.info("Initialized the resource manager.")
 
@@ -100,6 +146,11 @@ class ResourceManager:
         logger.info("Unload all resources.")
         tick: float = time.time()
 
+        # wait for prefetching to finish
+        if self._prefetch_executor is not None:
+            self._prefetch_executor.shutdown(wait=True)
+            self._prefetch_executor = None
+
         # close resources
         for resource_identifier in list(self._resources.keys()):
             self.unload(resource_identifier)
@@ -112,10 +163,19 @@ class ResourceManager:
         resources_str: str = "\n".join(f"- {resource_identifier}" for resource_identifier in self._resources.keys())
         return "Currently loaded resources:\n{}".format(resources_str if resources_str != "" else " -")
 
+    @property
+    def memory_usage(self) -> int:
+        """Approximate memory usage of the loaded resources in bytes."""
+        with self._lock:
+            return sum(self._sizes.values())
+
     def load(self, resource: Union[str, Type[BaseResource]]) -> None:
         """
         Load a resource.
 
+        If the resource is currently being loaded by another thread (e.g. because it has been prefetched), this method
+        waits until it has been loaded.
+
         :param resource: resource class or identifier of the resource to load
         """
         if isinstance(resource, str):
@@ -126,14 +186,128 @@ class ResourceManager:
         if resource_identifier not in RESOURCES.keys():
             logger.error(f"Unknown resource '{resource_identifier}'!")
             assert False, f"Unknown resource '{resource_identifier}'!"
-        elif resource_identifier in self._resources:
-            logger.info(f"Resource '{resource_identifier}' already loaded.")
-        else:
-            logger.info(f"Load resource '{resource_identifier}'.")
-            tick: float = time.time()
-            self._resources[resource_identifier] = RESOURCES[resource_identifier].load()
-            tack: float = time.time()
-            logger.info(f"Loaded resource '{resource_identifier}' in {tack - tick} seconds.")
+
+        with self._lock:
+            if resource_identifier in self._resources:
+                logger.info(f"Resource '{resource_identifier}' already loaded.")
+                self._resources.move_to_end(resource_identifier)
+                return
+            elif resource_identifier in self._loading.keys():
+                future: Optional[Future] = self._loading[resource_identifier]
+            else:
+                future: Optional[Future] = None
+                self._loading[resource_identifier] = Future()
+
+        if future is not None:
+            logger.info(f"Wait for resource '{resource_identifier}' to be loaded.")
+            future.result()
+            return
+
+        try:
+            # loads do not overlap so that the growth of the resident set size belongs to this resource
+            with self._load_lock:
+                logger.info(f"Load resource '{resource_identifier}'.")
+                tick: float = time.time()
+                rss_before: Optional[int] = _current_rss()
+                remote_resource: Optional["RemoteResource"] = None
+                if self._model_server_address is not None:
+                    from wannadb import model_server
+                    remote_resource = model_server.load_remote_resource(resource_identifier, self._model_server_address)
+                if remote_resource is not None:
+                    logger.info(f"Access resource '{resource_identifier}' through the model server.")
+                    loaded_resource: Union[BaseResource, "RemoteResource"] = remote_resource
+                else:
+                    loaded_resource: Union[BaseResource, "RemoteResource"] = RESOURCES[resource_identifier].load()
+                rss_after: Optional[int] = _current_rss()
+                tack: float = time.time()
+
+            with self._lock:
+                self._resources[resource_identifier] = loaded_resource
+                if rss_before is not None and rss_after is not None:
+                    self._sizes[resource_identifier] = max(rss_after - rss_before, 0)
+                else:
+                    self._sizes[resource_identifier] = 0
+                self._evicted.discard(resource_identifier)
+                self._loading.pop(resource_identifier).set_result(None)
+            logger.info(f"Loaded resource '{resource_identifier}' in {tack - tick} seconds "
+                        f"(approx. {self._sizes[resource_identifier] // (1024 * 1024)} MB).")
+            profiling.record_resource_load(resource_identifier, tack - tick, self._sizes[resource_identifier])
+        except BaseException as e:
+            with self._lock:
+                self._loading.pop(resource_identifier).set_exception(e)
+            raise
+
+        self._enforce_memory_budget(resource_identifier)
+
+    def prefetch(self, resources: List[Union[str, Type[BaseResource]]]) -> None:
+        """
+        Load the given resources in a background thread if they are not already loaded.
+
+        :param resources: resource classes or identifiers of the resources to load
+        """
+        for resource in resources:
+            resource_identifier: str = resource if isinstance(resource, str) else resource.identifier
+            with self._lock:
+                if resource_identifier in self._resources or resource_identifier in self._loading.keys():
+                    continue
+                if self._prefetch_executor is None:
+                    self._prefetch_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="prefetch")
+            logger.info(f"Prefetch resource '{resource_identifier}'.")
+            self._prefetch_executor.submit(self._prefetch, resource_identifier)
+
+    def _prefetch(self, resource_identifier: str) -> None:
+        try:
+            self.load(resource_identifier)
+        except BaseException as e:
+            logger.error(f"Unable to prefetch resource '{resource_identifier}': {e}")
+
+    @contextmanager
+    def pinned(self, resources: Iterable[Union[str, Type[BaseResource]]]) -> Iterator[None]:
+        """
+        Context manager that prevents the given resources from being unloaded to stay within the memory budget.
+
+        Pipeline elements pin their resources while they are running. Pins are counted, so the same resource may be
+        pinned by several concurrent users.
+
+        :param resources: resource classes or identifiers of the resources to pin
+        """
+        resource_identifiers: List[str] = [
+            resource if isinstance(resource, str) else resource.identifier for resource in resources
+        ]
+        with self._lock:
+            for resource_identifier in resource_identifiers:
+                self._pins[resource_identifier] = self._pins.get(resource_identifier, 0) + 1
+        try:
+            yield
+        finally:
+            with self._lock:
+                for resource_identifier in resource_identifiers:
+                    self._pins[resource_identifier] -= 1
+                    if self._pins[resource_identifier] == 0:
+                        del self._pins[resource_identifier]
+
+    def _enforce_memory_budget(self, keep_resource_identifier: str) -> None:
+        """
+        Unload the least recently used resources until the loaded resources fit into the memory budget.
+
+        :param keep_resource_identifier: identifier of the resource that must not be unloaded
+        """
+        if self._memory_budget is None:
+            return
+
+        with self._lock:
+            while sum(self._sizes.values()) > self._memory_budget:
+                candidates: List[str] = [
+                    resource_identifier for resource_identifier in self._resources.keys()
+                    if resource_identifier != keep_resource_identifier and resource_identifier not in self._pins
+                ]
+                if candidates == []:
+                    logger.warning(f"The resources in use exceed the memory budget "
+                                   f"({sum(self._sizes.values()) // (1024 * 1024)} MB)!")
+                    break
+                logger.info(f"Evict resource '{candidates[0]}' to stay within the memory budget.")
+                self.unload(candidates[0])
+                self._evicted.add(candidates[0])
 
     def unload(self, resource: Union[str, Type[BaseResource]]) -> None:
         """
@@ -146,24 +320,29 @@ class ResourceManager:
         else:
             resource_identifier: str = resource.identifier
 
-        if resource_identifier not in RESOURCES.keys():
-            logger.error(f"Unknown resource '{resource_identifier}'!")
-            assert False, f"Unknown resource '{resource_identifier}'!"
-        elif resource_identifier not in self._resources:
-            logger.error(f"Resource '{resource_identifier}' is not loaded!")
-            assert False, f"Resource '{resource_identifier}' is not loaded!"
-        else:
-            logger.info(f"Unload resource '{resource_identifier}'.")
-            tick: float = time.time()
-            self._resources[resource_identifier].unload()
-            del self._resources[resource_identifier]
-            tack: float = time.time()
-            logger.info(f"Unloaded resource '{resource_identifier}' in {tack - tick} seconds.")
+        with self._lock:
+            if resource_identifier not in RESOURCES.keys():
+                logger.error(f"Unknown resource '{resource_identifier}'!")
+                assert False, f"Unknown resource '{resource_identifier}'!"
+            elif resource_identifier not in self._resources:
+                logger.error(f"Resource '{resource_identifier}' is not loaded!")
+                assert False, f"Resource '{resource_identifier}' is not loaded!"
+            else:
+                logger.info(f"Unload resource '{resource_identifier}'.")
+                tick: float = time.time()
+                self._resources[resource_identifier].unload()
+                del self._resources[resource_identifier]
+                del self._sizes[resource_identifier]
+                self._evicted.discard(resource_identifier)
+                tack: float = time.time()
+                logger.info(f"Unloaded resource '{resource_identifier}' in {tack - tick} seconds.")
 
     def __getitem__(self, resource: Union[str, Type[BaseResource]]) -> Any:
         """
         Access a resource.
 
+        Resources that have been unloaded to stay within the memory budget are loaded again.
+
         :param resource: resource class or identifier of the resource to load
         :return: the resource
         """
@@ -172,14 +351,22 @@ class ResourceManager:
         else:
             resource_identifier: str = resource.identifier
 
+        with self._lock:
+            loaded_resource: Optional[Union[BaseResource, "RemoteResource"]] = self._resources.get(resource_identifier)
+            if loaded_resource is not None:
+                self._resources.move_to_end(resource_identifier)
+                return loaded_resource.resource
+            do_load: bool = resource_identifier in self._evicted or resource_identifier in self._loading.keys()
+
         if resource_identifier not in RESOURCES.keys():
             logger.error(f"Unknown resource '{resource_identifier}'!")
             assert False, f"Unknown resource '{resource_identifier}'!"
-        elif resource_identifier not in self._resources:
+        elif not do_load:
             logger.error(f"Resource '{resource_identifier}' is not loaded!")
             assert False, f"Resource '{resource_identifier}' is not loaded!"
         else:
-            return self._resources[resource_identifier].resource
+            self.load(resource_identifier)
+            return self[resource_identifier]
 
 
 ########################################################################################################################
@@ -200,8 +387,10 @@ class StanzaNERPipeline(BaseResource):
     def __init__(self) -> None:
         """Initialize the StanzaNERPipeline."""
         super(StanzaNERPipeline, self).__init__()
+        from stanza import Pipeline
+
         path: str = os.path.join(os.path.dirname(__file__), "..", "models", "stanza")
-        self._stanza_ner_pipeline: Pipeline = Pipeline(
+        self._stanza_ner_pipeline: "Pipeline" = Pipeline(
             lang="en", processors="tokenize,mwt,pos,ner", model_dir=path, verbose=False
         )
 
@@ -214,6 +403,7 @@ class StanzaNERPipeline(BaseResource):
         if not os.path.isdir(path):
             path: str = os.path.join(os.path.dirname(__file__), "..", "models", "stanza")
             logger.info("Download the stanza 'en' language package.")
+            import stanza
             stanza.download("en", path)
         return cls()
 
@@ -221,52 +411,257 @@ class StanzaNERPipeline(BaseResource):
         del self._stanza_ner_pipeline
 
     @property
-    def resource(self) -> Pipeline:
+    def resource(self) -> "Pipeline":
         return self._stanza_ner_pipeline
 
 
+class MemmapVocabulary:
+    """
+    Vocabulary that maps words to row indices and is stored on disk in a compact binary format.
+
+    The vocabulary consists of three files: the UTF-8 encoded words in row order ('<prefix>.strings'), the offsets of the
+    words in the strings file ('<prefix>.offsets.npy'), and the rows sorted by their words ('<prefix>.order.npy'). All
+    of them are memory-mapped, so that words are looked up by binary search without creating Python objects for the
+    whole vocabulary and so that several processes share the same physical pages.
+    """
+
+    def __init__(self, prefix: str) -> None:
+        """
+        Open the vocabulary stored at the given path prefix.
+
+        :param prefix: path prefix of the vocabulary files
+        """
+        super(MemmapVocabulary, self).__init__()
+        self._offsets: np.ndarray = np.load(f"{prefix}.offsets.npy", mmap_mode="r")
+        self._order: np.ndarray = np.load(f"{prefix}.order.npy", mmap_mode="r")
+        with open(f"{prefix}.strings", "rb") as file:
+            if os.fstat(file.fileno()).st_size > 0:
+                self._strings: Union[mmap.mmap, bytes] = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+            else:
+                self._strings: Union[mmap.mmap, bytes] = b""
+
+    @staticmethod
+    def exists(prefix: str) -> bool:
+        """Check whether a vocabulary is stored at the given path prefix."""
+        return all(os.path.isfile(f"{prefix}{suffix}") for suffix in (".strings", ".offsets.npy", ".order.npy"))
+
+    @staticmethod
+    def build(words: List[str], prefix: str) -> None:
+        """
+        Store the given words as a vocabulary at the given path prefix.
+
+        If a word occurs more than once, it is mapped to its last row.
+
+        :param words: words in row order
+        :param prefix: path prefix of the vocabulary files
+        """
+        encoded_words: List[bytes] = [word.encode("utf-8") for word in words]
+        offsets: np.ndarray = np.zeros(len(encoded_words) + 1, dtype=np.int64)
+        np.cumsum([len(encoded_word) for encoded_word in encoded_words], out=offsets[1:])
+
+        order: List[int] = sorted(range(len(encoded_words)), key=encoded_words.__getitem__)
+        order = [row for ix, row in enumerate(order)
+                 if ix + 1 == len(order) or encoded_words[order[ix + 1]] != encoded_words[row]]
+
+        # write to temporary files first so that concurrent loaders never see partially written files
+        temp_suffix: str = f".{os.getpid()}.tmp"
+        with open(f"{prefix}.strings{temp_suffix}", "wb") as file:
+            file.write(b"".join(encoded_words))
+        with open(f"{prefix}.offsets.npy{temp_suffix}", "wb") as file:
+            np.save(file, offsets)
+        with open(f"{prefix}.order.npy{temp_suffix}", "wb") as file:
+            np.save(file, np.array(order, dtype=np.int32))
+        for suffix in (".strings", ".offsets.npy", ".order.npy"):
+            os.replace(f"{prefix}{suffix}{temp_suffix}", f"{prefix}{suffix}")
+
+    def __len__(self) -> int:
+        return len(self._offsets) - 1
+
+    def __contains__(self, word: str) -> bool:
+        return self.get(word) is not None
+
+    def __getitem__(self, word: str) -> int:
+        row: Optional[int] = self.get(word)
+        if row is None:
+            raise KeyError(word)
+        return row
+
+    def _encoded_word(self, row: int) -> bytes:
+        return self._strings[int(self._offsets[row]):int(self._offsets[row + 1])]
+
+    def get(self, word: str, default: Optional[int] = None) -> Optional[int]:
+        """
+        Look up the row of the given word.
+
+        :param word: word to look up
+        :param default: value to return if the word is not in the vocabulary
+        :return: row of the word or the default value
+        """
+        encoded_word: bytes = word.encode("utf-8")
+        low: int = 0
+        high: int = len(self._order)
+        while low < high:
+            middle: int = (low + high) // 2
+            if self._encoded_word(int(self._order[middle])) < encoded_word:
+                low = middle + 1
+            else:
+                high = middle
+        if low < len(self._order):
+            row: int = int(self._order[low])
+            if self._encoded_word(row) == encoded_word:
+                return row
+        return default
+
+    def word(self, row: int) -> str:
+        """
+        Get the word of the given row.
+
+        :param row: row of the word
+        :return: the word
+        """
+        if not 0 <= row < len(self):
+            raise IndexError(row)
+        return self._encoded_word(row).decode("utf-8")
+
+    @property
+    def words(self) -> Sequence[str]:
+        """Read-only sequence of the words in row order."""
+        return _MemmapVocabularyWords(self)
+
+    def close(self) -> None:
+        """Close the memory-mapped strings file."""
+        if isinstance(self._strings, mmap.mmap):
+            self._strings.close()
+
+
+class _MemmapVocabularyWords(Sequence):
+    """Read-only sequence view of the words of a MemmapVocabulary."""
+
+    def __init__(self, vocabulary: MemmapVocabulary) -> None:
+        self._vocabulary: MemmapVocabulary = vocabulary
+
+    def __len__(self) -> int:
+        return len(self._vocabulary)
+
+    def __getitem__(self, row: int) -> str:
+        if isinstance(row, slice):
+            return [self._vocabulary.word(ix) for ix in range(*row.indices(len(self)))]
+        if row < 0:
+            row += len(self)
+        return self._vocabulary.word(row)
+
+
+class MemmapWordVectors:
+    """Read-only mapping from words to the rows of a memory-mapped embedding matrix."""
+
+    def __init__(self, vocabulary: MemmapVocabulary, vectors: np.ndarray, num_vectors: Optional[int] = None) -> None:
+        """
+        Initialize the word vectors.
+
+        :param vocabulary: vocabulary that maps the words to rows of the matrix
+        :param vectors: embedding matrix with one row per word
+        :param num_vectors: only consider the first num_vectors rows or None to consider all rows
+        """
+        super(MemmapWordVectors, self).__init__()
+        self._vocabulary: MemmapVocabulary = vocabulary
+        self._vectors: np.ndarray = vectors if num_vectors is None else vectors[:num_vectors]
+
+    def __len__(self) -> int:
+        return len(self._vectors)
+
+    def __contains__(self, word: str) -> bool:
+        row: Optional[int] = self._vocabulary.get(word)
+        return row is not None and row < len(self._vectors)
+
+    def __getitem__(self, word: str) -> np.ndarray:
+        row: Optional[int] = self._vocabulary.get(word)
+        if row is None or row >= len(self._vectors):
+            raise KeyError(word)
+        return self._vectors[row]
+
+    @property
+    def vocabulary(self) -> MemmapVocabulary:
+        """Vocabulary of the word vectors."""
+        return self._vocabulary
+
+    @property
+    def vectors(self) -> np.ndarray:
+        """Embedding matrix of the word vectors."""
+        return self._vectors
+
+
 class BaseFastTextEmbedding(BaseResource, abc.ABC):
     """
     Base class for all FastText embeddings.
 
+    The FastText vectors are converted to a binary float32 matrix and a MemmapVocabulary when they are first loaded.
+    Afterward, both are memory-mapped.
+
     See https://fasttext.cc/
     """
 
     identifier: str = "BaseFastTextEmbedding"
     _num_vectors: Optional[int] = None
 
+    _path: str = os.path.join(os.path.dirname(__file__), "..", "models", "fasttext", "wiki-news-300d-1M-subword.vec")
+
     def __init__(self) -> None:
         """Initialize the FastText embedding."""
         super(BaseFastTextEmbedding, self).__init__()
-        self._fast_text_embedding: Dict[str, np.ndarray] = {}
-        path: str = os.path.join(os.path.dirname(__file__), "..", "models", "fasttext", "wiki-news-300d-1M-subword.vec")
-        with open(path, "r", encoding="utf-8", newline="\n", errors="ignore") as file:
-            _ = file.readline()  # skip number of words, dimension
-            n: int = 0
+        vectors: np.ndarray = np.load(f"{self._path}.npy", mmap_mode="r")
+        vocabulary: MemmapVocabulary = MemmapVocabulary(f"{self._path}.vocab")
+        self._fast_text_embedding: MemmapWordVectors = MemmapWordVectors(vocabulary, vectors, self._num_vectors)
+
+    @classmethod
+    def _convert(cls) -> None:
+        """Convert the FastText text file into the binary matrix and vocabulary."""
+        logger.info("Convert the FastText embedding into the binary format. This is only done once.")
+        tick: float = time.time()
+        temp_path: str = f"{cls._path}.npy.{os.getpid()}.tmp"
+        words: List[str] = []
+        with open(cls._path, "r", encoding="utf-8", newline="\n", errors="ignore") as file:
+            num_words, dimension = (int(part) for part in file.readline().split())
+            vectors: np.ndarray = np.lib.format.open_memmap(
+                temp_path, mode="w+", dtype=np.float32, shape=(num_words, dimension)
+            )
             for line in file:
-                if self._num_vectors is not None and n >= self._num_vectors:
-                    break
-                n += 1
+                if line.strip() == "":
+                    continue
                 parts: List[str] = line.rstrip().split(" ")
-                self._fast_text_embedding[parts[0]] = np.array([float(part) for part in parts[1:]])
+                vectors[len(words)] = np.array(parts[1:], dtype=np.float32)
+                words.append(parts[0])
+            vectors.flush()
+            del vectors
+
+        if len(words) != num_words:
+            os.remove(temp_path)
+            logger.error(f"Expected {num_words} FastText vectors, but found {len(words)}!")
+            assert False, f"Expected {num_words} FastText vectors, but found {len(words)}!"
+
+        MemmapVocabulary.build(words, f"{cls._path}.vocab")
+        os.replace(temp_path, f"{cls._path}.npy")
+        tack: float = time.time()
+        logger.info(f"Converted the FastText embedding in {tack - tick} seconds.")
 
     @classmethod
     def load(cls) -> "BaseFastTextEmbedding":
         # check that the FastText model has been downloaded
         path: str = os.path.join(os.path.dirname(__file__), "..", "models", "fasttext")
         os.makedirs(path, exist_ok=True)
-        path: str = os.path.join(os.path.dirname(__file__), "..", "models", "fasttext", "wiki-news-300d-1M-subword.vec")
-        if not os.path.isfile(path):
-            logger.error("You have to download the model by hand and place it in the appropriate folder!")
-            logger.error("URL: https://fasttext.cc/docs/en/english-vectors.html")
-            assert False, "You have to download the model by hand and place it in the appropriate folder!"
+        if not os.path.isfile(f"{cls._path}.npy") or not MemmapVocabulary.exists(f"{cls._path}.vocab"):
+            if not os.path.isfile(cls._path):
+                logger.error("You have to download the model by hand and place it in the appropriate folder!")
+                logger.error("URL: https://fasttext.cc/docs/en/english-vectors.html")
+                assert False, "You have to download the model by hand and place it in the appropriate folder!"
+            cls._convert()
         return cls()
 
     def unload(self) -> None:
+        self._fast_text_embedding.vocabulary.close()
         del self._fast_text_embedding
 
     @property
-    def resource(self) -> Dict[str, np.ndarray]:
+    def resource(self) -> MemmapWordVectors:
         return self._fast_text_embedding
 
 
@@ -299,10 +694,15 @@ class BaseSpacyResource(BaseResource, abc.ABC):
     def __init__(self) -> None:
         """Initialize the spacy model."""
         super(BaseSpacyResource, self).__init__()
-        self._spacy_nlp: Language = spacy.load(self._spacy_package_str)
+        import spacy
+
+        self._spacy_nlp: "Language" = spacy.load(self._spacy_package_str)
 
     @classmethod
     def load(cls) -> "BaseSpacyResource":
+        import spacy
+        import spacy.cli.download
+
         # download the spacy model if necessary
         if not spacy.util.is_package(cls._spacy_package_str):
             logger.info(f"Download the spacy package '{cls._spacy_package_str}'.")
@@ -316,7 +716,7 @@ class BaseSpacyResource(BaseResource, abc.ABC):
         del self._spacy_nlp
 
     @property
-    def resource(self) -> Language:
+    def resource(self) -> "Language":
         return self._spacy_nlp
 
 
@@ -365,9 +765,11 @@ class SpacyEnCoreSciMd(BaseResource):
     def __init__(self) -> None:
         """Initialize the spacy model."""
         super(BaseResource, self).__init__()
+        import spacy
+
         path: str = os.path.join(os.path.dirname(__file__), "..", "models", "spacy", "en_core_sci_md-0.4.0",
                                  "en_core_sci_md", "en_core_sci_md-0.4.0")
-        self._spacy_nlp: Language = spacy.load(path)
+        self._spacy_nlp: "Language" = spacy.load(path)
 
     @classmethod
     def load(cls) -> "SpacyEnCoreSciMd":
@@ -384,7 +786,7 @@ class SpacyEnCoreSciMd(BaseResource):
         del self._spacy_nlp
 
     @property
-    def resource(self) -> Language:
+    def resource(self) -> "Language":
         return self._spacy_nlp
 
 
@@ -401,9 +803,11 @@ class SpacyEnNerCraftMd(BaseResource):
     def __init__(self) -> None:
         """Initialize the spacy model."""
         super(BaseResource, self).__init__()
+        import spacy
+
         path: str = os.path.join(os.path.dirname(__file__), "..", "models", "spacy", "en_ner_craft_md-0.4.0",
                                  "en_ner_craft_md", "en_ner_craft_md-0.4.0")
-        self._spacy_nlp: Language = spacy.load(path)
+        self._spacy_nlp: "Language" = spacy.load(path)
 
     @classmethod
     def load(cls) -> "SpacyEnNerCraftMd":
@@ -420,10 +824,47 @@ class SpacyEnNerCraftMd(BaseResource):
         del self._spacy_nlp
 
     @property
-    def resource(self) -> Language:
+    def resource(self) -> "Language":
         return self._spacy_nlp
 
 
+def _configure_torch_threads() -> None:
+    """
+    Set the number of threads that torch uses in this process.
+
+    The numbers are taken from the environment variables WANNADB_TORCH_THREADS (intra-op parallelism) and
+    WANNADB_TORCH_INTEROP_THREADS (inter-op parallelism), so that they can be tuned to the number of worker processes per
+    host. If a variable is not set, torch's default is kept.
+    """
+    import torch
+
+    num_threads: Optional[str] = os.environ.get("WANNADB_TORCH_THREADS")
+    if num_threads is not None:
+        torch.set_num_threads(int(num_threads))
+        logger.info(f"Set number of torch threads to {num_threads}.")
+
+    num_interop_threads: Optional[str] = os.environ.get("WANNADB_TORCH_INTEROP_THREADS")
+    if num_interop_threads is not None and torch.get_num_interop_threads() != int(num_interop_threads):
+        try:
+            torch.set_num_interop_threads(int(num_interop_threads))
+            logger.info(f"Set number of torch inter-op threads to {num_interop_threads}.")
+        except RuntimeError:
+            # can only be set once and before any inter-op parallel work has started
+            logger.warning("Unable to set the number of torch inter-op threads after parallel work has started.")
+
+
+def _quantize_model(model: "torch.nn.Module") -> "torch.nn.Module":
+    """
+    Dynamically quantize the linear layers of the given model to int8 for inference on the CPU.
+
+    :param model: model to quantize
+    :return: quantized model
+    """
+    import torch
+
+    return torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+
+
 class BaseBERTResource(BaseResource):
     """
     Base class for all BERT-based resources.
@@ -433,24 +874,52 @@ class BaseBERTResource(BaseResource):
 
     identifier: str = "BaseBERTResource"
     _bert_model_str: str = "BaseBertModelStr"
+    _do_quantize: bool = False
 
     def __init__(self) -> None:
         """Initialize the BERT resource."""
         super(BaseBERTResource, self).__init__()
+        import torch
+        from transformers import BertModel
+
         path: str = os.path.join(os.path.dirname(__file__), "..", "models", "transformers")
 
-        self._tokenizer: BertTokenizer = BertTokenizerFast.from_pretrained(self._bert_model_str, cache_dir=path)
-        self._tokenizer.add_tokens(["[START_MENTION]", "[END_MENTION]", "[MASK]"])
+        self._tokenizer: "BertTokenizer" = self.load_tokenizer()
 
-        self._model: BertModel = BertModel.from_pretrained(self._bert_model_str, cache_dir=path)
+        _configure_torch_threads()
+        self._model: "BertModel" = BertModel.from_pretrained(self._bert_model_str, cache_dir=path)
+        self._model.eval()
 
+        if self._do_quantize:
+            # quantized models only run on the CPU
+            self._model = _quantize_model(self._model)
+            self._device: Optional[Any] = None
+            logger.info(f"Will use int8-quantized BERT model on CPU")
         # Use GPU for BERT model, but only if there is enough GPU RAM available
-        if torch.cuda.is_available() and torch.cuda.get_device_properties(0).total_memory > 4 * 1024 * 1024 * 1024:
+        elif torch.cuda.is_available() and torch.cuda.get_device_properties(0).total_memory > 4 * 1024 * 1024 * 1024:
             self._device: Optional[Any] = torch.device("cuda")
             logger.info(f"Will use GPU for BERT model")
         else:
             self._device: Optional[Any] = None
 
+        # coalesce concurrent forward passes, e.g. from several sessions served by the same worker
+        self._batched_model: Optional[batching.BatchedBertModel] = None
+        if batching.dynamic_batching_enabled():
+            self._batched_model = batching.BatchedBertModel(
+                self._model, self._device, batching.max_batch_size(), batching.max_wait()
+            )
+
+    @classmethod
+    def load_tokenizer(cls) -> "BertTokenizer":
+        """Load only the tokenizer of the BERT model."""
+        from transformers import BertTokenizerFast
+
+        path: str = os.path.join(os.path.dirname(__file__), "..", "models", "transformers")
+        os.makedirs(path, exist_ok=True)
+        tokenizer: "BertTokenizer" = BertTokenizerFast.from_pretrained(cls._bert_model_str, cache_dir=path)
+        tokenizer.add_tokens(["[START_MENTION]", "[END_MENTION]", "[MASK]"])
+        return tokenizer
+
     @classmethod
     def load(cls) -> "BaseBERTResource":
         path: str = os.path.join(os.path.dirname(__file__), "..", "models", "transformers")
@@ -458,6 +927,9 @@ class BaseBERTResource(BaseResource):
         return cls()
 
     def unload(self) -> None:
+        if self._batched_model is not None:
+            self._batched_model.close()
+        del self._batched_model
         del self._tokenizer
         del self._model
         del self._device
@@ -466,7 +938,7 @@ class BaseBERTResource(BaseResource):
     def resource(self) -> Dict[str, Any]:
         return {
             "tokenizer": self._tokenizer,
-            "model": self._model,
+            "model": self._batched_model if self._batched_model is not None else self._model,
             "device": self._device
         }
 
@@ -479,6 +951,15 @@ class BertLargeCasedResource(BaseBERTResource):
     _bert_model_str: str = "bert-large-cased"
 
 
+@register_resource
+class BertLargeCasedInt8Resource(BaseBERTResource):
+    """BERT 'bert-large-cased' model with int8-quantized linear layers for inference on the CPU."""
+
+    identifier: str = "BertLargeCasedInt8Resource"
+    _bert_model_str: str = "bert-large-cased"
+    _do_quantize: bool = True
+
+
 class BaseSBERTResource(BaseResource, abc.ABC):
     """
     Base class for all SBERT-based resources.
@@ -488,13 +969,31 @@ class BaseSBERTResource(BaseResource, abc.ABC):
 
     identifier: str = "BaseSBERTResource"
     _sbert_model_str: str = "BaseSBERTModelStr"
+    _do_quantize: bool = False
 
     def __init__(self) -> None:
         """Initialize the SBERT resource."""
         super(BaseSBERTResource, self).__init__()
+        from sentence_transformers import SentenceTransformer
 
+        _configure_torch_threads()
         path: str = os.path.join(os.path.dirname(__file__), "..", "models", "sentence-transformers")
-        self._sbert_model: SentenceTransformer = SentenceTransformer(self._sbert_model_str, cache_folder=path)
+        if self._do_quantize:
+            # quantized models only run on the CPU
+            self._sbert_model: "SentenceTransformer" = SentenceTransformer(
+                self._sbert_model_str, cache_folder=path, device="cpu"
+            )
+            self._sbert_model = _quantize_model(self._sbert_model)
+        else:
+            self._sbert_model: "SentenceTransformer" = SentenceTransformer(self._sbert_model_str, cache_folder=path)
+        self._sbert_model.eval()
+
+        # coalesce concurrent encode calls, e.g. from several sessions served by the same worker
+        self._batched_sbert_model: Optional[batching.BatchedSentenceEncoder] = None
+        if batching.dynamic_batching_enabled():
+            self._batched_sbert_model = batching.BatchedSentenceEncoder(
+                self._sbert_model, batching.max_batch_size(), batching.max_wait()
+            )
 
     @classmethod
     def load(cls) -> "BaseSBERTResource":
@@ -504,11 +1003,14 @@ class BaseSBERTResource(BaseResource, abc.ABC):
         return cls()
 
     def unload(self) -> None:
+        if self._batched_sbert_model is not None:
+            self._batched_sbert_model.close()
+        del self._batched_sbert_model
         del self._sbert_model
 
     @property
-    def resource(self) -> SentenceTransformer:
-        return self._sbert_model
+    def resource(self) -> Union["SentenceTransformer", batching.BatchedSentenceEncoder]:
+        return self._batched_sbert_model if self._batched_sbert_model is not None else self._sbert_model
 
 
 @register_resource
@@ -519,6 +1021,15 @@ class SBERTBertLargeNliMeanTokensResource(BaseSBERTResource):
     _sbert_model_str: str = "bert-large-nli-mean-tokens"
 
 
+@register_resource
+class SBERTBertLargeNliMeanTokensInt8Resource(BaseSBERTResource):
+    """SBERT 'bert-large-nli-mean-tokens' model with int8-quantized linear layers for inference on the CPU."""
+
+    identifier: str = "SBERTBertLargeNliMeanTokensInt8Resource"
+    _sbert_model_str: str = "bert-large-nli-mean-tokens"
+    _do_quantize: bool = True
+
+
 @register_resource
 class SBERTAllMiniLML6v2Resource(BaseSBERTResource):
     """SBERT 'all-MiniLM-L6-v2' model."""
@@ -527,58 +1038,63 @@ class SBERTAllMiniLML6v2Resource(BaseSBERTResource):
     _sbert_model_str: str = "all-MiniLM-L6-v2"
 
 
+@register_resource
+class SBERTAllMiniLML6v2Int8Resource(BaseSBERTResource):
+    """SBERT 'all-MiniLM-L6-v2' model with int8-quantized linear layers for inference on the CPU."""
+
+    identifier: str = "SBERTAllMiniLML6v2Int8Resource"
+    _sbert_model_str: str = "all-MiniLM-L6-v2"
+    _do_quantize: bool = True
+
+
 @register_resource
 class GloveEmbeddings300(BaseResource):
     """ Glove Embeddings 840B 300d"""
 
     identifier: str = "GloveEmbedding300"
 
+    _vocab_path: str = os.path.join(os.path.dirname(__file__), "..", "models", "glove", "glove.840B.300d.vocab")
+    _vector_path: str = os.path.join(os.path.dirname(__file__), "..", "models", "glove", "glove.840B.300dvectors.npy")
+
     def __init__(self) -> None:
         """Initialize the GloVe resource"""
         super(GloveEmbeddings300, self).__init__()
-        vocab_path: str = os.path.join(os.path.dirname(__file__), "..", "models", "glove", "glove.840B.300d.vocab")
-        vector_path: str = os.path.join(os.path.dirname(__file__), "..", "models", "glove", "glove.840B.300dvectors.npy")
-
-        with open(vocab_path, 'r', encoding='utf-8') as file:
-            self._index2word: List = [line.rstrip("\n") for line in file]
-        vectors_memmap: np.memmap = np.memmap(vector_path, dtype="float32", mode="r")
+        self._vocabulary: MemmapVocabulary = MemmapVocabulary(self._vocab_path)
+        vectors_memmap: np.memmap = np.memmap(self._vector_path, dtype="float32", mode="r")
         self._vectors_memmap = vectors_memmap.reshape(-1, 300)
-        embedding_vector = {}
-        assert (len(self._index2word) == len(self._vectors_memmap))
-        for i, w in enumerate(self._index2word):
-            embedding_vector[w] = vectors_memmap[i]
+        assert (len(self._vocabulary) == len(self._vectors_memmap))
 
-        print(f"Loaded {len(embedding_vector)} word vectors.")
-
-        self._word2index: Dict = dict(map(reversed, enumerate(self._index2word)))
-
-        print("Done loading embeddings.")
+        logger.info(f"Loaded {len(self._vocabulary)} word vectors.")
 
     @classmethod
     def load(cls) -> "GloveEmbeddings300":
         # check that the GloVe embeddings have been downloaded
         path: str = os.path.join(os.path.dirname(__file__), "..", "models", "glove")
         os.makedirs(path, exist_ok=True)
-        vocab_path: str = os.path.join(os.path.dirname(__file__), "..", "models", "glove", "glove.840B.300d.vocab")
-        vector_path: str = os.path.join(os.path.dirname(__file__), "..", "models", "glove", "glove.840B.300dvectors.npy")
-        if not os.path.isfile(vocab_path):
+        if not os.path.isfile(cls._vocab_path):
             logger.error("Missing file glove.840B.300d.vocab. You have to download the glove embeddings by hand and place them in the 'models/glove' folder!")
             assert False, "Missing file glove.840B.300d.vocab. You have to download the glove embeddings by hand and place them in the 'models/glove' folder!"
-        if not os.path.isfile(vector_path):
+        if not os.path.isfile(cls._vector_path):
             logger.error("Missing file glove.840B.300dvectors.npy. You have to download the glove embeddings by hand and place them in the 'models/glove' folder!")
             assert False, "Missing file glove.840B.300dvectors.npy. You have to download the glove embeddings by hand and place them in the 'models/glove' folder!"
+
+        # convert the vocabulary into the binary format, which is only done once
+        if not MemmapVocabulary.exists(cls._vocab_path):
+            logger.info("Convert the GloVe vocabulary into the binary format. This is only done once.")
+            with open(cls._vocab_path, "r", encoding="utf-8") as file:
+                MemmapVocabulary.build([line.rstrip("\n") for line in file], cls._vocab_path)
         return cls()
 
     def unload(self) -> None:
-        del self._word2index
-        del self._index2word
+        self._vocabulary.close()
+        del self._vocabulary
         del self._vectors_memmap
 
     @property
     def resource(self) -> Dict[str, Any]:
         return {
-            "word2index": self._word2index,
-            "index2word": self._index2word,
+            "word2index": self._vocabulary,
+            "index2word": self._vocabulary.words,
             "vectors_memmap": self._vectors_memmap
         }
 
@@ -588,6 +1104,9 @@ class FigerNERPipeline(BaseResource):
     """
     Adapted FIGER fine graned entity recognizer
 
+    The resource provides the server's URL together with pooled HTTP sessions that can be shared by concurrent
+    requests. The URL can be configured via the 'FIGER_URL' environment variable.
+
     See https://github.com/DataManagementLab/figer/tree/update-dependencies/project
     """
 
@@ -600,9 +1119,14 @@ class FigerNERPipeline(BaseResource):
         super().__init__()
         self._url = url
 
+        # keep-alive connections are reused across all requests to the server
+        self._sessions: List[requests.Session] = []
+        self._sessions_lock: threading.Lock = threading.Lock()
+        self._pool_size: int = 0
+
         # Check whether FIGER is already running
         try:
-            r = requests.get(url)
+            r = self.session(1).get(url)
             r.raise_for_status()  # Raises a HTTPError if the status is 4xx, 5xxx
         except (requests.exceptions.ConnectionError, requests.exceptions.Timeout):
             # Load server as managed background process
@@ -611,14 +1135,41 @@ class FigerNERPipeline(BaseResource):
 
     @classmethod
     def load(cls) -> "FigerNERPipeline":
-        url = "http://localhost:8081/api"
+        url = os.environ.get("FIGER_URL", "http://localhost:8081/api")
         return cls(url)
 
     def unload(self) -> None:
+        for session in self._sessions:
+            session.close()
         # Stop FIGER server if WannaDB is responsible
         if self._managed:
             self._background_process.terminate()
 
+    def session(self, pool_size: int) -> requests.Session:
+        """
+        Get an HTTP session that keeps up to the given number of connections to the server alive.
+
+        Sessions are shared, so a new session is only created if the current one has a smaller pool. Previous sessions
+        stay open for the requests that still use them.
+
+        :param pool_size: number of concurrent requests that will use the session
+        :return: pooled HTTP session
+        """
+        with self._sessions_lock:
+            if pool_size > self._pool_size:
+                session: requests.Session = requests.Session()
+                adapter: requests.adapters.HTTPAdapter = requests.adapters.HTTPAdapter(
+                    pool_connections=1, pool_maxsize=pool_size
+                )
+                session.mount("http://", adapter)
+                session.mount("https://", adapter)
+                self._sessions.append(session)
+                self._pool_size = pool_size
+            return self._sessions[-1]
+
     @property
-    def resource(self) -> str:
-        return self._url
+    def resource(self) -> Dict[str, Any]:
+        return {
+            "url": self._url,
+            "session": self.session
+        }
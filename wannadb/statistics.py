@@ -5,6 +5,66 @@ from typing import Any, Dict, List, Optional, Union
 logger: logging.Logger = logging.getLogger(__name__)
 
 
+class Counter:
+    """
+    Handle of a counter in a statistics object.
+
+    Hot code paths can resolve the handle once and increment it in each iteration instead of looking up the key in the
+    statistics object every time. The counter values are kept in a flat list of the statistics object and are only
+    turned into regular entries when the statistics object is read, merged, or serialized.
+    """
+
+    __slots__ = ("_values", "_index")
+
+    def __init__(self, values: List[Union[int, float]], index: int) -> None:
+        """
+        Initialize the Counter.
+
+        :param values: list of counter values of the statistics object
+        :param index: position of this counter's value in the list
+        """
+        self._values: List[Union[int, float]] = values
+        self._index: int = index
+
+    def __repr__(self) -> str:
+        return f"Counter({self.value})"
+
+    @property
+    def value(self) -> Union[int, float]:
+        """Current value of the counter."""
+        return self._values[self._index]
+
+    def add(self, value: Union[int, float] = 1) -> None:
+        """
+        Increment the counter.
+
+        :param value: value to add to the counter
+        """
+        self._values[self._index] += value
+
+
+class _NoOpCounter(Counter):
+    """Counter handle of statistics objects that do not collect statistics."""
+
+    __slots__ = ()
+
+    def __init__(self) -> None:
+        pass
+
+    def __repr__(self) -> str:
+        return "Counter(not-collecting-statistics)"
+
+    @property
+    def value(self) -> Union[int, float]:
+        return 0
+
+    def add(self, value: Union[int, float] = 1) -> None:
+        pass
+
+
+NO_OP_COUNTER: Counter = _NoOpCounter()
+
+
 class Statistics:
     """
     Statistics to collect information during execution.
@@ -15,6 +75,10 @@ class Statistics:
     In contrast to a basic Python dictionary, the statistics object can easily be configured as to whether it actually
     should record any information. This unclutters the code required in the pipeline / pipeline element implementation.
     Furthermore, it can be used as a counter for integer and float values without requiring initialization.
+
+    Statistics objects that do not collect statistics return themselves for every key, so that recording information
+    does not allocate anything. Hot code paths should use counter handles (see `counter`) instead of incrementing
+    entries by key.
     """
 
     def __init__(self, do_collect: bool = True) -> None:
@@ -26,9 +90,11 @@ class Statistics:
         super(Statistics, self).__init__()
         self._do_collect: bool = do_collect
         if self._do_collect:
-            self._entries: Optional[Dict[str, Union[Statistics, Any]]] = {}
+            self._entries: Optional[Dict[str, Union[Statistics, Counter, Any]]] = {}
+            self._counter_values: Optional[List[Union[int, float]]] = []
         else:
-            self._entries: Optional[Dict[str, Union[Statistics, Any]]] = None
+            self._entries: Optional[Dict[str, Union[Statistics, Counter, Any]]] = None
+            self._counter_values: Optional[List[Union[int, float]]] = None
 
     def __str__(self) -> str:
         if self._do_collect:
@@ -41,19 +107,67 @@ class Statistics:
 
     def __eq__(self, other: Any) -> bool:
         return isinstance(other, Statistics) and \
-            self._do_collect == other._do_collect and self._entries == other._entries
+            self._do_collect == other._do_collect and dict(self._items()) == dict(other._items())
 
     def __getitem__(self, item: str) -> Union["Statistics", Any]:
         if self._do_collect:
-            if item not in self._entries.keys():
-                self._entries[item] = Statistics(True)
-            return self._entries[item]
+            try:
+                entry: Union[Statistics, Counter, Any] = self._entries[item]
+            except KeyError:
+                entry: Statistics = Statistics(True)
+                self._entries[item] = entry
+                return entry
+            if type(entry) is Counter:
+                return entry.value
+            return entry
         else:
-            return Statistics(False)
+            return self
 
     def __setitem__(self, key: str, value: Union["Statistics", Any]) -> None:
         if self._do_collect:
-            self._entries[key] = value
+            entry: Union[Statistics, Counter, Any] = self._entries.get(key)
+            if type(entry) is Counter and isinstance(value, (int, float)) and not isinstance(value, bool):
+                self._counter_values[entry._index] = value
+            else:
+                self._entries[key] = value
+
+    def counter(self, key: str) -> Counter:
+        """
+        Get a handle to increment the counter with the given key.
+
+        The handle can be resolved once outside a loop and incremented cheaply inside of it. If the statistics object
+        does not collect statistics, a shared no-op handle is returned.
+
+        :param key: key of the counter
+        :return: handle of the counter
+        """
+        if not self._do_collect:
+            return NO_OP_COUNTER
+
+        entry: Union[Statistics, Counter, Any] = self._entries.get(key)
+        if type(entry) is Counter:
+            return entry
+
+        # counters start from the current value or from zero if the key has not been used yet
+        initial_value: Union[int, float] = 0
+        if isinstance(entry, (int, float)) and not isinstance(entry, bool):
+            initial_value = entry
+        elif entry is not None and not (isinstance(entry, Statistics) and entry._entries == {}):
+            logger.error(f"Cannot use the statistics entry '{key}' as a counter!")
+            assert False, f"Cannot use the statistics entry '{key}' as a counter!"
+
+        self._counter_values.append(initial_value)
+        counter: Counter = Counter(self._counter_values, len(self._counter_values) - 1)
+        self._entries[key] = counter
+        return counter
+
+    def _items(self):
+        # entries with the counter handles replaced by their values
+        for key, entry in self._entries.items():
+            if type(entry) is Counter:
+                yield key, entry.value
+            else:
+                yield key, entry
 
     def __iadd__(self, other: Union[int, float]) -> Union[int, float]:
         return other
@@ -69,16 +183,44 @@ class Statistics:
         # dummy method in case this is a no-collect statistics object that replaces a list
         pass
 
+    def merge(self, other: "Statistics") -> None:
+        """
+        Add the entries of the other statistics object to this statistics object.
+
+        Numbers are summed up, sets are united, lists are concatenated, and nested statistics objects are merged
+        recursively. Other entries are only taken over if they do not already exist.
+
+        :param other: statistics object to merge into this statistics object
+        """
+        if not self._do_collect or not other._do_collect:
+            return
+
+        for key, other_entry in other._items():
+            if key not in self._entries.keys():
+                self._entries[key] = other_entry
+                continue
+
+            entry: Union[Statistics, Any] = self[key]
+            if isinstance(entry, Statistics) and isinstance(other_entry, Statistics):
+                entry.merge(other_entry)
+            elif isinstance(entry, (int, float)) and isinstance(other_entry, (int, float)) \
+                    and not isinstance(entry, bool) and not isinstance(other_entry, bool):
+                self[key] = entry + other_entry
+            elif isinstance(entry, set) and isinstance(other_entry, set):
+                entry.update(other_entry)
+            elif isinstance(entry, list) and isinstance(other_entry, list):
+                entry.extend(other_entry)
+
     def all_keys(self) -> List[str]:
         return list(self._entries.keys())
 
     def all_values(self) -> List[Union["Statistics", Any]]:
-        return list(self._entries.values())
+        return [entry for _, entry in self._items()]
 
     def to_serializable(self) -> Dict[str, Any]:
         if self._do_collect:
             d: Dict[str, Union[Dict, Any]] = {}
-            for key, entry in self._entries.items():
+            for key, entry in self._items():
                 if isinstance(entry, Statistics):
                     d[key] = entry.to_serializable()
                 elif isinstance(entry, set):
@@ -1,6 +1,8 @@
 import abc
 import logging
-from typing import Callable
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Tuple
 
 logger: logging.Logger = logging.getLogger(__name__)
 
@@ -14,8 +16,33 @@ class BaseStatusCallback(abc.ABC):
     or pipeline element calls ('__call__') the status callback to convey a status update.
 
     The status information comprises a message string and a float progress indicator.
+
+    A status callback can throttle the delivery of status updates to the user interface. The throttling applies to
+    each message separately, so that the updates of concurrently running pipeline elements do not defeat each other's
+    throttling: an update is only delivered if at least min_interval seconds have passed since the last delivered update
+    with the same message and the progress has changed by at least min_progress_delta. Updates with a new message and
+    completion updates (progress 1) are always delivered. Held-back updates are coalesced, i.e. only the latest one of
+    each message is kept. It is delivered in the background as soon as min_interval has passed or by 'flush'.
     """
 
+    def __init__(self, min_interval: float = 0.0, min_progress_delta: float = 0.0) -> None:
+        """
+        Initialize the status callback.
+
+        Subclasses must call this constructor.
+
+        :param min_interval: minimum time in seconds between two delivered updates with the same message
+        :param min_progress_delta: minimum progress difference between two delivered updates with the same message
+        """
+        super(BaseStatusCallback, self).__init__()
+        self._min_interval: float = min_interval
+        self._min_progress_delta: float = min_progress_delta
+        self._lock: threading.Lock = threading.Lock()
+        # progress and time of the last delivered update and the held-back progress (if any) for each message
+        self._last_delivered: Dict[str, Tuple[float, float]] = {}
+        self._pending: Dict[str, float] = {}
+        self._timer: Optional[threading.Timer] = None
+
     def __call__(self, message: str, progress: float) -> None:
         """
         Convey a status update from the pipeline or pipeline element to the user interface
@@ -26,6 +53,69 @@ class BaseStatusCallback(abc.ABC):
         :param message: status message
         :param progress: progress indicator (either between 0.0 and 1.0 or -1 if the progress is unclear)
         """
+        if self._min_interval > 0 or self._min_progress_delta > 0:
+            with self._lock:
+                now: float = time.monotonic()
+                if message in self._last_delivered.keys() and progress != 1:
+                    last_progress, last_time = self._last_delivered[message]
+                    if now - last_time < self._min_interval:
+                        self._pending[message] = progress
+                        self._schedule(last_time + self._min_interval - now)
+                        return
+                    if abs(progress - last_progress) < self._min_progress_delta:
+                        self._pending[message] = progress
+                        return
+                self._pending.pop(message, None)
+                if progress == 1:
+                    self._last_delivered.pop(message, None)  # the message is finished
+                else:
+                    self._last_delivered[message] = (progress, now)
+
+        self._deliver(message, progress)
+
+    def flush(self) -> None:
+        """Deliver the latest status updates that have been held back by the throttling."""
+        with self._lock:
+            pending: List[Tuple[str, float]] = list(self._pending.items())
+            self._pending.clear()
+            now: float = time.monotonic()
+            for message, progress in pending:
+                self._last_delivered[message] = (progress, now)
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+        for message, progress in pending:
+            self._deliver(message, progress)
+
+    def _schedule(self, delay: float) -> None:
+        """Deliver the held-back updates after the given delay unless a delivery has already been scheduled."""
+        if self._timer is None:
+            self._timer = threading.Timer(delay, self._deliver_due)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def _deliver_due(self) -> None:
+        """Deliver the held-back updates whose messages have not been delivered for at least min_interval seconds."""
+        due: List[Tuple[str, float]] = []
+        with self._lock:
+            self._timer = None
+            now: float = time.monotonic()
+            next_due: Optional[float] = None
+            for message, progress in list(self._pending.items()):
+                last_progress, last_time = self._last_delivered.get(message, (-1, 0.0))
+                if now - last_time < self._min_interval:
+                    wait: float = last_time + self._min_interval - now
+                    next_due = wait if next_due is None else min(next_due, wait)
+                elif abs(progress - last_progress) >= self._min_progress_delta:
+                    due.append((message, progress))
+                    del self._pending[message]
+                    self._last_delivered[message] = (progress, now)
+            if next_due is not None:
+                self._schedule(next_due)
+        for message, progress in due:
+            self._deliver(message, progress)
+
+    def _deliver(self, message: str, progress: float) -> None:
         if progress == -1:
             logger.info(f"{message} ~%")
         else:
@@ -49,12 +139,20 @@ class BaseStatusCallback(abc.ABC):
 class StatusCallback(BaseStatusCallback):
     """Status callback that is initialized with a callback function."""
 
-    def __init__(self, callback_fn: Callable[[str, float], None]):
+    def __init__(
+            self,
+            callback_fn: Callable[[str, float], None],
+            min_interval: float = 0.0,
+            min_progress_delta: float = 0.0
+    ) -> None:
         """
         Initialize the status callback.
 
         :param callback_fn: callback function that is called whenever the interaction callback is called
+        :param min_interval: minimum time in seconds between two delivered updates with the same message
+        :param min_progress_delta: minimum progress difference between two delivered updates with the same message
         """
+        super(StatusCallback, self).__init__(min_interval, min_progress_delta)
         self._callback_fn: Callable[[str, float], None] = callback_fn
 
     def _call(self, message: str, progress: float) -> None:
@@ -66,3 +164,35 @@ class EmptyStatusCallback(BaseStatusCallback):
 
     def _call(self, message: str, progress: float) -> None:
         pass
+
+
+class TaggedStatusCallback(BaseStatusCallback):
+    """
+    Status callback that tags the messages with their source before passing them on to another status callback.
+
+    The pipeline uses it for steps that run concurrently, so that the user interface can tell their updates apart.
+    Messages that already mention the tag (e.g. 'Running <identifier>...') are passed on unchanged. The throttling is
+    left to the wrapped status callback.
+    """
+
+    def __init__(self, status_callback: BaseStatusCallback, tag: str) -> None:
+        """
+        Initialize the status callback.
+
+        :param status_callback: status callback to pass the tagged updates on to
+        :param tag: tag of the messages, e.g. the identifier of the pipeline element
+        """
+        super(TaggedStatusCallback, self).__init__()
+        self._status_callback: BaseStatusCallback = status_callback
+        self._tag: str = tag
+
+    def __call__(self, message: str, progress: float) -> None:
+        if self._tag not in message:
+            message = f"[{self._tag}] {message}"
+        self._status_callback(message, progress)
+
+    def flush(self) -> None:
+        self._status_callback.flush()
+
+    def _call(self, message: str, progress: float) -> None:
+        self._status_callback(message, progress)
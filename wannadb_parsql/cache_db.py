@@ -101,6 +101,20 @@ class SQLiteCacheDB:
         self.create_table_by_name(table_name)
         self.store_many(table_name, ((i, Path(doc.name).name) for i, doc in enumerate(documents)))
 
+    def append_input_docs(self, table_name, documents, start_index):
+        self.store_many(table_name, ((start_index + i, Path(doc.name).name) for i, doc in enumerate(documents)))
+
+    def append_attribute_values(self, attribute_name, documents, start_index):
+        # empty tables are populated lazily for all documents, so only tables that are already populated need new rows
+        if attribute_name.lower() not in self.existing_tables() or self.table_empty(attribute_name):
+            return
+        self.store_many(attribute_name, (
+            (start_index + i, doc.attribute_mappings[attribute_name][0].text)
+            for i, doc in enumerate(documents)
+            if len(doc.attribute_mappings.get(attribute_name, [])) > 0
+            and doc.attribute_mappings[attribute_name][0].text != ""
+        ))
+
     def delete_tables(self, attributes: List[ColumnToken]):
         c = self.conn.cursor()
         for attribute in attributes:
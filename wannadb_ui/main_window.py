@@ -42,6 +42,7 @@ class MainWindow(QMainWindow):
     # signals (wannadb ui --> wannadb api)
     ######################################
     create_document_base = pyqtSignal(str, list, Statistics)
+    add_documents = pyqtSignal(str, DocumentBase, Statistics)
     add_attribute = pyqtSignal(str, DocumentBase)
     add_attributes = pyqtSignal(list, DocumentBase)
     remove_attribute = pyqtSignal(str, DocumentBase)
@@ -152,6 +153,17 @@ class MainWindow(QMainWindow):
                 # noinspection PyUnresolvedReferences
                 self.load_document_base_from_bson.emit(str(path))
 
+    def add_documents_task(self):
+        logger.info("Execute task 'add_documents_task'.")
+
+        if self.document_base is not None:
+            path = QFileDialog.getExistingDirectory(self, "Choose a directory with the new .txt files!")
+            if path != "":
+                self.to_busy_state()
+                self.statistics = Statistics(self.collect_statistics)
+                # noinspection PyUnresolvedReferences
+                self.add_documents.emit(str(path), self.document_base, self.statistics)
+
     def save_document_base_to_bson_task(self):
         logger.info("Execute task 'save_document_base_to_bson_task'.")
 
@@ -418,6 +430,7 @@ class MainWindow(QMainWindow):
         self.forget_matches_for_attribute_action.setEnabled(True)
         self.load_document_base_from_bson_action.setEnabled(True)
         self.save_document_base_to_bson_action.setEnabled(True)
+        self.add_documents_action.setEnabled(True)
         self.save_table_to_csv_action.setEnabled(True)
         self.forget_matches_action.setEnabled(True)
         self.interactive_table_population_action.setEnabled(True)
@@ -492,6 +505,7 @@ class MainWindow(QMainWindow):
         self.api_thread = QThread()
         self.api.moveToThread(self.api_thread)
         self.create_document_base.connect(self.api.create_document_base)
+        self.add_documents.connect(self.api.add_documents)
         self.add_attribute.connect(self.api.add_attribute)
         self.add_attributes.connect(self.api.add_attributes)
         self.remove_attribute.connect(self.api.remove_attribute)
@@ -568,6 +582,12 @@ class MainWindow(QMainWindow):
         self.load_document_base_from_bson_action.triggered.connect(self.load_document_base_from_bson_task)
         self._all_actions.append(self.load_document_base_from_bson_action)
 
+        self.add_documents_action = QAction("&Add documents", self)
+        self.add_documents_action.setIcon(QIcon("wannadb_ui/resources/folder.svg"))
+        self.add_documents_action.setStatusTip("Add new documents to the document base.")
+        self.add_documents_action.triggered.connect(self.add_documents_task)
+        self._all_actions.append(self.add_documents_action)
+
         self.save_document_base_to_bson_action = QAction("&Save document base", self)
         self.save_document_base_to_bson_action.setIcon(QIcon("wannadb_ui/resources/save.svg"))
         self.save_document_base_to_bson_action.setStatusTip("Save the document base in a .bson file.")
@@ -620,6 +640,7 @@ class MainWindow(QMainWindow):
         self.document_base_menu.addSeparator()
         self.document_base_menu.addAction(self.load_document_base_from_bson_action)
         self.document_base_menu.addAction(self.save_document_base_to_bson_action)
+        self.document_base_menu.addAction(self.add_documents_action)
 
         self.table_menu = self.menubar.addMenu("&Table")
         self.table_menu.setFont(MENU_FONT)
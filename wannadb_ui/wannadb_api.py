@@ -12,14 +12,14 @@ from wannadb.configuration import Pipeline
 from wannadb.data.data import Attribute, Document, DocumentBase
 from wannadb.interaction import EmptyInteractionCallback, InteractionCallback
 from wannadb.matching.distance import SignalsMeanDistance
-from wannadb.matching.matching import RankingBasedMatcher
+from wannadb.matching.matching import DEFAULT_MAX_DISTANCE, RankingBasedMatcher, match_new_documents
 from wannadb.preprocessing.embedding import BERTContextSentenceEmbedder, RelativePositionEmbedder, \
     SBERTTextEmbedder, SBERTLabelEmbedder
 from wannadb.preprocessing.extraction import StanzaNERExtractor, SpacyNERExtractor
 from wannadb.preprocessing.label_paraphrasing import OntoNotesLabelParaphraser, \
     SplitAttributeNameLabelParaphraser
 from wannadb.preprocessing.normalization import CopyNormalizer
-from wannadb.preprocessing.other_processing import ContextSentenceCacher
+from wannadb.preprocessing.other_processing import ContextSentenceCacher, NuggetDeduplicator
 from wannadb.statistics import Statistics
 from wannadb.status import StatusCallback
 from wannadb_parsql.cache_db import SQLiteCacheDB
@@ -116,6 +116,7 @@ class WannaDBAPI(QObject):
             preprocessing_phase = Pipeline([
                 StanzaNERExtractor(),
                 SpacyNERExtractor("SpacyEnCoreWebLg"),
+                NuggetDeduplicator(),
                 ContextSentenceCacher(),
                 CopyNormalizer(),
                 OntoNotesLabelParaphraser(),
@@ -143,6 +144,89 @@ class WannaDBAPI(QObject):
         except Exception as e:
             self._handle_exception(e)
 
+    @pyqtSlot(str, DocumentBase, Statistics)
+    def add_documents(self, path, document_base, statistics):
+        logger.debug("Called slot 'add_documents'.")
+        self.status.emit("Adding documents...", -1)
+        try:
+            if path == "":
+                logger.error("The path cannot be empty!")
+                self.error.emit("The path cannot be empty!")
+                return
+
+            if pathlib.Path(path).is_dir():
+                path += "/*.txt"
+
+            existing_names = set(document.name for document in document_base.documents)
+            documents = []
+            for file_path in glob.glob(path):
+                if file_path in existing_names:
+                    logger.info(f"Document '{file_path}' already exists and was thus not added.")
+                    continue
+                with open(file_path, encoding="utf-8") as file:
+                    documents.append(Document(file_path, file.read()))
+
+            if documents == []:
+                logger.error("There are no new documents!")
+                self.error.emit("There are no new documents!")
+                return
+
+            # load default preprocessing phase
+            self.status.emit("Loading preprocessing phase...", -1)
+
+            preprocessing_phase = Pipeline([
+                StanzaNERExtractor(),
+                SpacyNERExtractor("SpacyEnCoreWebLg"),
+                NuggetDeduplicator(),
+                ContextSentenceCacher(),
+                CopyNormalizer(),
+                OntoNotesLabelParaphraser(),
+                SplitAttributeNameLabelParaphraser(do_lowercase=True, splitters=[" ", "_"]),
+                SBERTLabelEmbedder("SBERTBertLargeNliMeanTokensResource"),
+                SBERTTextEmbedder("SBERTBertLargeNliMeanTokensResource"),
+                BERTContextSentenceEmbedder("BertLargeCasedResource"),
+                RelativePositionEmbedder()
+            ])
+
+            # run preprocessing phase for the new documents only
+            def status_callback_fn(message, progress):
+                self.status.emit(message, progress)
+
+            status_callback = StatusCallback(status_callback_fn)
+
+            preprocessing_phase(
+                DocumentBase(documents, []), EmptyInteractionCallback(), status_callback, statistics["preprocessing"]
+            )
+
+            start_index = len(document_base.documents)
+            document_base.add_documents(documents)
+
+            # continue the matching of the existing attributes for the new documents
+            self.status.emit("Matching new documents...", -1)
+            distance = SignalsMeanDistance(
+                signal_identifiers=[
+                    "LabelEmbeddingSignal",
+                    "TextEmbeddingSignal",
+                    "ContextSentenceEmbeddingSignal",
+                    "RelativePositionSignal"
+                ]
+            )
+            # the thresholds that the matching has ended with for the attributes are kept in the document base
+            match_new_documents(document_base, documents, distance, statistics["matching"])
+
+            self.cache_db.append_input_docs(INPUT_DOCS_COLUMN_NAME, documents, start_index)
+            for attribute in document_base.attributes:
+                self.cache_db.append_attribute_values(attribute.name, documents, start_index)
+
+            self.document_base_to_ui.emit(document_base)
+            self.statistics_to_ui.emit(statistics)
+            self.finished.emit("Finished!")
+        except FileNotFoundError:
+            logger.error("Directory does not exist!")
+            self.error.emit("Directory does not exist!")
+        except Exception as e:
+            self._handle_exception(e)
+
     @pyqtSlot(str)
     def load_document_base_from_bson(self, path):
         logger.debug("Called slot 'load_document_base_from_bson'.")
@@ -375,7 +459,7 @@ class WannaDBAPI(QObject):
                         ),
                         max_num_feedback=100,
                         len_ranked_list=10,
-                        max_distance=0.2,
+                        max_distance=DEFAULT_MAX_DISTANCE,
                         num_random_docs=1,
                         sampling_mode="AT_MAX_DISTANCE_THRESHOLD",
                         adjust_threshold=True,
@@ -5,7 +5,7 @@ import bcrypt
 from psycopg2 import sql, IntegrityError
 from wannadb_web.util import Token, Authorisation, tokenDecode
 from wannadb_web.postgres.queries import checkPassword
-from wannadb_web.postgres.util import execute_transaction
+from wannadb_web.postgres.util import execute_transaction, transaction
 
 logger: logging.Logger = logging.getLogger(__name__)
 
@@ -216,24 +216,26 @@ def leaveOrganisation(organisationId: int, sessionToken: str):
 		token: Token = tokenDecode(sessionToken)
 		userid = token.id
 
-		count_query = sql.SQL("SELECT COUNT(*) FROM membership WHERE userid = (%s) AND organisationid = (%s)")
-		count = execute_transaction(count_query, (userid, organisationId,), commit=True)
-		count = int(count[0][0])
-		if count != 1:
-			return False, "You are not in this organisation"
-
-		delete_query = sql.SQL(
-			"DELETE FROM membership WHERE userid = (%s) AND organisationid = (%s) returning organisationid")
-		execute_transaction(delete_query, (userid, organisationId,), commit=True)
-
-		count_query = sql.SQL("SELECT COUNT(*) FROM membership WHERE organisationid = (%s)")
-		count = execute_transaction(count_query, [organisationId], commit=True)
-		count = int(count[0][0])
-		if count > 0:
-			return True, None
-
-		delete_query = sql.SQL("DELETE FROM organisations WHERE id = (%s)")
-		execute_transaction(delete_query, [organisationId], commit=True, fetch=False)
+		# the membership and the then empty organisation are removed together
+		with transaction() as cur:
+			count_query = sql.SQL("SELECT COUNT(*) FROM membership WHERE userid = (%s) AND organisationid = (%s)")
+			cur.execute(count_query, (userid, organisationId,))
+			count = int(cur.fetchone()[0])
+			if count != 1:
+				return False, "You are not in this organisation"
+
+			delete_query = sql.SQL(
+				"DELETE FROM membership WHERE userid = (%s) AND organisationid = (%s) returning organisationid")
+			cur.execute(delete_query, (userid, organisationId,))
+
+			count_query = sql.SQL("SELECT COUNT(*) FROM membership WHERE organisationid = (%s)")
+			cur.execute(count_query, [organisationId])
+			count = int(cur.fetchone()[0])
+			if count > 0:
+				return True, None
+
+			delete_query = sql.SQL("DELETE FROM organisations WHERE id = (%s)")
+			cur.execute(delete_query, [organisationId])
 		return True, None
 	except Exception as e:
 		print("leaveOrganisation failed because: \n", e)
@@ -279,17 +281,20 @@ INSERT INTO membership (userid, organisationid)
 
 def addUserToOrganisation2(organisationId: int, newUser: str):
 	try:
-		select_id_query = sql.SQL("SELECT id FROM users WHERE username = (%s)")
-		userid = execute_transaction(select_id_query, (newUser,), commit=True)
-		if userid is None:
-			return None, "User does not exist"
-
-		insert_query = sql.SQL(
-			"INSERT INTO membership (userid, organisationid) VALUES (%s, %s) returning organisationid")
-		organisation_id = execute_transaction(insert_query, (userid[0][0], organisationId), commit=True)
+		with transaction() as cur:
+			select_id_query = sql.SQL("SELECT id FROM users WHERE username = (%s)")
+			cur.execute(select_id_query, (newUser,))
+			userid = cur.fetchone()
+			if userid is None:
+				return None, "User does not exist"
+
+			insert_query = sql.SQL(
+				"INSERT INTO membership (userid, organisationid) VALUES (%s, %s) returning organisationid")
+			cur.execute(insert_query, (userid[0], organisationId))
+			organisation_id = cur.fetchone()
 		if organisation_id is None:
 			return None, "you have no privileges in this organisation"
-		return int(organisation_id[0][0]), None
+		return int(organisation_id[0]), None
 	except IntegrityError:
 		return None, "User already in organisation"
 	except Exception as e:
@@ -1,9 +1,13 @@
 import logging
 import os
+import threading
+import time
+from contextlib import contextmanager
 from sqlite3 import OperationalError
+from typing import Dict, Iterator, Optional
 
 import psycopg2
-from psycopg2 import extensions, IntegrityError
+from psycopg2 import extensions, IntegrityError, pool
 from psycopg2.sql import SQL
 
 DB_NAME = os.environ.get("DATABASE_NAME")
@@ -12,6 +16,13 @@ DB_PASSWORD = os.environ.get("DATABASE_PASSWORD")
 DB_HOST = os.environ.get("DATABASE_HOST")
 DB_PORT = os.environ.get("DATABASE_PORT")
 
+# size of the connection pool of each process and seconds to wait for a free connection
+DB_POOL_MIN_SIZE = int(os.environ.get("DATABASE_POOL_MIN_SIZE", 1))
+DB_POOL_MAX_SIZE = int(os.environ.get("DATABASE_POOL_MAX_SIZE", 10))
+DB_POOL_TIMEOUT = float(os.environ.get("DATABASE_POOL_TIMEOUT", 30))
+# connections that have been idle for longer than this many seconds are checked before they are handed out
+DB_POOL_HEALTH_CHECK_INTERVAL = float(os.environ.get("DATABASE_POOL_HEALTH_CHECK_INTERVAL", 30))
+
 
 # DB_NAME = "userManagement"
 # DB_USER = "postgres"
@@ -43,6 +54,170 @@ def connectPG():
 		raise OperationalError("Connection failed because: \n", e)
 
 
+class ConnectionPool:
+	"""
+	Thread-safe pool of connections to the PostgreSQL database server.
+
+	If all connections are in use, threads wait up to 'timeout' seconds for a free one. Connections that have been idle
+	for longer than 'health_check_interval' seconds are checked with a cheap query before they are handed out and are
+	replaced if they are broken. Open transactions are rolled back when a connection is returned to the pool.
+	"""
+
+	def __init__(self, min_size: int, max_size: int, timeout: float, health_check_interval: float):
+		self._pool = pool.ThreadedConnectionPool(
+			min_size,
+			max_size,
+			dbname=DB_NAME,
+			user=DB_USER,
+			password=DB_PASSWORD,
+			host=DB_HOST,
+			port=DB_PORT)
+		self._slots = threading.BoundedSemaphore(max_size)
+		self._timeout = timeout
+		self._health_check_interval = health_check_interval
+		self._last_used: Dict[int, float] = {}
+
+	def getconn(self):
+		"""
+		Take a connection from the pool
+
+		Returns:
+			conn (psycopg2 connection object)
+
+		Raise:
+			PoolError (if no connection is free within the timeout)
+		"""
+		if not self._slots.acquire(timeout=self._timeout):
+			raise pool.PoolError(f"No free database connection within {self._timeout} seconds")
+		try:
+			conn = self._pool.getconn()
+			# new connections count as healthy, so this ends at the latest when the idle connections are used up
+			while not self._is_healthy(conn):
+				logging.warning("Replace a broken database connection.")
+				self._last_used.pop(id(conn), None)
+				self._pool.putconn(conn, close=True)
+				conn = self._pool.getconn()
+			return conn
+		except BaseException:
+			self._slots.release()
+			raise
+
+	def putconn(self, conn):
+		"""Return a connection to the pool and roll back its open transaction (or close it if that fails)"""
+		try:
+			close = conn.closed != 0
+			if not close and conn.info.transaction_status != extensions.TRANSACTION_STATUS_IDLE:
+				try:
+					conn.rollback()
+				except psycopg2.Error:
+					close = True
+			if close:
+				self._last_used.pop(id(conn), None)
+			else:
+				self._last_used[id(conn)] = time.monotonic()
+			self._pool.putconn(conn, close=close)
+		finally:
+			self._slots.release()
+
+	def closeall(self):
+		self._last_used.clear()
+		self._pool.closeall()
+
+	def detach(self):
+		"""Detach the pool from the sockets of its connections without closing the database sessions
+
+		Forked processes inherit the sockets of the parent. Closing a connection would send the protocol goodbye over the
+		shared socket and thereby end the parent's session, so the sockets are replaced by /dev/null instead. This lets
+		the connections be closed and garbage collected in the child without affecting the parent.
+		"""
+		devnull = os.open(os.devnull, os.O_RDWR)
+		try:
+			# the free and the used connections of psycopg2's pool
+			for conn in list(self._pool._pool) + list(self._pool._used.values()):
+				if conn.closed == 0:
+					os.dup2(devnull, conn.fileno())
+		finally:
+			os.close(devnull)
+		self._last_used.clear()
+
+	def _is_healthy(self, conn) -> bool:
+		if conn.closed != 0:
+			return False
+		last_used = self._last_used.get(id(conn))
+		if last_used is None or time.monotonic() - last_used < self._health_check_interval:
+			return True
+		try:
+			with conn.cursor() as cur:
+				cur.execute("SELECT 1")
+			conn.rollback()
+			return True
+		except psycopg2.Error:
+			return False
+
+
+_POOL: Optional[ConnectionPool] = None
+_POOL_LOCK = threading.Lock()
+
+
+def _reset_pool_after_fork():
+	global _POOL, _POOL_LOCK
+	if _POOL is not None:
+		# the connections share the sockets of the parent process, so they must neither be used nor closed here
+		_POOL.detach()
+	_POOL = None
+	_POOL_LOCK = threading.Lock()
+
+
+# forked processes (e.g. Celery prefork workers) create their own pool on first use
+os.register_at_fork(after_in_child=_reset_pool_after_fork)
+
+
+def get_pool() -> ConnectionPool:
+	"""Return the connection pool of this process, which is created on first use"""
+	global _POOL
+	if _POOL is None:
+		with _POOL_LOCK:
+			if _POOL is None:
+				_POOL = ConnectionPool(DB_POOL_MIN_SIZE, DB_POOL_MAX_SIZE, DB_POOL_TIMEOUT,
+									   DB_POOL_HEALTH_CHECK_INTERVAL)
+	return _POOL
+
+
+@contextmanager
+def connection(autocommit: bool = False) -> Iterator[extensions.connection]:
+	"""Borrow a connection from the pool of this process
+
+	Open transactions are rolled back when the connection is returned to the pool.
+
+	Raise:
+		PoolError (if no connection is free within the timeout)
+	"""
+	conn_pool = get_pool()
+	conn = conn_pool.getconn()
+	try:
+		conn.autocommit = autocommit
+		yield conn
+	finally:
+		conn_pool.putconn(conn)
+
+
+@contextmanager
+def transaction() -> Iterator[extensions.cursor]:
+	"""Execute several statements in one transaction
+
+	The transaction is committed if the block completes and rolled back if it raises an exception.
+
+	Example:
+		with transaction() as cur:
+			cur.execute(query, params)
+			result = cur.fetchall()
+	"""
+	with connection() as conn:
+		with conn.cursor() as cur:
+			yield cur
+		conn.commit()
+
+
 def execute_transaction(query, params=None, commit=False, fetch=True):
 	"""Execute a query and return the result
 
@@ -54,21 +229,18 @@ def execute_transaction(query, params=None, commit=False, fetch=True):
 		i IntegrityError
 	"""
 
-	conn = None
-	cur = None
 	try:
-		conn = connectPG()
-		cur = conn.cursor()
+		with connection() as conn:
+			with conn.cursor() as cur:
+				cur.execute(query, params)
 
-		cur.execute(query, params)
+				if commit:
+					conn.commit()
 
-		if commit:
-			conn.commit()
-
-		if fetch:
-			result = cur.fetchall()
-			return result if result else None
-		return True
+				if fetch:
+					result = cur.fetchall()
+					return result if result else None
+				return True
 
 	except IntegrityError as e:
 		raise IntegrityError(f"Query execution failed for transaction: {query} \nParams: {params} \nError: {e}")
@@ -79,11 +251,6 @@ def execute_transaction(query, params=None, commit=False, fetch=True):
 					  f"Params: {params} \n"
 					  f"Error: {e}")
 		return False
-	finally:
-		if conn:
-			conn.close()
-		if cur:
-			cur.close()
 
 
 def execute_query(query: SQL, params=None):
@@ -97,19 +264,15 @@ def execute_query(query: SQL, params=None):
 		None
 	"""
 
-	conn = None
-	cur = None
 	try:
-		conn = connectPG()
-		conn.set_isolation_level(extensions.ISOLATION_LEVEL_AUTOCOMMIT)
-		cur = conn.cursor()
+		with connection(autocommit=True) as conn:
+			with conn.cursor() as cur:
+				cur.execute(query, params)
+				result = cur.fetchall()
+				if not result:
+					return None
 
-		cur.execute(query, params)
-		result = cur.fetchall()
-		if not result:
-			return None
-
-		return result
+				return result
 
 	except Exception as e:
 		logging.error(f"Query execution failed for query:\n"
@@ -117,9 +280,3 @@ def execute_query(query: SQL, params=None):
 					  f"Params: {params} \n"
 					  f"Error: {e}")
 		return False
-
-	finally:
-		if conn:
-			conn.close()
-		if cur:
-			cur.close()
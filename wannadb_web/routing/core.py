@@ -7,6 +7,8 @@ It includes a Blueprint named 'core_routes' with routes related to creating docu
 
 Routes:
     - /core/create_document_base (POST): Endpoint for creating a document base.
+    - /core/document_base/documents/add (POST): Endpoint for adding documents to a document base.
+    - /core/document_base/automatic (POST): Endpoint for populating the table without interactive matching.
 
 
 Dependencies:
@@ -39,7 +41,7 @@ from wannadb_web.Redis.RedisCache import RedisCache
 from wannadb_web.util import tokenDecode
 from wannadb_web.worker.data import Signals
 
-from wannadb_web.worker.tasks import CreateDocumentBase, BaseTask, DocumentBaseAddAttributes, DocumentBaseConfirmNugget, DocumentBaseInteractiveTablePopulation, DocumentBaseLoad, \
+from wannadb_web.worker.tasks import CreateDocumentBase, BaseTask, DocumentBaseAddAttributes, DocumentBaseAddDocuments, DocumentBaseAutomaticTablePopulation, DocumentBaseConfirmNugget, DocumentBaseInteractiveTablePopulation, DocumentBaseLoad, \
 	DocumentBaseUpdateAttributes, DocumentBaseGetOrderedNuggets
 
 
@@ -157,6 +159,48 @@ def interactive_document_base():
 	return make_response({'task_id': task.id}, 202)
 
 
+@core_routes.route('/document_base/automatic', methods=['POST'])
+def automatic_document_base():
+	"""
+    Endpoint for automatic document population
+
+	This endpoint is used to populate the table of a document base without the interactive matching, e.g. for batch
+	extraction. The matches are computed for all attributes at once. Optionally, a number of feedback rounds per
+	attribute can be given, which are answered like those of the interactive matching.
+
+    Example Form Payload:
+    {
+		"authorization": "your_authorization_token"
+        "organisationId": "your_organisation_id",
+        "baseName": "your_document_base_name",
+        "maxNumFeedback": "0" (optional)
+    }
+    """
+	form = request.form
+	authorization = form.get("authorization")
+	organisation_id: Optional[int] = form.get("organisationId")
+	base_name = form.get("baseName")
+	max_num_feedback = form.get("maxNumFeedback", "0")
+
+	if (organisation_id is None or base_name is None
+			or authorization is None):
+		return make_response({"error": "missing parameters"}, 400)
+	if not max_num_feedback.isdigit():
+		return make_response({"error": "invalid maxNumFeedback"}, 400)
+	_token = tokenDecode(authorization)
+
+	if _token is False:
+		return make_response({"error": "invalid token"}, 401)
+
+	user_id = _token.id
+
+	task = DocumentBaseAutomaticTablePopulation().apply_async(
+		args=(user_id, base_name, organisation_id, int(max_num_feedback))
+	)
+
+	return make_response({'task_id': task.id}, 202)
+
+
 @core_routes.route('/document_base/attributes/add', methods=['POST'])
 def document_base_attribute_add():
 	"""
@@ -202,6 +246,45 @@ def document_base_attribute_add():
 
 	return make_response({'task_id': task.id}, 202)
 
+@core_routes.route('/document_base/documents/add', methods=['POST'])
+def document_base_documents_add():
+	"""
+    Endpoint for adding documents to a document base.
+
+	This endpoint is used to add documents to an existing document base. Only the new documents are preprocessed and
+	the attributes that have already been matched are matched for the new documents.
+
+    Example Form Payload:
+    {
+		"authorization": "your_authorization_token"
+        "organisationId": "your_organisation_id",
+        "baseName": "your_document_base_name",
+        "document_ids": "4, 5, 6"
+    }
+    """
+	form = request.form
+	authorization = form.get("authorization")
+	organisation_id = form.get("organisationId")
+	base_name = form.get("baseName")
+	document_ids: Optional[list[int]] = form.get("document_ids")
+	if organisation_id is None or base_name is None or document_ids is None or authorization is None:
+		return make_response({"error": "missing parameters"}, 400)
+	_token = tokenDecode(authorization)
+
+	if _token is False:
+		return make_response({"error": "invalid token"}, 401)
+
+	document_ids = document_ids.split(",")
+
+	statistics = Statistics(False)
+	user_id = _token.id
+
+	statisticsDump = pickle.dumps(statistics)
+	task = DocumentBaseAddDocuments().apply_async(args=(user_id, document_ids, statisticsDump,
+												  base_name, organisation_id))
+
+	return make_response({'task_id': task.id}, 202)
+
 @core_routes.route('/document_base/attributes/update', methods=['POST'])
 def document_base_attribute_update():
 	"""
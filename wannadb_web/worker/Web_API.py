@@ -12,14 +12,15 @@ from wannadb.data.data import Attribute, Document, DocumentBase, InformationNugg
 from wannadb.data.signals import CachedDistanceSignal
 from wannadb.interaction import EmptyInteractionCallback, InteractionCallback
 from wannadb.matching.distance import SignalsMeanDistance
-from wannadb.matching.matching import RankingBasedMatcher
+from wannadb.matching.matching import DEFAULT_MAX_DISTANCE, AutomaticMatcher, RankingBasedMatcher, \
+	match_new_documents
 from wannadb.preprocessing.embedding import BERTContextSentenceEmbedder, RelativePositionEmbedder, \
 	SBERTTextEmbedder, SBERTLabelEmbedder
 from wannadb.preprocessing.extraction import StanzaNERExtractor, SpacyNERExtractor
 from wannadb.preprocessing.label_paraphrasing import OntoNotesLabelParaphraser, \
 	SplitAttributeNameLabelParaphraser
 from wannadb.preprocessing.normalization import CopyNormalizer
-from wannadb.preprocessing.other_processing import ContextSentenceCacher
+from wannadb.preprocessing.other_processing import ContextSentenceCacher, NuggetDeduplicator
 from wannadb.statistics import Statistics
 from wannadb.status import StatusCallback
 from wannadb_web.SQLite.Cache_DB import SQLiteCacheDBWrapper
@@ -48,7 +49,8 @@ class WannaDB_WebAPI:
 		def status_callback_fn(message, progress):
 			self.signals.status.emit(str(message) + " " + str(progress))
 
-		self.status_callback = StatusCallback(status_callback_fn)
+		# every status update is a Redis write, so that the updates in the pipeline elements' loops are throttled
+		self.status_callback = StatusCallback(status_callback_fn, min_interval=0.5, min_progress_delta=0.01)
 
 		def interaction_callback_fn(pipeline_element_identifier, feedback_request):
 
@@ -64,12 +66,15 @@ class WannaDB_WebAPI:
 				if msg is not None:
 					self.signals.status.emit("Feedback received from UI")
 					self.signals.match_feedback.emit(None)
+					# the matchers expect the nuggets of the document base and the key 'not-a-match'
 					if isinstance(msg, CustomMatchFeedback):
 						return {"message": "custom-match", "document": msg.document, "start": msg.start}
 					elif isinstance(msg, NuggetMatchFeedback):
-						return {"message": "is-match", "nugget": msg.nugget, "not_a_match": msg.not_a_match}
+						return {"message": "is-match", "nugget": self._resolve_nugget(msg.nugget),
+								"not-a-match": self._resolve_nugget(msg.not_a_match)}
 					elif isinstance(msg, NoMatchFeedback):
-						return {"message": "no-match-in-document", "nugget": msg.nugget, "not_a_match": msg.not_a_match}
+						return {"message": "no-match-in-document", "nugget": self._resolve_nugget(msg.nugget),
+								"not-a-match": self._resolve_nugget(msg.not_a_match)}
 					else:
 						raise TypeError("Unknown match_feedback type!")
 				time.sleep(1)
@@ -119,6 +124,19 @@ class WannaDB_WebAPI:
 		self.signals.document_base_to_ui.emit(value)
 		return
 
+	def _resolve_nugget(self, nugget: Any) -> Optional[InformationNugget]:
+		"""Find the nugget of the document base that corresponds to the JSON representation of a nugget from the UI."""
+		if nugget is None or isinstance(nugget, InformationNugget):
+			return nugget
+		document_name = nugget["document"]["name"]
+		start_char, end_char = int(nugget["start_char"]), int(nugget["end_char"])
+		for document in self.document_base.documents:
+			if document.name == document_name:
+				for candidate in document.nuggets:
+					if candidate.start_char == start_char and candidate.end_char == end_char:
+						return candidate
+		raise ValueError(f"Nugget ({start_char}, {end_char}) of document \"{document_name}\" not found in document base!")
+
 	def get_ordert_nuggets(self, document_id: int):
 		document = getDocument(document_id, self.user_id)
 		if document is None:
@@ -152,6 +170,23 @@ class WannaDB_WebAPI:
 		logger.error(f"Document \"{document_name}\" not found in document base!")
 		self.signals.error.emit(Exception(f"Document \"{document_name}\" not found in document base!"))
 
+	@staticmethod
+	def _preprocessing_phase() -> Pipeline:
+		# noinspection PyTypeChecker
+		return Pipeline([
+			StanzaNERExtractor(),
+			SpacyNERExtractor("SpacyEnCoreWebLg"),
+			NuggetDeduplicator(),
+			ContextSentenceCacher(),
+			CopyNormalizer(),
+			OntoNotesLabelParaphraser(),
+			SplitAttributeNameLabelParaphraser(do_lowercase=True, splitters=[" ", "_"]),
+			SBERTLabelEmbedder("SBERTBertLargeNliMeanTokensResource"),
+			SBERTTextEmbedder("SBERTBertLargeNliMeanTokensResource"),
+			BERTContextSentenceEmbedder("BertLargeCasedResource"),
+			RelativePositionEmbedder()
+		])
+
 	def create_document_base(self, documents: list[Document], attributes: list[Attribute], statistics: Statistics):
 		logger.debug("Called slot 'create_document_base'.")
 		self.signals.status.emit("create_document_base")
@@ -168,19 +203,7 @@ class WannaDB_WebAPI:
 			# load default preprocessing phase
 			self.signals.status.emit("Loading preprocessing phase...")
 
-			# noinspection PyTypeChecker
-			preprocessing_phase = Pipeline([
-				StanzaNERExtractor(),
-				SpacyNERExtractor("SpacyEnCoreWebLg"),
-				ContextSentenceCacher(),
-				CopyNormalizer(),
-				OntoNotesLabelParaphraser(),
-				SplitAttributeNameLabelParaphraser(do_lowercase=True, splitters=[" ", "_"]),
-				SBERTLabelEmbedder("SBERTBertLargeNliMeanTokensResource"),
-				SBERTTextEmbedder("SBERTBertLargeNliMeanTokensResource"),
-				BERTContextSentenceEmbedder("BertLargeCasedResource"),
-				RelativePositionEmbedder()
-			])
+			preprocessing_phase = self._preprocessing_phase()
 
 			preprocessing_phase(document_base, EmptyInteractionCallback(), self.status_callback, statistics)
 
@@ -196,6 +219,66 @@ class WannaDB_WebAPI:
 			self.signals.error.emit(e)
 			raise e
 
+	def add_documents(self, documents: list[Document], statistics: Statistics):
+		logger.debug("Called function 'add_documents'.")
+		self.signals.status.emit("add_documents")
+		try:
+			if self.document_base is None:
+				logger.error("Document base not loaded!")
+				self.signals.error.emit(Exception("Document base not loaded!"))
+				return
+
+			existing_names = set(document.name for document in self.document_base.documents)
+			new_documents = []
+			for document in documents:
+				if document.name in existing_names:
+					logger.info(f"Document '{document.name}' already exists and was thus not added.")
+				else:
+					existing_names.add(document.name)
+					new_documents.append(document)
+			if new_documents == []:
+				self.signals.status.emit("No new documents!")
+				return
+
+			# only the new documents pass through the preprocessing phase
+			self.signals.status.emit("Loading preprocessing phase...")
+			preprocessing_phase = self._preprocessing_phase()
+			new_document_base = DocumentBase(new_documents, [])
+			preprocessing_phase(
+				new_document_base, EmptyInteractionCallback(), self.status_callback, statistics["preprocessing"]
+			)
+			preprocessed_documents: list[Document] = new_document_base.documents
+
+			start_index = len(self.document_base.documents)
+			self.document_base.add_documents(preprocessed_documents)
+
+			# continue the matching of the existing attributes for the new documents only
+			self.signals.status.emit("Matching new documents...")
+			# the thresholds that the matching has ended with for the attributes are kept in the document base
+			match_new_documents(
+				self.document_base, preprocessed_documents, self._matching_distance(), statistics["matching"]
+			)
+
+			self.sqLiteCacheDBWrapper.cache_db.append_input_docs("input_document", preprocessed_documents, start_index)
+			for attribute in self.document_base.attributes:
+				self.sqLiteCacheDBWrapper.cache_db.append_attribute_values(
+					attribute.name, preprocessed_documents, start_index
+				)
+
+			if not self.document_base.validate_consistency():
+				logger.error("Document base is inconsistent!")
+				self.signals.error.emit(Exception("Document base is inconsistent!"))
+				return
+
+			self.signals.statistics.emit(statistics)
+			self.signals.finished.emit(1)
+			self.signals.status.emit("Finished!")
+
+		except Exception as e:
+			logger.error(str(e))
+			self.signals.error.emit(e)
+			raise e
+
 	def load_document_base_from_bson(self):
 		logger.debug("Called function 'load_document_base_from_bson'.")
 		try:
@@ -417,6 +500,17 @@ class WannaDB_WebAPI:
 			self.signals.error.emit(e)
 			raise e
 
+	@staticmethod
+	def _matching_distance() -> SignalsMeanDistance:
+		return SignalsMeanDistance(
+			signal_identifiers=[
+				"LabelEmbeddingSignal",
+				"TextEmbeddingSignal",
+				"ContextSentenceEmbeddingSignal",
+				"RelativePositionSignal"
+			]
+		)
+
 	def interactive_table_population(self):
 		logger.debug("Called slot 'interactive_table_population'.")
 
@@ -451,17 +545,10 @@ class WannaDB_WebAPI:
 					ContextSentenceCacher(),
 					SBERTLabelEmbedder("SBERTBertLargeNliMeanTokensResource"),
 					RankingBasedMatcher(
-						distance=SignalsMeanDistance(
-							signal_identifiers=[
-								"LabelEmbeddingSignal",
-								"TextEmbeddingSignal",
-								"ContextSentenceEmbeddingSignal",
-								"RelativePositionSignal"
-							]
-						),
+						distance=self._matching_distance(),
 						max_num_feedback=100,
 						len_ranked_list=10,
-						max_distance=0.2,
+						max_distance=DEFAULT_MAX_DISTANCE,
 						num_random_docs=1,
 						sampling_mode="AT_MAX_DISTANCE_THRESHOLD",
 						adjust_threshold=True,
@@ -490,3 +577,38 @@ class WannaDB_WebAPI:
 			logger.error(str(e))
 			self.signals.error.emit(e)
 			raise e
+
+	def automatic_table_population(self, max_num_feedback: int = 0):
+		logger.debug("Called slot 'automatic_table_population'.")
+
+		try:
+			if self.document_base is None:
+				logger.error("Document base not loaded!")
+				self.signals.error.emit(Exception("Document base not loaded!"))
+				return
+
+			# the feedback requests (if any) are answered through the same channel as in the interactive matching
+			self.signals.status.emit("Loading matching phase...")
+			matching_phase = Pipeline(
+				[
+					SplitAttributeNameLabelParaphraser(do_lowercase=True, splitters=[" ", "_"]),
+					ContextSentenceCacher(),
+					SBERTLabelEmbedder("SBERTBertLargeNliMeanTokensResource"),
+					AutomaticMatcher(
+						distance=self._matching_distance(),
+						max_distance=DEFAULT_MAX_DISTANCE,
+						max_num_feedback=max_num_feedback,
+						len_ranked_list=10,
+						adjust_threshold=True
+					)
+				]
+			)
+
+			interaction_callback = self.interaction_callback if max_num_feedback > 0 else EmptyInteractionCallback()
+			matching_phase(self.document_base, interaction_callback, self.status_callback, Statistics(False))
+			self.signals.document_base_to_ui.emit(self.document_base)
+			self.signals.finished.emit(1)
+		except Exception as e:
+			logger.error(str(e))
+			self.signals.error.emit(e)
+			raise e
@@ -7,7 +7,6 @@ from celery import Task
 
 import wannadb.resources
 from wannadb.data.data import Document, Attribute, InformationNugget
-from wannadb.resources import ResourceManager
 from wannadb.statistics import Statistics
 from wannadb_web.Redis.RedisCache import RedisCache
 from wannadb_web.postgres.queries import getDocuments
@@ -23,11 +22,11 @@ class InitManager(Task):
 	name = "InitManager"
 
 	def run(self, *args, **kwargs):
-		ResourceManager()
+		# the models are held by the model server (see wannadb.model_server) if WANNADB_MODEL_SERVER is set,
+		# so the resource manager of a worker process only holds proxies and cannot be shared through redis
+		BaseTask.load()
 		if wannadb.resources.MANAGER is None:
 			raise RuntimeError("Resource_Manager is None!")
-		manager = pickle.dumps(wannadb.resources.MANAGER)
-		RedisCache("0").set("manager", manager)
 
 
 class BaseTask(Task):
@@ -196,6 +195,42 @@ class DocumentBaseAddAttributes(BaseTask):
 		return self
 
 
+class DocumentBaseAddDocuments(BaseTask):
+	name = "DocumentBaseAddDocuments"
+
+	def run(self, user_id: int, document_ids: list[int], statistics_dump: bytes, base_name: str,
+			organisation_id: int):
+		self.load()
+		statistics: Statistics = pickle.loads(statistics_dump)
+		if not isinstance(statistics, Statistics):
+			self.update(State.ERROR)
+			raise Exception("Invalid statistics")
+
+		docs = getDocuments(document_ids, user_id)
+		if not docs:
+			self.update(State.ERROR)
+			raise Exception("No documents found")
+
+		documents: list[Document] = []
+		for name, text in docs:
+			if name is None:
+				raise Exception("Document Name is none")
+			if text is None:
+				raise Exception("Document text is none")
+			documents.append(Document(name, text))
+
+		self.update(State.PENDING)
+		api = WannaDB_WebAPI(user_id, base_name, organisation_id)
+		api.load_document_base_from_bson()
+		api.add_documents(documents, statistics)
+		if api.signals.error.msg is None:
+			api.update_document_base_to_bson()
+			self.update(State.SUCCESS)
+			return self
+		self.update(State.ERROR)
+		return self
+
+
 class DocumentBaseUpdateAttributes(BaseTask):
 	name = "DocumentBaseAddAttributes"
 
@@ -313,6 +348,25 @@ class DocumentBaseInteractiveTablePopulation(BaseTask):
 			return self
 
 
+class DocumentBaseAutomaticTablePopulation(BaseTask):
+	name = "DocumentBaseAutomaticTablePopulation"
+
+	def run(self, user_id: int, base_name: str, organisation_id: int, max_num_feedback: int = 0):
+		self._signals = Signals(str(user_id))
+		self._redis_client = RedisCache(str(user_id))
+		self.load()
+
+		api = WannaDB_WebAPI(user_id, base_name, organisation_id)
+		api.load_document_base_from_bson()
+		api.automatic_table_population(max_num_feedback)
+		if api.signals.error.msg is None:
+			api.update_document_base_to_bson()
+			self.update(State.SUCCESS)
+			return self
+		self.update(State.ERROR)
+		return self
+
+
 class DocumentBaseGetOrderedNuggets(BaseTask):
 	name = "DocumentBaseGetOrderedNuggets"
 